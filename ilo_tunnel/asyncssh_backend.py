@@ -0,0 +1,361 @@
+# ilo_tunnel/asyncssh_backend.py
+import asyncio
+import importlib.util
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .events import (
+    TunnelEvent,
+    EVENT_CONNECTING,
+    EVENT_AUTHENTICATED,
+    EVENT_CONNECT_FAILED,
+    EVENT_AUTH_FAILED,
+    EVENT_FORWARD_BOUND,
+    EVENT_BIND_FAILED,
+    EVENT_CHANNEL_OPEN,
+    EVENT_FORWARD_FAILED,
+    EVENT_DISCONNECT,
+    EVENT_EXITED,
+)
+from .traffic import TrafficRelay, RELAY_CHUNK
+
+# Motores de túnel disponibles
+BACKEND_OPENSSH = "openssh"  # Proceso "sudo ssh" por túnel (predeterminado)
+BACKEND_ASYNCSSH = "asyncssh"  # Reenvío en proceso con asyncssh
+
+BACKEND_LABELS = {
+    BACKEND_OPENSSH: "OpenSSH (sudo ssh)",
+    BACKEND_ASYNCSSH: "asyncssh (en proceso)",
+}
+
+
+def is_asyncssh_available() -> bool:
+    """Comprueba si asyncssh está instalado sin importarlo"""
+    return importlib.util.find_spec("asyncssh") is not None
+
+
+def gateway_identity(config: dict) -> tuple:
+    """Clave de la conexión compartida por los túneles de un gateway"""
+    return (
+        config["user"],
+        config["gateway"],
+        int(config["ssh_port"]),
+        os.path.expanduser(config["key_path"]),
+    )
+
+
+class _Gateway:
+    """Conexión SSH compartida por los túneles de un mismo gateway"""
+
+    def __init__(self, identity: tuple):
+        self.identity = identity
+        self.connection = None
+        self.connecting: Optional[asyncio.Future] = None
+        self.users = set()
+
+
+class AsyncSSHEngine(QObject):
+    """
+    Motor de túneles en proceso basado en asyncssh.
+
+    Mantiene una única conexión SSH por gateway y abre sobre ella un canal
+    direct-tcpip por cada conexión local, por lo que no necesita lanzar
+    "sudo ssh" ni analizar su salida: los eventos de canal y los contadores
+    de bytes se obtienen directamente. Todo el trabajo de red se hace en un
+    bucle asyncio en un hilo propio; las señales llegan al hilo de la interfaz.
+
+    No puede escuchar en puertos privilegiados (<1024) sin permisos de
+    administrador; esos reenvíos se notifican como bind-failed.
+    """
+
+    tunnel_event = pyqtSignal(object)  # TunnelEvent
+    output_ready = pyqtSignal(str, str)  # túnel, texto
+    error_ready = pyqtSignal(str, str)  # túnel, texto
+
+    def __init__(self, traffic_relay: Optional[TrafficRelay] = None, parent=None):
+        super().__init__(parent)
+        self.traffic_relay = traffic_relay or TrafficRelay()
+        self._gateways: Dict[tuple, _Gateway] = {}
+        self._tunnels: Dict[str, Tuple[_Gateway, List]] = {}  # túnel -> (gateway, servidores)
+        self._writers: Dict[str, set] = {}
+        self._loop = None
+        self._thread = None
+
+    @staticmethod
+    def is_available() -> bool:
+        """Indica si el motor puede usarse (asyncssh instalado)"""
+        return is_asyncssh_available()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Arranca el bucle del motor la primera vez que se necesita"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="asyncssh-engine", daemon=True
+            )
+            self._thread.start()
+        return self._loop
+
+    def _event(self, tunnel_id: str, kind: str, **fields) -> None:
+        """Emite un evento de conexión (desde el hilo del motor)"""
+        self.tunnel_event.emit(
+            TunnelEvent(tunnel_id, kind, fields={k: str(v) for k, v in fields.items()})
+        )
+
+    def open_tunnel(
+        self, tunnel_id: str, config: dict, forwards: List[Tuple[str, int, str, int]]
+    ) -> None:
+        """
+        Abre los reenvíos de un túnel sobre la conexión de su gateway
+
+        Args:
+            tunnel_id: Identificador del túnel
+            config: Configuración del túnel (user, gateway, ssh_port, key_path,
+                compress, identity_only, timeout)
+            forwards: Lista de (ip local, puerto local, host remoto, puerto remoto)
+        """
+        asyncio.run_coroutine_threadsafe(
+            self._open_tunnel(tunnel_id, dict(config), list(forwards)),
+            self._ensure_loop(),
+        )
+
+    def close_tunnel(self, tunnel_id: str) -> None:
+        """Cierra los reenvíos de un túnel y libera su conexión de gateway"""
+        if self._loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._close_tunnel(tunnel_id), self._loop)
+        try:
+            # Los puertos locales quedan libres para un nuevo arranque
+            future.result(timeout=1)
+        except Exception:
+            pass
+
+    def is_running(self, tunnel_id: str) -> bool:
+        """Indica si el túnel tiene reenvíos abiertos o en curso"""
+        return tunnel_id in self._tunnels
+
+    def shutdown(self) -> None:
+        """Cierra todas las conexiones y detiene el bucle"""
+        if self._loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._close_all(), self._loop)
+        try:
+            future.result(timeout=3)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    # --- Métodos que se ejecutan en el hilo del motor ---
+
+    async def _connect(self, tunnel_id: str, gateway: _Gateway, config: dict):
+        """Obtiene la conexión del gateway, abriéndola si es necesario"""
+        if gateway.connection is not None:
+            return gateway.connection
+        if gateway.connecting is not None:
+            return await gateway.connecting
+
+        import asyncssh
+
+        self._event(
+            tunnel_id, EVENT_CONNECTING, host=config["gateway"], port=config["ssh_port"]
+        )
+        options = dict(
+            username=config["user"],
+            port=int(config["ssh_port"]),
+            client_keys=[os.path.expanduser(config["key_path"])],
+            known_hosts=None,  # Equivale a StrictHostKeyChecking=no
+            keepalive_interval=15,
+            keepalive_count_max=3,
+            connect_timeout=config["timeout"],
+        )
+        if config["identity_only"]:
+            options["agent_path"] = None
+        if config["compress"]:
+            options["compression_algs"] = ["zlib@openssh.com", "zlib", "none"]
+
+        gateway.connecting = asyncio.get_running_loop().create_future()
+        try:
+            connection = await asyncssh.connect(config["gateway"], **options)
+        except Exception as e:
+            gateway.connecting.set_exception(e)
+            # Evitar el aviso de excepción no recuperada si nadie más espera
+            gateway.connecting.exception()
+            gateway.connecting = None
+            raise
+
+        gateway.connection = connection
+        gateway.connecting.set_result(connection)
+        gateway.connecting = None
+        asyncio.ensure_future(self._watch_connection(gateway))
+        return connection
+
+    async def _watch_connection(self, gateway: _Gateway) -> None:
+        """Notifica a los túneles del gateway cuando la conexión se cierra"""
+        await gateway.connection.wait_closed()
+        gateway.connection = None
+        self._forget_gateway(gateway)
+
+        for tunnel_id in list(gateway.users):
+            self._event(tunnel_id, EVENT_DISCONNECT, reason="conexión con el gateway cerrada")
+            await self._close_tunnel(tunnel_id)
+            self._event(tunnel_id, EVENT_EXITED, code=255, reason="Conexión cerrada")
+
+    def _forget_gateway(self, gateway: _Gateway) -> None:
+        """Quita un gateway del registro si sigue siendo el registrado"""
+        if self._gateways.get(gateway.identity) is gateway:
+            del self._gateways[gateway.identity]
+
+    async def _open_tunnel(self, tunnel_id: str, config: dict, forwards: list) -> None:
+        """Conecta con el gateway y abre los servidores locales del túnel"""
+        if tunnel_id in self._tunnels:
+            await self._close_tunnel(tunnel_id)
+
+        identity = gateway_identity(config)
+        gateway = self._gateways.setdefault(identity, _Gateway(identity))
+        gateway.users.add(tunnel_id)
+        servers = []
+        self._tunnels[tunnel_id] = (gateway, servers)
+
+        import asyncssh
+
+        reused = gateway.connection is not None
+        try:
+            connection = await self._connect(tunnel_id, gateway, config)
+        except asyncssh.PermissionDenied as e:
+            self._fail(tunnel_id, gateway, EVENT_AUTH_FAILED, str(e))
+            return
+        except (OSError, asyncssh.Error, asyncio.TimeoutError) as e:
+            self._fail(tunnel_id, gateway, EVENT_CONNECT_FAILED, str(e) or type(e).__name__)
+            return
+
+        if tunnel_id not in self._tunnels:
+            # El túnel se cerró mientras se conectaba: si nadie más usa la
+            # conexión recién abierta, cerrarla (_close_tunnel no la vio)
+            if not gateway.users:
+                self._forget_gateway(gateway)
+                connection.close()
+            return
+
+        self._event(
+            tunnel_id,
+            EVENT_AUTHENTICATED,
+            host=config["gateway"],
+            reused="1" if reused else "0",
+        )
+        self.output_ready.emit(
+            tunnel_id,
+            f"Conectado a {config['gateway']} con asyncssh"
+            + (" (conexión compartida)" if reused else ""),
+        )
+
+        for local_ip, local_port, remote_host, remote_port in forwards:
+            listen = f"{local_ip}:{local_port}"
+            counters = self.traffic_relay.counters_for(tunnel_id, local_port)
+
+            async def handle(reader, writer, remote=(remote_host, remote_port),
+                             counters=counters, local_port=local_port):
+                await self._forward(
+                    tunnel_id, connection, reader, writer, remote, counters, local_port
+                )
+
+            try:
+                server = await asyncio.start_server(handle, local_ip, local_port)
+            except OSError as e:
+                self._event(tunnel_id, EVENT_BIND_FAILED, port=local_port, reason=e.strerror)
+                self.error_ready.emit(tunnel_id, f"bind [{local_ip}]:{local_port}: {e.strerror}")
+                continue
+
+            servers.append(server)
+            self._event(tunnel_id, EVENT_FORWARD_BOUND, listen=listen,
+                        target=f"{remote_host}:{remote_port}")
+
+    def _fail(self, tunnel_id: str, gateway: _Gateway, kind: str, reason: str) -> None:
+        """Notifica un error de conexión y da el túnel por terminado"""
+        gateway.users.discard(tunnel_id)
+        if not gateway.users and gateway.connection is None:
+            self._forget_gateway(gateway)
+        self._tunnels.pop(tunnel_id, None)
+
+        self.error_ready.emit(tunnel_id, reason)
+        self._event(tunnel_id, kind, reason=reason)
+        self._event(tunnel_id, EVENT_EXITED, code=255, reason=reason)
+
+    async def _forward(
+        self, tunnel_id, connection, client_reader, client_writer, remote, counters, local_port
+    ) -> None:
+        """Abre un canal direct-tcpip para una conexión local y copia los datos"""
+        import asyncssh
+
+        try:
+            remote_reader, remote_writer = await connection.open_connection(*remote)
+        except (asyncssh.ChannelOpenError, OSError) as e:
+            reason = getattr(e, "reason", str(e))
+            self._event(tunnel_id, EVENT_FORWARD_FAILED, port=local_port, reason=reason)
+            client_writer.close()
+            return
+
+        self._event(tunnel_id, EVENT_CHANNEL_OPEN, port=local_port,
+                    host=remote[0], remote_port=remote[1])
+        writers = self._writers.setdefault(tunnel_id, set())
+        writers.update((client_writer, remote_writer))
+        counters.connections += 1
+        counters.active += 1
+
+        async def pump(reader, writer, attribute):
+            try:
+                while True:
+                    data = await reader.read(RELAY_CHUNK)
+                    if not data:
+                        break
+                    writer.write(data)
+                    setattr(counters, attribute, getattr(counters, attribute) + len(data))
+                    await writer.drain()
+            except (OSError, asyncio.CancelledError, asyncssh.Error):
+                pass
+            finally:
+                try:
+                    writer.write_eof()
+                except (OSError, asyncssh.Error):
+                    pass
+
+        try:
+            await asyncio.gather(
+                pump(client_reader, remote_writer, "bytes_sent"),
+                pump(remote_reader, client_writer, "bytes_received"),
+            )
+        finally:
+            counters.active -= 1
+            for writer in (client_writer, remote_writer):
+                writers.discard(writer)
+                writer.close()
+
+    async def _close_tunnel(self, tunnel_id: str) -> None:
+        """
+        Cierra los servidores de un túnel y la conexión si nadie más la usa.
+
+        No emite EVENT_EXITED: quien detiene el túnel ya conoce su estado.
+        """
+        entry = self._tunnels.pop(tunnel_id, None)
+        if entry is None:
+            return
+
+        gateway, servers = entry
+        for server in servers:
+            server.close()
+        for writer in self._writers.pop(tunnel_id, set()):
+            writer.close()
+
+        gateway.users.discard(tunnel_id)
+        if not gateway.users and gateway.connection is not None:
+            # Un túnel nuevo del mismo gateway abrirá otra conexión
+            self._forget_gateway(gateway)
+            gateway.connection.close()
+
+    async def _close_all(self) -> None:
+        """Cierra todos los túneles"""
+        for tunnel_id in list(self._tunnels):
+            await self._close_tunnel(tunnel_id)
@@ -0,0 +1,103 @@
+# ilo_tunnel/events.py
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# Ciclo de vida de la conexión
+EVENT_SPAWNED = "spawned"  # Proceso ssh lanzado
+EVENT_PROCESS_STARTED = "process-started"  # El sistema ha creado el proceso
+EVENT_CONNECTING = "connecting"  # Resolviendo y conectando al gateway
+EVENT_TCP_CONNECTED = "tcp-connected"  # Conexión TCP establecida
+EVENT_KEX_DONE = "kex-done"  # Intercambio de claves completado
+EVENT_AUTH_METHOD = "auth-method"  # Método de autenticación probado
+EVENT_AUTHENTICATED = "authenticated"
+EVENT_DISCONNECT = "disconnect"  # Motivo de desconexión indicado por ssh
+EVENT_EXITED = "exited"  # Fin del proceso ssh o de la conexión maestra
+
+# Errores de conexión
+EVENT_AUTH_FAILED = "auth-failed"
+EVENT_HOST_KEY_FAILED = "host-key-failed"
+EVENT_CONNECT_FAILED = "connect-failed"
+
+# Reenvíos de puertos (-L) y canales
+EVENT_FORWARD_BOUND = "forward-bound"
+EVENT_FORWARD_FAILED = "forward-failed"
+EVENT_BIND_FAILED = "bind-failed"
+EVENT_CHANNEL_OPEN = "channel-open"
+
+# Estados de un reenvío
+FORWARD_PENDING = "pending"
+FORWARD_BOUND = "bound"
+FORWARD_FAILED = "failed"
+
+
+@dataclass
+class TunnelEvent:
+    """Evento de conexión de un túnel"""
+
+    tunnel_id: str
+    kind: str
+    timestamp: float = field(default_factory=time.monotonic)
+    fields: Dict[str, str] = field(default_factory=dict)
+    line: str = ""  # Línea de ssh de la que procede, si la hay
+
+
+@dataclass
+class ForwardState:
+    """Estado de un reenvío de puerto local"""
+
+    listen: str  # "ip_local:puerto_local"
+    target: str  # "host_remoto:puerto_remoto"
+    state: str = FORWARD_PENDING
+    since: float = field(default_factory=time.monotonic)
+    detail: str = ""
+    channels: int = 0  # Canales abiertos a través del reenvío
+    channel_failures: int = 0
+
+    @classmethod
+    def from_mapping(cls, mapping: str) -> Optional["ForwardState"]:
+        """Crea el estado a partir de "local_ip:local_port:remote_host:remote_port" """
+        parts = mapping.split(":")
+        if len(parts) != 4:
+            return None
+        return cls(f"{parts[0]}:{parts[1]}", f"{parts[2]}:{parts[3]}")
+
+    @property
+    def local_port(self) -> int:
+        """Puerto local del reenvío"""
+        return int(self.listen.rsplit(":", 1)[1])
+
+    def set_state(self, state: str, detail: str = "") -> None:
+        """Cambia el estado del reenvío"""
+        if state != self.state:
+            self.state = state
+            self.since = time.monotonic()
+        self.detail = detail
+
+
+# Descripción de cada evento para la interfaz
+EVENT_LABELS = {
+    EVENT_SPAWNED: "Proceso ssh iniciado",
+    EVENT_PROCESS_STARTED: "Proceso en ejecución",
+    EVENT_CONNECTING: "Conectando al gateway",
+    EVENT_TCP_CONNECTED: "Conexión TCP establecida",
+    EVENT_KEX_DONE: "Intercambio de claves completado",
+    EVENT_AUTH_METHOD: "Probando autenticación",
+    EVENT_AUTHENTICATED: "Autenticado",
+    EVENT_DISCONNECT: "Desconexión",
+    EVENT_EXITED: "Conexión finalizada",
+    EVENT_AUTH_FAILED: "Error de autenticación",
+    EVENT_HOST_KEY_FAILED: "Error de clave de host",
+    EVENT_CONNECT_FAILED: "Error de conexión",
+    EVENT_FORWARD_BOUND: "Reenvío abierto",
+    EVENT_FORWARD_FAILED: "Reenvío fallido",
+    EVENT_BIND_FAILED: "Puerto local no disponible",
+    EVENT_CHANNEL_OPEN: "Canal abierto",
+}
+
+# Descripción de cada estado de reenvío
+FORWARD_LABELS = {
+    FORWARD_PENDING: "pendiente",
+    FORWARD_BOUND: "abierto",
+    FORWARD_FAILED: "fallido",
+}
@@ -21,6 +21,9 @@ from PyQt6.QtWidgets import (
     QRadioButton,
     QButtonGroup,
     QGroupBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
 )
 from PyQt6.QtCore import Qt
 
@@ -31,6 +34,22 @@ from ..models.server_types import (
     get_server_ports,
     get_server_description,
 )
+from ..models.profile_export import EXPORT_FORMAT_LABELS
+from ..metrics import (
+    PHASES,
+    PHASE_LABELS,
+    TOTAL_PHASE,
+    HISTOGRAM_BUCKETS,
+    SCOPE_PROFILE,
+    SCOPE_GATEWAY,
+)
+from ..asyncssh_backend import BACKEND_LABELS, BACKEND_OPENSSH
+from ..socks_proxy import (
+    FORWARD_MODE_LABELS,
+    FORWARD_MODE_PORTS,
+    FORWARD_MODE_SOCKS,
+    DEFAULT_SOCKS_PORT,
+)
 
 
 class ConnectionProfileDialog(QDialog):
@@ -133,6 +152,46 @@ class ConnectionProfileDialog(QDialog):
         key_path_widget.setLayout(key_path_layout)
         basic_layout.addRow("Ruta de la clave SSH:", key_path_widget)
 
+        # Motor del túnel
+        self.backend_combo = QComboBox()
+        for backend, label in BACKEND_LABELS.items():
+            self.backend_combo.addItem(label, backend)
+        index = self.backend_combo.findData(
+            self.profile_data.get("backend", BACKEND_OPENSSH)
+        )
+        self.backend_combo.setCurrentIndex(max(index, 0))
+        basic_layout.addRow("Motor:", self.backend_combo)
+
+        # Modo de reenvío: un -L por puerto o un único proxy SOCKS5
+        forward_layout = QHBoxLayout()
+        self.forward_mode_combo = QComboBox()
+        for mode, label in FORWARD_MODE_LABELS.items():
+            self.forward_mode_combo.addItem(label, mode)
+        forward_layout.addWidget(self.forward_mode_combo, 1)
+
+        self.socks_port = QSpinBox()
+        self.socks_port.setRange(1, 65535)
+        self.socks_port.setValue(self.profile_data.get("socks_port", DEFAULT_SOCKS_PORT))
+        self.socks_port.setPrefix("Puerto ")
+        forward_layout.addWidget(self.socks_port)
+
+        self.forward_mode_combo.currentIndexChanged.connect(
+            lambda: self.socks_port.setEnabled(
+                self.forward_mode_combo.currentData() == FORWARD_MODE_SOCKS
+            )
+        )
+        index = self.forward_mode_combo.findData(
+            self.profile_data.get("forward_mode", FORWARD_MODE_PORTS)
+        )
+        self.forward_mode_combo.setCurrentIndex(max(index, 0))
+        self.socks_port.setEnabled(
+            self.forward_mode_combo.currentData() == FORWARD_MODE_SOCKS
+        )
+
+        forward_widget = QWidget()
+        forward_widget.setLayout(forward_layout)
+        basic_layout.addRow("Reenvío:", forward_widget)
+
         # Añadir pestaña básica
         tabs.addTab(basic_tab, "Básico")
 
@@ -342,6 +401,9 @@ class ConnectionProfileDialog(QDialog):
             "key_path": self.key_path.text(),
             "ports": ports_data,
             "custom_ports": self.use_custom_ports.isChecked(),
+            "backend": self.backend_combo.currentData(),
+            "forward_mode": self.forward_mode_combo.currentData(),
+            "socks_port": self.socks_port.value(),
         }
 
     def get_selected_folder(self):
@@ -506,3 +568,220 @@ class FolderManagementDialog(QDialog):
         """Actualiza la lista de carpetas"""
         self.folder_list.clear()
         self.folder_list.addItems(self.profile_manager.get_folders())
+
+
+class ExportProfilesDialog(QDialog):
+    """Diálogo para elegir qué perfiles exportar y en qué formato"""
+
+    def __init__(self, parent=None, profile_manager=None, current_folder=None):
+        super().__init__(parent)
+        self.profile_manager = profile_manager
+        self.current_folder = current_folder
+
+        self.setWindowTitle("Exportar perfiles")
+        self.setMinimumWidth(400)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+        form_layout = QFormLayout()
+
+        # Formato del archivo
+        self.format_combo = QComboBox()
+        for file_format, label in EXPORT_FORMAT_LABELS.items():
+            self.format_combo.addItem(label, file_format)
+        form_layout.addRow("Formato:", self.format_combo)
+
+        # Filtros (None = todos)
+        self.folder_combo = QComboBox()
+        self.folder_combo.addItem("Todas las carpetas", None)
+        for folder in self.profile_manager.get_folders():
+            self.folder_combo.addItem(folder, folder)
+        index = self.folder_combo.findData(self.current_folder)
+        self.folder_combo.setCurrentIndex(max(index, 0))
+        form_layout.addRow("Carpeta:", self.folder_combo)
+
+        self.server_type_combo = QComboBox()
+        self.server_type_combo.addItem("Todos los tipos", None)
+        for server_type in get_server_types():
+            self.server_type_combo.addItem(server_type, server_type)
+        form_layout.addRow("Tipo de servidor:", self.server_type_combo)
+
+        self.gateway_combo = QComboBox()
+        self.gateway_combo.addItem("Todos los gateways", None)
+        for gateway in sorted(self.profile_manager.get_field_values("gateway_ip")):
+            if gateway:
+                self.gateway_combo.addItem(gateway, gateway)
+        form_layout.addRow("Gateway:", self.gateway_combo)
+
+        layout.addLayout(form_layout)
+
+        info_label = QLabel(
+            "El formato de configuración de OpenSSH genera un bloque Host por "
+            "perfil con sus reenvíos, para usarlo con ssh -F o Include."
+        )
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def get_options(self):
+        """Formato y filtros elegidos"""
+        return {
+            "file_format": self.format_combo.currentData(),
+            "folder": self.folder_combo.currentData(),
+            "server_type": self.server_type_combo.currentData(),
+            "gateway": self.gateway_combo.currentData(),
+        }
+
+
+class MetricsDialog(QDialog):
+    """Diálogo con los tiempos de arranque de los túneles por fase"""
+
+    def __init__(self, parent=None, metrics=None):
+        super().__init__(parent)
+        self.metrics = metrics
+
+        self.setWindowTitle("Tiempos de conexión")
+        self.setMinimumWidth(560)
+        self.setMinimumHeight(480)
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
+
+        # Selección de perfil o gateway
+        selector_layout = QHBoxLayout()
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItem("Por perfil", SCOPE_PROFILE)
+        self.scope_combo.addItem("Por gateway", SCOPE_GATEWAY)
+        self.scope_combo.currentIndexChanged.connect(self.refresh_keys)
+        selector_layout.addWidget(self.scope_combo)
+
+        self.key_combo = QComboBox()
+        self.key_combo.currentIndexChanged.connect(self.refresh_stats)
+        selector_layout.addWidget(self.key_combo, 1)
+        layout.addLayout(selector_layout)
+
+        # Resumen por fase
+        self.stats_table = QTableWidget(0, 6)
+        self.stats_table.setHorizontalHeaderLabels(
+            ["Fase", "Muestras", "Mín (ms)", "Mediana (ms)", "P90 (ms)", "Máx (ms)"]
+        )
+        self.stats_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.stats_table)
+
+        # Histograma de la fase seleccionada
+        histogram_layout = QHBoxLayout()
+        histogram_layout.addWidget(QLabel("Histograma de:"))
+        self.phase_combo = QComboBox()
+        for name, _, _ in PHASES + [(TOTAL_PHASE, None, None)]:
+            self.phase_combo.addItem(PHASE_LABELS[name], name)
+        self.phase_combo.setCurrentIndex(self.phase_combo.count() - 1)
+        self.phase_combo.currentIndexChanged.connect(self.refresh_histogram)
+        histogram_layout.addWidget(self.phase_combo, 1)
+        layout.addLayout(histogram_layout)
+
+        self.histogram_table = QTableWidget(len(HISTOGRAM_BUCKETS), 2)
+        self.histogram_table.setHorizontalHeaderLabels(["Muestras", ""])
+        self.histogram_table.setVerticalHeaderLabels(
+            [
+                f"≤ {limit:.0f} ms" if limit != float("inf") else "más"
+                for limit in HISTOGRAM_BUCKETS
+            ]
+        )
+        self.histogram_table.horizontalHeader().setStretchLastSection(True)
+        self.histogram_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.histogram_table)
+
+        info_label = QLabel(
+            "Si la conexión TCP o el intercambio de claves son lentos el problema "
+            "suele estar en el gateway; si lo es el primer reenvío, en el ILO."
+        )
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+
+        # Botones de diálogo
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        export_button = buttons.addButton(
+            "Exportar...", QDialogButtonBox.ButtonRole.ActionRole
+        )
+        export_button.clicked.connect(self.export_metrics)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.refresh_keys()
+
+    def refresh_keys(self):
+        """Actualiza la lista de perfiles o gateways con muestras"""
+        self.key_combo.blockSignals(True)
+        self.key_combo.clear()
+        self.key_combo.addItems(self.metrics.keys(self.scope_combo.currentData()))
+        self.key_combo.blockSignals(False)
+        self.refresh_stats()
+
+    def refresh_stats(self):
+        """Muestra el resumen por fase de la selección actual"""
+        stats = self.metrics.stats(
+            self.scope_combo.currentData(), self.key_combo.currentText()
+        )
+        self.stats_table.setRowCount(len(stats))
+        for row, (phase, phase_stats) in enumerate(stats.items()):
+            values = [
+                PHASE_LABELS[phase],
+                str(phase_stats.count),
+                f"{phase_stats.minimum:.0f}",
+                f"{phase_stats.median:.0f}",
+                f"{phase_stats.p90:.0f}",
+                f"{phase_stats.maximum:.0f}",
+            ]
+            for col, value in enumerate(values):
+                self.stats_table.setItem(row, col, QTableWidgetItem(value))
+        self.refresh_histogram()
+
+    def refresh_histogram(self):
+        """Muestra el histograma de la fase seleccionada"""
+        counts = self.metrics.histogram(
+            self.scope_combo.currentData(),
+            self.key_combo.currentText(),
+            self.phase_combo.currentData(),
+        )
+        largest = max(counts) or 1
+        for row, count in enumerate(counts):
+            self.histogram_table.setItem(row, 0, QTableWidgetItem(str(count)))
+            self.histogram_table.setItem(
+                row, 1, QTableWidgetItem("█" * round(30 * count / largest))
+            )
+
+    def export_metrics(self):
+        """Exporta todas las muestras a un archivo CSV o JSON"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar tiempos de conexión",
+            "",
+            "Archivos CSV (*.csv);;Archivos JSON (*.json)",
+        )
+        if not file_path:
+            return
+
+        if not file_path.lower().endswith((".csv", ".json")):
+            file_path += ".csv"
+
+        try:
+            count = self.metrics.export(file_path)
+            QMessageBox.information(
+                self, "Exportación", f"Se exportaron {count} muestras a {file_path}"
+            )
+        except OSError as e:
+            QMessageBox.critical(
+                self, "Error", f"No se pudo exportar el archivo: {str(e)}"
+            )
@@ -6,6 +6,7 @@ import os
 import platform
 import webbrowser
 import json
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 
@@ -26,8 +27,9 @@ from PyQt6.QtWidgets import (
     QGridLayout,
     QFormLayout,
     QComboBox,
-    QListWidget,
+    QListView,
     QInputDialog,
+    QProgressDialog,
     QSplitter,
     QGroupBox,
     QScrollArea,
@@ -37,20 +39,51 @@ from PyQt6.QtWidgets import (
     QFileDialog,
     QDialogButtonBox,
     QSizePolicy,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QAbstractItemView,
 )
-from PyQt6.QtCore import Qt, QProcess, QSettings, QTimer, pyqtSignal, QSize
+from PyQt6.QtCore import Qt, QProcess, QSettings, QTimer, pyqtSignal, QSize, QModelIndex
 from PyQt6.QtGui import QIcon, QAction, QColor, QTextCursor, QFont
 
 from ..models.profile import ConnectionProfile
 from ..models.profile_manager import ProfileManager
+from ..models.profile_export import EXPORT_FILE_FILTERS, ProfileExporter
+from ..models.profile_import import MERGE_LABELS, MERGE_SKIP, ProfileImporter
+from .profile_model import FOLDER_ROLE, ProfileListModel, ProfileFilterProxyModel
 from ..ssh_manager import SSHManager
+from ..events import (
+    EVENT_LABELS,
+    FORWARD_LABELS,
+    FORWARD_BOUND,
+    EVENT_SPAWNED,
+    EVENT_CHANNEL_OPEN,
+    EVENT_BIND_FAILED,
+)
+from ..metrics import PHASES, PHASE_LABELS, TOTAL_PHASE
+from ..traffic import format_bytes
+from ..reconnect import CIRCUIT_CLOSED, CIRCUIT_LABELS
+from ..socks_proxy import (
+    FORWARD_MODE_LABELS,
+    FORWARD_MODE_PORTS,
+    FORWARD_MODE_SOCKS,
+    DEFAULT_SOCKS_PORT,
+)
+from ..asyncssh_backend import (
+    BACKEND_LABELS,
+    BACKEND_OPENSSH,
+    BACKEND_ASYNCSSH,
+    is_asyncssh_available,
+)
 from ..models.server_types import (
     get_server_types,
     get_server_ports,
     get_server_description,
     get_server_essential_ports,
 )
-from .widgets import PortStatusWidget
+from .widgets import PortStatusWidget, LogTextEdit
+from .dialogs import MetricsDialog
 
 
 class ILOTunnelApp(QMainWindow):
@@ -61,10 +94,29 @@ class ILOTunnelApp(QMainWindow):
 
         # Estado de la aplicación
         self.settings = QSettings("ILOTunnel", "ILOTunnelApp")
-        self.profile_manager = ProfileManager()
+        self.profile_manager = ProfileManager(self)
+        # Un único modelo de perfiles para el combo y la lista; cada vista
+        # filtra su carpeta y su búsqueda con su propio proxy
+        self.profile_model = ProfileListModel(self.profile_manager, self)
+        self.profile_combo_proxy = ProfileFilterProxyModel(self.profile_manager, self)
+        self.profile_combo_proxy.setSourceModel(self.profile_model)
+        self.profiles_list_proxy = ProfileFilterProxyModel(self.profile_manager, self)
+        self.profiles_list_proxy.setSourceModel(self.profile_model)
+        # Importación de archivos de perfiles en segundo plano
+        self.profile_importer = ProfileImporter(self.profile_manager, parent=self)
+        self.profile_importer.progress.connect(self.updateImportProgress)
+        self.profile_importer.finished.connect(self.importFinished)
+        self.import_progress = None
+        self.profile_exporter = ProfileExporter(self.profile_manager, parent=self)
+        self.profile_exporter.progress.connect(self.updateExportProgress)
+        self.profile_exporter.finished.connect(self.exportFinished)
+        self.export_progress = None
+        self.export_path = None
         self.current_folder = "DEFAULT"
         self.current_profile = None
         self.active_ports = {}  # Para seguimiento de puertos activos
+        self.current_profile_folder = None
+        self.tunnel_info = {}  # Datos de cada túnel lanzado desde la interfaz
 
         # Inicializar SSH manager primero para que esté disponible durante la inicialización de UI
         self.ssh_manager = SSHManager()
@@ -86,11 +138,26 @@ class ILOTunnelApp(QMainWindow):
         self.ssh_manager.process_finished.connect(self.onProcessFinished)
         self.ssh_manager.connection_status.connect(self.onConnectionStatusChanged)
         self.ssh_manager.status_changed.connect(self.updatePortStatus)
+        self.ssh_manager.probe_result.connect(self.updatePortProbeDetail)
+        self.ssh_manager.tunnel_event.connect(self.onTunnelEvent)
+        self.ssh_manager.startup_recorded.connect(self.onStartupRecorded)
+        self.ssh_manager.tunnel_added.connect(self.updateTunnelsTable)
+        self.ssh_manager.tunnel_removed.connect(self.onTunnelRemoved)
+
+        # El túnel mostrado depende de la configuración del formulario
+        self.ilo_ip.textChanged.connect(self.refreshCurrentTunnelState)
+        self.gateway_ip.textChanged.connect(self.refreshCurrentTunnelState)
+        self.ssh_user.textChanged.connect(self.refreshCurrentTunnelState)
 
         # Puerto monitor timer
         self.port_monitor_timer = QTimer(self)
         self.port_monitor_timer.timeout.connect(self.checkPortStatus)
 
+        # Actualización de la tasa de tráfico (una vez por segundo)
+        self.traffic_timer = QTimer(self)
+        self.traffic_timer.timeout.connect(self.updateTrafficTable)
+        self.traffic_timer.start(1000)
+
         # Cargar configuración
         self.loadSettings()
 
@@ -151,6 +218,11 @@ class ILOTunnelApp(QMainWindow):
         self.browser_action.triggered.connect(self.openBrowser)
         toolbar.addAction(self.browser_action)
 
+        # Acción tiempos de conexión
+        self.metrics_action = QAction("Tiempos de conexión", self)
+        self.metrics_action.triggered.connect(self.showMetricsDialog)
+        toolbar.addAction(self.metrics_action)
+
         toolbar.addSeparator()
 
         # Acciones para perfiles
@@ -190,7 +262,7 @@ class ILOTunnelApp(QMainWindow):
         search_layout = QHBoxLayout()
         search_layout.addWidget(QLabel("🔍"))
         self.profile_search = QLineEdit()
-        self.profile_search.setPlaceholderText("Buscar perfil (nombre, IP de ILO, gateway)...")
+        self.profile_search.setPlaceholderText("Buscar perfil (nombre, IP de ILO, gateway, usuario, tipo)...")
         self.profile_search.setClearButtonEnabled(True)
         self.profile_search.textChanged.connect(self.filterProfiles)
         search_layout.addWidget(self.profile_search)
@@ -202,7 +274,15 @@ class ILOTunnelApp(QMainWindow):
 
         self.profile_combo = QComboBox()
         self.profile_combo.setMinimumWidth(200)
+        self.profile_combo.setModel(self.profile_combo_proxy)
+        self.profile_combo.setPlaceholderText("-- Seleccionar Perfil --")
+        self.profile_combo.setCurrentIndex(-1)
         self.profile_combo.currentIndexChanged.connect(self.loadProfile)
+        # Si desaparece el perfil seleccionado (borrado o filtrado), no
+        # saltar a otro perfil: dejar el combo sin selección
+        self.profile_combo_proxy.rowsAboutToBeRemoved.connect(
+            self.profileRowsAboutToBeRemoved
+        )
         profile_selector_layout.addWidget(self.profile_combo)
 
         self.new_profile_btn = QPushButton("Nuevo")
@@ -271,6 +351,7 @@ class ILOTunnelApp(QMainWindow):
         self.local_ip.setEditable(True)
         self.local_ip.addItem("127.0.0.1")
         self.updateLocalIPs()  # Añadir IPs locales
+        self.ssh_manager.local_addresses.addresses_changed.connect(self.updateLocalIPs)
         connection_form.addRow("IP Local:", self.local_ip)
 
         # Campo de clave SSH con layout horizontal para el botón de exploración
@@ -291,6 +372,43 @@ class ILOTunnelApp(QMainWindow):
         key_path_widget.setLayout(key_path_layout)
         connection_form.addRow("Clave SSH:", key_path_widget)
 
+        # Motor del túnel (por perfil)
+        self.backend_combo = QComboBox()
+        for backend, label in BACKEND_LABELS.items():
+            self.backend_combo.addItem(label, backend)
+        if not is_asyncssh_available():
+            # Se puede seleccionar igualmente; al conectar se usará OpenSSH
+            index = self.backend_combo.findData(BACKEND_ASYNCSSH)
+            self.backend_combo.setItemData(
+                index,
+                "asyncssh no está instalado (pip install asyncssh); se usará OpenSSH",
+                Qt.ItemDataRole.ToolTipRole,
+            )
+        connection_form.addRow("Motor:", self.backend_combo)
+
+        # Modo de reenvío (por perfil): un -L por puerto o un único proxy SOCKS5
+        forward_layout = QHBoxLayout()
+        self.forward_mode_combo = QComboBox()
+        for mode, label in FORWARD_MODE_LABELS.items():
+            self.forward_mode_combo.addItem(label, mode)
+        self.forward_mode_combo.setToolTip(
+            "SOCKS5: una única escucha por gateway, compartida por sus perfiles, "
+            "con la que se accede a cualquier ILO; se genera un archivo PAC para el navegador"
+        )
+        forward_layout.addWidget(self.forward_mode_combo, 1)
+
+        self.socks_port = QSpinBox()
+        self.socks_port.setRange(1, 65535)
+        self.socks_port.setValue(DEFAULT_SOCKS_PORT)
+        self.socks_port.setPrefix("Puerto ")
+        self.socks_port.setEnabled(False)
+        forward_layout.addWidget(self.socks_port)
+        self.forward_mode_combo.currentIndexChanged.connect(self.forwardModeChanged)
+
+        forward_widget = QWidget()
+        forward_widget.setLayout(forward_layout)
+        connection_form.addRow("Reenvío:", forward_widget)
+
         # Opciones adicionales
         options_layout = QHBoxLayout()
 
@@ -393,12 +511,66 @@ class ILOTunnelApp(QMainWindow):
         # Panel de configuración al splitter
         splitter.addWidget(config_panel)
 
+        # Panel de túneles activos (uno por perfil)
+        tunnels_group = QGroupBox("Túneles activos")
+        tunnels_layout = QVBoxLayout(tunnels_group)
+
+        self.tunnels_table = QTableWidget(0, 5)
+        self.tunnels_table.setHorizontalHeaderLabels(
+            ["Túnel", "Gateway", "IP de ILO", "Reenvíos", "Estado"]
+        )
+        self.tunnels_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        self.tunnels_table.verticalHeader().setVisible(False)
+        self.tunnels_table.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.tunnels_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        self.tunnels_table.itemDoubleClicked.connect(self.showSelectedTunnel)
+        tunnels_layout.addWidget(self.tunnels_table)
+
+        # Tráfico por puerto del túnel mostrado
+        self.traffic_table = QTableWidget(0, 6)
+        self.traffic_table.setHorizontalHeaderLabels(
+            ["Puerto", "Conexiones", "Recibido", "Enviado", "Recibido/s", "Enviado/s"]
+        )
+        self.traffic_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        self.traffic_table.verticalHeader().setVisible(False)
+        self.traffic_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        self.traffic_table.setVisible(False)
+        tunnels_layout.addWidget(self.traffic_table)
+
+        tunnels_buttons = QHBoxLayout()
+
+        show_tunnel_btn = QPushButton("Mostrar")
+        show_tunnel_btn.clicked.connect(self.showSelectedTunnel)
+        tunnels_buttons.addWidget(show_tunnel_btn)
+
+        stop_tunnel_btn = QPushButton("Desconectar seleccionado")
+        stop_tunnel_btn.clicked.connect(self.stopSelectedTunnel)
+        tunnels_buttons.addWidget(stop_tunnel_btn)
+
+        stop_all_btn = QPushButton("Desconectar todos")
+        stop_all_btn.clicked.connect(self.stopAllTunnels)
+        tunnels_buttons.addWidget(stop_all_btn)
+
+        tunnels_layout.addLayout(tunnels_buttons)
+
+        # Panel de túneles al splitter
+        splitter.addWidget(tunnels_group)
+
         # Panel de consola
         console_group = QGroupBox("Consola")
         console_layout = QVBoxLayout(console_group)
 
-        self.console = QTextEdit()
-        self.console.setReadOnly(True)
+        self.console = LogTextEdit()
         # Usar una fuente monoespaciada del sistema sin especificar nombre
         font = QFont()
         font.setStyleHint(QFont.StyleHint.Monospace)
@@ -410,6 +582,20 @@ class ILOTunnelApp(QMainWindow):
         # Botones de consola
         console_buttons = QHBoxLayout()
 
+        console_buttons.addWidget(QLabel("Nivel:"))
+        self.log_level_combo = QComboBox()
+        for label, level in (
+            ("Depuración", "debug"),
+            ("Información", "info"),
+            ("Avisos", "warning"),
+            ("Errores", "error"),
+        ):
+            self.log_level_combo.addItem(label, level)
+        self.log_level_combo.currentIndexChanged.connect(
+            lambda: self.console.setMinimumLevel(self.log_level_combo.currentData())
+        )
+        console_buttons.addWidget(self.log_level_combo)
+
         clear_console_btn = QPushButton("Limpiar")
         clear_console_btn.clicked.connect(self.console.clear)
         console_buttons.addWidget(clear_console_btn)
@@ -462,7 +648,7 @@ class ILOTunnelApp(QMainWindow):
         profiles_search_layout = QHBoxLayout()
         profiles_search_layout.addWidget(QLabel("🔍"))
         self.profiles_search = QLineEdit()
-        self.profiles_search.setPlaceholderText("Buscar perfil (nombre, IP de ILO, gateway)...")
+        self.profiles_search.setPlaceholderText("Buscar perfil (nombre, IP de ILO, gateway, usuario, tipo)...")
         self.profiles_search.setClearButtonEnabled(True)
         self.profiles_search.textChanged.connect(self.filterProfilesList)
         profiles_search_layout.addWidget(self.profiles_search)
@@ -471,9 +657,13 @@ class ILOTunnelApp(QMainWindow):
         # Lista de perfiles
         profiles_layout.addWidget(QLabel("Perfiles guardados:"))
 
-        self.profiles_list = QListWidget()
-        self.profiles_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
-        self.profiles_list.itemDoubleClicked.connect(self.loadProfileFromList)
+        self.profiles_list = QListView()
+        self.profiles_list.setModel(self.profiles_list_proxy)
+        # Selección múltiple para mover o eliminar varios perfiles a la vez
+        self.profiles_list.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.profiles_list.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.profiles_list.setUniformItemSizes(True)
+        self.profiles_list.doubleClicked.connect(self.loadProfileFromList)
         profiles_layout.addWidget(self.profiles_list)
 
         # Botones de acción para perfiles
@@ -491,6 +681,10 @@ class ILOTunnelApp(QMainWindow):
         clone_profile_btn.clicked.connect(self.cloneProfileFromList)
         profiles_actions.addWidget(clone_profile_btn)
 
+        move_profiles_btn = QPushButton("Mover a...")
+        move_profiles_btn.clicked.connect(self.moveProfilesFromList)
+        profiles_actions.addWidget(move_profiles_btn)
+
         delete_profile_btn = QPushButton("Eliminar")
         delete_profile_btn.clicked.connect(self.deleteProfileFromList)
         profiles_actions.addWidget(delete_profile_btn)
@@ -504,6 +698,22 @@ class ILOTunnelApp(QMainWindow):
         import_btn.clicked.connect(self.importProfiles)
         import_export_layout.addWidget(import_btn)
 
+        # Qué hacer con los perfiles importados que ya existen
+        self.import_merge_combo = QComboBox()
+        for merge, label in MERGE_LABELS.items():
+            self.import_merge_combo.addItem(label, merge)
+        self.import_merge_combo.setToolTip(
+            "Perfiles importados que ya existen en la carpeta (mismo nombre o\n"
+            "mismo ILO, gateway y usuario):\n"
+            "- Omitir: se conserva el existente\n"
+            "- Sobrescribir: se sustituye por el importado\n"
+            "- Conservar el más reciente: según la fecha de modificación\n"
+            "- Renombrar: si es otro servidor, se añade con otro nombre"
+        )
+        index = self.import_merge_combo.findData(self.settings.value("import_merge", MERGE_SKIP))
+        self.import_merge_combo.setCurrentIndex(max(index, 0))
+        import_export_layout.addWidget(self.import_merge_combo)
+
         export_btn = QPushButton("Exportar perfiles")
         export_btn.clicked.connect(self.exportProfiles)
         import_export_layout.addWidget(export_btn)
@@ -537,6 +747,7 @@ class ILOTunnelApp(QMainWindow):
             <li>Indica la ruta a tu clave SSH privada.</li>
             <li>Haz clic en "Conectar" para establecer el túnel.</li>
             <li>Utiliza "Abrir en Navegador" para acceder a la interfaz web ILO.</li>
+            <li>Puedes conectar varios perfiles a la vez; cada uno aparece en "Túneles activos".</li>
         </ol>
         
         <h3>Gestión de Perfiles:</h3>
@@ -558,9 +769,14 @@ class ILOTunnelApp(QMainWindow):
             <li><b>Modo verbose:</b> Muestra información detallada sobre la conexión SSH.</li>
             <li><b>Compresión:</b> Usa compresión SSH para reducir el ancho de banda.</li>
             <li><b>Reconexión automática:</b> Intenta reconectar automáticamente si se pierde la conexión.</li>
+            <li><b>Multiplexación:</b> Los túneles que comparten gateway usan una única conexión SSH, por lo que abrir otro ILO detrás del mismo gateway es casi instantáneo.</li>
+            <li><b>Reasignar puertos privilegiados:</b> Los puertos locales menores de 1024 se sustituyen por puertos altos libres (443 pasa a 10443) y ssh se lanza sin sudo. La rejilla de puertos muestra la reasignación y "Abrir en Navegador" usa el puerto asignado.</li>
+            <li><b>Reenvío SOCKS5:</b> En lugar de un "-L" por cada puerto, el perfil usa un único proxy SOCKS5 ("-D") con el que se accede a cualquier ILO detrás del gateway. Todos los perfiles en modo SOCKS del mismo gateway comparten el proxy, que se cierra al desconectar el último. Se genera un archivo PAC por gateway que envía por el proxy solo las IP de sus ILO; configúralo en el navegador como "configuración automática del proxy".</li>
+            <li><b>Motor asyncssh:</b> Si está instalado el paquete asyncssh, un perfil puede abrir sus reenvíos dentro de la aplicación, con una única conexión por gateway y sin lanzar "sudo ssh". Los puertos privilegiados (&lt;1024) siguen necesitando OpenSSH con permisos de administrador.</li>
+            <li><b>Comprobación extremo a extremo:</b> Verifica que el servicio del ILO responde a través del túnel (TLS, HTTP o SSH) y muestra la latencia al pasar el ratón sobre el indicador del puerto.</li>
         </ul>
         
-        <p><b>Nota:</b> Esta aplicación requiere permisos de administrador para crear los túneles.</p>
+        <p><b>Nota:</b> Solo se necesitan permisos de administrador (sudo) si se desactiva la reasignación de puertos privilegiados.</p>
         """
         )
 
@@ -613,6 +829,11 @@ class ILOTunnelApp(QMainWindow):
         self.reconnect_attempts_spinbox.setRange(1, 10)
         self.reconnect_attempts_spinbox.setValue(3)
         self.reconnect_attempts_spinbox.setSuffix(" intentos")
+        self.reconnect_attempts_spinbox.setToolTip(
+            "Reintentos rápidos antes de abrir el circuito. Después se sigue "
+            "reintentando sin límite, una vez cada pocos minutos, hasta que "
+            "la conexión se mantiene estable."
+        )
         ssh_layout.addRow("Intentos de reconexión:", self.reconnect_attempts_spinbox)
 
         self.identity_only_checkbox = QCheckBox("Usar solo la identidad especificada")
@@ -625,6 +846,59 @@ class ILOTunnelApp(QMainWindow):
         self.strict_host_key_checkbox.setChecked(False)
         ssh_layout.addRow("", self.strict_host_key_checkbox)
 
+        self.multiplex_checkbox = QCheckBox(
+            "Compartir una conexión SSH por gateway (multiplexación)"
+        )
+        self.multiplex_checkbox.setChecked(False)
+        self.multiplex_checkbox.setToolTip(
+            "Los túneles que usan el mismo gateway, usuario, puerto y clave "
+            "comparten una conexión maestra (ControlMaster)"
+        )
+        ssh_layout.addRow("", self.multiplex_checkbox)
+
+        self.meter_traffic_checkbox = QCheckBox(
+            "Medir el tráfico de cada puerto (relé local)"
+        )
+        self.meter_traffic_checkbox.setToolTip(
+            "Los puertos privilegiados (<1024) no se pueden medir sin permisos "
+            "de administrador; en ellos ssh sigue escuchando directamente"
+        )
+        ssh_layout.addRow("", self.meter_traffic_checkbox)
+
+        self.remap_ports_checkbox = QCheckBox(
+            "Reasignar puertos privilegiados a puertos altos (sin sudo)"
+        )
+        self.remap_ports_checkbox.setChecked(True)
+        self.remap_ports_checkbox.setToolTip(
+            "Los puertos locales menores de 1024 (22, 80, 443, 623...) se "
+            "sustituyen por puertos altos libres, p. ej. 443 -> 10443, y ssh "
+            "se lanza sin sudo si no queda ningún puerto privilegiado"
+        )
+        ssh_layout.addRow("", self.remap_ports_checkbox)
+
+        self.network_watch_checkbox = QCheckBox(
+            "Reiniciar los túneles al detectar un cambio de red"
+        )
+        self.network_watch_checkbox.setChecked(True)
+        self.network_watch_checkbox.setToolTip(
+            "Se comprueba cada 2 segundos la IP de origen hacia cada gateway; "
+            "si cambia (otra Wi-Fi, VPN...) los túneles se reinician al momento "
+            "en lugar de esperar ~45 s a que ssh detecte la conexión muerta"
+        )
+        self.network_watch_checkbox.stateChanged.connect(self.updateNetworkWatch)
+        ssh_layout.addRow("", self.network_watch_checkbox)
+
+        self.probe_mode_combo = QComboBox()
+        self.probe_mode_combo.addItems(
+            ["Solo escucha local", "Extremo a extremo (servicio del ILO)"]
+        )
+        self.probe_mode_combo.setToolTip(
+            "Extremo a extremo: handshake TLS en 443, HEAD en 80 y banner en 22 "
+            "a través del túnel, con latencia de ida y vuelta"
+        )
+        self.probe_mode_combo.currentIndexChanged.connect(self.updateProbeMode)
+        ssh_layout.addRow("Comprobación de puertos:", self.probe_mode_combo)
+
         settings_layout.addWidget(ssh_group)
 
         # Grupo de opciones de UI
@@ -639,8 +913,16 @@ class ILOTunnelApp(QMainWindow):
 
         self.auto_scroll_checkbox = QCheckBox("Auto-scroll de consola")
         self.auto_scroll_checkbox.setChecked(True)
+        self.auto_scroll_checkbox.toggled.connect(self.console.setAutoScroll)
         ui_layout.addRow("", self.auto_scroll_checkbox)
 
+        self.console_lines_spinbox = QSpinBox()
+        self.console_lines_spinbox.setRange(1000, 1000000)
+        self.console_lines_spinbox.setSingleStep(1000)
+        self.console_lines_spinbox.setValue(10000)
+        self.console_lines_spinbox.valueChanged.connect(self.console.setMaximumLines)
+        ui_layout.addRow("Líneas máximas de consola:", self.console_lines_spinbox)
+
         settings_layout.addWidget(ui_group)
 
         # Botones de acción
@@ -686,14 +968,14 @@ class ILOTunnelApp(QMainWindow):
         if hasattr(self, "updateProfilesList"):
             self.updateProfilesList()
 
-        last_profile_index = int(self.settings.value("last_profile_index", -1))
+        last_profile = self.settings.value("last_profile", "")
 
         if (
             self.profile_combo is not None
-            and last_profile_index >= 0
-            and last_profile_index < self.profile_combo.count()
+            and last_profile
+            and self.profile_combo.findText(last_profile) >= 0
         ):
-            self.profile_combo.setCurrentIndex(last_profile_index)
+            self.selectProfile(last_profile)
         else:
             # Cargar configuración individual si no hay perfil seleccionado
             self.ilo_ip.setText(self.settings.value("ilo_ip", ""))
@@ -707,6 +989,11 @@ class ILOTunnelApp(QMainWindow):
             self.key_path.setText(
                 self.settings.value("key_path", os.path.expanduser("~/.ssh/id_rsa"))
             )
+            self.setBackend(self.settings.value("backend", BACKEND_OPENSSH))
+            self.setForwardMode(self.settings.value("forward_mode", FORWARD_MODE_PORTS))
+            self.socks_port.setValue(
+                self.settings.value("socks_port", DEFAULT_SOCKS_PORT, type=int)
+            )
 
             # Cargar tipo de servidor
             server_type = self.settings.value("server_type", "HP/Huawei")
@@ -771,6 +1058,23 @@ class ILOTunnelApp(QMainWindow):
         self.strict_host_key_checkbox.setChecked(
             self.settings.value("strict_host_key", False, type=bool)
         )
+        self.multiplex_checkbox.setChecked(
+            self.settings.value("multiplex", False, type=bool)
+        )
+        self.meter_traffic_checkbox.setChecked(
+            self.settings.value("meter_traffic", False, type=bool)
+        )
+        self.remap_ports_checkbox.setChecked(
+            self.settings.value("remap_privileged", True, type=bool)
+        )
+        self.network_watch_checkbox.setChecked(
+            self.settings.value("network_watch", True, type=bool)
+        )
+        self.updateNetworkWatch()
+        self.probe_mode_combo.setCurrentIndex(
+            1 if self.settings.value("probe_end_to_end", False, type=bool) else 0
+        )
+        self.updateProbeMode()
 
         # Opciones UI
         font_size = self.settings.value("console_font_size", 9, type=int)
@@ -779,6 +1083,9 @@ class ILOTunnelApp(QMainWindow):
         self.auto_scroll_checkbox.setChecked(
             self.settings.value("auto_scroll", True, type=bool)
         )
+        self.console_lines_spinbox.setValue(
+            self.settings.value("console_max_lines", 10000, type=int)
+        )
 
     def saveGlobalSettings(self):
         """Guarda la configuración global de la aplicación"""
@@ -801,10 +1108,22 @@ class ILOTunnelApp(QMainWindow):
         self.settings.setValue(
             "strict_host_key", self.strict_host_key_checkbox.isChecked()
         )
+        self.settings.setValue("multiplex", self.multiplex_checkbox.isChecked())
+        self.settings.setValue("meter_traffic", self.meter_traffic_checkbox.isChecked())
+        self.settings.setValue(
+            "remap_privileged", self.remap_ports_checkbox.isChecked()
+        )
+        self.settings.setValue(
+            "network_watch", self.network_watch_checkbox.isChecked()
+        )
+        self.settings.setValue(
+            "probe_end_to_end", self.probe_mode_combo.currentIndex() == 1
+        )
 
         # Opciones UI
         self.settings.setValue("console_font_size", self.font_size_spinbox.value())
         self.settings.setValue("auto_scroll", self.auto_scroll_checkbox.isChecked())
+        self.settings.setValue("console_max_lines", self.console_lines_spinbox.value())
 
         # Actualizar reconexión automática
         self.ssh_manager.set_auto_reconnect(
@@ -837,13 +1156,27 @@ class ILOTunnelApp(QMainWindow):
             self.reconnect_attempts_spinbox.setValue(3)
             self.identity_only_checkbox.setChecked(True)
             self.strict_host_key_checkbox.setChecked(False)
+            self.multiplex_checkbox.setChecked(False)
+            self.meter_traffic_checkbox.setChecked(False)
+            self.remap_ports_checkbox.setChecked(True)
+            self.network_watch_checkbox.setChecked(True)
+            self.probe_mode_combo.setCurrentIndex(0)
             self.font_size_spinbox.setValue(9)
             self.updateConsoleFont(9)
             self.auto_scroll_checkbox.setChecked(True)
+            self.console_lines_spinbox.setValue(10000)
 
             # Guardar configuración
             self.saveGlobalSettings()
 
+    def updateProbeMode(self, *args):
+        """Aplica el modo de comprobación de puertos seleccionado"""
+        self.ssh_manager.set_probe_mode(self.probe_mode_combo.currentIndex() == 1)
+
+    def updateNetworkWatch(self, *args):
+        """Activa o desactiva el reinicio de los túneles al cambiar la red"""
+        self.ssh_manager.set_network_watch(self.network_watch_checkbox.isChecked())
+
     def updateConsoleFont(self, size):
         """Actualiza el tamaño de fuente de la consola"""
         font = QFont()
@@ -944,23 +1277,27 @@ class ILOTunnelApp(QMainWindow):
                     folders[0]
                 )  # Seleccionar el primero por defecto
 
-    def updateLocalIPs(self):
-        """Actualiza la lista de IPs locales"""
-        current_ip = self.local_ip.currentText()
+    def updateLocalIPs(self, addresses=None):
+        """
+        Actualiza la lista de IPs locales
 
-        self.local_ip.clear()
-        self.local_ip.addItem("127.0.0.1")
+        Args:
+            addresses: IPs a mostrar (por defecto las de la caché del SSHManager)
+        """
+        if addresses is None:
+            addresses = self.ssh_manager.get_local_ip_addresses()
+
+        items = ["127.0.0.1"] + [ip for ip in addresses if ip != "127.0.0.1"]
+        if items == [self.local_ip.itemText(i) for i in range(self.local_ip.count())]:
+            return  # Sin cambios: no tocar el combo
 
-        # Añadir IPs locales usando SSHManager
-        for ip in self.ssh_manager.get_local_ip_addresses():
-            if ip != "127.0.0.1":  # Ya añadido
-                self.local_ip.addItem(ip)
+        current_ip = self.local_ip.currentText()
+        self.local_ip.clear()
+        self.local_ip.addItems(items)
 
-        # Restaurar IP seleccionada
+        # Restaurar IP seleccionada (o escrita a mano)
         if current_ip:
-            index = self.local_ip.findText(current_ip)
-            if index >= 0:
-                self.local_ip.setCurrentIndex(index)
+            self.local_ip.setCurrentText(current_ip)
 
     def folderChanged(self, index):
         """Maneja el cambio de carpeta en el combo principal"""
@@ -980,27 +1317,16 @@ class ILOTunnelApp(QMainWindow):
         if not hasattr(self, "profile_combo") or self.profile_combo is None:
             return
 
-        # Bloquear señales para evitar que loadProfile se dispare al limpiar/repoblar
+        # Bloquear señales para evitar que loadProfile se dispare al filtrar
         self.profile_combo.blockSignals(True)
 
-        self.profile_combo.clear()
-        self.profile_combo.addItem("-- Seleccionar Perfil --")
-
         # Obtener texto de búsqueda
         search_text = ""
         if hasattr(self, "profile_search") and self.profile_search is not None:
             search_text = self.profile_search.text().strip().lower()
 
-        profiles = self.profile_manager.get_profiles(self.current_folder)
-        for profile in profiles:
-            if search_text:
-                # Filtrar por nombre, IP de ILO o IP de gateway
-                name = profile.get("name", "").lower()
-                ilo_ip = profile.get("ilo_ip", "").lower()
-                gateway_ip = profile.get("gateway_ip", "").lower()
-                if not (search_text in name or search_text in ilo_ip or search_text in gateway_ip):
-                    continue
-            self.profile_combo.addItem(profile["name"])
+        # Filtrar por nombre, IP de ILO, gateway, usuario o tipo (por relevancia)
+        self.profile_combo_proxy.set_filter(self.current_folder, search_text)
 
         # Restaurar señales
         self.profile_combo.blockSignals(False)
@@ -1026,16 +1352,47 @@ class ILOTunnelApp(QMainWindow):
         if hasattr(self, "profiles_search") and self.profiles_search is not None:
             search_text = self.profiles_search.text().strip().lower()
 
-        self.profiles_list.clear()
-        profiles = self.profile_manager.get_profiles(folder)
-        for profile in profiles:
-            if search_text:
-                name = profile.get("name", "").lower()
-                ilo_ip = profile.get("ilo_ip", "").lower()
-                gateway_ip = profile.get("gateway_ip", "").lower()
-                if not (search_text in name or search_text in ilo_ip or search_text in gateway_ip):
-                    continue
-            self.profiles_list.addItem(profile["name"])
+        self.profiles_list_proxy.set_filter(folder, search_text)
+
+    def profileRowsAboutToBeRemoved(self, parent, first, last):
+        """Deja el combo sin selección si va a desaparecer el perfil elegido"""
+        if first <= self.profile_combo.currentIndex() <= last:
+            self.profile_combo.setCurrentIndex(-1)
+
+    def selectProfile(self, profile_name):
+        """
+        Selecciona un perfil de la carpeta actual en el combo y lo carga
+
+        Returns:
+            True si el perfil está en el combo
+        """
+        index = self.profile_combo.findText(profile_name)
+        if index < 0:
+            return False
+        if index == self.profile_combo.currentIndex():
+            # Misma fila (p. ej. tras editarlo): volver a cargar sus datos
+            self.loadProfile(index)
+        else:
+            self.profile_combo.setCurrentIndex(index)
+        return True
+
+    def selectedListProfileName(self):
+        """Nombre del perfil seleccionado en la lista de perfiles ("" si no hay)"""
+        index = self.profiles_list.currentIndex()
+        if not index.isValid() or not self.profiles_list.selectionModel().isSelected(index):
+            return ""
+        return index.data() or ""
+
+    def selectedListProfileIds(self):
+        """Identificadores (ProfileManager.profile_id) de los perfiles seleccionados en la lista"""
+        rows = sorted(
+            self.profiles_list_proxy.mapToSource(index).row()
+            for index in self.profiles_list.selectionModel().selectedIndexes()
+        )
+        return [
+            self.profile_manager.profile_id(*self.profile_model.row_position(row))
+            for row in rows
+        ]
 
     def filterProfiles(self, text):
         """Filtra los perfiles del combo en la pestaña de Conexión"""
@@ -1047,26 +1404,23 @@ class ILOTunnelApp(QMainWindow):
 
     def loadProfile(self, index):
         """Carga un perfil seleccionado en el combo principal"""
-        if index <= 0:  # Skip the "Select Profile" item
+        if index < 0:  # Sin perfil seleccionado
             return
 
         # Usar el nombre del perfil seleccionado para buscarlo
         # (no usar índice directo porque la lista puede estar filtrada)
         profile_name = self.profile_combo.currentText()
-        if not profile_name or profile_name == "-- Seleccionar Perfil --":
+        if not profile_name:
             return
 
-        profiles = self.profile_manager.get_profiles(self.current_folder)
-        profile_data = None
-        for p in profiles:
-            if p.get("name") == profile_name:
-                profile_data = p
-                break
-
-        if profile_data is None:
+        profile, _, _ = self.profile_manager.get_profile_by_name(
+            profile_name, self.current_folder
+        )
+        if profile is None:
             return
 
-        self.current_profile = ConnectionProfile.from_dict(profile_data)
+        self.current_profile = profile
+        self.current_profile_folder = self.current_folder
 
         # Cargar datos del perfil en la interfaz
         self.ilo_ip.setText(self.current_profile.ilo_ip)
@@ -1075,6 +1429,9 @@ class ILOTunnelApp(QMainWindow):
         self.ssh_port.setValue(self.current_profile.ssh_port)
         self.local_ip.setCurrentText(self.current_profile.local_ip)
         self.key_path.setText(self.current_profile.key_path)
+        self.setBackend(self.current_profile.backend)
+        self.setForwardMode(self.current_profile.forward_mode)
+        self.socks_port.setValue(self.current_profile.socks_port)
 
         # Configurar tipo de servidor
         self.server_type_combo.setCurrentText(self.current_profile.server_type)
@@ -1086,7 +1443,10 @@ class ILOTunnelApp(QMainWindow):
             is_checked = self.current_profile.ports.get(str(port), True)
             checkbox.setChecked(is_checked)
 
-        self.settings.setValue("last_profile_index", index)
+        self.settings.setValue("last_profile", profile.name)
+
+        # Mostrar el estado del túnel del perfil si ya está en marcha
+        self.refreshCurrentTunnelState()
 
     def createProfile(self):
         """Abre el diálogo para crear un nuevo perfil"""
@@ -1114,7 +1474,7 @@ class ILOTunnelApp(QMainWindow):
 
                 self.updateProfilesList()
                 # Seleccionar el nuevo perfil
-                self.profile_combo.setCurrentText(profile.name)
+                self.selectProfile(profile.name)
 
                 self.statusBar().showMessage(
                     f"Perfil '{profile.name}' creado correctamente", 5000
@@ -1132,17 +1492,18 @@ class ILOTunnelApp(QMainWindow):
         from ilo_tunnel.gui.dialogs import ConnectionProfileDialog
 
         index = self.profile_combo.currentIndex()
-        if index <= 0:
+        if index < 0:
             QMessageBox.warning(
                 self, "Error", "Por favor, selecciona un perfil para editar."
             )
             return
 
-        profile_index = index - 1  # Adjust for the "Select Profile" item
-        profiles = self.profile_manager.get_profiles(self.current_folder)
+        # Buscar por nombre: el combo puede estar filtrado y ordenado por relevancia
+        profile, _, profile_index = self.profile_manager.get_profile_by_name(
+            self.profile_combo.currentText(), self.current_folder
+        )
 
-        if profile_index < len(profiles):
-            profile = ConnectionProfile.from_dict(profiles[profile_index])
+        if profile is not None:
             folders = self.profile_manager.get_folders()
             dialog = ConnectionProfileDialog(
                 self, profile.to_dict(), folders, self.current_folder
@@ -1171,7 +1532,7 @@ class ILOTunnelApp(QMainWindow):
                         self.updateProfilesList()
 
                         # Seleccionar el perfil editado
-                        self.profile_combo.setCurrentText(updated_profile.name)
+                        self.selectProfile(updated_profile.name)
 
                         self.statusBar().showMessage(
                             f"Perfil '{updated_profile.name}' movido correctamente",
@@ -1190,7 +1551,7 @@ class ILOTunnelApp(QMainWindow):
                     ):
                         self.updateProfilesList()
                         # Reseleccionar el perfil editado
-                        self.profile_combo.setCurrentText(updated_profile.name)
+                        self.selectProfile(updated_profile.name)
                         self.statusBar().showMessage(
                             f"Perfil '{updated_profile.name}' actualizado correctamente",
                             5000,
@@ -1203,17 +1564,19 @@ class ILOTunnelApp(QMainWindow):
     def deleteProfile(self):
         """Elimina el perfil seleccionado en el combo principal"""
         index = self.profile_combo.currentIndex()
-        if index <= 0:
+        if index < 0:
             QMessageBox.warning(
                 self, "Error", "Por favor, selecciona un perfil para eliminar."
             )
             return
 
-        profile_index = index - 1  # Adjust for the "Select Profile" item
-        profiles = self.profile_manager.get_profiles(self.current_folder)
+        # Buscar por nombre: el combo puede estar filtrado y ordenado por relevancia
+        profile, _, profile_index = self.profile_manager.get_profile_by_name(
+            self.profile_combo.currentText(), self.current_folder
+        )
 
-        if profile_index < len(profiles):
-            profile_name = profiles[profile_index]["name"]
+        if profile is not None:
+            profile_name = profile.name
             confirm = QMessageBox.question(
                 self,
                 "Confirmar eliminación",
@@ -1225,8 +1588,7 @@ class ILOTunnelApp(QMainWindow):
                 if self.profile_manager.delete_profile(
                     self.current_folder, profile_index
                 ):
-                    self.updateProfilesList()
-                    self.profile_combo.setCurrentIndex(0)
+                    # La fila desaparece del combo y este queda sin selección
                     self.statusBar().showMessage(
                         f"Perfil '{profile_name}' eliminado correctamente", 5000
                     )
@@ -1253,6 +1615,9 @@ class ILOTunnelApp(QMainWindow):
             "local_ip": self.local_ip.currentText(),
             "key_path": self.key_path.text(),
             "ports": ports_data,
+            "backend": self.backend_combo.currentData(),
+            "forward_mode": self.forward_mode_combo.currentData(),
+            "socks_port": self.socks_port.value(),
         }
 
         # Pedir nombre para el perfil
@@ -1265,7 +1630,7 @@ class ILOTunnelApp(QMainWindow):
             if self.profile_manager.add_profile(profile, self.current_folder):
                 self.updateProfilesList()
                 # Seleccionar el nuevo perfil
-                self.profile_combo.setCurrentText(name)
+                self.selectProfile(name)
                 self.statusBar().showMessage(
                     f"Perfil '{name}' guardado correctamente", 5000
                 )
@@ -1276,10 +1641,10 @@ class ILOTunnelApp(QMainWindow):
                     "No se pudo guardar el perfil. Comprueba que no exista ya un perfil con el mismo nombre.",
                 )
 
-    def loadProfileFromList(self, item):
+    def loadProfileFromList(self, index: QModelIndex):
         """Carga un perfil seleccionado de la lista de perfiles"""
-        profile_name = item.text()
-        folder = self.profiles_folder_combo.currentText()
+        profile_name = index.data()
+        folder = index.data(FOLDER_ROLE)
 
         # Buscar el perfil por nombre
         profile, folder, _ = self.profile_manager.get_profile_by_name(
@@ -1296,33 +1661,25 @@ class ILOTunnelApp(QMainWindow):
             self.updateProfilesList()
 
             # Cargar el perfil
-            index = self.profile_combo.findText(profile_name)
-            if index > 0:
-                # +1 porque el primer elemento es "-- Seleccionar Perfil --"
-                self.profile_combo.setCurrentIndex(index)
-
-                # Guardar índice del último perfil usado
-                self.settings.setValue("last_profile_index", index)
+            self.selectProfile(profile_name)
 
     def loadSelectedProfile(self):
         """Carga el perfil seleccionado en la lista de perfiles"""
-        current_item = self.profiles_list.currentItem()
-        if current_item:
-            self.loadProfileFromList(current_item)
+        if self.selectedListProfileName():
+            self.loadProfileFromList(self.profiles_list.currentIndex())
 
     def editProfileFromList(self):
         """Edita el perfil seleccionado en la lista de perfiles"""
         # Importar aquí para evitar problemas de importación circular
         from ilo_tunnel.gui.dialogs import ConnectionProfileDialog
 
-        current_item = self.profiles_list.currentItem()
-        if not current_item:
+        profile_name = self.selectedListProfileName()
+        if not profile_name:
             QMessageBox.warning(
                 self, "Error", "Por favor, selecciona un perfil para editar."
             )
             return
 
-        profile_name = current_item.text()
         folder = self.profiles_folder_combo.currentText()
 
         # Buscar el perfil por nombre
@@ -1391,55 +1748,96 @@ class ILOTunnelApp(QMainWindow):
                         )
 
     def deleteProfileFromList(self):
-        """Elimina el perfil seleccionado en la lista de perfiles"""
-        current_item = self.profiles_list.currentItem()
-        if not current_item:
+        """Elimina los perfiles seleccionados en la lista de perfiles"""
+        profile_ids = self.selectedListProfileIds()
+        if not profile_ids:
             QMessageBox.warning(
                 self, "Error", "Por favor, selecciona un perfil para eliminar."
             )
             return
 
-        profile_name = current_item.text()
-        folder = self.profiles_folder_combo.currentText()
-
-        # Buscar el perfil por nombre
-        profile, folder, index = self.profile_manager.get_profile_by_name(
-            profile_name, folder
+        if len(profile_ids) == 1:
+            question = f"¿Estás seguro de que deseas eliminar el perfil '{self.selectedListProfileName()}'?"
+        else:
+            question = f"¿Estás seguro de que deseas eliminar {len(profile_ids)} perfiles?"
+        confirm = QMessageBox.question(
+            self,
+            "Confirmar eliminación",
+            question,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
+        if confirm != QMessageBox.StandardButton.Yes:
+            return
 
-        if profile:
-            confirm = QMessageBox.question(
-                self,
-                "Confirmar eliminación",
-                f"¿Estás seguro de que deseas eliminar el perfil '{profile_name}'?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        # Todos los borrados se guardan en una sola transacción
+        with self.profile_manager.batch() as batch:
+            for profile_id in profile_ids:
+                batch.delete(profile_id)
+
+        if batch.result:
+            # Repetir las búsquedas activas con los datos nuevos
+            self.updateProfilesListWidget()
+            self.updateProfilesList()
+            self.statusBar().showMessage(
+                f"{len(profile_ids)} perfiles eliminados correctamente"
+                if len(profile_ids) > 1
+                else "Perfil eliminado correctamente",
+                5000,
+            )
+        else:
+            QMessageBox.warning(self, "Error", "No se pudieron eliminar los perfiles.")
+
+    def moveProfilesFromList(self):
+        """Mueve los perfiles seleccionados en la lista de perfiles a otra carpeta"""
+        profile_ids = self.selectedListProfileIds()
+        if not profile_ids:
+            QMessageBox.warning(
+                self, "Error", "Por favor, selecciona los perfiles que quieres mover."
             )
+            return
 
-            if confirm == QMessageBox.StandardButton.Yes:
-                if self.profile_manager.delete_profile(folder, index):
-                    # Actualizar listas de perfiles
-                    self.updateProfilesListWidget(folder)
+        current_folder = self.profiles_folder_combo.currentText()
+        folders = [
+            folder for folder in self.profile_manager.get_folders() if folder != current_folder
+        ]
+        if not folders:
+            QMessageBox.warning(self, "Error", "No hay otra carpeta a la que moverlos.")
+            return
 
-                    # Si la carpeta actual en la pestaña de conexión es la misma, actualizarla también
-                    if self.current_folder == folder:
-                        self.updateProfilesList()
+        target_folder, ok = QInputDialog.getItem(
+            self,
+            "Mover perfiles",
+            f"Carpeta de destino para {len(profile_ids)} perfiles:",
+            folders,
+            0,
+            False,
+        )
+        if not ok:
+            return
 
-                    self.statusBar().showMessage(
-                        f"Perfil '{profile_name}' eliminado correctamente", 5000
-                    )
-                else:
-                    QMessageBox.warning(self, "Error", "No se pudo eliminar el perfil.")
+        with self.profile_manager.batch() as batch:
+            for profile_id in profile_ids:
+                batch.move(profile_id, target_folder)
+
+        if batch.result:
+            # Repetir las búsquedas activas con los datos nuevos
+            self.updateProfilesListWidget()
+            self.updateProfilesList()
+            self.statusBar().showMessage(
+                f"{len(profile_ids)} perfiles movidos a '{target_folder}'", 5000
+            )
+        else:
+            QMessageBox.warning(self, "Error", "No se pudieron mover los perfiles.")
 
     def cloneProfileFromList(self):
         """Clona el perfil seleccionado en la lista de perfiles"""
-        current_item = self.profiles_list.currentItem()
-        if not current_item:
+        profile_name = self.selectedListProfileName()
+        if not profile_name:
             QMessageBox.warning(
                 self, "Error", "Por favor, selecciona un perfil para clonar."
             )
             return
 
-        profile_name = current_item.text()
         folder = self.profiles_folder_combo.currentText()
 
         # Buscar el perfil por nombre
@@ -1546,72 +1944,153 @@ class ILOTunnelApp(QMainWindow):
             self.updateProfilesList()
 
     def importProfiles(self):
-        """Importa perfiles desde un archivo JSON"""
+        """Importa perfiles desde un archivo JSON, NDJSON o CSV"""
+        if self.profile_importer.is_busy():
+            QMessageBox.warning(
+                self, "Importación en curso", "Espera a que termine la importación actual."
+            )
+            return
+
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Importar perfiles",
             "",
-            "Archivos JSON (*.json);;Todos los archivos (*)",
+            "Perfiles (*.json *.ndjson *.jsonl *.csv);;Archivos JSON (*.json);;"
+            "NDJSON (*.ndjson *.jsonl);;CSV (*.csv);;Todos los archivos (*)",
         )
 
         if file_path:
-            try:
-                with open(file_path, "r") as f:
-                    json_data = f.read()
+            # Los perfiles sin carpeta van a la carpeta seleccionada en la pestaña
+            folder = self.profiles_folder_combo.currentText() or "DEFAULT"
+            merge = self.import_merge_combo.currentData()
+            self.settings.setValue("import_merge", merge)
+            self.profile_importer.start(file_path, folder=folder, merge=merge)
+
+            self.import_progress = QProgressDialog(
+                "Importando perfiles...", "Cancelar", 0, 100, self
+            )
+            self.import_progress.setWindowTitle("Importar perfiles")
+            self.import_progress.setMinimumDuration(500)
+            self.import_progress.canceled.connect(self.profile_importer.cancel)
+
+    def updateImportProgress(self, processed, percent):
+        """Muestra el avance de la importación"""
+        if self.import_progress is not None:
+            self.import_progress.setLabelText(f"Procesados {processed} perfiles...")
+            self.import_progress.setValue(percent)
+
+    def importFinished(self, stats, errors):
+        """Muestra el resultado de la importación"""
+        if self.import_progress is not None:
+            self.import_progress.canceled.disconnect()
+            self.import_progress.close()
+            self.import_progress = None
+
+        # Actualizar interfaces
+        self.updateFolderCombos()
+        self.updateProfilesList()
+        self.updateProfilesListWidget()
+
+        # Con archivos grandes puede haber miles de errores: mostrar los primeros
+        error_msg = "\n".join(errors[:20])
+        if len(errors) > 20:
+            error_msg += f"\n... y {len(errors) - 20} errores más"
+
+        if stats.imported or stats.skipped:
+            message = (
+                f"Perfiles nuevos: {stats.added}"
+                + (f" ({stats.renamed} renombrados)" if stats.renamed else "")
+                + f"\nPerfiles actualizados: {stats.updated}"
+                + f"\nDuplicados sin cambios: {stats.skipped}"
+            )
+            if errors:
+                message += f"\n\nAlgunos perfiles no se importaron:\n{error_msg}"
+            QMessageBox.information(self, "Importación completada", message)
+        else:
+            QMessageBox.warning(
+                self,
+                "Error de importación",
+                f"No se pudieron importar los perfiles:\n{error_msg or 'No se importaron perfiles'}",
+            )
 
-                success, count, errors = self.profile_manager.import_profiles(json_data)
+    def exportProfiles(self):
+        """Exporta perfiles a un archivo JSON, NDJSON, CSV o de configuración de OpenSSH"""
+        from ilo_tunnel.gui.dialogs import ExportProfilesDialog
 
-                if success:
-                    # Actualizar interfaces
-                    self.updateFolderCombos()
-                    self.updateProfilesList()
-                    self.updateProfilesListWidget()
+        if self.profile_exporter.is_busy():
+            QMessageBox.warning(
+                self, "Exportación en curso", "Espera a que termine la exportación actual."
+            )
+            return
 
-                    QMessageBox.information(
-                        self,
-                        "Importación completada",
-                        f"Se importaron {count} perfiles correctamente.",
-                    )
-                else:
-                    error_msg = "\n".join(errors)
-                    QMessageBox.warning(
-                        self,
-                        "Error de importación",
-                        f"No se pudieron importar los perfiles:\n{error_msg}",
-                    )
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "Error de importación", f"Error al leer el archivo: {str(e)}"
-                )
+        dialog = ExportProfilesDialog(
+            self, self.profile_manager, self.profiles_folder_combo.currentText() or None
+        )
+        if not dialog.exec():
+            return
+        options = dialog.get_options()
 
-    def exportProfiles(self):
-        """Exporta perfiles a un archivo JSON"""
+        extension, file_filter = EXPORT_FILE_FILTERS[options["file_format"]]
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "Exportar perfiles", "", "Archivos JSON (*.json)"
+            self, "Exportar perfiles", "", file_filter
         )
 
         if file_path:
-            # Asegurar extensión .json
-            if not file_path.lower().endswith(".json"):
-                file_path += ".json"
+            # Asegurar la extensión del formato (salvo un archivo "config" de OpenSSH)
+            if not file_path.lower().endswith(extension) and not (
+                options["file_format"] == "ssh"
+                and os.path.basename(file_path).lower() == "config"
+            ):
+                file_path += extension
 
-            try:
-                json_data = self.profile_manager.export_profiles()
+            self.export_path = file_path
+            self.profile_exporter.start(file_path, **options)
 
-                with open(file_path, "w") as f:
-                    f.write(json_data)
+            self.export_progress = QProgressDialog(
+                "Exportando perfiles...", "Cancelar", 0, 100, self
+            )
+            self.export_progress.setWindowTitle("Exportar perfiles")
+            self.export_progress.setMinimumDuration(500)
+            self.export_progress.canceled.connect(self.profile_exporter.cancel)
+
+    def updateExportProgress(self, written, percent):
+        """Muestra el avance de la exportación"""
+        if self.export_progress is not None:
+            self.export_progress.setLabelText(f"Exportados {written} perfiles...")
+            self.export_progress.setValue(percent)
+
+    def exportFinished(self, written, error):
+        """Muestra el resultado de la exportación"""
+        if self.export_progress is not None:
+            self.export_progress.canceled.disconnect()
+            self.export_progress.close()
+            self.export_progress = None
+
+        if error:
+            QMessageBox.critical(self, "Error de exportación", error)
+        else:
+            QMessageBox.information(
+                self,
+                "Exportación completada",
+                f"Se han exportado {written} perfiles a:\n{self.export_path}",
+            )
 
-                QMessageBox.information(
-                    self,
-                    "Exportación completada",
-                    f"Los perfiles se han exportado correctamente a:\n{file_path}",
-                )
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "Error de exportación",
-                    f"Error al guardar el archivo: {str(e)}",
-                )
+    def setBackend(self, backend):
+        """Selecciona el motor del túnel en el formulario de conexión"""
+        index = self.backend_combo.findData(backend)
+        self.backend_combo.setCurrentIndex(max(index, 0))
+
+    def setForwardMode(self, mode):
+        """Selecciona el modo de reenvío en el formulario de conexión"""
+        index = self.forward_mode_combo.findData(mode)
+        self.forward_mode_combo.setCurrentIndex(max(index, 0))
+        self.forwardModeChanged()
+
+    def forwardModeChanged(self, *args):
+        """Habilita el puerto SOCKS solo en el modo de reenvío dinámico"""
+        self.socks_port.setEnabled(
+            self.forward_mode_combo.currentData() == FORWARD_MODE_SOCKS
+        )
 
     def browseKeyFile(self):
         """Abre un diálogo para seleccionar el archivo de clave SSH"""
@@ -1625,16 +2104,47 @@ class ILOTunnelApp(QMainWindow):
         if file_path:
             self.key_path.setText(file_path)
 
+    def currentTunnelId(self):
+        """
+        Obtiene el identificador del túnel correspondiente a la configuración actual
+
+        Returns:
+            "carpeta/perfil" si la configuración corresponde a un perfil cargado,
+            "usuario@gateway/ip_ilo" en caso contrario
+        """
+        if (
+            self.current_profile is not None
+            and self.current_profile.ilo_ip == self.ilo_ip.text()
+            and self.current_profile.gateway_ip == self.gateway_ip.text()
+        ):
+            return f"{self.current_profile_folder}/{self.current_profile.name}"
+
+        return f"{self.ssh_user.text()}@{self.gateway_ip.text()}/{self.ilo_ip.text()}"
+
     def startTunnel(self):
         """Inicia el túnel SSH con la configuración actual"""
         if not self.validateInputs():
             return
 
+        tunnel_id = self.currentTunnelId()
+        if self.ssh_manager.is_connected(tunnel_id):
+            QMessageBox.information(
+                self,
+                "Túnel activo",
+                f"El túnel '{tunnel_id}' ya está en marcha.",
+            )
+            return
+
         # Preparar mapeos de puertos
         port_mappings = []
+        dynamic_forward = None
+        socks_mode = self.forward_mode_combo.currentData() == FORWARD_MODE_SOCKS
 
+        if socks_mode:
+            # Un único proxy SOCKS5 da acceso a todos los puertos del ILO
+            dynamic_forward = f"{self.local_ip.currentText()}:{self.socks_port.value()}"
         # Si se usan puertos personalizados, usar los seleccionados en la interfaz
-        if self.use_custom_ports.isChecked():
+        elif self.use_custom_ports.isChecked():
             for port, checkbox in self.port_checkboxes.items():
                 if checkbox.isChecked():
                     mapping = f"{self.local_ip.currentText()}:{port}:{self.ilo_ip.text()}:{port}"
@@ -1658,7 +2168,7 @@ class ILOTunnelApp(QMainWindow):
                 if port in self.port_status_widgets:
                     self.port_status_widgets[port].setStatus("connecting")
 
-        if not port_mappings:
+        if not port_mappings and not socks_mode:
             QMessageBox.warning(
                 self,
                 "Sin puertos",
@@ -1673,12 +2183,26 @@ class ILOTunnelApp(QMainWindow):
         essential_ports = get_server_essential_ports(
             self.server_type_combo.currentText()
         )
-        self.console.append(
-            f"Nota: Solo se monitoreará el estado de los puertos esenciales: {', '.join(map(str, essential_ports))}"
-        )
+        if socks_mode:
+            self.console.append("Nota: Se monitoreará el estado del proxy SOCKS5")
+        else:
+            self.console.append(
+                f"Nota: Solo se monitoreará el estado de los puertos esenciales: {', '.join(map(str, essential_ports))}"
+            )
+
+        # Puertos esenciales que realmente se tunelizan en este túnel
+        mapped_ports = [int(mapping.split(":")[1]) for mapping in port_mappings]
+        self.tunnel_info[tunnel_id] = {
+            "ilo_ip": self.ilo_ip.text(),
+            "gateway": self.gateway_ip.text(),
+            "essential_ports": [p for p in essential_ports if p in mapped_ports],
+            "port_states": {},
+            "status": "Conectando...",
+        }
 
         # Iniciar túnel usando SSHManager
         if self.ssh_manager.create_tunnel(
+            tunnel_id,
             self.key_path.text(),
             self.ssh_port.value(),
             port_mappings,
@@ -1688,23 +2212,48 @@ class ILOTunnelApp(QMainWindow):
             self.compress_checkbox.isChecked(),
             self.identity_only_checkbox.isChecked(),
             self.ssh_timeout_spinbox.value(),
+            self.multiplex_checkbox.isChecked(),
+            self.meter_traffic_checkbox.isChecked(),
+            self.backend_combo.currentData(),
+            self.remap_ports_checkbox.isChecked(),
+            dynamic_forward,
+            [self.ilo_ip.text()],
         ):
+            # Comprobar los puertos en los que escucha realmente el túnel
+            tunnel = self.ssh_manager.get_tunnel(tunnel_id)
+            info = self.tunnel_info[tunnel_id]
+            info["essential_ports"] = [
+                tunnel.local_endpoint(self.local_ip.currentText(), port)[1]
+                for port in info["essential_ports"]
+            ]
+            self.showPortRemapping(tunnel)
+
+            if socks_mode:
+                # El proxy puede haberse movido a otro puerto o ser el que ya
+                # comparten otros perfiles del mismo gateway
+                proxy_host, proxy_port = tunnel.config["dynamic_forward"].rsplit(":", 1)
+                info["essential_ports"] = [int(proxy_port)]
+                path = tunnel.socks_proxy.pac_file if tunnel.socks_proxy else None
+                self.console.append(
+                    f"[{tunnel_id}] Proxy SOCKS5 en {proxy_host}:{proxy_port}"
+                    + (f"; configuración del navegador: {Path(path).as_uri()}" if path else "")
+                )
+
             # Activar reconexión automática si está habilitada
             self.ssh_manager.set_auto_reconnect(
                 self.auto_reconnect_checkbox.isChecked(),
                 self.reconnect_attempts_spinbox.value(),
+                tunnel_id,
             )
 
             # Actualizar interfaz
-            self.connect_btn.setEnabled(False)
-            self.connect_action.setEnabled(False)
-            self.disconnect_btn.setEnabled(True)
-            self.disconnect_action.setEnabled(True)
+            self.updateConnectionButtons()
+            self.updateTunnelsTable()
 
             # Iniciar monitor de puertos
-            self.port_monitor_timer.start(2000)  # Comprobar cada 2 segundos
+            self.updatePortMonitor()
 
-            self.statusBar().showMessage("Conectando...", 5000)
+            self.statusBar().showMessage(f"Conectando {tunnel_id}...", 5000)
         else:
             QMessageBox.critical(
                 self,
@@ -1712,110 +2261,436 @@ class ILOTunnelApp(QMainWindow):
                 "No se pudo iniciar el túnel SSH. Comprueba la configuración y los permisos.",
             )
 
-    def stopTunnel(self):
-        """Detiene el túnel SSH activo"""
-        if self.ssh_manager.stop_tunnel():
-            self.console.append("Túnel cerrado correctamente.\n")
+    def stopTunnel(self, tunnel_id=None):
+        """
+        Detiene un túnel SSH activo
 
-            # Actualizar interfaz
-            self.connect_btn.setEnabled(True)
-            self.connect_action.setEnabled(True)
-            self.disconnect_btn.setEnabled(False)
-            self.disconnect_action.setEnabled(False)
+        Args:
+            tunnel_id: Túnel a detener (por defecto, el de la configuración actual)
+        """
+        if not tunnel_id:
+            tunnel_id = self.currentTunnelId()
+
+        if self.ssh_manager.stop_tunnel(tunnel_id):
+            self.console.append(f"[{tunnel_id}] Túnel cerrado correctamente.\n")
+            self.statusBar().showMessage(f"{tunnel_id}: Desconectado", 5000)
+
+    def stopAllTunnels(self):
+        """Detiene todos los túneles SSH activos"""
+        count = self.ssh_manager.stop_all_tunnels()
+        if count:
+            self.console.append(f"Se cerraron {count} túneles.\n")
+            self.statusBar().showMessage("Todos los túneles desconectados", 5000)
+
+    def selectedTunnelId(self):
+        """Obtiene el identificador del túnel seleccionado en la tabla de túneles"""
+        row = self.tunnels_table.currentRow()
+        if row < 0:
+            return None
+        item = self.tunnels_table.item(row, 0)
+        return item.text() if item else None
+
+    def stopSelectedTunnel(self):
+        """Detiene el túnel seleccionado en la tabla de túneles"""
+        tunnel_id = self.selectedTunnelId()
+        if not tunnel_id:
+            QMessageBox.warning(
+                self, "Error", "Por favor, selecciona un túnel para desconectar."
+            )
+            return
 
-            # Detener monitor de puertos
-            self.port_monitor_timer.stop()
+        if not self.ssh_manager.stop_tunnel(tunnel_id):
+            # El túnel ya no estaba en ejecución: basta con quitarlo de la tabla
+            self.console.append(f"[{tunnel_id}] Túnel eliminado de la lista.\n")
+
+    def showSelectedTunnel(self, *args):
+        """Carga en el formulario la configuración del túnel seleccionado"""
+        tunnel_id = self.selectedTunnelId()
+        if not tunnel_id:
+            return
 
-            # Resetear estados de puertos
-            for port, widget in self.port_status_widgets.items():
-                widget.setStatus("disconnected")
+        # Los túneles de perfil se identifican como "carpeta/perfil"
+        folder, _, profile_name = tunnel_id.partition("/")
+        profile, folder, _ = self.profile_manager.get_profile_by_name(
+            profile_name, folder
+        )
+        if profile:
+            self.folder_combo.setCurrentText(folder)
+            self.current_folder = folder
+            self.updateProfilesList()
+            self.selectProfile(profile_name)
+            return
 
-            self.statusBar().showMessage("Desconectado", 5000)
+        # Túnel sin perfil: rellenar el formulario con su configuración
+        tunnel = self.ssh_manager.get_tunnel(tunnel_id)
+        if tunnel is None:
+            return
 
-    def onSshOutput(self, data):
-        """Maneja la salida estándar del proceso SSH"""
-        self.console.append(data)
+        info = self.tunnel_info.get(tunnel_id, {})
+        self.current_profile = None
+        self.ilo_ip.setText(info.get("ilo_ip", ""))
+        self.ssh_user.setText(tunnel.config["user"] or "")
+        self.gateway_ip.setText(tunnel.config["gateway"] or "")
+        self.ssh_port.setValue(int(tunnel.config["ssh_port"] or 22))
+        self.key_path.setText(tunnel.config["key_path"] or "")
+        self.refreshCurrentTunnelState()
+
+    def updateTunnelsTable(self, *args):
+        """Actualiza la tabla de túneles registrados en el SSHManager"""
+        tunnel_ids = self.ssh_manager.get_tunnel_ids()
+        self.tunnels_table.setRowCount(len(tunnel_ids))
+
+        for row, tunnel_id in enumerate(tunnel_ids):
+            tunnel = self.ssh_manager.get_tunnel(tunnel_id)
+            info = self.tunnel_info.get(tunnel_id, {})
+
+            if tunnel.connected:
+                status = "Conectado"
+            else:
+                status = info.get("status", "Desconectado")
+
+            forwards = list(tunnel.forwards.values())
+            bound = sum(1 for forward in forwards if forward.state == FORWARD_BOUND)
+
+            values = [
+                tunnel_id,
+                tunnel.config["gateway"] or "",
+                info.get("ilo_ip", ""),
+                f"{bound}/{len(forwards)}",
+                status,
+            ]
+            for col, value in enumerate(values):
+                self.tunnels_table.setItem(row, col, QTableWidgetItem(value))
+
+            self.tunnels_table.item(row, 3).setToolTip(
+                "\n".join(
+                    f"{forward.listen} → {forward.target}: "
+                    f"{FORWARD_LABELS[forward.state]}"
+                    + (f" ({forward.detail})" if forward.detail else "")
+                    for forward in forwards
+                )
+            )
+            self.tunnels_table.item(row, 4).setToolTip(
+                "\n\n".join(
+                    part
+                    for part in (
+                        self.formatTunnelTimeline(tunnel),
+                        self.formatReconnectHistory(tunnel),
+                    )
+                    if part
+                )
+            )
 
-        # Scroll al final si está habilitado el auto-scroll
-        if self.auto_scroll_checkbox.isChecked():
-            self.console.moveCursor(QTextCursor.MoveOperation.End)
+    def formatTunnelTimeline(self, tunnel):
+        """Describe los eventos del último intento de conexión con su tiempo relativo"""
+        events = list(tunnel.events)
+        starts = [i for i, event in enumerate(events) if event.kind == EVENT_SPAWNED]
+        if not starts:
+            return ""
+
+        events = events[starts[-1]:]
+        origin = events[0].timestamp
+        return "\n".join(
+            f"+{(event.timestamp - origin) * 1000:.0f} ms  "
+            f"{EVENT_LABELS.get(event.kind, event.kind)}"
+            for event in events
+            if event.kind != EVENT_CHANNEL_OPEN
+        )
 
-    def onSshError(self, data):
-        """Maneja la salida de error del proceso SSH"""
-        # Marcar errores en color rojo
-        self.console.setTextColor(QColor("red"))
-        self.console.append(data)
-        self.console.setTextColor(QColor("black"))
-
-        # Scroll al final si está habilitado el auto-scroll
-        if self.auto_scroll_checkbox.isChecked():
-            self.console.moveCursor(QTextCursor.MoveOperation.End)
-
-    def onProcessFinished(self, exit_code, status_msg):
-        """Maneja la finalización del proceso SSH"""
-        self.connect_btn.setEnabled(True)
-        self.connect_action.setEnabled(True)
-        self.disconnect_btn.setEnabled(False)
-        self.disconnect_action.setEnabled(False)
+    def formatReconnectHistory(self, tunnel):
+        """Describe el estado del circuito de reconexión y los últimos fallos"""
+        policy = tunnel.reconnect_policy
+        failures = policy.recent_failures()
+        if policy.state == CIRCUIT_CLOSED and not failures:
+            return ""
+
+        lines = [
+            f"Circuito de reconexión: {CIRCUIT_LABELS[policy.state]} "
+            f"({policy.failures} fallos seguidos)"
+        ]
+        if policy.is_flapping():
+            lines.append("Conexión inestable: cae poco después de conectar")
+        for record in failures[-5:]:
+            moment = time.strftime("%H:%M:%S", time.localtime(record.timestamp))
+            lines.append(
+                f"{moment}  código {record.code}, conectado {record.uptime:.0f} s, "
+                f"reintento en {record.delay:.0f} s"
+            )
+        return "\n".join(lines)
+
+    def onStartupRecorded(self, sample):
+        """Muestra en la consola el desglose del arranque de un túnel"""
+        phases = ", ".join(
+            f"{PHASE_LABELS[name]} {sample.phases[name]:.0f} ms"
+            for name, _, _ in PHASES
+            if name in sample.phases
+        )
+        self.console.append(
+            f"[{sample.tunnel_id}] Túnel listo en "
+            f"{sample.phases.get(TOTAL_PHASE, 0):.0f} ms ({phases})"
+        )
 
-        self.console.append(f"Proceso finalizado: {status_msg} (código {exit_code})\n")
+    def showMetricsDialog(self):
+        """Muestra los tiempos de arranque de los túneles"""
+        dialog = MetricsDialog(self, self.ssh_manager.metrics)
+        dialog.exec()
 
-        # Detener monitor de puertos
-        self.port_monitor_timer.stop()
+    def onTunnelEvent(self, event):
+        """Refleja en la interfaz un evento de conexión de un túnel"""
+        if event.kind == EVENT_CHANNEL_OPEN:
+            return
+
+        if event.kind == EVENT_BIND_FAILED and event.tunnel_id == self.currentTunnelId():
+            port = event.fields.get("port") or event.fields.get("listen_port")
+            if port:
+                port = self.gridPort(event.tunnel_id, int(port))
+                if port in self.port_status_widgets:
+                    self.port_status_widgets[port].setStatus("error")
 
-        # Resetear estados de puertos
+        self.updateTunnelsTable()
+
+    def updateTrafficTable(self):
+        """Muestra los contadores y la tasa de tráfico del túnel mostrado"""
+        tunnel_id = self.currentTunnelId()
+        relay = self.ssh_manager.traffic_relay
+        counters = relay.get_counters(tunnel_id)
+        self.traffic_table.setVisible(bool(counters))
+        if not counters:
+            return
+
+        rates = relay.sample_rates(tunnel_id)
+        self.traffic_table.setRowCount(len(counters))
+        for row, port in enumerate(sorted(counters)):
+            port_counters = counters[port]
+            rate = rates[port]
+            values = [
+                str(port),
+                f"{port_counters.active} / {port_counters.connections}",
+                format_bytes(port_counters.bytes_received),
+                format_bytes(port_counters.bytes_sent),
+                format_bytes(rate.received_per_s) + "/s",
+                format_bytes(rate.sent_per_s) + "/s",
+            ]
+            for col, value in enumerate(values):
+                self.traffic_table.setItem(row, col, QTableWidgetItem(value))
+
+    def onTunnelRemoved(self, tunnel_id):
+        """Maneja la eliminación de un túnel del registro"""
+        # Resumen del tráfico de la sesión
+        for port, counters in sorted(
+            self.ssh_manager.traffic_relay.get_counters(tunnel_id).items()
+        ):
+            self.console.append(
+                f"[{tunnel_id}] Tráfico del puerto {port}: "
+                f"{format_bytes(counters.bytes_received)} recibidos, "
+                f"{format_bytes(counters.bytes_sent)} enviados, "
+                f"{counters.connections} conexiones"
+            )
+
+        self.tunnel_info.pop(tunnel_id, None)
+        self.updateTunnelsTable()
+
+        if tunnel_id == self.currentTunnelId():
+            self.resetPortStatusWidgets()
+        self.updateConnectionButtons()
+        self.updatePortMonitor()
+
+    def updatePortMonitor(self):
+        """
+        Arranca el monitor de puertos si hay algún túnel en ejecución y lo
+        detiene si no queda ninguno en el registro
+        """
+        if self.ssh_manager.is_connected():
+            if not self.port_monitor_timer.isActive():
+                self.port_monitor_timer.start(2000)  # Comprobar cada 2 segundos
+        else:
+            self.port_monitor_timer.stop()
+
+    def updateConnectionButtons(self):
+        """Habilita los botones de conexión según el estado del túnel actual"""
+        running = self.ssh_manager.is_connected(self.currentTunnelId())
+        self.connect_btn.setEnabled(not running)
+        self.connect_action.setEnabled(not running)
+        self.disconnect_btn.setEnabled(running)
+        self.disconnect_action.setEnabled(running)
+
+    def resetPortStatusWidgets(self):
+        """Devuelve los indicadores de puertos al estado desconectado"""
         for port, widget in self.port_status_widgets.items():
             widget.setStatus("disconnected")
+            widget.setToolTip("")
+        self.showPortRemapping(None)
+
+    def showPortRemapping(self, tunnel):
+        """Indica en la rejilla de puertos los puertos locales reasignados"""
+        for port, checkbox in self.port_checkboxes.items():
+            text = checkbox.text().split(" → ")[0]
+            endpoint = tunnel.remapped.get(port) if tunnel is not None else None
+            if endpoint is not None:
+                ip, local_port = endpoint
+                if ip == self.local_ip.currentText():
+                    text += f" → {local_port}"
+                else:
+                    text += f" → {ip}:{local_port}"
+            checkbox.setText(text)
+
+    def gridPort(self, tunnel_id, local_port):
+        """Puerto de la rejilla correspondiente a un puerto local de un túnel"""
+        tunnel = self.ssh_manager.get_tunnel(tunnel_id)
+        return tunnel.requested_port(local_port) if tunnel is not None else local_port
+
+    def refreshCurrentTunnelState(self):
+        """Muestra en la interfaz el estado del túnel de la configuración actual"""
+        tunnel_id = self.currentTunnelId()
+        self.resetPortStatusWidgets()
+
+        info = self.tunnel_info.get(tunnel_id)
+        if info and self.ssh_manager.is_connected(tunnel_id):
+            self.showPortRemapping(self.ssh_manager.get_tunnel(tunnel_id))
+            for port, status in info["port_states"].items():
+                if port in self.port_status_widgets:
+                    self.port_status_widgets[port].setStatus(status)
+            for port, detail in info.get("port_details", {}).items():
+                if port in self.port_status_widgets:
+                    self.port_status_widgets[port].setToolTip(detail)
+
+        self.updateConnectionButtons()
+
+    def onSshOutput(self, tunnel_id, data):
+        """Maneja la salida estándar del proceso SSH"""
+        for line in data.splitlines():
+            self.console.append(f"[{tunnel_id}] {line}")
+
+    def onSshError(self, tunnel_id, data):
+        """Maneja la salida de error del proceso SSH"""
+        # Con -v ssh escribe la depuración en stderr; no todo es un error
+        for line in data.splitlines():
+            if line.startswith("debug"):
+                level = "debug"
+            elif line.lower().startswith("warning"):
+                level = "warning"
+            else:
+                level = "error"
+            self.console.append(f"[{tunnel_id}] {line}", level)
+
+    def onProcessFinished(self, tunnel_id, exit_code, status_msg):
+        """Maneja la finalización del proceso SSH de un túnel"""
+        self.console.append(
+            f"[{tunnel_id}] Proceso finalizado: {status_msg} (código {exit_code})\n"
+        )
+
+        info = self.tunnel_info.get(tunnel_id)
+        if info:
+            info["port_states"] = {}
+            info["port_details"] = {}
+
+        # Resetear estados de puertos si es el túnel mostrado
+        if tunnel_id == self.currentTunnelId():
+            self.resetPortStatusWidgets()
+
+        self.updateConnectionButtons()
+        self.updateTunnelsTable()
 
-    def onConnectionStatusChanged(self, connected, message):
-        """Maneja los cambios en el estado de la conexión"""
+        # Detener monitor de puertos si no queda ningún túnel activo
+        self.updatePortMonitor()
+
+    def onConnectionStatusChanged(self, tunnel_id, connected, message):
+        """Maneja los cambios en el estado de la conexión de un túnel"""
+        info = self.tunnel_info.get(tunnel_id)
+        if info is not None:
+            info["status"] = message
+
+        self.statusBar().showMessage(f"{tunnel_id}: {message}", 5000)
         if connected:
-            self.statusBar().showMessage(message, 5000)
-            self.console.append(f"Túnel SSH establecido: {message}\n")
-        else:
-            self.statusBar().showMessage(message, 5000)
+            self.console.append(f"[{tunnel_id}] Túnel SSH establecido: {message}\n")
+            # Tras una reconexión automática el monitor puede estar detenido
+            self.updatePortMonitor()
+
+        self.updateTunnelsTable()
 
     def checkPortStatus(self):
-        """Verifica el estado de los puertos tunelizados"""
-        if not self.ssh_manager.is_connected():
-            self.port_monitor_timer.stop()
+        """Verifica el estado de los puertos esenciales de todos los túneles activos"""
+        active_tunnels = self.ssh_manager.get_active_tunnel_ids()
+        if not active_tunnels:
+            self.updatePortMonitor()
             return
 
-        # Obtener puertos esenciales según el tipo de servidor seleccionado
-        selected_server_type = self.server_type_combo.currentText()
-        essential_ports = get_server_essential_ports(selected_server_type)
+        # Una única comprobación concurrente para todos los túneles
+        tunnel_ports = {}
+        for tunnel_id in active_tunnels:
+            info = self.tunnel_info.get(tunnel_id)
+            if info and info["essential_ports"]:
+                tunnel_ports[tunnel_id] = info["essential_ports"]
 
-        # Preparar mapeos de puertos esenciales
-        port_mappings = []
-        for port in essential_ports:
-            if port in self.port_checkboxes and self.port_checkboxes[port].isChecked():
-                local_ip = self.local_ip.currentText()
-                mapping = f"{local_ip}:{port}:{self.ilo_ip.text()}:{port}"
-                port_mappings.append(mapping)
+        if tunnel_ports:
+            self.ssh_manager.check_ports_status(tunnel_ports)
 
-        # Comprobar estado de los puertos
-        if port_mappings:
-            self.ssh_manager.check_port_status(port_mappings)
-
-    def updatePortStatus(self, port_name, is_open):
+    def updatePortStatus(self, tunnel_id, port_name, is_open):
         """Actualiza el indicador de estado de un puerto"""
         parts = port_name.split(":")
         if len(parts) >= 2:
-            local_port = int(parts[1])
-            if local_port in self.port_status_widgets:
-                self.port_status_widgets[local_port].setStatus(
-                    "connected" if is_open else "error"
-                )
+            local_port = self.gridPort(tunnel_id, int(parts[1]))
+            status = "connected" if is_open else "error"
+
+            info = self.tunnel_info.get(tunnel_id)
+            if info is not None:
+                info["port_states"][local_port] = status
+
+            # Solo se muestran los puertos del túnel de la configuración actual
+            if (
+                tunnel_id == self.currentTunnelId()
+                and local_port in self.port_status_widgets
+            ):
+                self.port_status_widgets[local_port].setStatus(status)
+
+    def updatePortProbeDetail(self, tunnel_id, port_name, result):
+        """Muestra la latencia y el detalle de la última comprobación de un puerto"""
+        local_port = self.gridPort(tunnel_id, int(port_name.split(":")[1]))
+
+        if result.latency_ms is not None:
+            detail = f"{port_name}: {result.latency_ms:.0f} ms"
+        else:
+            detail = f"{port_name}: {'abierto' if result.is_open else 'cerrado'}"
+        if result.detail:
+            detail += f" ({result.detail})"
+
+        info = self.tunnel_info.get(tunnel_id)
+        if info is not None:
+            info.setdefault("port_details", {})[local_port] = detail
+
+        if (
+            tunnel_id == self.currentTunnelId()
+            and local_port in self.port_status_widgets
+        ):
+            self.port_status_widgets[local_port].setToolTip(detail)
 
     def openBrowser(self):
         """Abre el navegador para acceder a la interfaz ILO"""
         # URL https por defecto
-        url = f"https://{self.local_ip.currentText()}"
+        scheme, port = "https", 443
 
         if 443 in self.port_checkboxes and not self.port_checkboxes[443].isChecked():
             # Si el puerto 443 no está seleccionado, intentar con HTTP
             if 80 in self.port_checkboxes and self.port_checkboxes[80].isChecked():
-                url = f"http://{self.local_ip.currentText()}"
+                scheme, port = "http", 80
+
+        # El túnel puede escuchar en un puerto reasignado
+        host, local_port = self.local_ip.currentText(), port
+        tunnel = self.ssh_manager.get_tunnel(self.currentTunnelId())
+        if tunnel is not None and tunnel.config["dynamic_forward"]:
+            # Con el proxy SOCKS5 se accede directamente a la IP del ILO
+            host = self.ilo_ip.text()
+            path = tunnel.socks_proxy.pac_file if tunnel.socks_proxy else None
+            if path and os.path.exists(path):
+                self.console.append(
+                    f"El navegador debe usar la configuración de proxy {Path(path).as_uri()}"
+                )
+        elif tunnel is not None:
+            host, local_port = tunnel.local_endpoint(host, port)
+
+        url = f"{scheme}://{host}"
+        if local_port != port:
+            url += f":{local_port}"
 
         try:
             self.console.append(f"Abriendo navegador en {url}\n")
@@ -1865,6 +2740,9 @@ class ILOTunnelApp(QMainWindow):
         self.settings.setValue("key_path", self.key_path.text())
         self.settings.setValue("server_type", self.server_type_combo.currentText())
         self.settings.setValue("custom_ports", self.use_custom_ports.isChecked())
+        self.settings.setValue("backend", self.backend_combo.currentData())
+        self.settings.setValue("forward_mode", self.forward_mode_combo.currentData())
+        self.settings.setValue("socks_port", self.socks_port.value())
 
         # Guardar estado de puertos
         ports_data = {}
@@ -1877,10 +2755,11 @@ class ILOTunnelApp(QMainWindow):
         """Activa o desactiva la reconexión automática"""
         is_checked = state == Qt.CheckState.Checked
 
-        # Actualizar el SSHManager solo si hay una conexión activa
-        if self.ssh_manager.is_connected():
+        # Actualizar el túnel actual solo si hay una conexión activa
+        tunnel_id = self.currentTunnelId()
+        if self.ssh_manager.is_connected(tunnel_id):
             self.ssh_manager.set_auto_reconnect(
-                is_checked, self.reconnect_attempts_spinbox.value()
+                is_checked, self.reconnect_attempts_spinbox.value(), tunnel_id
             )
 
     def copyConsoleText(self):
@@ -1916,26 +2795,27 @@ class ILOTunnelApp(QMainWindow):
 
     def closeEvent(self, event):
         """Maneja el cierre de la ventana"""
-        # Comprobar si hay una conexión activa
+        # Comprobar si hay algún túnel activo
         if self.ssh_manager.is_connected():
             # Confirmar cierre si está habilitada la confirmación
             if self.confirm_exit_checkbox.isChecked():
                 confirm = QMessageBox.question(
                     self,
                     "Confirmar salida",
-                    "Hay una conexión activa. ¿Deseas cerrarla y salir?",
+                    "Hay túneles activos. ¿Deseas cerrarlos y salir?",
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                 )
 
-                if confirm == QMessageBox.StandardButton.Yes:
-                    self.ssh_manager.stop_tunnel()
-                else:
+                if confirm != QMessageBox.StandardButton.Yes:
                     event.ignore()
                     return
-            else:
-                # Cerrar túnel sin confirmación
-                self.ssh_manager.stop_tunnel()
+
+        # Cerrar los túneles, las conexiones maestras y los hilos de fondo
+        self.port_monitor_timer.stop()
+        self.ssh_manager.shutdown()
 
         # Guardar la configuración antes de salir
         self.saveCurrentConfig()
+        self.profile_importer.shutdown()
+        self.profile_exporter.shutdown()
         event.accept()
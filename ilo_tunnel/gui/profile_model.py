@@ -0,0 +1,207 @@
+# ilo_tunnel/gui/profile_model.py
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import (
+    Qt,
+    QAbstractListModel,
+    QModelIndex,
+    QSortFilterProxyModel,
+)
+
+from ..models.profile_manager import ProfileManager
+
+# Roles propios de los elementos del modelo
+FOLDER_ROLE = Qt.ItemDataRole.UserRole + 1
+PROFILE_ROLE = Qt.ItemDataRole.UserRole + 2
+
+
+class ProfileListModel(QAbstractListModel):
+    """
+    Modelo con todos los perfiles de todas las carpetas, en el orden del
+    ProfileManager (carpeta a carpeta).
+
+    Se comparte entre el combo de la pestaña de conexión y la lista de la
+    pestaña de perfiles; cada vista filtra su carpeta y su búsqueda con un
+    ProfileFilterProxyModel. Los cambios del ProfileManager llegan como
+    inserciones, borrados o modificaciones de filas sueltas, de modo que las
+    vistas conservan la selección y no se reconstruyen enteras.
+    """
+
+    def __init__(self, profile_manager: ProfileManager, parent=None):
+        super().__init__(parent)
+        self.profile_manager = profile_manager
+        self._rows: List[Tuple[str, dict]] = []  # (carpeta, perfil)
+        self._counts: Dict[str, int] = {}  # perfiles por carpeta, en orden
+        self._reload()
+
+        profile_manager.profile_added.connect(self._handle_added)
+        profile_manager.profiles_added.connect(self._handle_range_added)
+        profile_manager.profile_removed.connect(self._handle_removed)
+        profile_manager.profile_changed.connect(self._handle_changed)
+        profile_manager.folders_changed.connect(self._handle_folders_changed)
+        profile_manager.profiles_reset.connect(self._handle_reset)
+
+    def _reload(self) -> None:
+        """Copia la lista de perfiles del ProfileManager"""
+        profiles_data = self.profile_manager.get_profiles()
+        self._rows = [
+            (folder, profile_data)
+            for folder, profiles in profiles_data.items()
+            for profile_data in profiles
+        ]
+        self._counts = {folder: len(profiles) for folder, profiles in profiles_data.items()}
+
+    def _row(self, folder: str, index: int) -> int:
+        """Fila del modelo de un perfil de una carpeta"""
+        offset = 0
+        for current_folder, count in self._counts.items():
+            if current_folder == folder:
+                break
+            offset += count
+        return offset + index
+
+    def row_profile(self, row: int) -> Tuple[str, dict]:
+        """Carpeta y datos del perfil de una fila"""
+        return self._rows[row]
+
+    def row_position(self, row: int) -> Tuple[str, int]:
+        """Posición (carpeta, índice) en el ProfileManager del perfil de una fila"""
+        folder = self._rows[row][0]
+        return folder, row - self._row(folder, 0)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+
+        folder, profile_data = self._rows[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return profile_data.get("name", "")
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return (
+                f"ILO: {profile_data.get('ilo_ip', '')}\n"
+                f"Gateway: {profile_data.get('gateway_ip', '')}\n"
+                f"Usuario: {profile_data.get('ssh_user', '')}\n"
+                f"Tipo: {profile_data.get('server_type', '')}"
+            )
+        if role == FOLDER_ROLE:
+            return folder
+        if role == PROFILE_ROLE:
+            return profile_data
+        return None
+
+    def _handle_added(self, folder: str, index: int) -> None:
+        """Inserta la fila de un perfil nuevo"""
+        self._handle_range_added(folder, index, index)
+
+    def _handle_range_added(self, folder: str, first: int, last: int) -> None:
+        """Inserta las filas de varios perfiles nuevos seguidos (importación)"""
+        self._counts.setdefault(folder, 0)
+        row = self._row(folder, first)
+        profiles = self.profile_manager.get_profiles(folder)[first:last + 1]
+        self.beginInsertRows(QModelIndex(), row, row + len(profiles) - 1)
+        self._rows[row:row] = [(folder, profile_data) for profile_data in profiles]
+        self._counts[folder] += len(profiles)
+        self.endInsertRows()
+
+    def _handle_removed(self, folder: str, index: int) -> None:
+        """Elimina la fila de un perfil borrado o movido"""
+        row = self._row(folder, index)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self._counts[folder] -= 1
+        self.endRemoveRows()
+
+    def _handle_changed(self, folder: str, index: int) -> None:
+        """Actualiza la fila de un perfil modificado"""
+        row = self._row(folder, index)
+        self._rows[row] = (folder, self.profile_manager.get_profile_data(folder, index))
+        model_index = self.index(row, 0)
+        self.dataChanged.emit(model_index, model_index)
+
+    def _handle_folders_changed(self) -> None:
+        """Registra las carpetas nuevas (vacías) para mantener el orden"""
+        self._counts = {
+            folder: self._counts.get(folder, 0)
+            for folder in self.profile_manager.get_folders()
+        }
+
+    def _handle_reset(self) -> None:
+        """Vuelve a copiar todos los perfiles (importación, cambio externo...)"""
+        self.beginResetModel()
+        self._reload()
+        self.endResetModel()
+
+
+class ProfileFilterProxyModel(QSortFilterProxyModel):
+    """
+    Vista filtrada del ProfileListModel: una carpeta y, opcionalmente, un
+    texto de búsqueda. Con búsqueda las filas se ordenan por relevancia
+    según ProfileManager.search_profiles; sin ella, en el orden de la carpeta.
+    """
+
+    def __init__(self, profile_manager: ProfileManager, parent=None):
+        super().__init__(parent)
+        self.profile_manager = profile_manager
+        self.folder: Optional[str] = None
+        self.search_text = ""
+        self._ranks: Optional[Dict[int, int]] = None  # id del perfil -> posición
+        self._version = None  # Versión de los perfiles al calcular la búsqueda
+        # Los filtros se aplican al cambiar carpeta o búsqueda, no con cada
+        # modificación de un perfil (que movería la selección de las vistas)
+        self.setDynamicSortFilter(False)
+        # Tras recargar los perfiles los resultados guardados ya no sirven
+        profile_manager.profiles_reset.connect(self._handle_reset)
+
+    def set_filter(self, folder: Optional[str], search_text: str = "") -> bool:
+        """
+        Cambia la carpeta y el texto de búsqueda
+
+        Returns:
+            True si el filtro ha cambiado
+        """
+        search_text = search_text.strip()
+        if folder == self.folder and search_text == self.search_text:
+            # Los resultados de una búsqueda dependen de los datos
+            if not search_text or self._version == self.profile_manager.version:
+                return False
+
+        self.folder = folder
+        self.search_text = search_text
+        self.refresh()
+        return True
+
+    def refresh(self) -> None:
+        """Vuelve a aplicar el filtro y el orden actuales"""
+        if self.search_text:
+            matches = self.profile_manager.search_profiles(self.search_text, self.folder)
+            self._ranks = {id(profile_data): i for i, profile_data in enumerate(matches)}
+        else:
+            self._ranks = None
+        self._version = self.profile_manager.version
+
+        self.invalidateFilter()
+        # Columna -1: orden del modelo de origen
+        self.sort(0 if self._ranks is not None else -1)
+
+    def _handle_reset(self) -> None:
+        """Repite la búsqueda activa con los perfiles recargados"""
+        if self.search_text and self.sourceModel() is not None:
+            self.refresh()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        folder, profile_data = self.sourceModel().row_profile(source_row)
+        if self.folder is not None and folder != self.folder:
+            return False
+        return self._ranks is None or id(profile_data) in self._ranks
+
+    def lessThan(self, left: QModelIndex, right: QModelIndex) -> bool:
+        if self._ranks is None:
+            return left.row() < right.row()
+        model = self.sourceModel()
+        last = len(self._ranks)
+        left_rank = self._ranks.get(id(model.row_profile(left.row())[1]), last)
+        right_rank = self._ranks.get(id(model.row_profile(right.row())[1]), last)
+        return left_rank < right_rank
@@ -1,7 +1,7 @@
 # ilo_tunnel/gui/widgets.py
-from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLabel
-from PyQt6.QtGui import QColor, QPainter, QBrush
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPlainTextEdit
+from PyQt6.QtGui import QColor, QPainter, QBrush, QTextCharFormat, QTextCursor
+from PyQt6.QtCore import Qt, QSize, QTimer
 
 
 class PortStatusWidget(QWidget):
@@ -87,10 +87,154 @@ class ConnectionStatusBar(QWidget):
         self.status_label.setText(message)
 
 
-class LogTextEdit(QWidget):
+class LogTextEdit(QPlainTextEdit):
     """
-    Widget de texto avanzado para mostrar logs con colores y filtrado
+    Widget de texto avanzado para mostrar logs con colores y filtrado.
+
+    - Búfer circular: solo se conservan las últimas `max_lines` líneas.
+    - Las líneas se acumulan y se insertan en bloque cada `flush_interval` ms,
+      de modo que la salida de ssh -v no provoca un repintado por línea.
+    - Cada línea guarda su nivel de severidad en el bloque del documento;
+      el filtrado oculta bloques en lugar de reconstruir el documento.
     """
 
-    # TODO: Implementar un widget de texto avanzado para logs
-    pass
+    LEVELS = {"debug": 0, "info": 1, "warning": 2, "error": 3}
+
+    def __init__(self, parent=None, max_lines=10000, flush_interval=100):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setMaximumBlockCount(max_lines)
+
+        self.auto_scroll = True
+        self.min_level = self.LEVELS["debug"]
+        self._pending = []
+
+        # Formato de cada nivel (info usa el color del tema)
+        self.level_formats = {}
+        for level, color in (
+            ("debug", QColor(128, 128, 128)),
+            ("info", None),
+            ("warning", QColor(200, 120, 0)),
+            ("error", QColor(220, 0, 0)),
+        ):
+            fmt = QTextCharFormat()
+            if color is not None:
+                fmt.setForeground(QBrush(color))
+            self.level_formats[self.LEVELS[level]] = fmt
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_interval)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def append(self, text, level="info"):
+        """
+        Añade texto al log (una entrada por línea)
+
+        Args:
+            text: Texto a añadir, puede contener varias líneas
+            level: debug, info, warning o error
+        """
+        value = self.LEVELS.get(level, self.LEVELS["info"])
+        lines = text.splitlines() or [""]
+        self._pending.extend((value, line) for line in lines)
+
+        # Si se acumulan más líneas de las que caben, descartar las antiguas
+        overflow = len(self._pending) - self.maximumBlockCount()
+        if self.maximumBlockCount() > 0 and overflow > 0:
+            del self._pending[:overflow]
+
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Inserta en el documento las líneas pendientes"""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+
+        document = self.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        first_position = cursor.position()
+        hidden = False
+
+        cursor.beginEditBlock()
+        for value, line in pending:
+            if not document.isEmpty():
+                cursor.insertBlock()
+            cursor.insertText(line, self.level_formats[value])
+
+            block = cursor.block()
+            block.setUserState(value)
+            if value < self.min_level:
+                block.setVisible(False)
+                hidden = True
+        cursor.endEditBlock()
+
+        if hidden:
+            # Solo se recalcula la zona recién insertada
+            first_position = min(first_position, document.characterCount() - 1)
+            document.markContentsDirty(
+                first_position, document.characterCount() - first_position
+            )
+
+        if self.auto_scroll and at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def setAutoScroll(self, enabled):
+        """Activa o desactiva el desplazamiento automático al final"""
+        self.auto_scroll = enabled
+
+    def setMaximumLines(self, max_lines):
+        """Establece el número máximo de líneas conservadas"""
+        self.flush()
+        self.setMaximumBlockCount(max_lines)
+
+    def setMinimumLevel(self, level):
+        """
+        Muestra solo las líneas con severidad igual o superior a `level`
+
+        Args:
+            level: debug, info, warning o error
+        """
+        self.flush()
+        min_level = self.LEVELS.get(level, self.LEVELS["debug"])
+        if min_level == self.min_level:
+            return
+        self.min_level = min_level
+
+        document = self.document()
+        first = last = None
+        block = document.firstBlock()
+        while block.isValid():
+            visible = block.userState() >= min_level
+            if block.isVisible() != visible:
+                block.setVisible(visible)
+                if first is None:
+                    first = block.position()
+                last = block.position() + block.length()
+            block = block.next()
+
+        if first is not None:
+            # Recalcular únicamente el rango de bloques que ha cambiado
+            last = min(last, document.characterCount())
+            document.markContentsDirty(first, last - first)
+            self.viewport().update()
+
+    def clear(self):
+        """Borra el log y las líneas pendientes"""
+        self._pending = []
+        self._flush_timer.stop()
+        super().clear()
+
+    def toPlainText(self):
+        """Devuelve el texto del log incluyendo las líneas pendientes"""
+        self.flush()
+        return super().toPlainText()
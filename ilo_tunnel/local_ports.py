@@ -0,0 +1,226 @@
+# ilo_tunnel/local_ports.py
+import errno
+import os
+import platform
+import socket
+from typing import Dict, List, Optional, Tuple
+
+# Desplazamiento de los puertos reasignados: 443 -> 10443, 22 -> 10022...
+REMAP_OFFSET = 10000
+
+# Primer puerto que un usuario sin privilegios puede ocupar en sistemas Unix
+PRIVILEGED_PORT_LIMIT = 1024
+
+_UNPRIVILEGED_PORT_START = "/proc/sys/net/ipv4/ip_unprivileged_port_start"
+
+
+def privileged_port_limit() -> int:
+    """
+    Obtiene el primer puerto que se puede ocupar sin permisos de administrador
+
+    Returns:
+        0 si no hay puertos privilegiados (Windows o ejecución como root),
+        el valor configurado en el kernel en Linux o 1024 en otro caso
+    """
+    if platform.system() == "Windows":
+        return 0
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        return 0
+    try:
+        with open(_UNPRIVILEGED_PORT_START) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return PRIVILEGED_PORT_LIMIT
+
+
+def split_mapping(mapping: str) -> Tuple[str, int, str]:
+    """
+    Separa un mapeo "ip_local:puerto_local:host_remoto:puerto_remoto"
+
+    Returns:
+        Tupla (ip local, puerto local, destino "host:puerto")
+    """
+    local_ip, local_port, target = mapping.split(":", 2)
+    return local_ip, int(local_port), target
+
+
+def needs_root(port_mappings: List[str], limit: Optional[int] = None) -> bool:
+    """Indica si algún mapeo escucha en un puerto privilegiado"""
+    if limit is None:
+        limit = privileged_port_limit()
+    return any(split_mapping(mapping)[1] < limit for mapping in port_mappings)
+
+
+def sudo_prefix(port_mappings: List[str]) -> List[str]:
+    """Prefijo del comando ssh: "sudo" solo si hay que ocupar puertos privilegiados"""
+    return ["sudo"] if needs_root(port_mappings) else []
+
+
+def set_listen_options(sock: socket.socket) -> None:
+    """
+    Opciones de un socket de escucha para que bind() falle si el puerto ya
+    está en uso
+
+    En Windows SO_REUSEADDR permite ocupar un puerto en el que otro proceso
+    ya escucha, así que allí se usa SO_EXCLUSIVEADDRUSE; en el resto de
+    sistemas SO_REUSEADDR solo evita esperar a las conexiones en TIME_WAIT.
+    """
+    if platform.system() == "Windows":
+        exclusive = getattr(socket, "SO_EXCLUSIVEADDRUSE", None)
+        if exclusive is not None:
+            sock.setsockopt(socket.SOL_SOCKET, exclusive, 1)
+    else:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+
+def is_port_free(host: str, port: int) -> bool:
+    """
+    Comprueba si se puede ocupar un puerto local
+
+    Solo cuenta como ocupado un puerto en uso (EADDRINUSE) o una dirección
+    que no existe en el equipo (EADDRNOTAVAIL, alias de loopback sin
+    crear). La falta de permisos (EACCES en un puerto privilegiado) no
+    indica que esté ocupado: ssh lo ocupará con sudo.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        set_listen_options(s)
+        try:
+            s.bind((host, port))
+        except OSError as e:
+            return e.errno not in (errno.EADDRINUSE, errno.EADDRNOTAVAIL)
+    return True
+
+
+def pick_high_port(host: str, port: int, taken: Tuple[int, ...] = ()) -> int:
+    """
+    Elige un puerto alto libre para sustituir a un puerto privilegiado
+
+    Se prueba primero port + REMAP_OFFSET, fácil de reconocer; si está
+    ocupado se deja que el sistema asigne uno libre.
+    """
+    candidate = port + REMAP_OFFSET
+    if candidate <= 65535 and candidate not in taken and is_port_free(host, candidate):
+        return candidate
+
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((host, 0))
+            candidate = s.getsockname()[1]
+        if candidate not in taken:
+            return candidate
+
+
+# Direcciones de loopback alternativas para túneles cuyos puertos están ocupados
+# (en macOS solo existen si se han creado con "ifconfig lo0 alias")
+LOOPBACK_ALIASES = [f"127.0.0.{i}" for i in range(2, 17)]
+
+
+class PortAllocator:
+    """
+    Reparto de los puertos locales entre todos los túneles.
+
+    Antes de lanzar un túnel se comprueba que sus puertos estén libres y no
+    reservados por otro túnel. Si alguno está ocupado se busca otra dirección
+    de loopback en la que estén libres todos (para que la interfaz web y la
+    consola remota del ILO sigan en el mismo host) y, si no hay ninguna, se
+    asignan puertos alternativos en la dirección pedida. Los puertos quedan
+    reservados para el túnel hasta que se libera, incluso entre reconexiones.
+    """
+
+    def __init__(self, aliases: Optional[List[str]] = None):
+        self.aliases = LOOPBACK_ALIASES if aliases is None else aliases
+        self.reservations: Dict[str, set] = {}  # túnel -> {(ip, puerto)}
+
+    def reserved_by(self, ip: str, port: int) -> Optional[str]:
+        """Túnel que tiene reservado un puerto, si lo hay"""
+        for tunnel_id, reserved in self.reservations.items():
+            if (ip, port) in reserved:
+                return tunnel_id
+        return None
+
+    def is_available(self, ip: str, port: int) -> bool:
+        """Comprueba que un puerto no esté reservado ni ocupado por otro proceso"""
+        return self.reserved_by(ip, port) is None and is_port_free(ip, port)
+
+    def allocate(
+        self,
+        tunnel_id: str,
+        port_mappings: List[str],
+        remap_privileged: bool = False,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], Dict[int, Tuple[str, int]]]:
+        """
+        Reserva los puertos locales de un túnel
+
+        Args:
+            tunnel_id: Identificador del túnel
+            port_mappings: Mapeos "ip_local:puerto_local:host_remoto:puerto_remoto"
+            remap_privileged: Sustituir los puertos privilegiados por puertos altos
+            limit: Primer puerto no privilegiado (por defecto el del sistema)
+
+        Returns:
+            Tupla (mapeos resultantes, puerto pedido -> (ip, puerto) asignado)
+            con solo los puertos que han cambiado
+        """
+        self.release(tunnel_id)
+        if limit is None:
+            limit = privileged_port_limit()
+
+        parsed = [split_mapping(mapping) for mapping in port_mappings]
+        wanted = []  # (puerto pedido, puerto deseado)
+        for _, port, _ in parsed:
+            if remap_privileged and port < limit:
+                wanted.append((port, port + REMAP_OFFSET))
+            else:
+                wanted.append((port, port))
+
+        # Todos los reenvíos de un túnel comparten la IP local
+        requested_ip = parsed[0][0] if parsed else "127.0.0.1"
+        candidates = [requested_ip]
+        if requested_ip.startswith("127."):
+            candidates += [ip for ip in self.aliases if ip != requested_ip]
+
+        def available(ip: str, port: int) -> bool:
+            # Sin reasignación los puertos privilegiados los ocupa ssh con
+            # sudo: sin permisos no se pueden comprobar, basta con la reserva
+            if not remap_privileged and port < limit:
+                return self.reserved_by(ip, port) is None
+            return self.is_available(ip, port)
+
+        for ip in candidates:
+            if all(available(ip, port) for _, port in wanted):
+                assigned = [(ip, port) for _, port in wanted]
+                break
+        else:
+            # Ninguna dirección tiene todos los puertos libres: puertos alternativos
+            ip = requested_ip
+            taken = {port for reserved in self.reservations.values() for _, port in reserved}
+            assigned = []
+            for _, port in wanted:
+                if port in taken or not available(ip, port):
+                    try:
+                        port = pick_high_port(ip, port, tuple(taken))
+                    except OSError:
+                        # La IP local no existe en el equipo: se deja el
+                        # puerto pedido y ssh informará del error de bind
+                        pass
+                taken.add(port)
+                assigned.append((ip, port))
+
+        mappings = []
+        remapped = {}
+        for (local_ip, port, target), (ip, assigned_port) in zip(parsed, assigned):
+            if (ip, assigned_port) != (local_ip, port):
+                remapped[port] = (ip, assigned_port)
+            mappings.append(f"{ip}:{assigned_port}:{target}")
+
+        self.reservations[tunnel_id] = set(assigned)
+        return mappings, remapped
+
+    def reserve(self, tunnel_id: str, ip: str, port: int) -> None:
+        """Reserva un puerto ya asignado (por ejemplo, al volver a abrirlo)"""
+        self.reservations.setdefault(tunnel_id, set()).add((ip, port))
+
+    def release(self, tunnel_id: str) -> None:
+        """Libera los puertos reservados por un túnel"""
+        self.reservations.pop(tunnel_id, None)
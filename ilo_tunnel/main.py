@@ -3,7 +3,7 @@ import sys
 import platform
 import os
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QDir
+from PyQt6.QtCore import QDir, QSettings
 
 from .gui.main_window import ILOTunnelApp
 
@@ -14,12 +14,13 @@ def setup_environment():
     config_dir = os.path.join(os.path.expanduser("~"), ".config", "ilo-tunnel")
     os.makedirs(config_dir, exist_ok=True)
     
-    # Verificar si la aplicación se está ejecutando con los permisos necesarios
+    # Solo hacen falta permisos de administrador para ocupar puertos privilegiados;
+    # con la reasignación de puertos (activa por defecto) los túneles no usan sudo
+    settings = QSettings("ILOTunnel", "ILOTunnelApp")
     if platform.system() == "Linux" or platform.system() == "Darwin":
-        # En sistemas basados en Unix, comprobar si se está ejecutando como root
-        if os.geteuid() != 0:
-            print("ADVERTENCIA: La aplicación puede requerir permisos de administrador para crear túneles SSH.")
-            print("Considera ejecutar con 'sudo' si experimentas problemas de permisos.")
+        remap = settings.value("remap_privileged", True, type=bool)
+        if not remap and os.geteuid() != 0:
+            print("ADVERTENCIA: Con la reasignación de puertos desactivada, los túneles a puertos privilegiados se lanzan con 'sudo'.")
 
 
 def main():
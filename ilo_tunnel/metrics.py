@@ -0,0 +1,250 @@
+# ilo_tunnel/metrics.py
+import csv
+import json
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .events import (
+    TunnelEvent,
+    EVENT_SPAWNED,
+    EVENT_PROCESS_STARTED,
+    EVENT_CONNECTING,
+    EVENT_TCP_CONNECTED,
+    EVENT_KEX_DONE,
+    EVENT_AUTHENTICATED,
+    EVENT_FORWARD_BOUND,
+    EVENT_EXITED,
+)
+
+# Fases del arranque de un túnel: (nombre, evento inicial, evento final).
+# Si falta el evento inicial se usa el anterior disponible, de modo que la
+# fase absorbe el tiempo de las que no se han podido medir.
+PHASES = [
+    ("spawn", EVENT_SPAWNED, EVENT_PROCESS_STARTED),
+    ("sudo", EVENT_PROCESS_STARTED, EVENT_CONNECTING),
+    ("tcp", EVENT_CONNECTING, EVENT_TCP_CONNECTED),
+    ("kex", EVENT_TCP_CONNECTED, EVENT_KEX_DONE),
+    ("auth", EVENT_KEX_DONE, EVENT_AUTHENTICATED),
+    ("forward", EVENT_AUTHENTICATED, EVENT_FORWARD_BOUND),
+]
+TOTAL_PHASE = "total"
+
+PHASE_LABELS = {
+    "spawn": "Lanzar proceso",
+    "sudo": "sudo",
+    "tcp": "Conexión TCP",
+    "kex": "Intercambio de claves",
+    "auth": "Autenticación",
+    "forward": "Primer reenvío",
+    TOTAL_PHASE: "Total",
+}
+
+# Límites superiores (ms) de las barras del histograma
+HISTOGRAM_BUCKETS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
+
+SCOPE_PROFILE = "profile"
+SCOPE_GATEWAY = "gateway"
+
+
+@dataclass
+class StartupSample:
+    """Duración de las fases de un arranque de túnel (ms)"""
+
+    tunnel_id: str
+    gateway: str
+    phases: Dict[str, float]
+    recorded_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class PhaseStats:
+    """Estadísticas de una fase"""
+
+    count: int
+    minimum: float
+    median: float
+    p90: float
+    maximum: float
+
+
+class StartupTracker:
+    """
+    Reconstruye las fases de un arranque a partir de los eventos de un túnel.
+
+    Cada evento "spawned" inicia una medida nueva; la medida se completa con
+    el primer reenvío utilizable y se descarta si el proceso termina antes.
+    """
+
+    def __init__(self):
+        self.marks: Optional[Dict[str, float]] = None
+
+    def feed(self, event: TunnelEvent) -> Optional[Dict[str, float]]:
+        """
+        Procesa un evento del túnel
+
+        Returns:
+            Duración de cada fase en ms si el arranque acaba de completarse
+        """
+        if event.kind == EVENT_SPAWNED:
+            self.marks = {EVENT_SPAWNED: event.timestamp}
+            return None
+
+        if self.marks is None:
+            return None
+
+        if event.kind == EVENT_EXITED:
+            self.marks = None
+            return None
+
+        self.marks.setdefault(event.kind, event.timestamp)
+        if event.kind != EVENT_FORWARD_BOUND:
+            return None
+
+        phases = self.phases(self.marks)
+        self.marks = None
+        return phases
+
+    @staticmethod
+    def phases(marks: Dict[str, float]) -> Dict[str, float]:
+        """Calcula la duración de cada fase (ms) a partir de las marcas de tiempo"""
+        phases = {}
+        previous = None
+        for name, start_kind, end_kind in PHASES:
+            start = marks.get(start_kind, previous)
+            end = marks.get(end_kind)
+            if start is not None and end is not None and end >= start:
+                phases[name] = (end - start) * 1000
+            if end is not None:
+                previous = end
+            elif start is not None:
+                previous = start
+
+        if EVENT_FORWARD_BOUND in marks:
+            phases[TOTAL_PHASE] = (marks[EVENT_FORWARD_BOUND] - marks[EVENT_SPAWNED]) * 1000
+        return phases
+
+
+class ConnectionMetrics:
+    """
+    Histograma deslizante de los tiempos de arranque por perfil y por gateway
+    """
+
+    def __init__(self, max_samples: int = 100):
+        self.max_samples = max_samples
+        self.samples: Dict[Tuple[str, str], deque] = {}
+
+    def record(self, tunnel_id: str, gateway: str, phases: Dict[str, float]) -> StartupSample:
+        """
+        Registra un arranque
+
+        Args:
+            tunnel_id: Perfil (identificador del túnel)
+            gateway: Gateway del túnel
+            phases: Duración de cada fase en ms
+
+        Returns:
+            La muestra registrada
+        """
+        sample = StartupSample(tunnel_id, gateway, dict(phases))
+        for key in ((SCOPE_PROFILE, tunnel_id), (SCOPE_GATEWAY, gateway)):
+            self.samples.setdefault(key, deque(maxlen=self.max_samples)).append(sample)
+        return sample
+
+    def keys(self, scope: str) -> List[str]:
+        """Perfiles o gateways con muestras"""
+        return sorted(key for key_scope, key in self.samples if key_scope == scope)
+
+    def values(self, scope: str, key: str, phase: str) -> List[float]:
+        """Duraciones registradas de una fase"""
+        return [
+            sample.phases[phase]
+            for sample in self.samples.get((scope, key), ())
+            if phase in sample.phases
+        ]
+
+    def stats(self, scope: str, key: str) -> Dict[str, PhaseStats]:
+        """
+        Resumen de cada fase
+
+        Args:
+            scope: SCOPE_PROFILE o SCOPE_GATEWAY
+            key: Perfil o gateway
+
+        Returns:
+            Diccionario fase -> estadísticas (solo fases con muestras)
+        """
+        result = {}
+        for phase in [name for name, _, _ in PHASES] + [TOTAL_PHASE]:
+            values = sorted(self.values(scope, key, phase))
+            if not values:
+                continue
+            result[phase] = PhaseStats(
+                count=len(values),
+                minimum=values[0],
+                median=statistics.median(values),
+                p90=values[min(len(values) - 1, int(len(values) * 0.9))],
+                maximum=values[-1],
+            )
+        return result
+
+    def histogram(self, scope: str, key: str, phase: str) -> List[int]:
+        """Número de muestras de una fase en cada barra de HISTOGRAM_BUCKETS"""
+        counts = [0] * len(HISTOGRAM_BUCKETS)
+        for value in self.values(scope, key, phase):
+            for i, limit in enumerate(HISTOGRAM_BUCKETS):
+                if value <= limit:
+                    counts[i] += 1
+                    break
+        return counts
+
+    def all_samples(self) -> List[StartupSample]:
+        """Todas las muestras sin duplicados, en orden cronológico"""
+        unique = {
+            id(sample): sample
+            for (scope, _), samples in self.samples.items()
+            if scope == SCOPE_PROFILE
+            for sample in samples
+        }
+        return sorted(unique.values(), key=lambda sample: sample.recorded_at)
+
+    def export(self, file_path: str) -> int:
+        """
+        Exporta las muestras a CSV o JSON según la extensión del archivo
+
+        Returns:
+            Número de muestras exportadas
+        """
+        samples = self.all_samples()
+        phases = [name for name, _, _ in PHASES] + [TOTAL_PHASE]
+
+        if file_path.lower().endswith(".json"):
+            with open(file_path, "w") as f:
+                json.dump(
+                    [
+                        {
+                            "tunnel": sample.tunnel_id,
+                            "gateway": sample.gateway,
+                            "recorded_at": sample.recorded_at,
+                            "phases_ms": sample.phases,
+                        }
+                        for sample in samples
+                    ],
+                    f,
+                    indent=2,
+                )
+        else:
+            with open(file_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["tunnel", "gateway", "recorded_at"] + phases)
+                for sample in samples:
+                    writer.writerow(
+                        [sample.tunnel_id, sample.gateway, f"{sample.recorded_at:.3f}"]
+                        + [
+                            f"{sample.phases[phase]:.1f}" if phase in sample.phases else ""
+                            for phase in phases
+                        ]
+                    )
+        return len(samples)
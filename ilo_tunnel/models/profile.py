@@ -17,22 +17,46 @@ class ConnectionProfile:
     key_path: str = "~/.ssh/id_rsa"
     ports: Dict[str, bool] = field(default_factory=dict)
     custom_ports: bool = False  # Flag para indicar si se usan puertos personalizados
+    backend: str = "openssh"  # Motor del túnel: "openssh" o "asyncssh"
+    forward_mode: str = "ports"  # "ports" (un -L por puerto) o "socks" (un -D)
+    socks_port: int = 1080  # Puerto local del proxy SOCKS5 en modo "socks"
+    updated_at: float = 0.0  # Última modificación (epoch); 0 si se desconoce
 
     @classmethod
     def from_dict(cls, data: dict) -> "ConnectionProfile":
         """Crea un perfil a partir de un diccionario"""
-        return cls(
-            name=data.get("name", ""),
-            ilo_ip=data.get("ilo_ip", ""),
-            ssh_user=data.get("ssh_user", ""),
-            gateway_ip=data.get("gateway_ip", ""),
-            server_type=data.get("server_type", "HP/Huawei"),
-            ssh_port=data.get("ssh_port", 22),
-            local_ip=data.get("local_ip", "127.0.0.1"),
-            key_path=data.get("key_path", "~/.ssh/id_rsa"),
-            ports=data.get("ports", {}),
-            custom_ports=data.get("custom_ports", False),
-        )
+        return cls(**cls.normalize_dict(data))
+
+    @staticmethod
+    def normalize_dict(data: dict) -> dict:
+        """
+        Diccionario con todos los campos del perfil, con los valores por
+        defecto de los que falten
+
+        Equivale a from_dict(data).to_dict() sin crear el perfil, para las
+        importaciones masivas.
+        """
+        return {
+            "name": data.get("name", ""),
+            "ilo_ip": data.get("ilo_ip", ""),
+            "ssh_user": data.get("ssh_user", ""),
+            "gateway_ip": data.get("gateway_ip", ""),
+            "server_type": data.get("server_type", "HP/Huawei"),
+            "ssh_port": data.get("ssh_port", 22),
+            "local_ip": data.get("local_ip", "127.0.0.1"),
+            "key_path": data.get("key_path", "~/.ssh/id_rsa"),
+            "ports": data.get("ports", {}),
+            "custom_ports": data.get("custom_ports", False),
+            "backend": data.get("backend", "openssh"),
+            "forward_mode": data.get("forward_mode", "ports"),
+            "socks_port": data.get("socks_port", 1080),
+            "updated_at": data.get("updated_at", 0.0),
+        }
+
+    @staticmethod
+    def is_valid_dict(data: dict) -> bool:
+        """Igual que is_valid, para un diccionario ya normalizado"""
+        return bool(data["name"] and data["ilo_ip"] and data["ssh_user"] and data["gateway_ip"])
 
     def to_dict(self) -> dict:
         """Convierte el perfil a un diccionario"""
@@ -47,6 +71,10 @@ class ConnectionProfile:
             "key_path": self.key_path,
             "ports": self.ports,
             "custom_ports": self.custom_ports,
+            "backend": self.backend,
+            "forward_mode": self.forward_mode,
+            "socks_port": self.socks_port,
+            "updated_at": self.updated_at,
         }
 
     def is_valid(self) -> bool:
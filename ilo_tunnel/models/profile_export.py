@@ -0,0 +1,321 @@
+# ilo_tunnel/models/profile_export.py
+import csv
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .profile import ConnectionProfile
+from .server_types import get_server_ports
+from ..socks_proxy import FORWARD_MODE_SOCKS
+
+# Formatos de exportación por extensión del archivo (por defecto JSON)
+EXPORT_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".conf": "ssh",
+    ".config": "ssh",
+}
+
+# Nombres de los formatos en la interfaz
+EXPORT_FORMAT_LABELS = {
+    "json": "JSON",
+    "ndjson": "NDJSON (un perfil por línea)",
+    "csv": "CSV",
+    "ssh": "Configuración de OpenSSH",
+}
+
+# Extensión y filtro del diálogo de guardar de cada formato
+EXPORT_FILE_FILTERS = {
+    "json": (".json", "Archivos JSON (*.json)"),
+    "ndjson": (".ndjson", "NDJSON (*.ndjson *.jsonl)"),
+    "csv": (".csv", "CSV (*.csv)"),
+    "ssh": (".conf", "Configuración de OpenSSH (*.conf config)"),
+}
+
+# Perfiles escritos entre dos avisos de progreso
+EXPORT_PROGRESS_STEP = 500
+
+# Columnas del CSV: las del perfil más la carpeta (las mismas que lee la importación)
+CSV_COLUMNS = ["folder"] + list(ConnectionProfile.normalize_dict({}))
+
+
+def detect_export_format(path: str) -> str:
+    """Formato de un archivo de exportación según su extensión"""
+    name = os.path.basename(path).lower()
+    if name == "config":
+        return "ssh"
+    return EXPORT_FORMATS.get(os.path.splitext(name)[1], "json")
+
+
+def filter_profiles(
+    profiles_data: Dict[str, List[dict]],
+    folder: Optional[str] = None,
+    server_type: Optional[str] = None,
+    gateway: Optional[str] = None,
+) -> Iterator[Tuple[str, List[dict]]]:
+    """
+    Perfiles de cada carpeta que cumplen los filtros
+
+    Yields:
+        (carpeta, perfiles) en el orden de las carpetas; con filtro de
+        carpeta, solo esa carpeta
+    """
+    for current_folder, profiles in profiles_data.items():
+        if folder is not None and current_folder != folder:
+            continue
+        if server_type is not None or gateway is not None:
+            profiles = [
+                profile_data
+                for profile_data in profiles
+                if (server_type is None or profile_data.get("server_type") == server_type)
+                and (gateway is None or profile_data.get("gateway_ip") == gateway)
+            ]
+        yield current_folder, profiles
+
+
+def write_json(stream, folders: Iterator[Tuple[str, List[dict]]]) -> Iterator[int]:
+    """
+    Escribe las carpetas como un objeto JSON {carpeta: [perfiles]}
+
+    El resultado es idéntico a json.dumps(datos, indent=2), pero se escribe
+    perfil a perfil sin formar la cadena completa.
+
+    Yields:
+        1 por cada perfil escrito
+    """
+    stream.write("{")
+    first_folder = True
+    for folder, profiles in folders:
+        stream.write(("\n" if first_folder else ",\n") + f"  {json.dumps(folder)}: ")
+        first_folder = False
+        if not profiles:
+            stream.write("[]")
+            continue
+        stream.write("[")
+        for i, profile_data in enumerate(profiles):
+            text = json.dumps(profile_data, indent=2).replace("\n", "\n    ")
+            stream.write(("\n    " if i == 0 else ",\n    ") + text)
+            yield 1
+        stream.write("\n  ]")
+    stream.write("}" if first_folder else "\n}")
+
+
+def write_ndjson(stream, folders: Iterator[Tuple[str, List[dict]]]) -> Iterator[int]:
+    """Escribe un perfil por línea con su carpeta en el campo "folder" """
+    for folder, profiles in folders:
+        for profile_data in profiles:
+            stream.write(json.dumps({"folder": folder, **profile_data}) + "\n")
+            yield 1
+
+
+def _csv_row(folder: str, profile_data: dict) -> dict:
+    """Fila de CSV de un perfil (puertos activos separados por comas)"""
+    row = dict(ConnectionProfile.normalize_dict(profile_data), folder=folder)
+    row["ports"] = ",".join(port for port, enabled in row["ports"].items() if enabled)
+    row["custom_ports"] = "true" if row["custom_ports"] else "false"
+    return row
+
+
+def write_csv(stream, folders: Iterator[Tuple[str, List[dict]]]) -> Iterator[int]:
+    """Escribe un CSV con cabecera y una fila por perfil"""
+    writer = csv.DictWriter(stream, fieldnames=CSV_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    for folder, profiles in folders:
+        for profile_data in profiles:
+            writer.writerow(_csv_row(folder, profile_data))
+            yield 1
+
+
+def ssh_host_alias(folder: str, name: str) -> str:
+    """Alias de Host para ssh_config: carpeta y nombre sin espacios ni comodines"""
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", f"{folder}-{name}").strip("-") or "ilo"
+
+
+def forwarded_ports(profile_data: dict) -> List[int]:
+    """Puertos que reenvía el túnel de un perfil (los mismos que al conectar)"""
+    if profile_data["custom_ports"]:
+        ports = [int(port) for port, enabled in profile_data["ports"].items() if enabled]
+    else:
+        ports = list(get_server_ports(profile_data["server_type"]))
+    return sorted(ports)
+
+
+def ssh_config_entry(folder: str, profile_data: dict) -> str:
+    """Bloque Host de ssh_config equivalente al túnel de un perfil"""
+    profile_data = ConnectionProfile.normalize_dict(profile_data)
+    lines = [
+        f"# {folder}/{profile_data['name']}",
+        f"Host {ssh_host_alias(folder, profile_data['name'])}",
+        f"    HostName {profile_data['gateway_ip']}",
+        f"    User {profile_data['ssh_user']}",
+        f"    Port {profile_data['ssh_port']}",
+    ]
+    if profile_data["key_path"]:
+        lines.append(f"    IdentityFile {profile_data['key_path']}")
+    local_ip = profile_data["local_ip"]
+    if profile_data["forward_mode"] == FORWARD_MODE_SOCKS:
+        lines.append(f"    DynamicForward {local_ip}:{profile_data['socks_port']}")
+    else:
+        ilo_ip = profile_data["ilo_ip"]
+        for port in forwarded_ports(profile_data):
+            lines.append(f"    LocalForward {local_ip}:{port} {ilo_ip}:{port}")
+    lines.append("    ExitOnForwardFailure yes")
+    return "\n".join(lines) + "\n"
+
+
+def write_ssh_config(stream, folders: Iterator[Tuple[str, List[dict]]]) -> Iterator[int]:
+    """Escribe un bloque Host de ssh_config por perfil (para usar con ssh -F o Include)"""
+    first = True
+    for folder, profiles in folders:
+        for profile_data in profiles:
+            stream.write(("" if first else "\n") + ssh_config_entry(folder, profile_data))
+            first = False
+            yield 1
+
+
+_WRITERS = {
+    "json": write_json,
+    "ndjson": write_ndjson,
+    "csv": write_csv,
+    "ssh": write_ssh_config,
+}
+
+
+def write_profiles(
+    stream,
+    profiles_data: Dict[str, List[dict]],
+    file_format: str = "json",
+    folder: Optional[str] = None,
+    server_type: Optional[str] = None,
+    gateway: Optional[str] = None,
+) -> int:
+    """
+    Escribe los perfiles que cumplen los filtros en un archivo abierto en modo texto
+
+    Returns:
+        Número de perfiles escritos
+    """
+    folders = filter_profiles(profiles_data, folder, server_type, gateway)
+    return sum(_WRITERS[file_format](stream, folders))
+
+
+class ProfileExporter(QObject):
+    """
+    Exportación de perfiles a un archivo en segundo plano.
+
+    Al lanzarla se toma una copia de las listas de perfiles (no de los
+    perfiles: el ProfileManager nunca los modifica, los sustituye), de modo
+    que la interfaz puede seguir cambiando perfiles mientras el hilo de
+    trabajo los filtra y escribe carpeta a carpeta. Se escribe en un archivo
+    temporal que sustituye al destino solo si la exportación termina.
+    """
+
+    progress = pyqtSignal(int, int)  # perfiles escritos, porcentaje
+    finished = pyqtSignal(int, str)  # perfiles escritos, error ("" si ha ido bien)
+    _worker_done = pyqtSignal(int, str)
+
+    def __init__(self, profile_manager, parent=None):
+        super().__init__(parent)
+        self.profile_manager = profile_manager
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-export")
+        self._pending = None
+        self._cancelled = threading.Event()
+        self._worker_done.connect(self.finished)
+
+    def is_busy(self) -> bool:
+        """Comprueba si hay una exportación en curso"""
+        return self._pending is not None and not self._pending.done()
+
+    def start(
+        self,
+        path: str,
+        file_format: Optional[str] = None,
+        folder: Optional[str] = None,
+        server_type: Optional[str] = None,
+        gateway: Optional[str] = None,
+    ) -> bool:
+        """
+        Lanza la exportación a un archivo
+
+        Args:
+            path: Archivo de destino
+            file_format: "json", "ndjson", "csv" o "ssh" (por defecto según la extensión)
+            folder: Exportar solo una carpeta (opcional)
+            server_type: Exportar solo un tipo de servidor (opcional)
+            gateway: Exportar solo los perfiles de un gateway (opcional)
+
+        Returns:
+            True si se lanzó, False si ya hay una exportación en curso
+        """
+        if self.is_busy():
+            return False
+
+        profiles_data = self.profile_manager.get_profiles()
+        self._cancelled.clear()
+        self._pending = self._executor.submit(
+            self._write,
+            path,
+            profiles_data,
+            file_format or detect_export_format(path),
+            folder,
+            server_type,
+            gateway,
+        )
+        self._pending.add_done_callback(self._handle_done)
+        return True
+
+    def cancel(self) -> None:
+        """Detiene la exportación sin tocar el archivo de destino"""
+        self._cancelled.set()
+
+    def _write(
+        self,
+        path: str,
+        profiles_data: Dict[str, List[dict]],
+        file_format: str,
+        folder: Optional[str],
+        server_type: Optional[str],
+        gateway: Optional[str],
+    ) -> int:
+        """Escribe el archivo (en el hilo de trabajo)"""
+        total = sum(
+            len(profiles)
+            for current_folder, profiles in profiles_data.items()
+            if folder is None or current_folder == folder
+        ) or 1
+        folders = filter_profiles(profiles_data, folder, server_type, gateway)
+        temp_path = f"{path}.part"
+        written = 0
+        try:
+            with open(temp_path, "w", encoding="utf-8", newline="") as stream:
+                for written, _ in enumerate(_WRITERS[file_format](stream, folders), 1):
+                    if written % EXPORT_PROGRESS_STEP == 0:
+                        if self._cancelled.is_set():
+                            raise InterruptedError
+                        self.progress.emit(written, written * 100 // total)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return written
+
+    def _handle_done(self, future) -> None:
+        """Entrega el resultado al hilo de la interfaz (desde el hilo de trabajo)"""
+        try:
+            self._worker_done.emit(future.result(), "")
+        except InterruptedError:
+            self._worker_done.emit(0, "Exportación cancelada")
+        except Exception as e:
+            self._worker_done.emit(0, f"Error al guardar el archivo: {e}")
+
+    def shutdown(self) -> None:
+        """Cancela la exportación en curso y detiene el hilo de trabajo"""
+        self.cancel()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,392 @@
+# ilo_tunnel/models/profile_import.py
+import csv
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .profile import ConnectionProfile
+
+# Perfiles que se guardan en cada transacción durante una importación
+IMPORT_BATCH_SIZE = 500
+
+# Tamaño de los bloques leídos del archivo JSON
+CHUNK_SIZE = 64 * 1024
+
+# Formatos de importación por extensión del archivo (por defecto JSON)
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# Qué hacer con un perfil importado que ya existe en la carpeta (mismo
+# nombre o mismo ILO, gateway y usuario)
+MERGE_SKIP = "skip"  # Conservar el existente
+MERGE_OVERWRITE = "overwrite"  # Sustituirlo por el importado
+MERGE_NEWEST = "newest"  # Quedarse con el de updated_at más reciente
+MERGE_RENAME = "rename"  # Añadir con otro nombre si es otro servidor
+
+MERGE_LABELS = {
+    MERGE_SKIP: "Omitir duplicados",
+    MERGE_OVERWRITE: "Sobrescribir",
+    MERGE_NEWEST: "Conservar el más reciente",
+    MERGE_RENAME: "Renombrar",
+}
+
+# Campos numéricos y booleanos que en CSV llegan como texto
+_INT_FIELDS = ("ssh_port", "socks_port")
+_FLOAT_FIELDS = ("updated_at",)
+_TRUE_VALUES = ("1", "true", "yes", "si", "sí", "x")
+
+
+def detect_format(path: str) -> str:
+    """Formato de un archivo de importación según su extensión"""
+    return IMPORT_FORMATS.get(os.path.splitext(path)[1].lower(), "json")
+
+
+class _JSONStream:
+    """
+    Lector incremental de JSON: recorre la estructura exterior carácter a
+    carácter y decodifica cada valor interior (perfil) con raw_decode,
+    leyendo más bloques del archivo solo cuando hacen falta.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.chunk_size = CHUNK_SIZE
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Lee el siguiente bloque; False si ya no queda nada"""
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Siguiente carácter significativo ("" al final del archivo)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Se esperaba '{char}'")
+        self.pos += 1
+
+    def value(self):
+        """Decodifica el siguiente valor JSON completo"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise
+                continue
+            # Un número al final del bloque puede seguir en el siguiente
+            if end < len(self.buffer) or self.eof or not self._fill():
+                self.pos = end
+                return value
+
+    def array(self) -> Iterator:
+        """Recorre los elementos de un array"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("Se esperaba ',' o ']'")
+
+
+def iter_json(stream, errors: List[str], folder: str = "DEFAULT") -> Iterator[Tuple[str, object]]:
+    """
+    Perfiles de un JSON con carpetas (el de export_profiles) o de una lista
+
+    Yields:
+        (carpeta, perfil sin validar)
+    """
+    reader = _JSONStream(stream)
+    start = reader.peek()
+    if start == "[":
+        for item in reader.array():
+            yield folder, item
+        return
+    if start != "{":
+        reader.value()  # JSONDecodeError si ni siquiera es JSON
+        raise ValueError("Formato de importación no válido")
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        current_folder = reader.value()
+        reader.expect(":")
+        if reader.peek() == "[":
+            for item in reader.array():
+                yield str(current_folder), item
+        else:
+            reader.value()
+            errors.append(f"La carpeta '{current_folder}' no contiene una lista válida")
+
+        char = reader.peek()
+        reader.pos += 1
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError("Se esperaba ',' o '}'")
+
+
+def iter_ndjson(stream, errors: List[str], folder: str = "DEFAULT") -> Iterator[Tuple[str, object]]:
+    """
+    Perfiles de un NDJSON (un objeto por línea); la clave opcional "folder"
+    indica la carpeta
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            errors.append(f"Línea {line_number}: JSON no válido")
+            continue
+        if isinstance(item, dict):
+            yield str(item.pop("folder", None) or folder), item
+        else:
+            yield folder, item
+
+
+def _csv_profile(row: dict) -> dict:
+    """Convierte una fila de CSV (todo texto) a los tipos del perfil"""
+    profile_data = {key: value.strip() for key, value in row.items() if key and value and value.strip()}
+    for key in _INT_FIELDS:
+        if key in profile_data:
+            profile_data[key] = int(profile_data[key])
+    for key in _FLOAT_FIELDS:
+        if key in profile_data:
+            profile_data[key] = float(profile_data[key])
+    if "custom_ports" in profile_data:
+        profile_data["custom_ports"] = profile_data["custom_ports"].lower() in _TRUE_VALUES
+    if "ports" in profile_data:
+        # "443, 17990" -> {"443": True, "17990": True}
+        profile_data["ports"] = {
+            port.strip(): True for port in profile_data["ports"].replace(";", ",").split(",") if port.strip()
+        }
+    return profile_data
+
+
+def iter_csv(stream, errors: List[str], folder: str = "DEFAULT") -> Iterator[Tuple[str, object]]:
+    """
+    Perfiles de un CSV con cabecera (name, ilo_ip, gateway_ip, ssh_user...);
+    la columna opcional "folder" indica la carpeta
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        row_folder = (row.pop("folder", None) or "").strip() or folder
+        try:
+            profile_data = _csv_profile(row)
+        except ValueError:
+            errors.append(f"Línea {reader.line_num}: valor numérico no válido")
+            continue
+        yield row_folder, profile_data
+
+
+_READERS = {"json": iter_json, "ndjson": iter_ndjson, "csv": iter_csv}
+
+
+@dataclass
+class ImportStats:
+    """Resultado de una importación"""
+
+    added: int = 0
+    updated: int = 0
+    renamed: int = 0  # Añadidos con otro nombre (incluidos en added)
+    skipped: int = 0  # Duplicados que no se han tocado
+
+    @property
+    def imported(self) -> int:
+        """Perfiles añadidos o actualizados"""
+        return self.added + self.updated
+
+    def accumulate(self, other: "ImportStats") -> None:
+        """Suma el resultado de otro lote"""
+        self.added += other.added
+        self.updated += other.updated
+        self.renamed += other.renamed
+        self.skipped += other.skipped
+
+
+def validate_profiles(
+    items: Iterable[Tuple[str, object]], errors: List[str]
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Valida y normaliza los perfiles leídos
+
+    Yields:
+        (carpeta, perfil normalizado) de los perfiles válidos
+    """
+    for folder, item in items:
+        if not isinstance(item, dict) or "name" not in item:
+            errors.append(f"Perfil no válido en carpeta '{folder}'")
+            continue
+        profile_data = ConnectionProfile.normalize_dict(item)
+        if not ConnectionProfile.is_valid_dict(profile_data):
+            errors.append(f"Perfil '{profile_data['name']}' no válido")
+            continue
+        yield folder, profile_data
+
+
+def read_profiles(
+    stream, errors: List[str], file_format: str = "json", folder: str = "DEFAULT"
+) -> Iterator[Tuple[str, dict]]:
+    """Perfiles válidos de un archivo abierto en modo texto"""
+    return validate_profiles(_READERS[file_format](stream, errors, folder), errors)
+
+
+class ProfileImporter(QObject):
+    """
+    Importación de archivos de perfiles grandes en segundo plano.
+
+    El archivo se lee, interpreta y valida en un hilo de trabajo sin
+    cargarlo entero en memoria; los perfiles válidos llegan al hilo de la
+    interfaz en lotes de IMPORT_BATCH_SIZE y cada lote se guarda en una
+    transacción. El hilo de trabajo no prepara más de dos lotes por delante
+    de los guardados, de modo que la memoria no depende del tamaño del
+    archivo.
+    """
+
+    progress = pyqtSignal(int, int)  # perfiles procesados, porcentaje leído
+    finished = pyqtSignal(object, list)  # ImportStats, errores
+    _batch_ready = pyqtSignal(list, int)
+    _worker_done = pyqtSignal(list)
+
+    def __init__(self, profile_manager, batch_size: int = IMPORT_BATCH_SIZE, parent=None):
+        super().__init__(parent)
+        self.profile_manager = profile_manager
+        self.batch_size = batch_size
+        self.merge = MERGE_SKIP
+        self.stats = ImportStats()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-import")
+        self._pending = None
+        self._cancelled = threading.Event()
+        self._slots = threading.Semaphore(2)  # Lotes preparados sin guardar
+        self._errors: List[str] = []
+        self._batch_ready.connect(self._handle_batch)
+        self._worker_done.connect(self._handle_worker_done)
+
+    def is_busy(self) -> bool:
+        """Comprueba si hay una importación en curso"""
+        return self._pending is not None and not self._pending.done()
+
+    def start(
+        self,
+        path: str,
+        file_format: Optional[str] = None,
+        folder: str = "DEFAULT",
+        merge: str = MERGE_SKIP,
+    ) -> bool:
+        """
+        Lanza la importación de un archivo
+
+        Args:
+            path: Archivo JSON, NDJSON o CSV
+            file_format: "json", "ndjson" o "csv" (por defecto según la extensión)
+            folder: Carpeta de los perfiles que no indican ninguna
+            merge: Estrategia para los perfiles que ya existen (MERGE_*)
+
+        Returns:
+            True si se lanzó, False si ya hay una importación en curso
+        """
+        if self.is_busy():
+            return False
+
+        self.merge = merge
+        self.stats = ImportStats()
+        self._errors = []
+        self._cancelled.clear()
+        self._slots = threading.Semaphore(2)
+        self._pending = self._executor.submit(
+            self._read, path, file_format or detect_format(path), folder
+        )
+        self._pending.add_done_callback(self._handle_done)
+        return True
+
+    def cancel(self) -> None:
+        """Detiene la importación (los lotes ya guardados se conservan)"""
+        self._cancelled.set()
+        self._slots.release()  # Despertar al hilo de trabajo si está esperando
+
+    def _read(self, path: str, file_format: str, folder: str) -> List[str]:
+        """Lee el archivo y entrega los lotes (en el hilo de trabajo)"""
+        errors: List[str] = []
+        with open(path, "rb") as raw:
+            size = os.fstat(raw.fileno()).st_size or 1
+            stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            batch = []
+            for item in read_profiles(stream, errors, file_format, folder):
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    if not self._send(batch, raw.tell() * 100 // size):
+                        return errors
+                    batch = []
+            if batch:
+                self._send(batch, 100)
+        return errors
+
+    def _send(self, batch: list, percent: int) -> bool:
+        """Entrega un lote cuando haya hueco; False si se ha cancelado"""
+        self._slots.acquire()
+        if self._cancelled.is_set():
+            return False
+        self._batch_ready.emit(batch, min(percent, 100))
+        return True
+
+    def _handle_done(self, future) -> None:
+        """Entrega el final de la lectura al hilo de la interfaz (desde el hilo de trabajo)"""
+        try:
+            errors = future.result()
+        except UnicodeDecodeError:
+            errors = ["El archivo no está en UTF-8"]
+        except ValueError as e:
+            errors = [f"Formato no válido: {e}"]
+        except Exception as e:
+            errors = [f"Error al importar: {e}"]
+        self._worker_done.emit(errors)
+
+    def _handle_batch(self, batch: list, percent: int) -> None:
+        """Guarda un lote de perfiles"""
+        if not self._cancelled.is_set():
+            stats = ImportStats()
+            if self.profile_manager.add_profiles_batch(batch, self.merge, stats):
+                self.stats.accumulate(stats)
+            else:
+                self._errors.append("No se pudieron guardar los perfiles importados")
+                self._cancelled.set()
+            self.progress.emit(self.stats.imported + self.stats.skipped, percent)
+        self._slots.release()
+
+    def _handle_worker_done(self, errors: list) -> None:
+        """Termina la importación (todos los lotes ya se han procesado)"""
+        self.finished.emit(self.stats, errors + self._errors)
+
+    def shutdown(self) -> None:
+        """Cancela la importación en curso y detiene el hilo de trabajo"""
+        self.cancel()
+        self._executor.shutdown(wait=False)
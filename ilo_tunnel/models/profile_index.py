@@ -0,0 +1,241 @@
+# ilo_tunnel/models/profile_index.py
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+from .profile_search import ProfileSearchIndex, rank_results
+
+# Campos de los perfiles con índice secundario
+INDEXED_FIELDS = ("name", "ilo_ip", "gateway_ip", "server_type")
+
+# Campos que identifican el servidor al que da acceso un perfil
+IDENTITY_FIELDS = ("ilo_ip", "gateway_ip", "ssh_user")
+
+
+class ProfileIndex:
+    """
+    Índices secundarios de los perfiles en memoria.
+
+    Cada perfil recibe un identificador interno estable mientras está
+    cargado, de modo que borrar o mover un perfil no obliga a renumerar las
+    entradas de los índices; la posición (carpeta, índice) se calcula al
+    consultar y se guarda hasta el siguiente cambio de orden.
+    """
+
+    def __init__(self):
+        self.search_index = ProfileSearchIndex()
+        # Los identificadores no se reutilizan al reconstruir los índices: un
+        # identificador guardado antes de recargar los perfiles deja de existir
+        self._ids = itertools.count(1)
+        self.clear()
+
+    def clear(self) -> None:
+        """Vacía todos los índices"""
+        self._rows: Dict[str, List[int]] = {}  # carpeta -> identificadores en orden
+        self._folder_of: Dict[int, str] = {}
+        self._keys: Dict[int, Tuple[str, ...]] = {}  # identificador -> valores indexados
+        # campo -> valor -> identificadores (dict como conjunto ordenado)
+        self._indexes: Dict[str, Dict[str, Dict[int, None]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+        # (ilo_ip, gateway_ip, ssh_user) -> identificadores, para detectar duplicados
+        self._identities: Dict[Tuple[str, ...], Dict[int, None]] = {}
+        self._identity_of: Dict[int, Tuple[str, ...]] = {}
+        # identificador -> (orden de la carpeta, índice); None si hay que recalcularlo
+        self._positions: Optional[Dict[int, Tuple[int, int]]] = None
+        self.search_index.clear()
+
+    @staticmethod
+    def key(value) -> str:
+        """Normaliza el valor de un campo para usarlo como clave"""
+        return "" if value is None else str(value).strip()
+
+    @classmethod
+    def identity(cls, profile_data: dict) -> Tuple[str, ...]:
+        """Clave de identidad de un perfil: IP del ILO, gateway y usuario"""
+        return tuple(cls.key(profile_data.get(field)).lower() for field in IDENTITY_FIELDS)
+
+    def rebuild(self, profiles_data: Dict[str, List[dict]]) -> None:
+        """Reconstruye todos los índices a partir de los datos completos"""
+        self.clear()
+        for folder, profiles in profiles_data.items():
+            self.add_folder(folder)
+            for profile_data in profiles:
+                self.append(folder, profile_data)
+
+    def add_folder(self, folder: str) -> None:
+        """Registra una carpeta vacía"""
+        self._rows.setdefault(folder, [])
+
+    def rename_folder(self, old_name: str, new_name: str) -> None:
+        """Renombra una carpeta (pasa al final, igual que en los datos)"""
+        rows = self._rows.pop(old_name)
+        self._rows[new_name] = rows
+        for profile_id in rows:
+            self._folder_of[profile_id] = new_name
+        self._positions = None
+
+    def remove_folder(self, folder: str) -> None:
+        """Elimina una carpeta y los perfiles que contiene"""
+        for profile_id in self._rows.pop(folder, []):
+            self._unindex(profile_id)
+            del self._folder_of[profile_id]
+        self._positions = None
+
+    def append(self, folder: str, profile_data: dict) -> int:
+        """
+        Añade un perfil al final de una carpeta
+
+        Returns:
+            Identificador interno del perfil
+        """
+        profile_id = next(self._ids)
+        rows = self._rows.setdefault(folder, [])
+        rows.append(profile_id)
+        self._folder_of[profile_id] = folder
+        self._index(profile_id, profile_data)
+        if self._positions is not None:
+            # Añadir al final no mueve a nadie: no hace falta recalcular
+            # todas las posiciones (importaciones de miles de perfiles)
+            self._positions[profile_id] = (list(self._rows).index(folder), len(rows) - 1)
+        return profile_id
+
+    def replace(self, folder: str, index: int, profile_data: dict) -> None:
+        """Actualiza los valores indexados del perfil de una posición"""
+        profile_id = self._rows[folder][index]
+        self._unindex(profile_id)
+        self._index(profile_id, profile_data)
+
+    def remove(self, folder: str, index: int) -> int:
+        """
+        Elimina el perfil de una posición
+
+        Returns:
+            Identificador interno del perfil eliminado
+        """
+        profile_id = self._rows[folder].pop(index)
+        self._unindex(profile_id)
+        del self._folder_of[profile_id]
+        self._positions = None
+        return profile_id
+
+    def move(self, source_folder: str, index: int, target_folder: str) -> None:
+        """Mueve un perfil al final de otra carpeta conservando sus índices"""
+        profile_id = self._rows[source_folder].pop(index)
+        self._rows[target_folder].append(profile_id)
+        self._folder_of[profile_id] = target_folder
+        self._positions = None
+
+    def _order(self) -> Dict[int, Tuple[int, int]]:
+        """Posición de cada perfil como (orden de la carpeta, índice)"""
+        if self._positions is None:
+            self._positions = {
+                profile_id: (order, i)
+                for order, rows in enumerate(self._rows.values())
+                for i, profile_id in enumerate(rows)
+            }
+        return self._positions
+
+    def locate(self, profile_id: int) -> Tuple[str, int]:
+        """Posición (carpeta, índice) actual de un perfil"""
+        return self._folder_of[profile_id], self._order()[profile_id][1]
+
+    def profile_id(self, folder: str, index: int) -> int:
+        """Identificador interno del perfil de una posición"""
+        return self._rows[folder][index]
+
+    def contains(self, profile_id: int) -> bool:
+        """Comprueba si un identificador corresponde a un perfil cargado"""
+        return profile_id in self._folder_of
+
+    def position(self, profile_id: int) -> Tuple[str, int]:
+        """
+        Posición (carpeta, índice) actual de un perfil, buscándolo solo en
+        su carpeta: no recalcula todas las posiciones tras cada cambio de
+        orden (lotes de borrados y movimientos)
+        """
+        if self._positions is not None:
+            return self.locate(profile_id)
+        folder = self._folder_of[profile_id]
+        return folder, self._rows[folder].index(profile_id)
+
+    def lookup(self, field: str, value) -> List[Tuple[str, int]]:
+        """
+        Busca los perfiles con un valor en un campo indexado
+
+        Returns:
+            Posiciones (carpeta, índice) en el orden de carpetas y perfiles
+        """
+        ids = self._indexes[field].get(self.key(value), {})
+        order = self._order()
+        return [self.locate(profile_id) for profile_id in sorted(ids, key=order.get)]
+
+    def search(
+        self, query: str, folder: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Búsqueda de texto en nombre, IP del ILO, gateway, usuario y tipo
+
+        Args:
+            query: Texto de búsqueda
+            folder: Limitar la búsqueda a una carpeta (opcional)
+            limit: Número máximo de resultados (opcional)
+
+        Returns:
+            Posiciones (carpeta, índice) de los perfiles, los más relevantes primero
+        """
+        scope = None if folder is None else set(self._rows.get(folder, []))
+        results = self.search_index.search(query, scope, folder)
+        return [
+            self.locate(profile_id)
+            for profile_id in rank_results(results, self._order(), limit)
+        ]
+
+    def duplicates(self, folder: str, profile_data: dict) -> List[int]:
+        """
+        Perfiles de una carpeta con el mismo nombre o la misma identidad
+
+        Returns:
+            Índices en la carpeta; primero el que coincide en nombre
+        """
+        by_name = self._indexes["name"].get(self.key(profile_data.get("name")), {})
+        by_identity = self._identities.get(self.identity(profile_data), {})
+        order = self._order()
+        matches = []
+        for ids in (by_name, by_identity):
+            for profile_id in ids:
+                if self._folder_of[profile_id] == folder:
+                    index = order[profile_id][1]
+                    if index not in matches:
+                        matches.append(index)
+        return matches
+
+    def values(self, field: str) -> List[str]:
+        """Valores distintos de un campo indexado"""
+        return list(self._indexes[field])
+
+    def _index(self, profile_id: int, profile_data: dict) -> None:
+        """Añade un perfil a los índices"""
+        keys = tuple(self.key(profile_data.get(field)) for field in INDEXED_FIELDS)
+        self._keys[profile_id] = keys
+        for field, key in zip(INDEXED_FIELDS, keys):
+            self._indexes[field].setdefault(key, {})[profile_id] = None
+        identity = self.identity(profile_data)
+        self._identity_of[profile_id] = identity
+        self._identities.setdefault(identity, {})[profile_id] = None
+        self.search_index.add(profile_id, profile_data)
+
+    def _unindex(self, profile_id: int) -> None:
+        """Quita un perfil de los índices"""
+        self.search_index.remove(profile_id)
+        keys = self._keys.pop(profile_id)
+        for field, key in zip(INDEXED_FIELDS, keys):
+            ids = self._indexes[field].get(key)
+            if ids is not None:
+                ids.pop(profile_id, None)
+                if not ids:
+                    del self._indexes[field][key]
+        identity = self._identity_of.pop(profile_id)
+        ids = self._identities[identity]
+        del ids[profile_id]
+        if not ids:
+            del self._identities[identity]
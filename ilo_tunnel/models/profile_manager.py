@@ -1,20 +1,126 @@
 # ilo_tunnel/models/profile_manager.py
+import io
 import json
 import os
+import time
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
-from PyQt6.QtCore import QSettings
+from PyQt6.QtCore import QObject, QSettings, pyqtSignal
 from ..models.profile import ConnectionProfile
+from ..models.profile_import import (
+    MERGE_NEWEST,
+    MERGE_OVERWRITE,
+    MERGE_RENAME,
+    MERGE_SKIP,
+    ImportStats,
+    read_profiles,
+)
+from ..models.profile_export import write_profiles
+from ..models.profile_index import ProfileIndex
+from ..models.profile_storage import (
+    ProfileStorage,
+    SettingsProfileStorage,
+    SQLiteProfileStorage,
+    default_database_path,
+)
 from ..config import Config
 
 
-class ProfileManager:
-    """Gestor de perfiles de conexión con soporte para carpetas"""
+class ProfileManager(QObject):
+    """
+    Gestor de perfiles de conexión con soporte para carpetas.
 
-    def __init__(self):
+    Los perfiles se guardan en un ProfileStorage (por defecto una base de
+    datos SQLite). Para no volver a leerlos en cada consulta se mantiene una
+    copia en memoria con índices por nombre, IP del ILO, gateway y tipo de
+    servidor. Las escrituras modifican la copia y los índices de forma
+    incremental y después guardan solo lo que ha cambiado; la copia se
+    vuelve a cargar si otra instancia de la aplicación modifica los
+    perfiles. `version` aumenta con cada cambio de los datos.
+
+    Cada cambio se notifica con señales de grano fino (carpeta, índice) para
+    que las vistas actualicen solo las filas afectadas.
+    """
+
+    profile_added = pyqtSignal(str, int)  # carpeta, índice
+    profiles_added = pyqtSignal(str, int, int)  # carpeta, primer y último índice
+    profile_removed = pyqtSignal(str, int)  # carpeta, índice (antes de borrarlo)
+    profile_changed = pyqtSignal(str, int)  # carpeta, índice
+    folders_changed = pyqtSignal()
+    profiles_reset = pyqtSignal()  # Datos sustituidos por completo
+
+    def __init__(self, parent=None, storage: Optional[ProfileStorage] = None):
+        super().__init__(parent)
         self.settings = QSettings("ILOTunnel", "ILOTunnelApp")
         self.config = Config()
+        self.storage = storage if storage is not None else self._open_storage()
+        self.version = 0
+        self._data: Optional[Dict[str, List[dict]]] = None
+        self._index = ProfileIndex()
+
+    def _open_storage(self) -> ProfileStorage:
+        """Abre la base de datos de perfiles o, si no es posible, usa QSettings"""
+        try:
+            return SQLiteProfileStorage(default_database_path(self.settings), self.settings)
+        except Exception as e:
+            print(f"Error al abrir la base de datos de perfiles: {e}")
+            return SettingsProfileStorage(self.settings)
+
+    def _load(self) -> Dict[str, List[dict]]:
+        """Devuelve los datos en memoria, cargándolos si no están o han cambiado"""
+        if self._data is not None and not self.storage.has_changed():
+            return self._data
+
+        try:
+            profiles_data = self.storage.load()
+        except Exception as e:
+            print(f"Error al cargar perfiles: {e}")
+            # Inicializar con estructura de carpetas vacía
+            profiles_data = {"DEFAULT": []}
+
+        self._set_data(profiles_data)
+        return self._data
+
+    def _set_data(self, profiles_data: Dict[str, List[dict]]) -> None:
+        """Sustituye los datos en memoria y reconstruye los índices"""
+        self._data = {folder: list(profiles) for folder, profiles in profiles_data.items()}
+        self._index.rebuild(self._data)
+        self.version += 1
+        self.profiles_reset.emit()
+        self.folders_changed.emit()
+
+    def _write(self, *operations: tuple) -> bool:
+        """
+        Guarda en el almacenamiento los cambios hechos en memoria
+
+        Args:
+            operations: Tuplas (método de ProfileStorage, argumentos...); se
+                aplican todas en una transacción
+
+        Si no se pueden guardar se descartan los datos en memoria, para
+        volver a leer lo que hay realmente almacenado.
+        """
+        try:
+            with self.storage.transaction():
+                for method, *args in operations:
+                    getattr(self.storage, method)(self._data, *args)
+        except Exception as e:
+            print(f"Error al guardar perfiles: {e}")
+            # Volver a lo que hay almacenado (las vistas reciben profiles_reset)
+            self.invalidate()
+            self._load()
+            return False
+        self.version += 1
+        return True
+
+    def _copy(self) -> Dict[str, List[dict]]:
+        """Copia modificable de los datos (las listas, no los perfiles)"""
+        return {folder: list(profiles) for folder, profiles in self._load().items()}
+
+    def invalidate(self) -> None:
+        """Descarta los datos en memoria; se volverán a leer en el siguiente acceso"""
+        self._data = None
 
     def get_profiles(self, folder: Optional[str] = None) -> Dict[str, List[dict]]:
         """
@@ -26,23 +132,9 @@ class ProfileManager:
         Returns:
             Un diccionario de carpetas con listas de perfiles o una lista de perfiles
         """
-        profiles_json = self.settings.value("connection_profiles", "{}")
-        try:
-            profiles_data = json.loads(profiles_json)
-
-            # Si no hay estructura de carpetas, convertir al nuevo formato
-            if isinstance(profiles_data, list):
-                profiles_data = {"DEFAULT": profiles_data}
-                self.save_profiles_data(profiles_data)
-
-            if folder:
-                return profiles_data.get(folder, [])
-            else:
-                return profiles_data
-        except Exception as e:
-            print(f"Error al cargar perfiles: {e}")
-            # Inicializar con estructura de carpetas vacía
-            return {"DEFAULT": []}
+        if folder:
+            return list(self._load().get(folder, []))
+        return self._copy()
 
     def get_profile_by_name(
         self, name: str, folder: Optional[str] = None
@@ -57,20 +149,86 @@ class ProfileManager:
         Returns:
             Una tupla con (perfil, carpeta, índice) o (None, None, -1) si no se encuentra
         """
-        folders_to_search = [folder] if folder else self.get_folders()
-
-        for current_folder in folders_to_search:
-            profiles = self.get_profiles(current_folder)
-            for i, profile_data in enumerate(profiles):
-                if profile_data.get("name") == name:
-                    return ConnectionProfile.from_dict(profile_data), current_folder, i
+        for profile, current_folder, i in self.find_profiles("name", name):
+            if folder is None or current_folder == folder:
+                return profile, current_folder, i
 
         return None, None, -1
 
+    def find_profiles(
+        self, field: str, value: str
+    ) -> List[Tuple[ConnectionProfile, str, int]]:
+        """
+        Busca perfiles por el valor exacto de un campo indexado
+
+        Args:
+            field: "name", "ilo_ip", "gateway_ip" o "server_type"
+            value: Valor buscado
+
+        Returns:
+            Lista de tuplas (perfil, carpeta, índice) en el orden de las carpetas
+        """
+        profiles_data = self._load()
+        return [
+            (ConnectionProfile.from_dict(profiles_data[folder][i]), folder, i)
+            for folder, i in self._index.lookup(field, value)
+        ]
+
+    def get_profiles_by_ilo_ip(
+        self, ilo_ip: str
+    ) -> List[Tuple[ConnectionProfile, str, int]]:
+        """Perfiles que acceden a un ILO"""
+        return self.find_profiles("ilo_ip", ilo_ip)
+
+    def get_profiles_by_gateway(
+        self, gateway_ip: str
+    ) -> List[Tuple[ConnectionProfile, str, int]]:
+        """Perfiles que usan un gateway"""
+        return self.find_profiles("gateway_ip", gateway_ip)
+
+    def get_profiles_by_server_type(
+        self, server_type: str
+    ) -> List[Tuple[ConnectionProfile, str, int]]:
+        """Perfiles de un tipo de servidor"""
+        return self.find_profiles("server_type", server_type)
+
+    def get_profile_data(self, folder: str, index: int) -> Optional[dict]:
+        """Datos de un perfil por su posición, o None si no existe"""
+        profiles = self._load().get(folder, [])
+        return profiles[index] if 0 <= index < len(profiles) else None
+
+    def search_profiles(
+        self, text: str, folder: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Busca perfiles por nombre, IP del ILO, gateway, usuario o tipo de servidor
+
+        Todos los términos del texto (separados por espacios) tienen que
+        aparecer; primero van las coincidencias exactas y al principio del
+        nombre, después las de los demás campos.
+
+        Args:
+            text: Texto de búsqueda
+            folder: Carpeta donde buscar (opcional)
+            limit: Número máximo de resultados (opcional)
+
+        Returns:
+            Lista de perfiles (diccionarios) ordenada por relevancia
+        """
+        profiles_data = self._load()
+        return [
+            profiles_data[current_folder][i]
+            for current_folder, i in self._index.search(text, folder, limit)
+        ]
+
+    def get_field_values(self, field: str) -> List[str]:
+        """Valores distintos de un campo indexado (p. ej. todos los gateways)"""
+        self._load()
+        return self._index.values(field)
+
     def get_folders(self) -> List[str]:
         """Obtiene la lista de carpetas disponibles"""
-        profiles_data = self.get_profiles()
-        return list(profiles_data.keys())
+        return list(self._load().keys())
 
     def save_profiles_data(self, profiles_data: Dict[str, List[dict]]) -> bool:
         """
@@ -83,11 +241,13 @@ class ProfileManager:
             True si se guardó correctamente, False en caso contrario
         """
         try:
-            self.settings.setValue("connection_profiles", json.dumps(profiles_data))
-            return True
+            self.storage.save_all(profiles_data)
         except Exception as e:
             print(f"Error al guardar perfiles: {e}")
+            self.invalidate()
             return False
+        self._set_data(profiles_data)
+        return True
 
     def add_profile(self, profile: ConnectionProfile, folder: str = "DEFAULT") -> bool:
         """
@@ -103,17 +263,23 @@ class ProfileManager:
         if not profile.is_valid():
             return False
 
-        profiles_data = self.get_profiles()
-        if folder not in profiles_data:
-            profiles_data[folder] = []
-
         # Verificar si ya existe un perfil con el mismo nombre en la carpeta
-        for existing_profile in profiles_data[folder]:
-            if existing_profile.get("name") == profile.name:
-                return False
+        if self.get_profile_by_name(profile.name, folder)[0] is not None:
+            return False
 
-        profiles_data[folder].append(profile.to_dict())
-        return self.save_profiles_data(profiles_data)
+        profiles_data = self._load()
+        new_folder = folder not in profiles_data
+        profile_data = profile.to_dict()
+        profile_data["updated_at"] = time.time()
+        profiles_data.setdefault(folder, []).append(profile_data)
+        self._index.append(folder, profile_data)
+        if not self._write(("add_profile", folder, len(profiles_data[folder]) - 1)):
+            return False
+
+        if new_folder:
+            self.folders_changed.emit()
+        self.profile_added.emit(folder, len(profiles_data[folder]) - 1)
+        return True
 
     def update_profile(
         self, folder: str, index: int, profile: ConnectionProfile
@@ -132,10 +298,12 @@ class ProfileManager:
         if not profile.is_valid():
             return False
 
-        profiles_data = self.get_profiles()
+        profiles_data = self._load()
         if folder in profiles_data and 0 <= index < len(profiles_data[folder]):
-            profiles_data[folder][index] = profile.to_dict()
-            return self.save_profiles_data(profiles_data)
+            self._replace(folder, index, profile)
+            if self._write(("update_profile", folder, index)):
+                self.profile_changed.emit(folder, index)
+                return True
         return False
 
     def delete_profile(self, folder: str, index: int) -> bool:
@@ -149,10 +317,12 @@ class ProfileManager:
         Returns:
             True si se eliminó correctamente, False en caso contrario
         """
-        profiles_data = self.get_profiles()
+        profiles_data = self._load()
         if folder in profiles_data and 0 <= index < len(profiles_data[folder]):
-            del profiles_data[folder][index]
-            return self.save_profiles_data(profiles_data)
+            self._remove(folder, index)
+            if self._write(("delete_profile", folder, index)):
+                self.profile_removed.emit(folder, index)
+                return True
         return False
 
     def get_profile_names(self, folder: str = "DEFAULT") -> List[str]:
@@ -180,10 +350,13 @@ class ProfileManager:
         if not folder_name:
             return False
 
-        profiles_data = self.get_profiles()
+        profiles_data = self._load()
         if folder_name not in profiles_data:
             profiles_data[folder_name] = []
-            return self.save_profiles_data(profiles_data)
+            self._index.add_folder(folder_name)
+            if self._write(("add_folder", folder_name)):
+                self.folders_changed.emit()
+                return True
         return False
 
     def rename_folder(self, old_name: str, new_name: str) -> bool:
@@ -200,10 +373,14 @@ class ProfileManager:
         if not new_name or old_name == new_name or old_name == "DEFAULT":
             return False
 
-        profiles_data = self.get_profiles()
+        profiles_data = self._load()
         if old_name in profiles_data and new_name not in profiles_data:
             profiles_data[new_name] = profiles_data.pop(old_name)
-            return self.save_profiles_data(profiles_data)
+            self._index.rename_folder(old_name, new_name)
+            if self._write(("rename_folder", old_name, new_name)):
+                self.profiles_reset.emit()
+                self.folders_changed.emit()
+                return True
         return False
 
     def delete_folder(self, folder_name: str) -> bool:
@@ -219,10 +396,14 @@ class ProfileManager:
         if folder_name == "DEFAULT":
             return False  # No permitir eliminar la carpeta por defecto
 
-        profiles_data = self.get_profiles()
+        profiles_data = self._load()
         if folder_name in profiles_data:
             del profiles_data[folder_name]
-            return self.save_profiles_data(profiles_data)
+            self._index.remove_folder(folder_name)
+            if self._write(("delete_folder", folder_name)):
+                self.profiles_reset.emit()
+                self.folders_changed.emit()
+                return True
         return False
 
     def move_profile(self, source_folder: str, index: int, target_folder: str) -> bool:
@@ -237,17 +418,105 @@ class ProfileManager:
         Returns:
             True si se movió correctamente, False en caso contrario
         """
-        profiles_data = self.get_profiles()
+        profiles_data = self._load()
         if (
             source_folder in profiles_data
             and target_folder in profiles_data
             and 0 <= index < len(profiles_data[source_folder])
         ):
-            profile = profiles_data[source_folder].pop(index)
-            profiles_data[target_folder].append(profile)
-            return self.save_profiles_data(profiles_data)
+            self._move(source_folder, index, target_folder)
+            if self._write(("move_profile", source_folder, index, target_folder)):
+                self.profile_removed.emit(source_folder, index)
+                self.profile_added.emit(target_folder, len(profiles_data[target_folder]) - 1)
+                return True
         return False
 
+    def _replace(self, folder: str, index: int, profile: ConnectionProfile) -> None:
+        """Sustituye en memoria el perfil de una posición"""
+        self._data[folder][index] = dict(profile.to_dict(), updated_at=time.time())
+        self._index.replace(folder, index, self._data[folder][index])
+
+    def _remove(self, folder: str, index: int) -> None:
+        """Elimina de memoria el perfil de una posición"""
+        del self._data[folder][index]
+        self._index.remove(folder, index)
+
+    def _move(self, source_folder: str, index: int, target_folder: str) -> None:
+        """Mueve en memoria un perfil al final de otra carpeta"""
+        self._data[target_folder].append(self._data[source_folder].pop(index))
+        self._index.move(source_folder, index, target_folder)
+
+    def profile_id(self, folder: str, index: int) -> Optional[int]:
+        """
+        Identificador de un perfil para usarlo en un lote (ProfileBatch)
+
+        No cambia al borrar o mover otros perfiles; deja de ser válido si los
+        perfiles se vuelven a cargar (p. ej. tras un cambio externo).
+
+        Returns:
+            El identificador o None si la posición no existe
+        """
+        profiles_data = self._load()
+        if folder in profiles_data and 0 <= index < len(profiles_data[folder]):
+            return self._index.profile_id(folder, index)
+        return None
+
+    def batch(self) -> "ProfileBatch":
+        """Lote de cambios que se guardan juntos al salir del bloque with"""
+        return ProfileBatch(self)
+
+    def _apply_batch(self, operations: List[tuple]) -> bool:
+        """
+        Aplica las operaciones de un lote en una sola transacción
+
+        Cada operación localiza el perfil por su identificador justo antes
+        de aplicarse, así que los borrados anteriores no la desplazan. Las
+        señales se emiten a medida que se aplican, para que las vistas lean
+        siempre datos coherentes; si no se puede guardar, los datos se
+        vuelven a leer y las vistas reciben profiles_reset.
+
+        Returns:
+            True si se guardó el lote; False si no se aplicó nada
+        """
+        profiles_data = self._load()
+        for method, profile_id, *args in operations:
+            if not self._index.contains(profile_id):
+                return False  # Identificador de una carga anterior
+            if method == "move" and args[0] not in profiles_data:
+                return False
+            if method == "update" and not args[0].is_valid():
+                return False
+        if not operations:
+            return True
+
+        try:
+            with self.storage.transaction():
+                for method, profile_id, *args in operations:
+                    if not self._index.contains(profile_id):
+                        continue  # Ya borrado en este mismo lote
+                    folder, index = self._index.position(profile_id)
+                    if method == "update":
+                        self._replace(folder, index, args[0])
+                        self.storage.update_profile(profiles_data, folder, index)
+                        self.profile_changed.emit(folder, index)
+                    elif method == "delete":
+                        self._remove(folder, index)
+                        self.storage.delete_profile(profiles_data, folder, index)
+                        self.profile_removed.emit(folder, index)
+                    elif args[0] != folder:
+                        target_folder = args[0]
+                        self._move(folder, index, target_folder)
+                        self.storage.move_profile(profiles_data, folder, index, target_folder)
+                        self.profile_removed.emit(folder, index)
+                        self.profile_added.emit(target_folder, len(profiles_data[target_folder]) - 1)
+        except Exception as e:
+            print(f"Error al guardar perfiles: {e}")
+            self.invalidate()
+            self._load()
+            return False
+        self.version += 1
+        return True
+
     def export_profiles(self) -> str:
         """
         Exporta todos los perfiles a JSON
@@ -255,67 +524,182 @@ class ProfileManager:
         Returns:
             String JSON con todos los perfiles
         """
-        return json.dumps(self.get_profiles(), indent=2)
-
-    def import_profiles(self, json_data: str) -> Tuple[bool, int, List[str]]:
+        stream = io.StringIO()
+        write_profiles(stream, self._load())
+        return stream.getvalue()
+
+    def _unique_name(self, folder: str, name: str) -> str:
+        """Primer nombre libre en la carpeta: "nombre (2)", "nombre (3)"..."""
+        n = 2
+        while self.get_profile_by_name(f"{name} ({n})", folder)[0] is not None:
+            n += 1
+        return f"{name} ({n})"
+
+    def add_profiles_batch(
+        self,
+        batch: List[Tuple[str, dict]],
+        merge: str = MERGE_SKIP,
+        stats: Optional[ImportStats] = None,
+    ) -> bool:
         """
-        Importa perfiles desde JSON
+        Añade un lote de perfiles ya validados en una sola transacción
+
+        Un perfil ya existe si en su carpeta hay otro con el mismo nombre o
+        con el mismo ILO, gateway y usuario; la búsqueda usa los índices,
+        así que el lote se procesa en tiempo lineal y repetir una
+        importación no duplica los perfiles.
 
         Args:
-            json_data: String JSON con perfiles
+            batch: Lista de (carpeta, perfil normalizado); las carpetas que
+                no existen se crean
+            merge: Qué hacer con los que ya existen (MERGE_SKIP,
+                MERGE_OVERWRITE, MERGE_NEWEST o MERGE_RENAME)
+            stats: Recuento de añadidos, actualizados y omitidos (opcional)
 
         Returns:
-            Tupla con (éxito, número de perfiles importados, errores)
+            True si se guardó correctamente, False en caso contrario
         """
-        errors = []
-        try:
-            imported_data = json.loads(json_data)
-
-            # Comprobar formato
-            if isinstance(imported_data, dict):
-                # Formato con carpetas
-                imported_folders = imported_data
-            elif isinstance(imported_data, list):
-                # Lista simple de perfiles
-                imported_folders = {"DEFAULT": imported_data}
-            else:
-                return False, 0, ["Formato de importación no válido"]
-
-            # Validar perfiles
-            total_imported = 0
-            current_profiles = self.get_profiles()
-
-            for folder, profiles in imported_folders.items():
-                if not isinstance(profiles, list):
-                    errors.append(f"La carpeta '{folder}' no contiene una lista válida")
+        if stats is None:
+            stats = ImportStats()
+        profiles_data = self._load()
+        operations = []  # Cambios para el almacenamiento, en orden
+        new_folders = False
+        added = {}  # carpeta -> primer índice añadido
+        changed = []  # (carpeta, índice) actualizados
+
+        for folder, profile_data in batch:
+            duplicates = self._index.duplicates(folder, profile_data) if folder in profiles_data else []
+            if duplicates:
+                index = duplicates[0]
+                existing = profiles_data[folder][index]
+                identity = self._index.identity(profile_data)
+                same_server = any(
+                    self._index.identity(profiles_data[folder][i]) == identity
+                    for i in duplicates
+                )
+                if merge == MERGE_RENAME and not same_server:
+                    # Otro servidor con el mismo nombre: añadirlo con otro
+                    profile_data = dict(profile_data, name=self._unique_name(folder, profile_data["name"]))
+                    stats.renamed += 1
+                elif merge == MERGE_OVERWRITE or (
+                    merge == MERGE_NEWEST
+                    and profile_data.get("updated_at", 0) > existing.get("updated_at", 0)
+                ):
+                    if profile_data == existing:
+                        stats.skipped += 1  # Sin cambios: no reescribir
+                        continue
+                    profiles_data[folder][index] = profile_data
+                    self._index.replace(folder, index, profile_data)
+                    operations.append(("update_profile", folder, index))
+                    changed.append((folder, index))
+                    stats.updated += 1
+                    continue
+                else:
+                    stats.skipped += 1
                     continue
 
-                if folder not in current_profiles:
-                    current_profiles[folder] = []
-
-                for profile_data in profiles:
-                    if not isinstance(profile_data, dict) or "name" not in profile_data:
-                        errors.append(f"Perfil no válido en carpeta '{folder}'")
-                        continue
+            if folder not in profiles_data:
+                profiles_data[folder] = []
+                self._index.add_folder(folder)
+                operations.append(("add_folder", folder))
+                new_folders = True
+            added.setdefault(folder, len(profiles_data[folder]))
+            profiles_data[folder].append(profile_data)
+            self._index.append(folder, profile_data)
+            operations.append(("add_profile", folder, len(profiles_data[folder]) - 1))
+            stats.added += 1
+
+        if not operations:
+            return True
+        if not self._write(*operations):
+            return False
 
-                    # Validar perfil
-                    profile = ConnectionProfile.from_dict(profile_data)
-                    if not profile.is_valid():
-                        errors.append(f"Perfil '{profile.name}' no válido")
-                        continue
+        if new_folders:
+            self.folders_changed.emit()
+        # Los perfiles nuevos de cada carpeta quedan seguidos al final de ella
+        for folder, first in added.items():
+            self.profiles_added.emit(folder, first, len(profiles_data[folder]) - 1)
+        for folder, index in changed:
+            self.profile_changed.emit(folder, index)
+        return True
+
+    def import_profiles(
+        self, json_data: str, merge: str = MERGE_SKIP
+    ) -> Tuple[bool, int, List[str]]:
+        """
+        Importa perfiles desde JSON
 
-                    # Añadir perfil
-                    current_profiles[folder].append(profile.to_dict())
-                    total_imported += 1
+        Para archivos grandes es preferible ProfileImporter, que los lee por
+        partes en segundo plano.
 
-            # Guardar perfiles
-            if total_imported > 0:
-                self.save_profiles_data(current_profiles)
-                return True, total_imported, errors
-            else:
-                return False, 0, errors if errors else ["No se importaron perfiles"]
+        Args:
+            json_data: String JSON con perfiles
+            merge: Qué hacer con los perfiles que ya existen (ver add_profiles_batch)
 
+        Returns:
+            Tupla con (éxito, número de perfiles importados, errores)
+        """
+        errors = []
+        try:
+            batch = list(read_profiles(io.StringIO(json_data), errors))
         except json.JSONDecodeError:
             return False, 0, ["JSON no válido"]
-        except Exception as e:
-            return False, 0, [f"Error al importar: {str(e)}"]
+        except ValueError as e:
+            return False, 0, [str(e)]
+
+        if not batch:
+            return False, 0, errors if errors else ["No se importaron perfiles"]
+        stats = ImportStats()
+        if not self.add_profiles_batch(batch, merge, stats):
+            return False, 0, ["No se pudieron guardar los perfiles importados"]
+        return True, stats.imported, errors
+
+
+class ProfileBatch:
+    """
+    Lote de cambios de perfiles que se guarda en una sola transacción.
+
+    Se usa como gestor de contexto:
+
+        with profile_manager.batch() as batch:
+            for profile_id in selected_ids:
+                batch.move(profile_id, "DC2")
+
+    Los perfiles se indican con ProfileManager.profile_id, que no cambia al
+    borrar o mover otros perfiles, de modo que se pueden reunir todas las
+    operaciones antes de aplicarlas. Al salir del bloque se aplican todas o
+    ninguna (`result`); si el bloque termina con una excepción se descartan.
+    """
+
+    def __init__(self, profile_manager: ProfileManager):
+        self.profile_manager = profile_manager
+        self.operations: List[tuple] = []
+        self.result: Optional[bool] = None
+
+    def update(self, profile_id: int, profile: ConnectionProfile) -> None:
+        """Sustituye los datos de un perfil"""
+        self.operations.append(("update", profile_id, profile))
+
+    def delete(self, profile_id: int) -> None:
+        """Elimina un perfil"""
+        self.operations.append(("delete", profile_id))
+
+    def move(self, profile_id: int, target_folder: str) -> None:
+        """Mueve un perfil al final de otra carpeta"""
+        self.operations.append(("move", profile_id, target_folder))
+
+    def commit(self) -> bool:
+        """Aplica las operaciones reunidas hasta ahora"""
+        operations, self.operations = self.operations, []
+        self.result = self.profile_manager._apply_batch(operations)
+        return self.result
+
+    def __enter__(self) -> "ProfileBatch":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.operations = []
+        return False
@@ -0,0 +1,165 @@
+# ilo_tunnel/models/profile_search.py
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Campos en los que se busca, de mayor a menor relevancia
+SEARCH_FIELDS = ("name", "ilo_ip", "gateway_ip", "ssh_user", "server_type")
+
+# Separadores tras los que una coincidencia cuenta como inicio de palabra
+_WORD_BREAKS = " .-_/:@"
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas (subcadenas de 3 caracteres) de un texto"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def match_rank(text: str, term: str, pos: int) -> int:
+    """
+    Calidad de la coincidencia de un término encontrado en `pos`
+
+    Returns:
+        0 si es exacta, 1 si es prefijo, 2 si empieza una palabra y 3 si
+        está en mitad del texto
+    """
+    if pos == 0:
+        return 0 if len(text) == len(term) else 1
+    if text[pos - 1] in _WORD_BREAKS:
+        return 2
+    return 3
+
+
+class ProfileSearchIndex:
+    """
+    Índice de trigramas para la búsqueda incremental de perfiles.
+
+    Cada término de tres o más caracteres reduce los candidatos a los
+    perfiles que contienen todos sus trigramas; después se comprueba la
+    coincidencia real. Si la búsqueda nueva contiene a la anterior (el
+    usuario sigue escribiendo) se parte de los resultados anteriores, que
+    es lo más habitual al teclear en el cuadro de búsqueda.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Vacía el índice"""
+        self._texts: Dict[int, Tuple[str, ...]] = {}  # perfil -> campos en minúsculas
+        self._joined: Dict[int, str] = {}  # perfil -> campos unidos, para descartar rápido
+        self._trigrams: Dict[str, Set[int]] = {}
+        # Última búsqueda: (ámbito, texto, perfiles encontrados)
+        self._last: Optional[Tuple[object, str, Set[int]]] = None
+
+    def add(self, profile_id: int, profile_data: dict) -> None:
+        """Añade (o actualiza) un perfil en el índice"""
+        if profile_id in self._texts:
+            self.remove(profile_id)
+        texts = tuple(
+            str(profile_data.get(field) or "").strip().lower() for field in SEARCH_FIELDS
+        )
+        self._texts[profile_id] = texts
+        self._joined[profile_id] = "\0".join(texts)
+        for gram in set().union(*(trigrams(text) for text in texts)):
+            self._trigrams.setdefault(gram, set()).add(profile_id)
+        self._last = None
+
+    def remove(self, profile_id: int) -> None:
+        """Quita un perfil del índice"""
+        texts = self._texts.pop(profile_id, None)
+        if texts is None:
+            return
+        del self._joined[profile_id]
+        for gram in set().union(*(trigrams(text) for text in texts)):
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(profile_id)
+                if not ids:
+                    del self._trigrams[gram]
+        self._last = None
+
+    def _candidates(
+        self, query: str, terms: List[str], scope: Optional[Set[int]], scope_key
+    ) -> Iterable[int]:
+        """Perfiles que pueden coincidir con la búsqueda"""
+        if self._last is not None:
+            last_key, last_query, last_results = self._last
+            if last_key == scope_key and last_query in query:
+                return last_results
+
+        postings = [
+            self._trigrams.get(gram, set())
+            for term in terms
+            if len(term) >= 3
+            for gram in trigrams(term)
+        ]
+        if scope is not None:
+            postings.append(scope)
+        if not postings:
+            return self._texts.keys()
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def search(
+        self, query: str, scope: Optional[Set[int]] = None, scope_key=None
+    ) -> List[Tuple[int, int]]:
+        """
+        Busca los perfiles que contienen todos los términos de la búsqueda
+
+        Args:
+            query: Texto de búsqueda (los términos se separan por espacios)
+            scope: Limitar la búsqueda a estos perfiles (opcional)
+            scope_key: Identifica el ámbito (p. ej. la carpeta) para poder
+                reutilizar los resultados de la búsqueda anterior
+
+        Returns:
+            Lista de (puntuación, perfil), menor puntuación = más relevante
+        """
+        query = " ".join(query.lower().split())
+        terms = query.split(" ")
+        if not query:
+            ids = self._texts if scope is None else scope
+            return [(0, profile_id) for profile_id in ids]
+
+        results = []
+        for profile_id in self._candidates(query, terms, scope, scope_key):
+            joined = self._joined[profile_id]
+            texts = self._texts[profile_id]
+            score = 0
+            for term in terms:
+                if term not in joined:
+                    break
+                # Cuenta el primer campo que lo contiene (el nombre antes que
+                # las IPs...) y después la calidad de la coincidencia
+                for weight, text in enumerate(texts):
+                    pos = text.find(term)
+                    if pos >= 0:
+                        score += weight * 4 + match_rank(text, term, pos)
+                        break
+            else:
+                results.append((score, profile_id))
+
+        self._last = (scope_key, query, {profile_id for _, profile_id in results})
+        return results
+
+
+def rank_results(
+    results: List[Tuple[int, int]], order: Dict[int, Tuple[int, int]], limit: Optional[int]
+) -> List[int]:
+    """
+    Ordena los resultados por puntuación y, a igualdad, por posición
+
+    Args:
+        results: Lista de (puntuación, perfil)
+        order: Posición de cada perfil (orden de carpeta, índice)
+        limit: Número máximo de resultados (None para todos)
+    """
+
+    def key(item):
+        return item[0], order[item[1]]
+
+    if limit is not None and limit < len(results):
+        ranked = heapq.nsmallest(limit, results, key=key)
+    else:
+        ranked = sorted(results, key=key)
+    return [profile_id for _, profile_id in ranked]
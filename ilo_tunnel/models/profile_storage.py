@@ -0,0 +1,431 @@
+# ilo_tunnel/models/profile_storage.py
+import json
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QSettings
+
+from ..config import CONFIG_DIR
+
+# Clave de QSettings con todos los perfiles en JSON (formato anterior a SQLite)
+SETTINGS_KEY = "connection_profiles"
+
+# Columnas de la tabla de perfiles copiadas del JSON para poder consultarlas
+PROFILE_COLUMNS = ("name", "ilo_ip", "gateway_ip", "server_type")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS folders (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    folder_id INTEGER NOT NULL REFERENCES folders(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    ilo_ip TEXT,
+    gateway_ip TEXT,
+    server_type TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_position ON profiles (folder_id, position);
+CREATE INDEX IF NOT EXISTS profiles_name ON profiles (name);
+CREATE INDEX IF NOT EXISTS profiles_ilo_ip ON profiles (ilo_ip);
+CREATE INDEX IF NOT EXISTS profiles_gateway_ip ON profiles (gateway_ip);
+"""
+
+
+def default_database_path(settings: QSettings) -> str:
+    """Ruta de la base de datos de perfiles, junto al archivo de QSettings"""
+    path = settings.fileName()
+    if sys.platform == "win32" or not os.path.isabs(path):
+        # En Windows QSettings usa el registro: no hay directorio
+        return os.path.join(CONFIG_DIR, "profiles.db")
+    return os.path.join(os.path.dirname(path), "profiles.db")
+
+
+def parse_profiles_json(profiles_json: str) -> Dict[str, List[dict]]:
+    """Interpreta el JSON de perfiles, convirtiendo el formato sin carpetas"""
+    profiles_data = json.loads(profiles_json)
+    if isinstance(profiles_data, list):
+        profiles_data = {"DEFAULT": profiles_data}
+    return profiles_data
+
+
+class ProfileStorage:
+    """
+    Almacenamiento de los perfiles del ProfileManager.
+
+    El ProfileManager modifica primero sus datos en memoria y después llama
+    a la operación equivalente del almacenamiento con los datos ya
+    modificados y la posición afectada, de modo que cada implementación
+    puede guardar solo esa fila o todo el conjunto. Por defecto todas las
+    operaciones guardan el conjunto completo con save_all; dentro de
+    transaction() se guarda una sola vez al final.
+
+    Los errores se notifican con excepciones.
+    """
+
+    def __init__(self):
+        self._depth = 0  # Transacciones anidadas abiertas
+        self._pending: Optional[Dict[str, List[dict]]] = None
+
+    def load(self) -> Dict[str, List[dict]]:
+        """Lee todos los perfiles, carpeta a carpeta"""
+        raise NotImplementedError
+
+    def has_changed(self) -> bool:
+        """True si otro proceso ha modificado los perfiles desde la última lectura"""
+        raise NotImplementedError
+
+    def save_all(self, profiles_data: Dict[str, List[dict]]) -> None:
+        """Sustituye todos los perfiles"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Libera los recursos del almacenamiento"""
+
+    def _save(self, profiles_data: Dict[str, List[dict]]) -> None:
+        """Guarda el conjunto completo ahora o al terminar la transacción"""
+        if self._depth:
+            self._pending = profiles_data
+        else:
+            self.save_all(profiles_data)
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa varias operaciones: se guardan todas o ninguna"""
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            if self._depth == 1:
+                self._pending = None
+            raise
+        finally:
+            self._depth -= 1
+
+        if not self._depth and self._pending is not None:
+            profiles_data, self._pending = self._pending, None
+            self.save_all(profiles_data)
+
+    def add_profile(self, profiles_data: Dict[str, List[dict]], folder: str, index: int) -> None:
+        """Guarda el perfil nuevo profiles_data[folder][index]"""
+        self._save(profiles_data)
+
+    def update_profile(self, profiles_data: Dict[str, List[dict]], folder: str, index: int) -> None:
+        """Guarda el perfil modificado profiles_data[folder][index]"""
+        self._save(profiles_data)
+
+    def delete_profile(self, profiles_data: Dict[str, List[dict]], folder: str, index: int) -> None:
+        """Elimina el perfil que ocupaba la posición index de la carpeta"""
+        self._save(profiles_data)
+
+    def move_profile(
+        self, profiles_data: Dict[str, List[dict]], source_folder: str, index: int, target_folder: str
+    ) -> None:
+        """Mueve el perfil de la posición index al final de otra carpeta"""
+        self._save(profiles_data)
+
+    def add_folder(self, profiles_data: Dict[str, List[dict]], folder: str) -> None:
+        """Guarda una carpeta nueva (vacía)"""
+        self._save(profiles_data)
+
+    def rename_folder(self, profiles_data: Dict[str, List[dict]], old_name: str, new_name: str) -> None:
+        """Renombra una carpeta (pasa al final del orden)"""
+        self._save(profiles_data)
+
+    def delete_folder(self, profiles_data: Dict[str, List[dict]], folder: str) -> None:
+        """Elimina una carpeta con sus perfiles"""
+        self._save(profiles_data)
+
+
+class SettingsProfileStorage(ProfileStorage):
+    """
+    Perfiles como un único JSON en QSettings (formato original).
+
+    Cada cambio reescribe el JSON completo; se mantiene como alternativa
+    cuando no se puede abrir la base de datos.
+    """
+
+    def __init__(self, settings: QSettings):
+        super().__init__()
+        self.settings = settings
+        self._raw = None  # JSON leído o escrito por última vez
+        self._stamp = None  # (mtime, tamaño) del archivo en ese momento
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        """Fecha de modificación y tamaño del archivo de configuración"""
+        try:
+            stat = os.stat(self.settings.fileName())
+        except OSError:
+            return None  # Registro de Windows u archivo aún no creado
+        return stat.st_mtime_ns, stat.st_size
+
+    def has_changed(self) -> bool:
+        if self._raw is not None and self._file_stamp() == self._stamp:
+            return False
+
+        self.settings.sync()  # Leer los cambios hechos por otros procesos
+        if self.settings.value(SETTINGS_KEY, "{}") == self._raw:
+            # El archivo cambió por otras opciones, no por los perfiles
+            self._stamp = self._file_stamp()
+            return False
+        return True
+
+    def load(self) -> Dict[str, List[dict]]:
+        self.settings.sync()
+        profiles_json = self.settings.value(SETTINGS_KEY, "{}")
+        profiles_data = json.loads(profiles_json)
+        if isinstance(profiles_data, list):
+            # Guardar ya en el formato con carpetas
+            profiles_data = {"DEFAULT": profiles_data}
+            self.save_all(profiles_data)
+        else:
+            self._raw = profiles_json
+            self._stamp = self._file_stamp()
+        return profiles_data
+
+    def save_all(self, profiles_data: Dict[str, List[dict]]) -> None:
+        profiles_json = json.dumps(profiles_data)
+        self.settings.setValue(SETTINGS_KEY, profiles_json)
+        self.settings.sync()
+        if self.settings.status() != QSettings.Status.NoError:
+            raise OSError(f"No se pudo escribir {self.settings.fileName()}")
+        self._raw = profiles_json
+        self._stamp = self._file_stamp()
+
+
+class SQLiteProfileStorage(ProfileStorage):
+    """
+    Perfiles en una base de datos SQLite (modo WAL), una fila por perfil.
+
+    Cada cambio escribe solo las filas afectadas dentro de una transacción,
+    y varias instancias de la aplicación pueden compartir la base de datos:
+    los cambios de las demás se detectan con PRAGMA data_version. La
+    primera vez se copian los perfiles guardados en QSettings (sin borrarlos).
+
+    Las filas se localizan por su id, que no cambia: junto a los datos en
+    memoria se guarda la lista de ids de cada carpeta en el mismo orden, de
+    modo que la posición (carpeta, índice) de cada operación se traduce al
+    id de su fila. La columna position solo sirve para ordenar (puede tener
+    huecos), así que borrar o mover un perfil no renumera los siguientes.
+    """
+
+    def __init__(self, path: str, settings: Optional[QSettings] = None):
+        super().__init__()
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Sin transacciones implícitas: se abren con BEGIN en transaction()
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            if settings is not None:
+                self._migrate(settings)
+        except Exception:
+            self._conn.close()
+            raise
+        self._data_version = None
+        self._ids: Dict[str, List[int]] = {}  # carpeta -> ids de las filas en orden
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _migrate(self, settings: QSettings) -> None:
+        """Copia una sola vez los perfiles del JSON de QSettings"""
+        if self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+            return
+
+        settings.sync()
+        profiles_json = settings.value(SETTINGS_KEY, None)
+        # El JSON se conserva en QSettings: es la copia original de los
+        # perfiles si la base de datos se daña o se vuelve a una versión anterior
+        with self.transaction():
+            if profiles_json and not self._conn.execute("SELECT 1 FROM folders").fetchone():
+                self._insert_all(parse_profiles_json(profiles_json))
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', '1')")
+
+    @contextmanager
+    def transaction(self):
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        # IMMEDIATE: reservar la escritura desde el principio para que otra
+        # instancia no modifique los datos a mitad de la transacción
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            # Los ids en memoria pueden no coincidir ya: forzar una recarga
+            self._data_version = None
+            raise
+        else:
+            try:
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                self._data_version = None
+                raise
+        finally:
+            self._depth = 0
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def has_changed(self) -> bool:
+        # data_version solo cambia con las escrituras de otras conexiones
+        return self._read_data_version() != self._data_version
+
+    def load(self) -> Dict[str, List[dict]]:
+        profiles_data: Dict[str, List[dict]] = {}
+        self._ids = {}
+        rows = self._conn.execute(
+            "SELECT folders.name, profiles.id, profiles.data FROM folders"
+            " LEFT JOIN profiles ON profiles.folder_id = folders.id"
+            " ORDER BY folders.position, profiles.position, profiles.id"
+        )
+        for folder, row_id, data in rows:
+            profiles = profiles_data.setdefault(folder, [])
+            ids = self._ids.setdefault(folder, [])
+            if data is not None:
+                profiles.append(json.loads(data))
+                ids.append(row_id)
+        self._data_version = self._read_data_version()
+        return profiles_data
+
+    def save_all(self, profiles_data: Dict[str, List[dict]]) -> None:
+        with self.transaction():
+            self._conn.execute("DELETE FROM profiles")
+            self._conn.execute("DELETE FROM folders")
+            self._insert_all(profiles_data)
+
+    @staticmethod
+    def _row(profile_data: dict) -> tuple:
+        """Valores de las columnas consultables y del JSON de un perfil"""
+        return tuple(
+            str(profile_data.get(column) or "") for column in PROFILE_COLUMNS
+        ) + (json.dumps(profile_data),)
+
+    def _insert_all(self, profiles_data: Dict[str, List[dict]]) -> None:
+        self._ids = {}
+        for position, (folder, profiles) in enumerate(profiles_data.items()):
+            folder_id = self._conn.execute(
+                "INSERT INTO folders (name, position) VALUES (?, ?)", (folder, position)
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO profiles (folder_id, position, name, ilo_ip, gateway_ip,"
+                " server_type, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (folder_id, i) + self._row(profile_data)
+                    for i, profile_data in enumerate(profiles)
+                ),
+            )
+            self._ids[folder] = [
+                row_id
+                for (row_id,) in self._conn.execute(
+                    "SELECT id FROM profiles WHERE folder_id = ? ORDER BY position", (folder_id,)
+                )
+            ]
+
+    def _folder_id(self, folder: str) -> Optional[int]:
+        row = self._conn.execute("SELECT id FROM folders WHERE name = ?", (folder,)).fetchone()
+        return row[0] if row else None
+
+    def _next_folder_position(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM folders").fetchone()[0]
+
+    def _next_position(self, folder_id: int) -> int:
+        """Posición detrás del último perfil de una carpeta"""
+        return self._conn.execute(
+            "SELECT COALESCE(MAX(position), -1) + 1 FROM profiles WHERE folder_id = ?",
+            (folder_id,),
+        ).fetchone()[0]
+
+    def add_folder(self, profiles_data, folder):
+        with self.transaction():
+            self._conn.execute(
+                "INSERT INTO folders (name, position) VALUES (?, ?)",
+                (folder, self._next_folder_position()),
+            )
+            self._ids.setdefault(folder, [])
+
+    def add_profile(self, profiles_data, folder, index):
+        with self.transaction():
+            folder_id = self._folder_id(folder)
+            if folder_id is None:
+                self.add_folder(profiles_data, folder)
+                folder_id = self._folder_id(folder)
+            ids = self._ids.setdefault(folder, [])
+            if index < len(ids):
+                # Inserción en medio de la carpeta: hacer sitio
+                position = self._conn.execute(
+                    "SELECT position FROM profiles WHERE id = ?", (ids[index],)
+                ).fetchone()[0]
+                self._conn.execute(
+                    "UPDATE profiles SET position = position + 1"
+                    " WHERE folder_id = ? AND position >= ?",
+                    (folder_id, position),
+                )
+            else:
+                position = self._next_position(folder_id)
+            row_id = self._conn.execute(
+                "INSERT INTO profiles (folder_id, position, name, ilo_ip, gateway_ip,"
+                " server_type, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (folder_id, position) + self._row(profiles_data[folder][index]),
+            ).lastrowid
+            ids.insert(index, row_id)
+
+    def update_profile(self, profiles_data, folder, index):
+        with self.transaction():
+            self._conn.execute(
+                "UPDATE profiles SET name = ?, ilo_ip = ?, gateway_ip = ?, server_type = ?,"
+                " data = ? WHERE id = ?",
+                self._row(profiles_data[folder][index]) + (self._ids[folder][index],),
+            )
+
+    def delete_profile(self, profiles_data, folder, index):
+        with self.transaction():
+            row_id = self._ids[folder].pop(index)
+            self._conn.execute("DELETE FROM profiles WHERE id = ?", (row_id,))
+
+    def move_profile(self, profiles_data, source_folder, index, target_folder):
+        with self.transaction():
+            row_id = self._ids[source_folder].pop(index)
+            target_id = self._folder_id(target_folder)
+            self._conn.execute(
+                "UPDATE profiles SET folder_id = ?, position = ? WHERE id = ?",
+                (target_id, self._next_position(target_id), row_id),
+            )
+            self._ids.setdefault(target_folder, []).append(row_id)
+
+    def rename_folder(self, profiles_data, old_name, new_name):
+        with self.transaction():
+            self._conn.execute(
+                "UPDATE folders SET name = ?, position = ? WHERE name = ?",
+                (new_name, self._next_folder_position(), old_name),
+            )
+            self._ids[new_name] = self._ids.pop(old_name, [])
+
+    def delete_folder(self, profiles_data, folder):
+        with self.transaction():
+            # Los perfiles se eliminan en cascada
+            self._conn.execute("DELETE FROM folders WHERE name = ?", (folder,))
+            self._ids.pop(folder, None)
@@ -0,0 +1,190 @@
+# ilo_tunnel/network_watcher.py
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Intervalo entre comprobaciones de la ruta hacia cada gateway (ms)
+NETWORK_POLL_INTERVAL = 2000
+
+# Tiempo que se reutiliza la dirección resuelta de un gateway (segundos)
+GATEWAY_RESOLVE_TTL = 60.0
+
+
+def resolve_gateway(host: str, port: int = 22) -> Optional[Tuple[int, tuple]]:
+    """
+    Resuelve el nombre de un gateway a una dirección IPv4
+
+    Returns:
+        (familia, dirección) para socket.connect(), o None si no se resuelve
+    """
+    try:
+        family, _, _, _, address = socket.getaddrinfo(
+            host, port, socket.AF_INET, socket.SOCK_DGRAM
+        )[0]
+    except (OSError, IndexError):
+        return None
+    return family, address
+
+
+def route_source(
+    host: str, port: int = 22, resolved: Optional[Tuple[int, tuple]] = None
+) -> Optional[str]:
+    """
+    Obtiene la IP local que el sistema usaría para llegar a un host
+
+    Se "conecta" un socket UDP, lo que consulta la tabla de rutas sin
+    enviar ningún paquete. Si cambia la interfaz de salida o la ruta por
+    defecto (cambio de Wi-Fi, VPN...) cambia también la IP de origen.
+
+    Args:
+        host: Gateway SSH (nombre o IP)
+        port: Puerto SSH (solo necesario para connect())
+        resolved: Dirección ya resuelta del host (evita consultar el DNS)
+
+    Returns:
+        IP de origen, o None si no hay ruta o no se puede resolver el nombre
+    """
+    if resolved is None:
+        resolved = resolve_gateway(host, port)
+        if resolved is None:
+            return None
+
+    family, address = resolved
+    with socket.socket(family, socket.SOCK_DGRAM) as s:
+        try:
+            s.connect(address)
+            return s.getsockname()[0]
+        except OSError:
+            return None
+
+
+class NetworkWatcher(QObject):
+    """
+    Vigilante de cambios de red.
+
+    Comprueba periódicamente, en un hilo de trabajo, la IP de origen hacia
+    cada gateway vigilado y avisa con route_changed cuando cambia. Así los
+    túneles se pueden reiniciar en cuanto cambia la red, sin esperar a que
+    ssh detecte la conexión muerta con ServerAliveInterval (~45 s).
+    """
+
+    route_changed = pyqtSignal(str, str, str)  # gateway, IP anterior, IP nueva
+    _poll_finished = pyqtSignal(object)
+
+    def __init__(self, interval: int = NETWORK_POLL_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.enabled = True
+        self.gateways = set()
+        self.sources: Dict[str, str] = {}  # gateway -> última IP de origen
+        # gateway -> (dirección resuelta, momento); solo lo usa el hilo de trabajo
+        self._resolved: Dict[str, Tuple[Tuple[int, tuple], float]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="network-watcher"
+        )
+        self._pending = None
+        self._poll_finished.connect(self._handle_poll)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.poll)
+
+    def set_gateways(self, gateways: Iterable[str]) -> None:
+        """
+        Establece los gateways a vigilar
+
+        El temporizador solo está activo mientras haya gateways que vigilar.
+        """
+        self.gateways = {gateway for gateway in gateways if gateway}
+        for gateway in list(self.sources):
+            if gateway not in self.gateways:
+                del self.sources[gateway]
+        self._update_timer()
+
+    def set_enabled(self, enabled: bool) -> None:
+        """Activa o desactiva la vigilancia"""
+        self.enabled = enabled
+        if not enabled:
+            self.sources.clear()
+        self._update_timer()
+
+    def _update_timer(self) -> None:
+        """Arranca o detiene el temporizador de comprobación"""
+        if self.enabled and self.gateways:
+            if not self.timer.isActive():
+                self.timer.start()
+                self.poll()
+        else:
+            self.timer.stop()
+
+    def poll(self) -> None:
+        """Lanza una comprobación en segundo plano (si no hay otra en curso)"""
+        if self._pending is not None and not self._pending.done():
+            return
+        self._pending = self._executor.submit(self._lookup, sorted(self.gateways))
+        self._pending.add_done_callback(self._handle_done)
+
+    def _lookup(self, gateways) -> Dict[str, Optional[str]]:
+        """
+        Obtiene la IP de origen hacia cada gateway (en el hilo de trabajo)
+
+        El nombre de cada gateway se resuelve como mucho una vez cada
+        GATEWAY_RESOLVE_TTL segundos, y de nuevo si la consulta de la ruta
+        falla, en lugar de consultar el DNS en cada comprobación.
+        """
+        now = time.monotonic()
+        self._resolved = {
+            gateway: entry for gateway, entry in self._resolved.items() if gateway in gateways
+        }
+        sources = {}
+        for gateway in gateways:
+            entry = self._resolved.get(gateway)
+            if entry is None or now - entry[1] >= GATEWAY_RESOLVE_TTL:
+                resolved = resolve_gateway(gateway)
+                if resolved is None:
+                    self._resolved.pop(gateway, None)
+                    sources[gateway] = None
+                    continue
+                entry = self._resolved[gateway] = (resolved, now)
+
+            sources[gateway] = route_source(gateway, resolved=entry[0])
+            if sources[gateway] is None:
+                del self._resolved[gateway]
+        return sources
+
+    def _handle_done(self, future) -> None:
+        """Entrega el resultado al hilo de la interfaz (desde el hilo de trabajo)"""
+        try:
+            sources = future.result()
+        except Exception as e:
+            print(f"Error al comprobar la red: {e}")
+            return
+        self._poll_finished.emit(sources)
+
+    def _handle_poll(self, sources: Dict[str, Optional[str]]) -> None:
+        """
+        Compara las IPs de origen con las de la comprobación anterior
+
+        La primera lectura de un gateway solo sirve de referencia. Las
+        consultas fallidas (sin ruta o sin DNS) se ignoran: un fallo puntual
+        no es un cambio de red. Solo se avisa cuando la IP de origen pasa de
+        una dirección conocida a otra distinta.
+        """
+        if not self.enabled:
+            return
+
+        for gateway, source in sources.items():
+            if gateway not in self.gateways or source is None:
+                continue  # Dejó de vigilarse durante la comprobación o falló
+
+            previous = self.sources.get(gateway)
+            self.sources[gateway] = source
+            if previous is not None and source != previous:
+                self.route_changed.emit(gateway, previous, source)
+
+    def shutdown(self) -> None:
+        """Detiene la vigilancia y el hilo de trabajo"""
+        self.timer.stop()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,284 @@
+# ilo_tunnel/port_prober.py
+import errno
+import selectors
+import socket
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Errores de connect() que indican que la conexión sigue en curso
+_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY}
+
+# Modos de comprobación
+PROBE_LISTENER = "listener"  # Solo el puerto local de ssh acepta conexiones
+PROBE_SERVICE = "service"  # Ida y vuelta a nivel de protocolo hasta el ILO
+
+# Protocolo a usar según el puerto remoto
+SERVICE_PROBES = {
+    22: "ssh",
+    80: "http",
+    8080: "http",
+    443: "tls",
+    8443: "tls",
+    5986: "tls",
+}
+
+
+@dataclass
+class ProbeResult:
+    """Resultado de la comprobación de un puerto"""
+
+    is_open: bool
+    latency_ms: Optional[float] = None  # Tiempo de ida y vuelta
+    detail: str = ""
+
+
+def probe_ports(
+    targets: List[Tuple[str, int]], timeout: float = 1.0
+) -> Dict[Tuple[str, int], bool]:
+    """
+    Comprueba a la vez si un conjunto de puertos acepta conexiones
+
+    Todas las conexiones se lanzan con sockets no bloqueantes y se esperan
+    juntas, de modo que la comprobación completa dura como máximo `timeout`
+    independientemente del número de puertos.
+
+    Args:
+        targets: Lista de (host, puerto) a comprobar
+        timeout: Tiempo máximo de espera en segundos
+
+    Returns:
+        Diccionario (host, puerto) -> True si el puerto está abierto
+    """
+    results = {target: False for target in targets}
+    selector = selectors.DefaultSelector()
+
+    try:
+        for target in results:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setblocking(False)
+            try:
+                error = s.connect_ex(target)
+            except OSError:
+                s.close()
+                continue
+
+            if error == 0:
+                results[target] = True
+                s.close()
+            elif error in _IN_PROGRESS:
+                selector.register(s, selectors.EVENT_WRITE, target)
+            else:
+                s.close()
+
+        deadline = time.monotonic() + timeout
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            for key, _ in selector.select(remaining):
+                s = key.fileobj
+                error = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                results[key.data] = error == 0
+                selector.unregister(s)
+                s.close()
+    finally:
+        # Cerrar los sockets que no respondieron a tiempo
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+
+    return results
+
+
+def _probe_tls(sock: socket.socket) -> str:
+    """Envía un ClientHello TLS y espera cualquier respuesta TLS del servidor"""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    try:
+        with context.wrap_socket(sock, do_handshake_on_connect=False) as tls:
+            tls.do_handshake()
+            return f"TLS {tls.version()}"
+    except (ssl.SSLEOFError, ssl.SSLZeroReturnError):
+        raise ConnectionError("conexión cerrada durante el handshake TLS")
+    except ssl.SSLError as e:
+        # Una alerta TLS también demuestra que el servidor ha respondido
+        return f"TLS ({e.reason or 'alerta'})"
+
+
+def _probe_http(sock: socket.socket, host: str) -> str:
+    """Envía una petición HEAD y lee la línea de estado"""
+    sock.sendall(
+        f"HEAD / HTTP/1.0\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode()
+    )
+    data = sock.recv(64)
+    if not data:
+        raise ConnectionError("conexión cerrada sin respuesta HTTP")
+    return data.split(b"\r\n", 1)[0].decode(errors="replace")
+
+
+def _probe_banner(sock: socket.socket) -> str:
+    """Lee el banner que el servidor envía al conectar (SSH)"""
+    data = sock.recv(64)
+    if not data:
+        raise ConnectionError("conexión cerrada sin banner")
+    return data.split(b"\r\n", 1)[0].decode(errors="replace")
+
+
+def probe_service(
+    host: str, port: int, remote_port: int, timeout: float = 3.0
+) -> ProbeResult:
+    """
+    Comprueba un puerto reenviado haciendo una ida y vuelta a nivel de protocolo.
+
+    ssh acepta la conexión local aunque el ILO no sea alcanzable y la cierra
+    después; por eso se espera una respuesta real del servicio remoto:
+    handshake TLS en 443, HEAD en 80 y banner en 22. Para otros puertos se
+    considera vivo si ssh no cierra la conexión.
+
+    Args:
+        host: Host local del reenvío
+        port: Puerto local del reenvío
+        remote_port: Puerto remoto (determina el protocolo)
+        timeout: Tiempo máximo de espera en segundos
+
+    Returns:
+        Resultado con la latencia de ida y vuelta
+    """
+    protocol = SERVICE_PROBES.get(remote_port)
+    start = time.monotonic()
+
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    except OSError as e:
+        return ProbeResult(False, None, f"sin escucha local: {e}")
+
+    try:
+        if protocol == "tls":
+            detail = _probe_tls(sock)
+        elif protocol == "http":
+            detail = _probe_http(sock, host)
+        elif protocol == "ssh":
+            detail = _probe_banner(sock)
+        else:
+            try:
+                if not sock.recv(1):
+                    raise ConnectionError("conexión cerrada por ssh")
+                detail = "datos recibidos"
+            except socket.timeout:
+                detail = "conexión aceptada"
+    except (OSError, ConnectionError) as e:
+        return ProbeResult(False, None, str(e))
+    finally:
+        sock.close()
+
+    return ProbeResult(True, (time.monotonic() - start) * 1000, detail)
+
+
+def probe_services(
+    targets: List[Tuple[str, int, int]],
+    timeout: float,
+    executor: ThreadPoolExecutor,
+) -> Dict[Tuple[str, int], ProbeResult]:
+    """
+    Comprueba a la vez varios puertos reenviados a nivel de protocolo
+
+    Args:
+        targets: Lista de (host, puerto local, puerto remoto)
+        timeout: Tiempo máximo de espera de cada comprobación en segundos
+        executor: Grupo de hilos en el que ejecutar las comprobaciones
+
+    Returns:
+        Diccionario (host, puerto local) -> resultado
+    """
+    futures = {
+        (host, port): executor.submit(probe_service, host, port, remote_port, timeout)
+        for host, port, remote_port in targets
+    }
+    wait(futures.values())
+    return {target: future.result() for target, future in futures.items()}
+
+
+class PortProber(QObject):
+    """
+    Comprobador asíncrono de puertos.
+
+    Las comprobaciones se ejecutan en un hilo de trabajo y el resultado se
+    entrega mediante la señal sweep_finished en el hilo de la interfaz, por
+    lo que el bucle de eventos nunca se bloquea.
+    """
+
+    sweep_finished = pyqtSignal(object, object)  # contexto, resultados
+
+    def __init__(
+        self,
+        timeout: float = 1.0,
+        service_timeout: float = 3.0,
+        max_workers: int = 32,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.timeout = timeout
+        self.service_timeout = service_timeout
+        self.mode = PROBE_LISTENER
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="port-prober"
+        )
+        self._service_executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="service-prober"
+        )
+        self._pending = None
+
+    def is_busy(self) -> bool:
+        """Comprueba si hay una comprobación en curso"""
+        return self._pending is not None and not self._pending.done()
+
+    def probe(self, targets: List[Tuple[str, int, int]], context=None) -> bool:
+        """
+        Lanza una comprobación de puertos en segundo plano
+
+        Args:
+            targets: Lista de (host, puerto local, puerto remoto) a comprobar
+            context: Datos que se devuelven junto con los resultados
+
+        Returns:
+            True si se lanzó la comprobación, False si aún hay una en curso
+        """
+        if self.is_busy():
+            return False
+
+        self._pending = self._executor.submit(self._sweep, list(targets), self.mode)
+        self._pending.add_done_callback(
+            lambda future: self._handle_done(future, context)
+        )
+        return True
+
+    def _sweep(
+        self, targets: List[Tuple[str, int, int]], mode: str
+    ) -> Dict[Tuple[str, int], ProbeResult]:
+        """Ejecuta una comprobación completa según el modo (en el hilo de trabajo)"""
+        if mode == PROBE_SERVICE:
+            return probe_services(targets, self.service_timeout, self._service_executor)
+
+        listeners = probe_ports([(host, port) for host, port, _ in targets], self.timeout)
+        return {target: ProbeResult(is_open) for target, is_open in listeners.items()}
+
+    def _handle_done(self, future, context) -> None:
+        """Entrega los resultados de una comprobación (desde el hilo de trabajo)"""
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Error al comprobar puertos: {e}")
+            return
+        self.sweep_finished.emit(context, results)
+
+    def shutdown(self) -> None:
+        """Detiene los hilos de trabajo"""
+        self._executor.shutdown(wait=False)
+        self._service_executor.shutdown(wait=False)
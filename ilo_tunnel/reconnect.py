@@ -0,0 +1,147 @@
+# ilo_tunnel/reconnect.py
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Estados del circuito de reconexión
+CIRCUIT_CLOSED = "closed"  # Reintentos rápidos con espera exponencial
+CIRCUIT_OPEN = "open"  # Demasiados fallos seguidos: espera máxima entre intentos
+CIRCUIT_HALF_OPEN = "half-open"  # Intento de prueba tras la espera máxima
+
+CIRCUIT_LABELS = {
+    CIRCUIT_CLOSED: "cerrado",
+    CIRCUIT_OPEN: "abierto",
+    CIRCUIT_HALF_OPEN: "semiabierto",
+}
+
+
+@dataclass
+class FailureRecord:
+    """Desconexión registrada por la política de reconexión"""
+
+    code: int
+    reason: str
+    uptime: float  # Segundos conectado antes de caer (0 si no llegó a conectar)
+    delay: float  # Espera programada hasta el siguiente intento
+    state: str  # Estado del circuito tras el fallo
+    timestamp: float = field(default_factory=time.time)
+
+
+class ReconnectPolicy:
+    """
+    Política de reconexión automática de un túnel.
+
+    Cada fallo espera un tiempo aleatorio entre base_delay y el triple de la
+    espera anterior, limitado a max_delay ("decorrelated jitter"), para que
+    los clientes de un gateway inestable no reintenten todos a la vez. Tras
+    max_attempts fallos seguidos el circuito se abre: se sigue reintentando
+    sin límite, pero un único intento de prueba cada max_delay segundos
+    aproximadamente (entre la mitad y el total, también con jitter). Los
+    contadores solo vuelven a cero cuando la conexión se mantiene estable
+    durante stable_after segundos, de modo que un túnel que conecta y cae
+    enseguida no reintenta indefinidamente a ritmo rápido.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        max_attempts: int = 3,
+        stable_after: float = 60.0,
+        history_size: int = 50,
+        rng: Optional[random.Random] = None,
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.stable_after = stable_after
+        self.history: deque = deque(maxlen=history_size)
+        self._rng = rng or random.Random()
+        self.reset()
+
+    def reset(self) -> None:
+        """Vuelve al estado inicial (circuito cerrado, sin fallos seguidos)"""
+        self.failures = 0  # Fallos seguidos desde la última conexión estable
+        self.state = CIRCUIT_CLOSED
+        self._delay = self.base_delay
+        self._connected_at: Optional[float] = None
+
+    def next_delay(self) -> float:
+        """Calcula la siguiente espera con jitter decorrelacionado (segundos)"""
+        upper = max(self.base_delay, self._delay * 3)
+        self._delay = min(self.max_delay, self._rng.uniform(self.base_delay, upper))
+        return self._delay
+
+    def open_delay(self) -> float:
+        """Espera con el circuito abierto: entre max_delay / 2 y max_delay (segundos)"""
+        self._delay = self._rng.uniform(self.max_delay / 2, self.max_delay)
+        return self._delay
+
+    def record_failure(self, code: int = 0, reason: str = "") -> float:
+        """
+        Registra una desconexión o un intento fallido
+
+        Args:
+            code: Código de salida de ssh
+            reason: Motivo de la desconexión
+
+        Returns:
+            Segundos que hay que esperar antes del siguiente intento
+        """
+        uptime = 0.0
+        if self._connected_at is not None:
+            uptime = time.monotonic() - self._connected_at
+            self._connected_at = None
+
+        self.failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or (
+            self.state == CIRCUIT_CLOSED and self.failures >= self.max_attempts
+        ):
+            self.state = CIRCUIT_OPEN
+
+        if self.state == CIRCUIT_OPEN:
+            # También con jitter: los túneles de un gateway caído no deben
+            # reintentar todos a la vez cada max_delay segundos
+            delay = self.open_delay()
+        else:
+            delay = self.next_delay()
+
+        self.history.append(FailureRecord(code, reason, uptime, delay, self.state))
+        return delay
+
+    def record_attempt(self) -> None:
+        """Registra el inicio de un intento de reconexión"""
+        if self.state == CIRCUIT_OPEN:
+            self.state = CIRCUIT_HALF_OPEN
+
+    def record_connected(self) -> None:
+        """Registra que el túnel ha conectado (aún no se considera estable)"""
+        self._connected_at = time.monotonic()
+
+    def record_stable(self) -> None:
+        """La conexión ha durado stable_after segundos: se olvidan los fallos"""
+        connected_at = self._connected_at
+        self.reset()
+        self._connected_at = connected_at
+
+    def recent_failures(self, window: float = 600.0) -> List[FailureRecord]:
+        """Fallos registrados en los últimos `window` segundos"""
+        since = time.time() - window
+        return [record for record in self.history if record.timestamp >= since]
+
+    def is_flapping(self, window: float = 600.0, threshold: int = 3) -> bool:
+        """
+        Indica si el túnel cae repetidamente poco después de conectar
+
+        Args:
+            window: Intervalo a considerar en segundos
+            threshold: Número de caídas tras una conexión inestable
+        """
+        drops = [
+            record
+            for record in self.recent_failures(window)
+            if 0 < record.uptime < self.stable_after
+        ]
+        return len(drops) >= threshold
@@ -0,0 +1,72 @@
+# ilo_tunnel/socks_proxy.py
+import os
+import re
+from typing import List, Optional
+
+from .config import CONFIG_DIR
+
+# Modos de reenvío de un perfil
+FORWARD_MODE_PORTS = "ports"  # Un "-L" por cada puerto del ILO
+FORWARD_MODE_SOCKS = "socks"  # Un único "-D" (SOCKS5) para todo el gateway
+
+FORWARD_MODE_LABELS = {
+    FORWARD_MODE_PORTS: "Puertos (-L)",
+    FORWARD_MODE_SOCKS: "SOCKS5 dinámico (-D)",
+}
+
+DEFAULT_SOCKS_PORT = 1080
+
+# Destino mostrado para el reenvío dinámico en la tabla de túneles
+SOCKS_TARGET = "SOCKS5"
+
+# Directorio de los archivos PAC generados
+PAC_DIR = os.path.join(CONFIG_DIR, "pac")
+
+
+def build_pac(proxy_host: str, proxy_port: int, hosts: List[str]) -> str:
+    """
+    Genera un archivo PAC que envía por el proxy SOCKS solo los hosts indicados
+
+    Args:
+        proxy_host: IP local del proxy SOCKS
+        proxy_port: Puerto local del proxy SOCKS
+        hosts: IPs o nombres de los ILO a los que se accede por el túnel
+
+    Returns:
+        Contenido del archivo PAC
+    """
+    proxy = f"SOCKS5 {proxy_host}:{proxy_port}; SOCKS {proxy_host}:{proxy_port}"
+    conditions = " ||\n        ".join(f'host == "{host}"' for host in hosts) or "false"
+    return (
+        "function FindProxyForURL(url, host) {\n"
+        f"    if ({conditions})\n"
+        f'        return "{proxy}";\n'
+        '    return "DIRECT";\n'
+        "}\n"
+    )
+
+
+def pac_path(name: str) -> str:
+    """Ruta del archivo PAC de un proxy (el nombre se limpia para el sistema de archivos)"""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_") or "proxy"
+    return os.path.join(PAC_DIR, f"{name}.pac")
+
+
+def write_pac(
+    name: str, proxy_host: str, proxy_port: int, hosts: List[str]
+) -> Optional[str]:
+    """
+    Escribe el archivo PAC de un proxy
+
+    Returns:
+        Ruta del archivo, o None si no se pudo escribir
+    """
+    path = pac_path(name)
+    try:
+        os.makedirs(PAC_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(build_pac(proxy_host, proxy_port, hosts))
+    except OSError as e:
+        print(f"Error al escribir el archivo PAC: {e}")
+        return None
+    return path
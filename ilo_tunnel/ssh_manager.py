@@ -4,38 +4,596 @@ import platform
 import subprocess
 import signal
 import re
+import hashlib
+from collections import deque
 from typing import List, Dict, Optional, Tuple
 
 from PyQt6.QtCore import QObject, QProcess, pyqtSignal, QTimer
 
+from .config import CONFIG_DIR
+from .port_prober import PortProber, PROBE_LISTENER, PROBE_SERVICE
+from .ssh_output import LineDecoder, SshEvent, classify_line
+from .metrics import ConnectionMetrics, StartupTracker
+from .traffic import TrafficRelay, allocate_internal_port
+from .asyncssh_backend import AsyncSSHEngine, BACKEND_OPENSSH, BACKEND_ASYNCSSH
+from .local_ports import PortAllocator, needs_root, sudo_prefix
+from .socks_proxy import SOCKS_TARGET, write_pac
+from .reconnect import ReconnectPolicy, CIRCUIT_OPEN
+from .network_watcher import NetworkWatcher
+from .utils.system_utils import LocalAddressCache
+from .events import (
+    TunnelEvent,
+    ForwardState,
+    EVENT_SPAWNED,
+    EVENT_PROCESS_STARTED,
+    EVENT_AUTHENTICATED,
+    EVENT_AUTH_FAILED,
+    EVENT_HOST_KEY_FAILED,
+    EVENT_CONNECT_FAILED,
+    EVENT_FORWARD_BOUND,
+    EVENT_FORWARD_FAILED,
+    EVENT_BIND_FAILED,
+    EVENT_CHANNEL_OPEN,
+    EVENT_EXITED,
+    FORWARD_PENDING,
+    FORWARD_BOUND,
+    FORWARD_FAILED,
+)
+
+# Directorio de los sockets de control de las conexiones multiplexadas
+CONTROL_DIR = os.path.join(CONFIG_DIR, "cm")
+
+# Tiempo que se mantiene viva una conexión maestra sin túneles (ms)
+MASTER_IDLE_TIMEOUT = 60000
+
+
+def _is_debug_line(line: str) -> bool:
+    """Indica si una línea pertenece a la salida de depuración de ssh -v"""
+    return line.startswith(("debug", "OpenSSH_"))
+
+
+def build_ssh_options(config: dict) -> List[str]:
+    """
+    Genera las opciones comunes de ssh (identidad, puerto, timeouts...)
 
-class SSHManager(QObject):
+    Args:
+        config: Configuración de la conexión (key_path, ssh_port, verbose, compress,
+            identity_only, timeout)
+
+    Returns:
+        Lista de argumentos para ssh
     """
-    Gestor de túneles SSH con soporte para:
-    - Comprobación de conexiones activas
-    - Reconexión automática
-    - Comprobación de estado de los puertos
-    - Modo verbose
+    options = []
+
+    # Identidad
+    options.extend(["-i", os.path.expanduser(config["key_path"])])
+
+    # Puerto SSH
+    options.extend(["-p", str(config["ssh_port"])])
+
+    # Opciones adicionales
+    if config["verbose"]:
+        options.append("-v")
+    if config["compress"]:
+        options.append("-C")
+    if config["identity_only"]:
+        options.append("-o")
+        options.append("IdentitiesOnly=yes")
+
+    # Timeout
+    options.extend(["-o", f"ConnectTimeout={config['timeout']}"])
+
+    # Server alive options
+    options.extend(["-o", "ServerAliveInterval=15"])
+    options.extend(["-o", "ServerAliveCountMax=3"])
+
+    # No host key checking (más conveniente para ILO)
+    options.extend(["-o", "StrictHostKeyChecking=no"])
+    options.extend(["-o", "UserKnownHostsFile=/dev/null"])
+
+    return options
+
+
+def listen_mappings(config: dict) -> List[str]:
+    """
+    Mapeos de todos los puertos locales de un túnel, incluida la escucha SOCKS
+
+    El reenvío dinámico se representa como "ip:puerto:SOCKS5" para poder
+    tratarlo igual que los mapeos "-L" al reservar y comprobar puertos.
+    """
+    mappings = list(config.get("port_mappings") or [])
+    if config.get("dynamic_forward"):
+        mappings.append(f"{config['dynamic_forward']}:{SOCKS_TARGET}")
+    return mappings
+
+
+class ControlMaster(QObject):
+    """
+    Conexión SSH maestra (ControlMaster) compartida por todos los túneles
+    que usan el mismo gateway, usuario, puerto y clave.
+
+    Los reenvíos de puertos se añaden y cancelan sobre la conexión ya
+    autenticada con "ssh -O forward" / "ssh -O cancel", sin repetir el
+    handshake TCP, el intercambio de claves ni la autenticación.
     """
 
-    # Señales para comunicar con la interfaz
-    output_ready = pyqtSignal(str)
-    error_ready = pyqtSignal(str)
-    process_finished = pyqtSignal(int, str)
-    status_changed = pyqtSignal(str, bool)  # puerto, está abierto
-    connection_status = pyqtSignal(bool, str)  # conectado, mensaje
+    ready = pyqtSignal()
+    stopped = pyqtSignal(int, str)  # código, mensaje
+    output_ready = pyqtSignal(str, str)  # conexión, texto
+    error_ready = pyqtSignal(str, str)  # conexión, texto
+
+    label = "conexión maestra"  # Nombre en los mensajes de la consola
+
+    def __init__(self, key: tuple, config: dict, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self.config = dict(config)
+        self.name = f"master:{config['user']}@{config['gateway']}:{config['ssh_port']}"
+        self.control_path = os.path.join(
+            CONTROL_DIR, hashlib.sha1(repr(key).encode()).hexdigest()[:16] + ".sock"
+        )
+        self.process = None
+        self.is_ready = False
+        self.privileged = key[-1]  # Ocupa puertos privilegiados (requiere sudo)
+        self.users = set()  # Túneles que usan la conexión
+        self.control_processes = []  # Procesos "ssh -O" en curso
+        self.stdout_decoder = LineDecoder()
+        self.stderr_decoder = LineDecoder()
+
+        # Cierre diferido cuando no queda ningún túnel
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self.stop)
+
+    def start(self) -> bool:
+        """
+        Inicia la conexión maestra si no está ya en marcha
+
+        Returns:
+            True si la conexión está en marcha, False en caso contrario
+        """
+        if self.is_running():
+            return True
+
+        cmd = self._build_command()
+        self.output_ready.emit(self.name, f"Iniciando {self.label}: {' '.join(cmd)}")
+
+        self.is_ready = False
+        self.stdout_decoder = LineDecoder()
+        self.stderr_decoder = LineDecoder()
+        self.process = QProcess(self)
+        self.process.readyReadStandardOutput.connect(self._handle_stdout)
+        self.process.readyReadStandardError.connect(self._handle_stderr)
+        self.process.finished.connect(self._handle_finished)
+        self.process.start(cmd[0], cmd[1:])
+
+        return self.process.waitForStarted(5000)
+
+    def _build_command(self) -> List[str]:
+        """Genera el comando ssh de la conexión maestra"""
+        os.makedirs(CONTROL_DIR, exist_ok=True)
+
+        # Un socket huérfano de una ejecución anterior impediría la multiplexación
+        if os.path.exists(self.control_path):
+            try:
+                os.remove(self.control_path)
+            except OSError:
+                pass
+
+        cmd = self._prefix() + ["ssh", "-M", "-N", "-S", self.control_path]
+        cmd.extend(["-o", "ControlPersist=no"])
+        if not self.config["verbose"]:
+            # Necesario para detectar "Authenticated to" sin el modo verbose
+            cmd.extend(["-o", "LogLevel=VERBOSE"])
+        cmd.extend(build_ssh_options(self.config))
+        cmd.append(self.destination)
+        return cmd
+
+    def _prefix(self) -> List[str]:
+        """sudo solo si la conexión tiene que ocupar puertos privilegiados"""
+        return ["sudo"] if self.privileged else []
+
+    @property
+    def destination(self) -> str:
+        """Destino ssh de la conexión"""
+        return f"{self.config['user']}@{self.config['gateway']}"
+
+    def stop(self) -> None:
+        """Cierra la conexión maestra"""
+        self.idle_timer.stop()
+        if self.is_running():
+            self.process.terminate()
+            if not self.process.waitForFinished(3000):
+                self.process.kill()
+
+    def is_running(self) -> bool:
+        """Comprueba si el proceso maestro está en ejecución"""
+        return (
+            self.process is not None
+            and self.process.state() != QProcess.ProcessState.NotRunning
+        )
+
+    def attach(self, tunnel_id: str) -> None:
+        """Registra un túnel como usuario de la conexión"""
+        self.users.add(tunnel_id)
+        self.idle_timer.stop()
+
+    def detach(self, tunnel_id: str) -> None:
+        """Elimina un túnel de los usuarios y programa el cierre si queda libre"""
+        self.users.discard(tunnel_id)
+        if not self.users and self.is_running():
+            self.idle_timer.start(MASTER_IDLE_TIMEOUT)
+
+    def control(
+        self, operation: str, port_mappings: List[str], dynamic_forwards: List[str] = ()
+    ) -> QProcess:
+        """
+        Ejecuta de forma asíncrona una operación de control sobre la conexión
+
+        Args:
+            operation: "forward" o "cancel"
+            port_mappings: Mapeos "-L" a añadir o cancelar
+            dynamic_forwards: Escuchas SOCKS "-D" ("ip:puerto") a añadir o cancelar
+
+        Returns:
+            El proceso "ssh -O" lanzado
+        """
+        cmd = self._prefix() + ["ssh", "-S", self.control_path, "-O", operation]
+        for mapping in port_mappings:
+            cmd.extend(["-L", mapping])
+        for listen in dynamic_forwards:
+            cmd.extend(["-D", listen])
+        cmd.append(self.destination)
+
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        process.finished.connect(lambda *args, p=process: self._control_finished(p))
+        self.control_processes.append(process)
+        process.start(cmd[0], cmd[1:])
+        return process
+
+    def _control_finished(self, process: QProcess) -> None:
+        """Libera un proceso de control terminado"""
+        if process in self.control_processes:
+            self.control_processes.remove(process)
+        process.deleteLater()
+
+    def _handle_stdout(self) -> None:
+        """Procesa la salida estándar del proceso maestro"""
+        lines = self.stdout_decoder.feed(self.process.readAllStandardOutput().data())
+        if lines:
+            self.output_ready.emit(self.name, "\n".join(lines))
+
+    def _handle_stderr(self) -> None:
+        """Procesa la salida de error del proceso maestro"""
+        self._process_error_lines(
+            self.stderr_decoder.feed(self.process.readAllStandardError().data())
+        )
+
+    def _process_error_lines(self, lines: List[str]) -> None:
+        """Muestra las líneas de error y detecta la autenticación"""
+        if not lines:
+            return
+        self.error_ready.emit(self.name, "\n".join(lines))
+
+        if not self.is_ready:
+            for line in lines:
+                event = classify_line(line)
+                if event and event.kind == EVENT_AUTHENTICATED:
+                    self.is_ready = True
+                    self.ready.emit()
+                    break
+
+    def _handle_finished(
+        self, exit_code: int, exit_status: QProcess.ExitStatus
+    ) -> None:
+        """Maneja la finalización del proceso maestro"""
+        status_msg = (
+            "Finalizado normalmente"
+            if exit_status == QProcess.ExitStatus.NormalExit
+            else "Terminado inesperadamente"
+        )
+        # Entregar la última línea incompleta de cada flujo
+        rest = self.stdout_decoder.flush()
+        if rest:
+            self.output_ready.emit(self.name, rest[0])
+        self._process_error_lines(self.stderr_decoder.flush())
+
+        self.is_ready = False
+        self.idle_timer.stop()
+        self.output_ready.emit(self.name, f"Conexión cerrada: {status_msg}")
+        self.stopped.emit(exit_code, status_msg)
+
+
+class ControlMasterPool(QObject):
+    """
+    Conjunto de conexiones maestras indexadas por identidad de gateway
+    (usuario, gateway, puerto SSH y clave)
+    """
+
+    output_ready = pyqtSignal(str, str)
+    error_ready = pyqtSignal(str, str)
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.masters: Dict[tuple, ControlMaster] = {}
+
+    @staticmethod
+    def is_supported() -> bool:
+        """La multiplexación de OpenSSH no está disponible en Windows"""
+        return platform.system() != "Windows"
+
+    @staticmethod
+    def identity(config: dict) -> tuple:
+        """
+        Clave de la conexión maestra para una configuración de túnel.
+
+        Los túneles con puertos privilegiados usan una conexión lanzada con
+        sudo y los demás otra sin privilegios.
+        """
+        return (
+            config["user"],
+            config["gateway"],
+            int(config["ssh_port"]),
+            os.path.expanduser(config["key_path"]),
+            needs_root(listen_mappings(config)),
+        )
+
+    def acquire(self, tunnel_id: str, config: dict) -> Optional[ControlMaster]:
+        """
+        Obtiene (y arranca si es necesario) la conexión maestra de un túnel
+
+        Args:
+            tunnel_id: Identificador del túnel que la usará
+            config: Configuración del túnel
+
+        Returns:
+            La conexión maestra, o None si no se pudo iniciar
+        """
+        key = self.identity(config)
+        master = self.masters.get(key)
+        if master is None:
+            master = ControlMaster(key, config, self)
+            master.output_ready.connect(self.output_ready)
+            master.error_ready.connect(self.error_ready)
+            self.masters[key] = master
+
+        if not master.start():
+            return None
+
+        master.attach(tunnel_id)
+        return master
+
+    def release(self, tunnel_id: str, master: ControlMaster) -> None:
+        """Deja de usar una conexión maestra"""
+        master.detach(tunnel_id)
+
+    def stop_gateway(self, gateway: str) -> None:
+        """Cierra las conexiones maestras de un gateway"""
+        for master in list(self.masters.values()):
+            if master.config["gateway"] == gateway:
+                master.stop()
+
+    def stop_all(self) -> None:
+        """Cierra todas las conexiones maestras"""
+        for master in list(self.masters.values()):
+            master.stop()
+
+
+class SocksProxy(ControlMaster):
+    """
+    Proxy SOCKS5 ("ssh -D") compartido por todos los túneles en modo SOCKS
+    de un mismo gateway.
+
+    Una sola escucha da acceso a cualquier ILO detrás del gateway, así que
+    los túneles se registran como usuarios del proxy en lugar de abrir cada
+    uno la suya. El proxy se cierra en cuanto lo deja el último túnel.
+    """
+
+    label = "proxy SOCKS5"
+
+    def __init__(self, key: tuple, config: dict, parent=None):
+        super().__init__(key, config, parent)
+        self.name = self.proxy_name(config)
+        self.listen = config["dynamic_forward"]
+        self.privileged = needs_root([f"{self.listen}:{SOCKS_TARGET}"])
+        self.hosts: Dict[str, List[str]] = {}  # Túnel -> ILO a los que accede
+        self.pac_file: Optional[str] = None
+
+    @staticmethod
+    def proxy_name(config: dict) -> str:
+        """Nombre del proxy de un gateway (en la consola y en su archivo PAC)"""
+        return f"socks:{config['user']}@{config['gateway']}:{config['ssh_port']}"
+
+    def _build_command(self) -> List[str]:
+        """Genera el comando ssh del proxy"""
+        cmd = self._prefix() + ["ssh", "-N", "-D", self.listen]
+        cmd.extend(["-o", "ExitOnForwardFailure=yes"])
+        if not self.config["verbose"]:
+            # Necesario para detectar "Authenticated to" sin el modo verbose
+            cmd.extend(["-o", "LogLevel=VERBOSE"])
+        cmd.extend(build_ssh_options(self.config))
+        cmd.append(self.destination)
+        return cmd
+
+    def detach(self, tunnel_id: str) -> None:
+        """Elimina un túnel de los usuarios y cierra el proxy si queda libre"""
+        self.users.discard(tunnel_id)
+        self.hosts.pop(tunnel_id, None)
+        if not self.users:
+            self.stop()
+
+
+class SocksProxyPool(QObject):
+    """
+    Proxies SOCKS5 compartidos indexados por identidad de gateway (usuario,
+    gateway y puerto SSH).
+
+    Cada proxy tiene un archivo PAC que envía por él los ILO de todos los
+    túneles que lo usan, y su puerto local queda reservado a nombre del
+    proxy mientras tenga usuarios.
+    """
+
+    output_ready = pyqtSignal(str, str)
+    error_ready = pyqtSignal(str, str)
+
+    def __init__(self, port_allocator: PortAllocator, parent=None):
+        super().__init__(parent)
+        self.port_allocator = port_allocator
+        self.proxies: Dict[tuple, SocksProxy] = {}
+
+    @staticmethod
+    def identity(config: dict) -> tuple:
+        """Clave del proxy para una configuración de túnel"""
+        return (config["user"], config["gateway"], int(config["ssh_port"]))
+
+    def reserve(
+        self, tunnel_id: str, config: dict, remap_privileged: bool = False
+    ) -> Tuple[str, Dict[int, Tuple[str, int]]]:
+        """
+        Escucha del proxy que usará un túnel
+
+        Si el gateway ya tiene un proxy en uso se comparte su escucha; si no,
+        se reserva la pedida por el túnel (o una alternativa si está ocupada).
+
+        Args:
+            tunnel_id: Identificador del túnel
+            config: Configuración del túnel (con la escucha "dynamic_forward" pedida)
+            remap_privileged: Sustituir un puerto privilegiado por uno alto
+
+        Returns:
+            Tupla (escucha "ip:puerto", puerto pedido -> (ip, puerto) asignado)
+        """
+        proxy = self.proxies.get(self.identity(config))
+        if proxy is not None and proxy.users - {tunnel_id}:
+            return proxy.listen, {}
+
+        mappings, remapped = self.port_allocator.allocate(
+            SocksProxy.proxy_name(config),
+            listen_mappings({"dynamic_forward": config["dynamic_forward"]}),
+            remap_privileged,
+        )
+        return mappings[0].rsplit(":", 1)[0], remapped
+
+    def acquire(self, tunnel_id: str, config: dict) -> Optional[SocksProxy]:
+        """
+        Obtiene (y arranca si es necesario) el proxy del gateway de un túnel
+
+        Args:
+            tunnel_id: Identificador del túnel que lo usará
+            config: Configuración del túnel (escucha e ILO a los que accede)
+
+        Returns:
+            El proxy, o None si no se pudo iniciar
+        """
+        key = self.identity(config)
+        proxy = self.proxies.get(key)
+        if proxy is None or not (proxy.users or proxy.is_running()):
+            # Un proxy sin usuarios se vuelve a crear con la escucha del túnel
+            if proxy is not None:
+                proxy.deleteLater()
+            proxy = SocksProxy(key, config, self)
+            proxy.output_ready.connect(self.output_ready)
+            proxy.error_ready.connect(self.error_ready)
+            self.proxies[key] = proxy
+
+        if not proxy.start():
+            if not proxy.users:
+                self.port_allocator.release(proxy.name)
+            return None
+
+        ip, port = proxy.listen.rsplit(":", 1)
+        self.port_allocator.reserve(proxy.name, ip, int(port))
+        proxy.attach(tunnel_id)
+        proxy.hosts[tunnel_id] = list(config.get("socks_hosts") or [])
+        self._write_pac(proxy)
+        return proxy
+
+    def release(self, tunnel_id: str, proxy: SocksProxy) -> None:
+        """Deja de usar un proxy; el último túnel lo cierra y libera su puerto"""
+        proxy.detach(tunnel_id)
+        if proxy.users:
+            self._write_pac(proxy)
+        else:
+            self.port_allocator.release(proxy.name)
+
+    def _write_pac(self, proxy: SocksProxy) -> None:
+        """Escribe el archivo PAC del proxy con los ILO de todos sus túneles"""
+        hosts = list(dict.fromkeys(host for hosts in proxy.hosts.values() for host in hosts))
+        ip, port = proxy.listen.rsplit(":", 1)
+        proxy.pac_file = write_pac(proxy.name, ip, int(port), hosts)
+
+    def stop_gateway(self, gateway: str) -> None:
+        """Cierra los proxies de un gateway"""
+        for proxy in list(self.proxies.values()):
+            if proxy.config["gateway"] == gateway:
+                proxy.stop()
+
+    def stop_all(self) -> None:
+        """Cierra todos los proxies"""
+        for proxy in list(self.proxies.values()):
+            proxy.stop()
+
+
+class Tunnel(QObject):
+    """
+    Túnel SSH individual asociado a un perfil.
+
+    Cada túnel tiene su propio proceso ssh, su temporizador de reconexión,
+    sus señales de estado y su conjunto de mapeos de puertos, de forma que
+    varios túneles pueden convivir sin interferir entre sí.
+    """
+
+    # Todas las señales incluyen el identificador del túnel como primer argumento
+    output_ready = pyqtSignal(str, str)  # túnel, texto
+    error_ready = pyqtSignal(str, str)  # túnel, texto
+    process_finished = pyqtSignal(str, int, str)  # túnel, código, mensaje
+    status_changed = pyqtSignal(str, str, bool)  # túnel, puerto, está abierto
+    connection_status = pyqtSignal(str, bool, str)  # túnel, conectado, mensaje
+    tunnel_event = pyqtSignal(object)  # TunnelEvent
+
+    def __init__(
+        self,
+        tunnel_id: str,
+        master_pool: Optional[ControlMasterPool] = None,
+        traffic_relay: Optional[TrafficRelay] = None,
+        async_engine: Optional[AsyncSSHEngine] = None,
+        socks_pool: Optional[SocksProxyPool] = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.tunnel_id = tunnel_id
         self.process = None
+        self.master_pool = master_pool
+        self.traffic_relay = traffic_relay
+        self.async_engine = async_engine
+        self.socks_pool = socks_pool
+        self.async_active = False  # Reenvíos abiertos por el motor asyncssh
+        self.relays: Dict[str, int] = {}  # "ip:puerto" local -> puerto interno de ssh
+        self.remapped: Dict[int, Tuple[str, int]] = {}  # Puerto pedido -> (ip, puerto) asignado
+        self.master = None  # Conexión maestra en modo multiplexado
+        self.socks_proxy = None  # Proxy SOCKS5 compartido del gateway
+        self.connected = False
+        self.port_latency: Dict[str, deque] = {}  # Latencias recientes por puerto (ms)
+        self.stdout_decoder = LineDecoder()
+        self.stderr_decoder = LineDecoder()
+        self.events: deque = deque(maxlen=200)  # Últimos eventos de conexión
+        self.forwards: Dict[str, ForwardState] = {}  # Reenvíos por "ip:puerto" local
+        self._channels: Dict[str, ForwardState] = {}  # Canal de ssh -> reenvío
+        self._requested_port = None  # Último puerto local con conexión entrante
         self.auto_reconnect = False
+        self.reconnect_policy = ReconnectPolicy()
         self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.setSingleShot(True)
         self.reconnect_timer.timeout.connect(self._try_reconnect)
-        self.reconnect_attempts = 0
-        self.max_reconnect_attempts = 3
+
+        # La política solo olvida los fallos si la conexión se mantiene estable
+        self.stable_timer = QTimer(self)
+        self.stable_timer.setSingleShot(True)
+        self.stable_timer.timeout.connect(self.reconnect_policy.record_stable)
 
         # Guardar los últimos parámetros usados para reconexión
-        self.last_config = {
+        self.config = {
             "key_path": None,
             "ssh_port": None,
             "port_mappings": None,
@@ -45,9 +603,28 @@ class SSHManager(QObject):
             "compress": False,
             "identity_only": True,
             "timeout": 30,
+            "multiplex": False,
+            "meter_traffic": False,
+            "backend": BACKEND_OPENSSH,
+            "dynamic_forward": None,
+            "socks_hosts": [],
         }
 
-    def create_tunnel(
+    @property
+    def max_reconnect_attempts(self) -> int:
+        """Fallos seguidos antes de espaciar los reintentos al máximo"""
+        return self.reconnect_policy.max_attempts
+
+    @max_reconnect_attempts.setter
+    def max_reconnect_attempts(self, value: int) -> None:
+        self.reconnect_policy.max_attempts = value
+
+    @property
+    def port_mappings(self) -> List[str]:
+        """Mapeos de puertos del túnel"""
+        return self.config["port_mappings"] or []
+
+    def start(
         self,
         key_path: str,
         ssh_port: int,
@@ -58,9 +635,14 @@ class SSHManager(QObject):
         compress: bool = False,
         identity_only: bool = True,
         timeout: int = 30,
+        multiplex: bool = False,
+        meter_traffic: bool = False,
+        backend: str = BACKEND_OPENSSH,
+        dynamic_forward: Optional[str] = None,
+        socks_hosts: Optional[List[str]] = None,
     ) -> bool:
         """
-        Crea un túnel SSH con los parámetros especificados
+        Inicia el proceso ssh del túnel con los parámetros especificados
 
         Args:
             key_path: Ruta a la clave SSH
@@ -72,12 +654,19 @@ class SSHManager(QObject):
             compress: Usar compresión SSH
             identity_only: Usar solo la identidad especificada (sin fallback a otras claves)
             timeout: Tiempo de espera de conexión en segundos
+            multiplex: Compartir la conexión maestra del gateway (ControlMaster)
+            meter_traffic: Contar el tráfico de cada reenvío con el relé local
+            backend: Motor del túnel (BACKEND_OPENSSH o BACKEND_ASYNCSSH)
+            dynamic_forward: Escucha SOCKS5 "ip:puerto" (ssh -D) para acceder a
+                cualquier host detrás del gateway
+            socks_hosts: ILO a los que se accede por el proxy SOCKS5 (para el
+                archivo PAC)
 
         Returns:
             True si el proceso se inició correctamente, False en caso contrario
         """
         # Guardar parámetros para posible reconexión
-        self.last_config = {
+        self.config = {
             "key_path": key_path,
             "ssh_port": ssh_port,
             "port_mappings": port_mappings,
@@ -87,243 +676,491 @@ class SSHManager(QObject):
             "compress": compress,
             "identity_only": identity_only,
             "timeout": timeout,
+            "multiplex": multiplex,
+            "meter_traffic": meter_traffic,
+            "backend": backend,
+            "dynamic_forward": dynamic_forward,
+            "socks_hosts": list(socks_hosts or []),
         }
+        self._reset_forwards()
 
-        # Generar comando SSH
-        cmd = ["sudo", "ssh"]
-
-        # Identidad
-        cmd.extend(["-i", os.path.expanduser(key_path)])
-
-        # Puerto SSH
-        cmd.extend(["-p", str(ssh_port)])
-
-        # Opciones adicionales
-        if verbose:
-            cmd.append("-v")
-        if compress:
-            cmd.append("-C")
-        if identity_only:
-            cmd.append("-o")
-            cmd.append("IdentitiesOnly=yes")
-
-        # Timeout
-        cmd.extend(["-o", f"ConnectTimeout={timeout}"])
-
-        # Server alive options
-        cmd.extend(["-o", "ServerAliveInterval=15"])
-        cmd.extend(["-o", "ServerAliveCountMax=3"])
+        if backend == BACKEND_ASYNCSSH:
+            if dynamic_forward:
+                self.output_ready.emit(
+                    self.tunnel_id,
+                    "El motor asyncssh no admite el modo SOCKS, se usará OpenSSH",
+                )
+            elif self.async_engine is not None and self.async_engine.is_available():
+                # El motor cuenta el tráfico por sí mismo, sin relé
+                self._stop_relays()
+                return self._start_async()
+            self.output_ready.emit(
+                self.tunnel_id, "asyncssh no está instalado, se usará OpenSSH"
+            )
 
-        # No host key checking (más conveniente para ILO)
-        cmd.extend(["-o", "StrictHostKeyChecking=no"])
-        cmd.extend(["-o", "UserKnownHostsFile=/dev/null"])
+        if dynamic_forward and not port_mappings and self.socks_pool is not None:
+            # Solo SOCKS: se comparte el proxy del gateway con otros perfiles
+            self._stop_relays()
+            return self._start_socks()
 
-        # Add port mappings
-        for mapping in port_mappings:
-            cmd.extend(["-L", mapping])
+        self._setup_relays()
 
-        # Add destination
-        cmd.append(f"{user}@{gateway}")
+        if multiplex:
+            if self.master_pool is not None and self.master_pool.is_supported():
+                return self._start_multiplexed()
+            self.output_ready.emit(
+                self.tunnel_id,
+                "Multiplexación no disponible, se usará una conexión independiente",
+            )
 
-        self.output_ready.emit(f"Iniciando túnel SSH: {' '.join(cmd)}")
+        cmd = self._build_command()
+        self.output_ready.emit(
+            self.tunnel_id, f"Iniciando túnel SSH: {' '.join(cmd)}"
+        )
 
         # Start process
-        self.process = QProcess()
+        self.stdout_decoder = LineDecoder()
+        self.stderr_decoder = LineDecoder()
+        self.process = QProcess(self)
         self.process.readyReadStandardOutput.connect(self._handle_stdout)
         self.process.readyReadStandardError.connect(self._handle_stderr)
         self.process.finished.connect(self._handle_finished)
-
-        # imprimir comando completo
-
-        print(cmd[0], cmd[1:])
+        self.process.started.connect(
+            lambda: self._emit_event(EVENT_PROCESS_STARTED)
+        )
 
         self.process.start(cmd[0], cmd[1:])
+        self._emit_event(EVENT_SPAWNED, {"gateway": self.config["gateway"]})
 
         # Indicar que estamos conectando
-        self.connection_status.emit(False, "Conectando...")
+        self.connected = False
+        self.connection_status.emit(self.tunnel_id, False, "Conectando...")
 
         return self.process.waitForStarted(5000)  # Esperar 5 segundos máximo
 
-    def stop_tunnel(self) -> bool:
+    def _build_command(self) -> List[str]:
         """
-        Detiene el túnel SSH en ejecución
+        Genera el comando ssh a partir de la configuración del túnel
 
         Returns:
-            True si se detuvo correctamente, False en caso contrario
+            Lista con el programa y sus argumentos
         """
-        if self.process and self.process.state() != QProcess.ProcessState.NotRunning:
-            # Desactivar reconexión automática
-            self.auto_reconnect = False
-            self.reconnect_timer.stop()
-
-            # Terminar proceso
-            self.process.terminate()
+        config = self.config
+
+        # Generar comando SSH (sudo solo si algún puerto local es privilegiado)
+        mappings = self._ssh_mappings()
+        dynamic = self._ssh_dynamic()
+        cmd = sudo_prefix(listen_mappings(
+            {"port_mappings": mappings, "dynamic_forward": dynamic}
+        )) + ["ssh"]
+        cmd.extend(build_ssh_options(config))
+        if not config["verbose"]:
+            # La depuración de ssh marca cada fase de la conexión; si el modo
+            # verbose está desactivado se analiza pero no se muestra
+            cmd.append("-v")
 
-            if not self.process.waitForFinished(3000):  # Esperar 3 segundos
-                self.output_ready.emit("Forzando terminación del proceso...")
-                self.process.kill()
+        # Add port mappings
+        for mapping in mappings:
+            cmd.extend(["-L", mapping])
+        if dynamic:
+            cmd.extend(["-D", dynamic])
 
-            self.connection_status.emit(False, "Desconectado")
-            return True
+        # Add destination
+        cmd.append(f"{config['user']}@{config['gateway']}")
 
-        return False
+        return cmd
 
-    def set_auto_reconnect(self, enabled: bool, max_attempts: int = 3) -> None:
+    def _start_multiplexed(self) -> bool:
         """
-        Activa o desactiva la reconexión automática
+        Inicia el túnel sobre la conexión maestra de su gateway
 
-        Args:
-            enabled: True para activar, False para desactivar
-            max_attempts: Número máximo de intentos de reconexión
+        Returns:
+            True si la conexión maestra está en marcha, False en caso contrario
         """
-        self.auto_reconnect = enabled
-        self.max_reconnect_attempts = max_attempts
-        self.reconnect_attempts = 0
+        master = self.master_pool.acquire(self.tunnel_id, self.config)
+        if master is None:
+            self.output_ready.emit(
+                self.tunnel_id, "No se pudo iniciar la conexión maestra"
+            )
+            return False
 
-        self.output_ready.emit(
-            f"Reconexión automática {'activada' if enabled else 'desactivada'}"
-            + (f" (máx. {max_attempts} intentos)" if enabled else "")
+        self.master = master
+        master.ready.connect(self._request_forwards)
+        master.stopped.connect(self._handle_master_stopped)
+        self._emit_event(
+            EVENT_SPAWNED, {"gateway": self.config["gateway"], "master": master.name}
         )
 
-    def reconnect(self) -> bool:
+        self.connected = False
+        self.connection_status.emit(self.tunnel_id, False, "Conectando...")
+
+        # Si la conexión ya está autenticada, los reenvíos se añaden al instante
+        if master.is_ready:
+            self._request_forwards()
+        else:
+            self.output_ready.emit(
+                self.tunnel_id, f"Esperando a la conexión maestra {master.name}..."
+            )
+        return True
+
+    def _start_socks(self) -> bool:
         """
-        Intenta reconectar con los últimos parámetros usados
+        Inicia el túnel sobre el proxy SOCKS5 compartido de su gateway
 
         Returns:
-            True si se inició la reconexión, False en caso contrario
+            True si el proxy está en marcha, False en caso contrario
         """
-        # Verificar que tengamos parámetros previos
-        if not all(
-            [
-                self.last_config["key_path"],
-                self.last_config["ssh_port"],
-                self.last_config["port_mappings"],
-                self.last_config["user"],
-                self.last_config["gateway"],
-            ]
-        ):
+        proxy = self.socks_pool.acquire(self.tunnel_id, self.config)
+        if proxy is None:
+            self.output_ready.emit(self.tunnel_id, "No se pudo iniciar el proxy SOCKS5")
+            return False
+
+        self.socks_proxy = proxy
+        proxy.ready.connect(self._handle_socks_ready)
+        proxy.stopped.connect(self._handle_socks_stopped)
+        self._emit_event(
+            EVENT_SPAWNED, {"gateway": self.config["gateway"], "proxy": proxy.name}
+        )
+        if self.config["meter_traffic"]:
             self.output_ready.emit(
-                "No hay parámetros de conexión previos para reconectar"
+                self.tunnel_id, "No se mide el tráfico del proxy SOCKS5 compartido"
             )
-            return False
 
-        # Detener cualquier proceso existente
-        if self.process and self.process.state() != QProcess.ProcessState.NotRunning:
-            self.stop_tunnel()
+        self.connected = False
+        self.connection_status.emit(self.tunnel_id, False, "Conectando...")
 
-        # Reconectar
-        self.output_ready.emit("Intentando reconexión...")
-        return self.create_tunnel(
-            self.last_config["key_path"],
-            self.last_config["ssh_port"],
-            self.last_config["port_mappings"],
-            self.last_config["user"],
-            self.last_config["gateway"],
-            self.last_config["verbose"],
-            self.last_config["compress"],
-            self.last_config["identity_only"],
-            self.last_config["timeout"],
+        if proxy.is_ready:
+            self._handle_socks_ready()
+        else:
+            self.output_ready.emit(
+                self.tunnel_id, f"Esperando al proxy SOCKS5 {proxy.name}..."
+            )
+        return True
+
+    def _handle_socks_ready(self) -> None:
+        """Marca el túnel como conectado cuando el proxy está autenticado"""
+        if self.socks_proxy is None:
+            return
+
+        self._emit_event(EVENT_AUTHENTICATED, {"proxy": self.socks_proxy.name})
+        for forward in self.forwards.values():
+            self._set_forward_state(forward, FORWARD_BOUND)
+        self._mark_connected()
+        self.connection_status.emit(self.tunnel_id, True, "Conectado (SOCKS5 compartido)")
+
+    def _handle_socks_stopped(self, exit_code: int, status_msg: str) -> None:
+        """Maneja el cierre del proxy SOCKS5 que usaba el túnel"""
+        if self.socks_proxy is None:
+            return
+        self._release_socks()
+        self._handle_disconnected(exit_code, f"Proxy SOCKS5 cerrado: {status_msg}")
+
+    def _release_socks(self) -> None:
+        """Desvincula el túnel de su proxy SOCKS5"""
+        proxy, self.socks_proxy = self.socks_proxy, None
+        if proxy is None:
+            return
+        proxy.ready.disconnect(self._handle_socks_ready)
+        proxy.stopped.disconnect(self._handle_socks_stopped)
+        self.socks_pool.release(self.tunnel_id, proxy)
+
+    def _start_async(self) -> bool:
+        """
+        Abre los reenvíos del túnel con el motor asyncssh
+
+        Returns:
+            True si se solicitaron los reenvíos, False si no hay ninguno válido
+        """
+        forwards = []
+        for mapping in self.port_mappings:
+            parts = mapping.split(":")
+            if len(parts) == 4:
+                local_ip, local_port, remote_host, remote_port = parts
+                forwards.append((local_ip, int(local_port), remote_host, int(remote_port)))
+        if not forwards:
+            return False
+
+        self.output_ready.emit(
+            self.tunnel_id,
+            f"Iniciando túnel con asyncssh: {self.config['user']}@{self.config['gateway']}"
+            f":{self.config['ssh_port']} ({len(forwards)} reenvíos)",
         )
+        self.async_active = True
+        self._emit_event(
+            EVENT_SPAWNED, {"gateway": self.config["gateway"], "backend": BACKEND_ASYNCSSH}
+        )
+        self.async_engine.open_tunnel(self.tunnel_id, self.config, forwards)
+
+        self.connected = False
+        self.connection_status.emit(self.tunnel_id, False, "Conectando...")
+        return True
 
-    def check_port_status(self, port_mappings: List[str]) -> None:
+    def handle_engine_event(self, event: TunnelEvent) -> None:
         """
-        Comprueba el estado de los puertos mapeados
+        Procesa un evento del motor asyncssh
 
         Args:
-            port_mappings: Lista de mapeos de puertos en formato "local_ip:local_port:remote_host:remote_port"
+            event: Evento generado por el motor para este túnel
         """
-        for mapping in port_mappings:
-            parts = mapping.split(":")
-            if len(parts) >= 2:
-                local_ip = parts[0]
-                local_port = parts[1]
+        if not self.async_active:
+            # Evento tardío de una sesión ya detenida
+            return
+
+        if event.kind == EVENT_EXITED:
+            self.async_active = False
+            self._handle_disconnected(
+                int(event.fields.get("code", 255)), event.fields.get("reason", "")
+            )
+            return
+
+        fields = event.fields
+        if event.kind == EVENT_FORWARD_BOUND:
+            forward = self.forwards.get(fields.get("listen", ""))
+            if forward is not None:
+                forward.set_state(FORWARD_BOUND)
+        elif event.kind == EVENT_BIND_FAILED:
+            forward = self.find_forward(fields.get("port"))
+            if forward is not None:
+                forward.set_state(FORWARD_FAILED, fields.get("reason", "sin permiso o en uso"))
+        elif event.kind == EVENT_CHANNEL_OPEN:
+            forward = self.find_forward(fields.get("port"))
+            if forward is not None:
+                forward.channels += 1
+        elif event.kind == EVENT_FORWARD_FAILED:
+            forward = self.find_forward(fields.get("port"))
+            if forward is not None:
+                forward.channel_failures += 1
+                forward.detail = fields.get("reason", "")
+
+        self.events.append(event)
+        self.tunnel_event.emit(event)
+
+        if event.kind == EVENT_AUTHENTICATED:
+            self._mark_connected()
+            self.connection_status.emit(self.tunnel_id, True, "Conectado (asyncssh)")
+        else:
+            self._report_event(event.kind, fields)
+
+    def _request_forwards(self) -> None:
+        """Añade los reenvíos del túnel a la conexión maestra"""
+        if self.master is None:
+            return
+
+        self._emit_event(EVENT_AUTHENTICATED, {"master": self.master.name})
+        self.process = self.master.control(
+            "forward", self._ssh_mappings(), self._dynamic_forwards()
+        )
+        self.process.finished.connect(self._handle_forward_finished)
 
-                # Solo comprobar localhost o 127.0.0.1 por seguridad
-                if local_ip in ["127.0.0.1", "localhost"]:
-                    is_open = self._check_port_open(local_ip, int(local_port))
-                    port_name = f"{local_ip}:{local_port}"
-                    self.status_changed.emit(port_name, is_open)
+    def _handle_forward_finished(
+        self, exit_code: int, exit_status: QProcess.ExitStatus
+    ) -> None:
+        """Comprueba el resultado de la operación "ssh -O forward" """
+        output = self.process.readAll().data().decode().strip() if self.process else ""
+        self.process = None
+        if self.master is None:
+            return
 
-    def _check_port_open(self, host: str, port: int) -> bool:
+        if exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0:
+            for forward in self.forwards.values():
+                self._set_forward_state(forward, FORWARD_BOUND)
+            self._mark_connected()
+            self.output_ready.emit(
+                self.tunnel_id, f"Reenvíos añadidos a {self.master.name}"
+            )
+            self.connection_status.emit(self.tunnel_id, True, "Conectado (multiplexado)")
+        else:
+            if output:
+                self.error_ready.emit(self.tunnel_id, output)
+            for forward in self.forwards.values():
+                self._set_forward_state(forward, FORWARD_FAILED, output)
+            self._release_master()
+            self._handle_disconnected(exit_code, "Error al añadir los reenvíos")
+
+    def _handle_master_stopped(self, exit_code: int, status_msg: str) -> None:
+        """Maneja el cierre de la conexión maestra que usaba el túnel"""
+        if self.master is None:
+            return
+        self._release_master()
+        self._handle_disconnected(exit_code, f"Conexión maestra cerrada: {status_msg}")
+
+    def _release_master(self) -> None:
+        """Desvincula el túnel de su conexión maestra"""
+        master, self.master = self.master, None
+        if master is None:
+            return
+        master.ready.disconnect(self._request_forwards)
+        master.stopped.disconnect(self._handle_master_stopped)
+        self.master_pool.release(self.tunnel_id, master)
+
+    def stop(self, wait: bool = True) -> bool:
         """
-        Comprueba si un puerto está abierto
+        Detiene el proceso ssh del túnel
 
         Args:
-            host: Host donde comprobar
-            port: Puerto a comprobar
+            wait: Esperar a que el proceso termine (y forzarlo si no lo hace)
 
         Returns:
-            True si el puerto está abierto, False en caso contrario
+            True si se detuvo correctamente, False si no estaba en ejecución
         """
-        import socket
+        # Desactivar reconexión automática
+        self.auto_reconnect = False
+        self.reconnect_timer.stop()
+        self.stable_timer.stop()
 
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(1.0)
-            s.connect((host, port))
-            s.close()
+        if self.async_active:
+            self.async_active = False
+            self.async_engine.close_tunnel(self.tunnel_id)
+            self.connected = False
+            self.connection_status.emit(self.tunnel_id, False, "Desconectado")
             return True
-        except:
+
+        if self.socks_proxy is not None:
+            # Proxy compartido: se cierra solo si era el último túnel que lo usaba
+            self._release_socks()
+            self.connected = False
+            self.connection_status.emit(self.tunnel_id, False, "Desconectado")
+            return True
+
+        if self.master is not None:
+            # Modo multiplexado: cancelar los reenvíos sin cerrar la conexión maestra
+            if self.master.is_ready:
+                self.master.control(
+                    "cancel", self._ssh_mappings(), self._dynamic_forwards()
+                )
+            self._release_master()
+            self._stop_relays()
+            self.connected = False
+            self.connection_status.emit(self.tunnel_id, False, "Desconectado")
+            return True
+
+        self._stop_relays()
+        if not self.is_running():
             return False
 
-    def get_local_ip_addresses(self) -> List[str]:
+        # Terminar proceso
+        self.process.terminate()
+
+        if wait:
+            self.wait_stopped()
+
+        return True
+
+    def wait_stopped(self, msecs: int = 3000) -> None:
         """
-        Obtiene las direcciones IP locales del sistema
+        Espera a que el proceso termine, forzando su terminación si no lo hace
+
+        Args:
+            msecs: Tiempo máximo de espera en milisegundos
+        """
+        if not self.is_running():
+            return
+
+        if not self.process.waitForFinished(msecs):
+            self.output_ready.emit(
+                self.tunnel_id, "Forzando terminación del proceso..."
+            )
+            self.process.kill()
+
+        self.connected = False
+        self.connection_status.emit(self.tunnel_id, False, "Desconectado")
+
+    def set_auto_reconnect(self, enabled: bool, max_attempts: int = 3) -> None:
+        """
+        Activa o desactiva la reconexión automática del túnel
+
+        Args:
+            enabled: True para activar, False para desactivar
+            max_attempts: Fallos seguidos antes de abrir el circuito (a partir de
+                ahí se sigue reintentando con la espera máxima)
+        """
+        self.auto_reconnect = enabled
+        self.max_reconnect_attempts = max_attempts
+        self.reconnect_policy.reset()
+        if self.connected:
+            self.reconnect_policy.record_connected()
+
+        self.output_ready.emit(
+            self.tunnel_id,
+            f"Reconexión automática {'activada' if enabled else 'desactivada'}"
+            + (f" ({max_attempts} intentos rápidos)" if enabled else ""),
+        )
+
+    def pause(self) -> bool:
+        """
+        Detiene el túnel conservando la reconexión automática, para volver a
+        arrancarlo después con reconnect()
 
         Returns:
-            Lista de direcciones IP
+            True si el túnel estaba en ejecución, False en caso contrario
         """
-        import socket
+        auto_reconnect = self.auto_reconnect
+        stopped = self.stop()
+        self.auto_reconnect = auto_reconnect
+        return stopped
 
-        ips = ["127.0.0.1"]  # Siempre incluir loopback
+    def restart(self) -> bool:
+        """
+        Vuelve a arrancar el túnel sin esperar al temporizador de reconexión,
+        empezando de cero la política de reintentos
 
-        try:
-            # Método 1: Usar socket para obtener la dirección IP local
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            try:
-                # No importa si no se puede conectar realmente
-                s.connect(("10.255.255.255", 1))
-                ip = s.getsockname()[0]
-                if ip not in ips:
-                    ips.append(ip)
-            except Exception:
-                pass
-            finally:
-                s.close()
+        Returns:
+            True si se inició la reconexión, False en caso contrario
+        """
+        self.reconnect_timer.stop()
+        self.reconnect_policy.reset()
+        if self.reconnect():
+            return True
+        if self.auto_reconnect:
+            self._schedule_reconnect(-1, "No se pudo iniciar la reconexión")
+        return False
 
-            # Método 2: Obtener todas las interfaces de red
-            for family, _, _, _, sockaddr in socket.getaddrinfo("localhost", None):
-                if family == socket.AF_INET:  # Solo IPv4
-                    ip = sockaddr[0]
-                    if ip not in ips and ip != "127.0.0.1":
-                        ips.append(ip)
+    def reconnect(self) -> bool:
+        """
+        Intenta reconectar con los últimos parámetros usados
 
-            # Método 3: Uso de hostname (si los anteriores fallan)
-            try:
-                hostname = socket.gethostname()
-                host_ips = socket.gethostbyname_ex(hostname)[2]
-                for ip in host_ips:
-                    if ip not in ips and not ip.startswith("127."):
-                        ips.append(ip)
-            except Exception:
-                pass
+        Returns:
+            True si se inició la reconexión, False en caso contrario
+        """
+        # Verificar que tengamos parámetros previos
+        if not all(
+            [
+                self.config["key_path"],
+                self.config["ssh_port"],
+                self.config["port_mappings"] or self.config["dynamic_forward"],
+                self.config["user"],
+                self.config["gateway"],
+            ]
+        ):
+            self.output_ready.emit(
+                self.tunnel_id, "No hay parámetros de conexión previos para reconectar"
+            )
+            return False
 
-        except Exception as e:
-            print(f"Advertencia al detectar IPs: {e}")
-            # Asegurar que al menos tenemos loopback
-            if "127.0.0.1" not in ips:
-                ips = ["127.0.0.1"]
+        # Detener cualquier proceso existente sin perder la reconexión automática
+        if self.is_running():
+            self.pause()
 
-        # Eliminar cualquier duplicado y ordenar
-        return sorted(list(dict.fromkeys(ips)))
+        # Reconectar
+        self.output_ready.emit(self.tunnel_id, "Intentando reconexión...")
+        return self.start(**self.config)
 
-    def is_connected(self) -> bool:
+    def is_running(self) -> bool:
         """
-        Comprueba si hay un túnel SSH activo
+        Comprueba si el proceso ssh del túnel está en ejecución
 
         Returns:
-            True si hay un túnel activo, False en caso contrario
+            True si el proceso está activo, False en caso contrario
         """
+        if self.async_active:
+            return True
+
+        if self.master is not None:
+            return self.master.is_running()
+
+        if self.socks_proxy is not None:
+            return self.socks_proxy.is_running()
+
         return (
             self.process is not None
             and self.process.state() != QProcess.ProcessState.NotRunning
@@ -331,32 +1168,241 @@ class SSHManager(QObject):
 
     def _handle_stdout(self) -> None:
         """Procesa la salida estándar del proceso"""
-        if self.process:
-            data = self.process.readAllStandardOutput().data().decode()
-            self.output_ready.emit(data)
-
-            # Detectar patrones de conexión exitosa
-            if "Authenticated to" in data:
-                self.connection_status.emit(True, "Conectado")
-                self.reconnect_attempts = 0  # Resetear contador de intentos
+        if self.process and self.master is None:
+            lines = self.stdout_decoder.feed(
+                self.process.readAllStandardOutput().data()
+            )
+            self._process_lines(lines, self.output_ready)
 
     def _handle_stderr(self) -> None:
         """Procesa la salida de error del proceso"""
-        if self.process:
-            data = self.process.readAllStandardError().data().decode()
-            self.error_ready.emit(data)
-
-            # Detectar errores comunes
-            if any(
-                pattern in data
-                for pattern in [
-                    "Connection refused",
-                    "Connection timed out",
-                    "No route to host",
-                    "Host key verification failed",
-                ]
-            ):
-                self.connection_status.emit(False, "Error de conexión")
+        if self.process and self.master is None:
+            lines = self.stderr_decoder.feed(
+                self.process.readAllStandardError().data()
+            )
+            self._process_lines(lines, self.error_ready)
+
+    def _process_lines(self, lines: List[str], signal) -> None:
+        """
+        Muestra las líneas completas de un flujo y reacciona a sus eventos
+
+        Args:
+            lines: Líneas completas decodificadas
+            signal: Señal por la que se envía el texto (salida o error)
+        """
+        if not lines:
+            return
+
+        shown = lines
+        if not self.config["verbose"]:
+            shown = [line for line in lines if not _is_debug_line(line)]
+        if shown:
+            signal.emit(self.tunnel_id, "\n".join(shown))
+
+        for line in lines:
+            event = classify_line(line)
+            if event is not None:
+                self._handle_event(event)
+
+    def _emit_event(self, kind: str, fields: Optional[dict] = None, line: str = "") -> None:
+        """Registra y emite un evento de conexión con su marca de tiempo"""
+        event = TunnelEvent(self.tunnel_id, kind, fields=fields or {}, line=line)
+        self.events.append(event)
+        self.tunnel_event.emit(event)
+
+    def _reset_forwards(self) -> None:
+        """Crea el estado de los reenvíos a partir de los mapeos de puertos"""
+        self.forwards = {}
+        for mapping in self.port_mappings:
+            forward = ForwardState.from_mapping(mapping)
+            if forward is not None:
+                self.forwards[forward.listen] = forward
+        if self.config.get("dynamic_forward"):
+            listen = self.config["dynamic_forward"]
+            self.forwards[listen] = ForwardState(listen, SOCKS_TARGET)
+        self._channels = {}
+        self._requested_port = None
+
+    def _setup_relays(self) -> None:
+        """
+        Interpone el relé de tráfico en los reenvíos que lo permiten.
+
+        Los relés se mantienen entre reconexiones para no perder el puerto
+        local; si el relé no puede ocupar un puerto (privilegiado o en uso)
+        ssh escucha en él directamente y ese puerto no se mide.
+        """
+        wanted = set()
+        if self.config["meter_traffic"] and self.traffic_relay is not None:
+            wanted = set(self.forwards)
+        if set(self.relays) - wanted:
+            self._stop_relays()
+
+        for listen, forward in self.forwards.items():
+            if listen not in wanted or listen in self.relays:
+                continue
+
+            host = listen.rsplit(":", 1)[0]
+            sock = self.traffic_relay.bind(host, forward.local_port)
+            if sock is None:
+                self.output_ready.emit(
+                    self.tunnel_id,
+                    f"No se puede medir el tráfico de {listen}: ssh escuchará directamente",
+                )
+                continue
+
+            internal_port = allocate_internal_port()
+            self.traffic_relay.start(self.tunnel_id, sock, forward.local_port, internal_port)
+            self.relays[listen] = internal_port
+
+    def _stop_relays(self) -> None:
+        """Cierra los relés de tráfico del túnel"""
+        if self.relays:
+            self.traffic_relay.stop(self.tunnel_id)
+            self.relays = {}
+
+    def _ssh_mappings(self) -> List[str]:
+        """Mapeos para ssh, con los puertos internos de los reenvíos con relé"""
+        mappings = []
+        for mapping in self.port_mappings:
+            local_ip, local_port, target = mapping.split(":", 2)
+            internal_port = self.relays.get(f"{local_ip}:{local_port}")
+            if internal_port is not None:
+                mapping = f"127.0.0.1:{internal_port}:{target}"
+            mappings.append(mapping)
+        return mappings
+
+    def local_endpoint(self, local_ip: str, port: int) -> Tuple[str, int]:
+        """
+        Dirección en la que el usuario accede a un puerto pedido
+
+        Args:
+            local_ip: IP local pedida
+            port: Puerto local pedido (antes de reasignar)
+
+        Returns:
+            Tupla (ip, puerto) realmente ocupada por el túnel
+        """
+        return self.remapped.get(port, (local_ip, port))
+
+    def requested_port(self, local_port: int) -> int:
+        """Puerto pedido originalmente para un puerto local asignado"""
+        for port, (_, assigned) in self.remapped.items():
+            if assigned == local_port:
+                return port
+        return local_port
+
+    def _ssh_dynamic(self) -> Optional[str]:
+        """Escucha SOCKS para ssh, con el puerto interno si tiene relé"""
+        listen = self.config.get("dynamic_forward")
+        if listen and listen in self.relays:
+            return f"127.0.0.1:{self.relays[listen]}"
+        return listen
+
+    def _dynamic_forwards(self) -> List[str]:
+        """Escuchas SOCKS para las operaciones de control de la conexión maestra"""
+        dynamic = self._ssh_dynamic()
+        return [dynamic] if dynamic else []
+
+    def ssh_listen_port(self, local_ip: str, local_port: int) -> Tuple[str, int]:
+        """Dirección en la que escucha ssh para un puerto local del usuario"""
+        internal_port = self.relays.get(f"{local_ip}:{local_port}")
+        if internal_port is not None:
+            return "127.0.0.1", internal_port
+        return local_ip, local_port
+
+    def find_forward(self, local_port) -> Optional[ForwardState]:
+        """Busca el reenvío de un puerto local (o del puerto interno de su relé)"""
+        try:
+            local_port = int(local_port)
+        except (TypeError, ValueError):
+            return None
+        for listen, internal_port in self.relays.items():
+            if internal_port == local_port:
+                return self.forwards.get(listen)
+        for forward in self.forwards.values():
+            if forward.local_port == local_port:
+                return forward
+        return None
+
+    def _set_forward_state(self, forward: ForwardState, state: str, detail: str = "") -> None:
+        """Cambia el estado de un reenvío y emite el evento correspondiente"""
+        if forward.state == state:
+            return
+        forward.set_state(state, detail)
+        kind = EVENT_FORWARD_BOUND if state == FORWARD_BOUND else EVENT_FORWARD_FAILED
+        if state != FORWARD_PENDING:
+            self._emit_event(kind, {"listen": forward.listen, "detail": detail})
+
+    def mark_forward_listening(self, local_port: int, is_open: bool) -> None:
+        """
+        Usa una comprobación de puerto para confirmar un reenvío
+
+        Sin el modo verbose ssh no informa de los reenvíos abiertos, así que un
+        puerto local que acepta conexiones se considera enlazado.
+        """
+        forward = self.find_forward(local_port)
+        if forward is not None and is_open and forward.state == FORWARD_PENDING:
+            self._set_forward_state(forward, FORWARD_BOUND, "puerto local en escucha")
+
+    def _update_forwards(self, event: SshEvent) -> None:
+        """Actualiza el estado de los reenvíos según un evento de ssh"""
+        fields = event.fields
+        if event.kind == EVENT_FORWARD_BOUND:
+            port = fields.get("port") or fields.get("listen", "").rsplit(":", 1)[-1]
+            forward = self.find_forward(port)
+            if forward is not None:
+                forward.set_state(FORWARD_BOUND)
+        elif event.kind == EVENT_BIND_FAILED:
+            forward = self.find_forward(fields.get("port") or fields.get("listen_port"))
+            if forward is not None:
+                forward.set_state(FORWARD_FAILED, fields.get("reason", "sin permiso o en uso"))
+        elif event.kind == EVENT_CHANNEL_OPEN:
+            if "port" in fields:
+                # "Connection to port X forwarding to ..." precede al canal nuevo
+                self._requested_port = fields["port"]
+            elif fields.get("type") == "direct-tcpip":
+                forward = self.find_forward(self._requested_port)
+                if forward is not None:
+                    forward.channels += 1
+                    self._channels[fields["channel"]] = forward
+        elif event.kind == EVENT_FORWARD_FAILED and "channel" in fields:
+            # El gateway no pudo conectar con el ILO a través de este reenvío
+            forward = self._channels.pop(fields["channel"], None)
+            if forward is not None:
+                forward.channel_failures += 1
+                forward.detail = fields.get("reason", "")
+
+    def _handle_event(self, event: SshEvent) -> None:
+        """Actualiza el estado del túnel según un evento de la salida de ssh"""
+        self._update_forwards(event)
+        self._emit_event(event.kind, event.fields, event.line)
+
+        if event.kind == EVENT_AUTHENTICATED:
+            self._mark_connected()
+            self.connection_status.emit(self.tunnel_id, True, "Conectado")
+        else:
+            self._report_event(event.kind, event.fields)
+
+    def _report_event(self, kind: str, fields: dict) -> None:
+        """Notifica los errores de conexión como cambio de estado del túnel"""
+        if kind == EVENT_CONNECT_FAILED:
+            self.connection_status.emit(self.tunnel_id, False, "Error de conexión")
+        elif kind == EVENT_HOST_KEY_FAILED:
+            self.connection_status.emit(
+                self.tunnel_id, False, "Error de verificación de clave de host"
+            )
+        elif kind == EVENT_AUTH_FAILED:
+            self.connection_status.emit(self.tunnel_id, False, "Error de autenticación")
+        elif kind == EVENT_BIND_FAILED:
+            port = fields.get("port") or fields.get("listen_port", "")
+            self.connection_status.emit(
+                self.tunnel_id, False, f"No se pudo abrir el puerto local {port}".strip()
+            )
+        elif kind == EVENT_FORWARD_FAILED:
+            reason = fields.get("reason", "")
+            self.connection_status.emit(
+                self.tunnel_id, False, f"Reenvío fallido {reason}".strip()
+            )
 
     def _handle_finished(
         self, exit_code: int, exit_status: QProcess.ExitStatus
@@ -368,6 +1414,11 @@ class SSHManager(QObject):
             exit_code: Código de salida
             exit_status: Estado de salida (normal o crash)
         """
+        # Entregar la última línea incompleta de cada flujo
+        if self.master is None:
+            self._process_lines(self.stdout_decoder.flush(), self.output_ready)
+            self._process_lines(self.stderr_decoder.flush(), self.error_ready)
+
         # Determinar mensaje según el código de salida
         status_msg = (
             "Finalizado normalmente"
@@ -375,33 +1426,566 @@ class SSHManager(QObject):
             else "Terminado inesperadamente"
         )
 
+        self._handle_disconnected(exit_code, status_msg)
+
+    def _handle_disconnected(self, exit_code: int, status_msg: str) -> None:
+        """
+        Notifica la desconexión del túnel y programa la reconexión automática
+
+        Args:
+            exit_code: Código de salida
+            status_msg: Motivo de la desconexión
+        """
         # Enviar señal
-        self.process_finished.emit(exit_code, status_msg)
-        self.connection_status.emit(False, f"Desconectado ({status_msg})")
+        self.connected = False
+        self.stable_timer.stop()
+        for forward in self.forwards.values():
+            forward.set_state(FORWARD_PENDING)
+        self._emit_event(EVENT_EXITED, {"code": str(exit_code), "reason": status_msg})
+        self.process_finished.emit(self.tunnel_id, exit_code, status_msg)
+        self.connection_status.emit(
+            self.tunnel_id, False, f"Desconectado ({status_msg})"
+        )
 
         # Intentar reconexión automática si está activada
-        if (
-            self.auto_reconnect
-            and self.reconnect_attempts < self.max_reconnect_attempts
-        ):
-            # Iniciar timer para reconexión (esperar 5 segundos)
-            self.reconnect_timer.start(5000)
+        if self.auto_reconnect:
+            self._schedule_reconnect(exit_code, status_msg)
+
+    def _mark_connected(self) -> None:
+        """Marca el túnel como conectado y empieza a medir su estabilidad"""
+        self.connected = True
+        self.reconnect_policy.record_connected()
+        self.stable_timer.start(int(self.reconnect_policy.stable_after * 1000))
+
+    def _schedule_reconnect(self, exit_code: int, status_msg: str) -> None:
+        """Registra el fallo en la política y programa el siguiente intento"""
+        delay = self.reconnect_policy.record_failure(exit_code, status_msg)
+        if self.reconnect_policy.state == CIRCUIT_OPEN:
+            message = (
+                f"Demasiados fallos seguidos ({self.reconnect_policy.failures}); "
+                f"siguiente intento en {delay:.0f} s"
+            )
+            self.connection_status.emit(
+                self.tunnel_id, False, f"Desconectado (reintento en {delay:.0f} s)"
+            )
+        else:
+            message = f"Reconexión en {delay:.1f} s"
+        self.output_ready.emit(self.tunnel_id, message)
+        self.reconnect_timer.start(int(delay * 1000))
 
     def _try_reconnect(self) -> None:
         """Intenta reconectar automáticamente después de una desconexión"""
-        self.reconnect_timer.stop()
-        self.reconnect_attempts += 1
+        self.reconnect_policy.record_attempt()
 
         self.output_ready.emit(
-            f"Intento de reconexión {self.reconnect_attempts}/{self.max_reconnect_attempts}..."
+            self.tunnel_id,
+            f"Intento de reconexión {self.reconnect_policy.failures}...",
         )
 
         if not self.reconnect():
-            if self.reconnect_attempts < self.max_reconnect_attempts:
-                # Aumentar el tiempo de espera en cada intento fallido (5s, 10s, 15s...)
-                self.reconnect_timer.start(5000 * self.reconnect_attempts)
-            else:
-                self.output_ready.emit(
-                    "Se alcanzó el número máximo de intentos de reconexión"
+            self._schedule_reconnect(-1, "No se pudo iniciar la reconexión")
+
+
+class SSHManager(QObject):
+    """
+    Gestor de túneles SSH con soporte para:
+    - Varios túneles simultáneos, uno por perfil
+    - Comprobación de conexiones activas
+    - Reconexión automática
+    - Comprobación de estado de los puertos
+    - Modo verbose
+    """
+
+    # Señales para comunicar con la interfaz (el primer argumento es el túnel)
+    output_ready = pyqtSignal(str, str)
+    error_ready = pyqtSignal(str, str)
+    process_finished = pyqtSignal(str, int, str)
+    status_changed = pyqtSignal(str, str, bool)  # túnel, puerto, está abierto
+    probe_result = pyqtSignal(str, str, object)  # túnel, puerto, ProbeResult
+    connection_status = pyqtSignal(str, bool, str)  # túnel, conectado, mensaje
+    tunnel_event = pyqtSignal(object)  # TunnelEvent
+    startup_recorded = pyqtSignal(object)  # StartupSample
+    tunnel_added = pyqtSignal(str)
+    tunnel_removed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Registro de túneles indexado por identificador de perfil
+        self.tunnels: Dict[str, Tunnel] = {}
+
+        # Conexiones maestras compartidas por gateway (modo multiplexado)
+        self.master_pool = ControlMasterPool(self)
+        self.master_pool.output_ready.connect(self.output_ready)
+        self.master_pool.error_ready.connect(self.error_ready)
+
+        # Comprobación de puertos en segundo plano
+        self.port_prober = PortProber(parent=self)
+        self.port_prober.sweep_finished.connect(self._handle_probe_results)
+
+        # Tiempos de arranque por fase
+        self.metrics = ConnectionMetrics()
+        self.startup_trackers: Dict[str, StartupTracker] = {}
+        self.tunnel_event.connect(self._record_startup)
+
+        # Puertos locales reservados por cada túnel
+        self.port_allocator = PortAllocator()
+
+        # Proxies SOCKS5 compartidos por gateway (modo de reenvío dinámico)
+        self.socks_pool = SocksProxyPool(self.port_allocator, self)
+        self.socks_pool.output_ready.connect(self.output_ready)
+        self.socks_pool.error_ready.connect(self.error_ready)
+
+        # Contadores de tráfico por reenvío
+        self.traffic_relay = TrafficRelay()
+
+        # Motor en proceso (asyncssh), compartido por todos los túneles
+        self.async_engine = AsyncSSHEngine(self.traffic_relay, self)
+        self.async_engine.tunnel_event.connect(self._route_engine_event)
+        self.async_engine.output_ready.connect(self.output_ready)
+        self.async_engine.error_ready.connect(self.error_ready)
+
+        # Reinicio de los túneles al cambiar la red (Wi-Fi, VPN...)
+        self.network_watcher = NetworkWatcher(parent=self)
+        self.network_watcher.route_changed.connect(self._handle_route_change)
+        self.tunnel_added.connect(self._update_watched_gateways)
+        self.tunnel_removed.connect(self._update_watched_gateways)
+
+        # IPs locales (sin DNS, en caché y refrescadas en segundo plano)
+        self.local_addresses = LocalAddressCache(parent=self)
+        self.network_watcher.route_changed.connect(self.local_addresses.refresh)
+
+        # Valores por defecto para los túneles nuevos
+        self.auto_reconnect = False
+        self.max_reconnect_attempts = 3  # Intentos rápidos antes de abrir el circuito
+
+    def create_tunnel(
+        self,
+        tunnel_id: str,
+        key_path: str,
+        ssh_port: int,
+        port_mappings: List[str],
+        user: str,
+        gateway: str,
+        verbose: bool = False,
+        compress: bool = False,
+        identity_only: bool = True,
+        timeout: int = 30,
+        multiplex: bool = False,
+        meter_traffic: bool = False,
+        backend: str = BACKEND_OPENSSH,
+        remap_privileged: bool = False,
+        dynamic_forward: Optional[str] = None,
+        socks_hosts: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Crea (o reinicia) el túnel SSH de un perfil con los parámetros especificados
+
+        Args:
+            tunnel_id: Identificador del túnel (normalmente el perfil)
+            key_path: Ruta a la clave SSH
+            ssh_port: Puerto SSH
+            port_mappings: Lista de mapeos de puertos en formato "local_ip:local_port:remote_host:remote_port"
+            user: Nombre de usuario SSH
+            gateway: Dirección del gateway
+            verbose: Mostrar mensajes detallados de SSH
+            compress: Usar compresión SSH
+            identity_only: Usar solo la identidad especificada (sin fallback a otras claves)
+            timeout: Tiempo de espera de conexión en segundos
+            multiplex: Compartir una conexión maestra por gateway (ControlMaster)
+            meter_traffic: Contar bytes y conexiones de cada reenvío
+            backend: Motor del túnel; si asyncssh no está instalado se usa OpenSSH
+            remap_privileged: Escuchar en puertos altos libres en lugar de los
+                puertos privilegiados, para no necesitar sudo
+            dynamic_forward: Escucha SOCKS5 "ip:puerto" (ssh -D); sin mapeos
+                de puertos se comparte con los demás túneles del gateway
+            socks_hosts: ILO a los que se accede por el proxy SOCKS5 (para el
+                archivo PAC del gateway)
+
+        Returns:
+            True si el proceso se inició correctamente, False en caso contrario
+        """
+        tunnel = self.tunnels.get(tunnel_id)
+        if tunnel is None:
+            tunnel = self._register_tunnel(tunnel_id)
+        elif tunnel.is_running():
+            tunnel.stop()
+
+        # Cada creación del túnel es una sesión nueva de contadores
+        self.traffic_relay.reset(tunnel_id)
+
+        if dynamic_forward and not port_mappings:
+            # Un único proxy SOCKS5 por gateway: si ya existe se usa su escucha
+            self.port_allocator.release(tunnel_id)
+            dynamic_forward, tunnel.remapped = self.socks_pool.reserve(
+                tunnel_id,
+                {
+                    "user": user,
+                    "gateway": gateway,
+                    "ssh_port": ssh_port,
+                    "dynamic_forward": dynamic_forward,
+                },
+                remap_privileged,
+            )
+        else:
+            # Reservar los puertos locales antes de lanzar ssh para evitar
+            # errores "Address already in use" entre túneles simultáneos
+            mappings, tunnel.remapped = self.port_allocator.allocate(
+                tunnel_id,
+                listen_mappings(
+                    {"port_mappings": port_mappings, "dynamic_forward": dynamic_forward}
+                ),
+                remap_privileged,
+            )
+            if dynamic_forward:
+                dynamic_forward = mappings.pop().rsplit(":", 1)[0]
+            port_mappings = mappings
+        for port, (ip, assigned) in tunnel.remapped.items():
+            self.output_ready.emit(
+                tunnel_id, f"Puerto local {port} reasignado a {ip}:{assigned}"
+            )
+
+        started = tunnel.start(
+            key_path,
+            ssh_port,
+            port_mappings,
+            user,
+            gateway,
+            verbose,
+            compress,
+            identity_only,
+            timeout,
+            multiplex,
+            meter_traffic,
+            backend,
+            dynamic_forward,
+            socks_hosts,
+        )
+        self._update_watched_gateways()
+        return started
+
+    def _register_tunnel(self, tunnel_id: str) -> Tunnel:
+        """
+        Crea un túnel nuevo, reenvía sus señales y lo añade al registro
+
+        Args:
+            tunnel_id: Identificador del túnel
+
+        Returns:
+            El túnel creado
+        """
+        tunnel = Tunnel(
+            tunnel_id,
+            self.master_pool,
+            self.traffic_relay,
+            self.async_engine,
+            self.socks_pool,
+            self,
+        )
+        tunnel.auto_reconnect = self.auto_reconnect
+        tunnel.max_reconnect_attempts = self.max_reconnect_attempts
+
+        tunnel.output_ready.connect(self.output_ready)
+        tunnel.error_ready.connect(self.error_ready)
+        tunnel.process_finished.connect(self.process_finished)
+        tunnel.status_changed.connect(self.status_changed)
+        tunnel.connection_status.connect(self.connection_status)
+        tunnel.tunnel_event.connect(self.tunnel_event)
+
+        self.tunnels[tunnel_id] = tunnel
+        self.tunnel_added.emit(tunnel_id)
+        return tunnel
+
+    def stop_tunnel(self, tunnel_id: str) -> bool:
+        """
+        Detiene un túnel SSH y lo elimina del registro
+
+        Args:
+            tunnel_id: Identificador del túnel
+
+        Returns:
+            True si el túnel estaba en ejecución y se detuvo, False en caso contrario
+        """
+        tunnel = self.tunnels.pop(tunnel_id, None)
+        if tunnel is None:
+            return False
+
+        stopped = tunnel.stop()
+        self.port_allocator.release(tunnel_id)
+        tunnel.deleteLater()
+        self.tunnel_removed.emit(tunnel_id)
+        return stopped
+
+    def _update_watched_gateways(self, *args) -> None:
+        """Vigila la ruta hacia los gateways de los túneles registrados"""
+        self.network_watcher.set_gateways(
+            tunnel.config["gateway"] for tunnel in self.tunnels.values()
+        )
+
+    def _handle_route_change(self, gateway: str, old_source: str, new_source: str) -> None:
+        """
+        Reinicia los túneles de un gateway cuando cambia la ruta hacia él
+
+        Las conexiones TCP de ssh quedan muertas al cambiar la IP de origen;
+        en lugar de esperar a ServerAliveInterval se cierran y se abren de
+        nuevo en cuanto se detecta el cambio.
+        """
+        affected = [
+            tunnel
+            for tunnel in self.tunnels.values()
+            if tunnel.config["gateway"] == gateway
+            and (tunnel.is_running() or tunnel.reconnect_timer.isActive())
+        ]
+        if not affected:
+            return
+
+        for tunnel in affected:
+            self.output_ready.emit(
+                tunnel.tunnel_id,
+                f"Cambio de red detectado ({old_source} → {new_source}): reiniciando el túnel",
+            )
+            tunnel.pause()
+
+        # Las conexiones maestras, los proxies SOCKS5 y las del motor asyncssh
+        # también están muertas
+        self.master_pool.stop_gateway(gateway)
+        self.socks_pool.stop_gateway(gateway)
+
+        for tunnel in affected:
+            tunnel.restart()
+
+    def set_network_watch(self, enabled: bool) -> None:
+        """Activa o desactiva el reinicio de los túneles al cambiar la red"""
+        self.network_watcher.set_enabled(enabled)
+
+    def _route_engine_event(self, event: TunnelEvent) -> None:
+        """Entrega un evento del motor asyncssh a su túnel"""
+        tunnel = self.tunnels.get(event.tunnel_id)
+        if tunnel is not None:
+            tunnel.handle_engine_event(event)
+
+    def _record_startup(self, event: TunnelEvent) -> None:
+        """Mide las fases de arranque de un túnel a partir de sus eventos"""
+        tunnel = self.tunnels.get(event.tunnel_id)
+        if tunnel is None:
+            self.startup_trackers.pop(event.tunnel_id, None)
+            return
+
+        tracker = self.startup_trackers.setdefault(event.tunnel_id, StartupTracker())
+        phases = tracker.feed(event)
+        if phases:
+            sample = self.metrics.record(
+                event.tunnel_id, tunnel.config["gateway"] or "", phases
+            )
+            self.startup_recorded.emit(sample)
+
+    def stop_all_tunnels(self) -> int:
+        """
+        Detiene todos los túneles registrados
+
+        Returns:
+            Número de túneles que estaban en ejecución
+        """
+        tunnels = list(self.tunnels.items())
+        self.tunnels.clear()
+
+        # Enviar la señal de terminación a todos antes de esperar a ninguno
+        stopped = [tunnel for _, tunnel in tunnels if tunnel.stop(wait=False)]
+        for tunnel in stopped:
+            tunnel.wait_stopped()
+
+        for tunnel_id, tunnel in tunnels:
+            self.port_allocator.release(tunnel_id)
+            tunnel.deleteLater()
+            self.tunnel_removed.emit(tunnel_id)
+
+        # Sin túneles no hace falta mantener las conexiones maestras
+        self.master_pool.stop_all()
+        self.socks_pool.stop_all()
+        self.async_engine.shutdown()
+
+        return len(stopped)
+
+    def shutdown(self) -> None:
+        """
+        Detiene los túneles y todos los hilos y temporizadores de fondo
+
+        Se llama al salir de la aplicación, haya o no túneles activos: las
+        conexiones maestras sobreviven a los túneles que las usaban.
+        """
+        self.stop_all_tunnels()
+        self.port_prober.shutdown()
+        self.network_watcher.shutdown()
+        self.local_addresses.shutdown()
+        self.traffic_relay.shutdown()
+
+    def get_tunnel(self, tunnel_id: str) -> Optional[Tunnel]:
+        """Obtiene un túnel del registro por su identificador"""
+        return self.tunnels.get(tunnel_id)
+
+    def get_tunnel_ids(self) -> List[str]:
+        """Obtiene los identificadores de todos los túneles registrados"""
+        return list(self.tunnels.keys())
+
+    def get_active_tunnel_ids(self) -> List[str]:
+        """Obtiene los identificadores de los túneles en ejecución"""
+        return [
+            tunnel_id
+            for tunnel_id, tunnel in self.tunnels.items()
+            if tunnel.is_running()
+        ]
+
+    def set_auto_reconnect(
+        self, enabled: bool, max_attempts: int = 3, tunnel_id: Optional[str] = None
+    ) -> None:
+        """
+        Activa o desactiva la reconexión automática
+
+        Args:
+            enabled: True para activar, False para desactivar
+            max_attempts: Número máximo de intentos de reconexión
+            tunnel_id: Túnel al que aplicar el cambio (None para los túneles nuevos)
+        """
+        if tunnel_id is None:
+            self.auto_reconnect = enabled
+            self.max_reconnect_attempts = max_attempts
+            return
+
+        tunnel = self.tunnels.get(tunnel_id)
+        if tunnel:
+            tunnel.set_auto_reconnect(enabled, max_attempts)
+
+    def reconnect(self, tunnel_id: str) -> bool:
+        """
+        Intenta reconectar un túnel con sus últimos parámetros
+
+        Args:
+            tunnel_id: Identificador del túnel
+
+        Returns:
+            True si se inició la reconexión, False en caso contrario
+        """
+        tunnel = self.tunnels.get(tunnel_id)
+        if tunnel is None:
+            return False
+        return tunnel.reconnect()
+
+    def check_port_status(
+        self, tunnel_id: str, ports: Optional[List[int]] = None
+    ) -> bool:
+        """
+        Comprueba el estado de los puertos mapeados de un túnel
+
+        Args:
+            tunnel_id: Identificador del túnel
+            ports: Puertos locales a comprobar (None para todos los del túnel)
+
+        Returns:
+            True si se lanzó la comprobación, False en caso contrario
+        """
+        return self.check_ports_status({tunnel_id: ports})
+
+    def check_ports_status(self, tunnel_ports: Dict[str, Optional[List[int]]]) -> bool:
+        """
+        Comprueba en segundo plano y a la vez los puertos de varios túneles.
+
+        Los resultados se notifican mediante la señal status_changed. Si la
+        comprobación anterior aún no ha terminado no se lanza otra.
+
+        Args:
+            tunnel_ports: Diccionario túnel -> puertos locales a comprobar
+                (None para todos los del túnel)
+
+        Returns:
+            True si se lanzó la comprobación, False en caso contrario
+        """
+        checks = []  # (túnel, nombre del puerto, (host, puerto))
+        for tunnel_id, ports in tunnel_ports.items():
+            tunnel = self.tunnels.get(tunnel_id)
+            if tunnel is None:
+                continue
+
+            for mapping in listen_mappings(tunnel.config):
+                parts = mapping.split(":")
+                if len(parts) >= 2:
+                    local_ip = parts[0]
+                    local_port = int(parts[1])
+
+                    if ports is not None and local_port not in ports:
+                        continue
+
+                    remote_port = int(parts[3]) if len(parts) >= 4 else local_port
+
+                    # Solo comprobar loopback por seguridad (incluye los alias 127.0.0.x)
+                    if local_ip == "localhost" or local_ip.startswith("127."):
+                        port_name = f"{local_ip}:{local_port}"
+                        # Con relé se comprueba el puerto de ssh, no el del relé
+                        host, port = tunnel.ssh_listen_port(local_ip, local_port)
+                        checks.append((tunnel_id, port_name, (host, port, remote_port)))
+
+        if not checks:
+            return False
+
+        return self.port_prober.probe([target for _, _, target in checks], checks)
+
+    def set_probe_mode(self, end_to_end: bool) -> None:
+        """
+        Selecciona cómo se comprueban los puertos
+
+        Args:
+            end_to_end: True para comprobar el servicio del ILO a través del
+                reenvío (TLS, HTTP, banner SSH), False para comprobar solo
+                que el puerto local de ssh acepta conexiones
+        """
+        self.port_prober.mode = PROBE_SERVICE if end_to_end else PROBE_LISTENER
+
+    def _handle_probe_results(self, checks: list, results: dict) -> None:
+        """
+        Notifica el resultado de una comprobación de puertos
+
+        Args:
+            checks: Lista de (túnel, nombre del puerto, (host, puerto, remoto)) comprobados
+            results: Diccionario (host, puerto) -> ProbeResult
+        """
+        for tunnel_id, port_name, (host, port, _) in checks:
+            # El túnel puede haberse detenido mientras se comprobaba
+            tunnel = self.tunnels.get(tunnel_id)
+            result = results.get((host, port))
+            if tunnel is None or result is None:
+                continue
+
+            if result.latency_ms is not None:
+                tunnel.port_latency.setdefault(port_name, deque(maxlen=60)).append(
+                    result.latency_ms
                 )
-                self.connection_status.emit(False, "Desconectado (max. intentos)")
+
+            tunnel.mark_forward_listening(port, result.is_open)
+            self.probe_result.emit(tunnel_id, port_name, result)
+            self.status_changed.emit(tunnel_id, port_name, result.is_open)
+
+    def get_local_ip_addresses(self) -> List[str]:
+        """
+        Obtiene las direcciones IP locales del sistema
+
+        La lista se guarda en caché y se refresca en segundo plano; los
+        cambios se notifican con local_addresses.addresses_changed.
+
+        Returns:
+            Lista de direcciones IP
+        """
+        return self.local_addresses.get()
+
+    def is_connected(self, tunnel_id: Optional[str] = None) -> bool:
+        """
+        Comprueba si hay un túnel SSH activo
+
+        Args:
+            tunnel_id: Túnel a comprobar (None para comprobar si hay alguno activo)
+
+        Returns:
+            True si el túnel (o alguno, si no se indica) está activo, False en caso contrario
+        """
+        if tunnel_id is None:
+            return any(tunnel.is_running() for tunnel in self.tunnels.values())
+
+        tunnel = self.tunnels.get(tunnel_id)
+        return tunnel is not None and tunnel.is_running()
@@ -0,0 +1,173 @@
+# ilo_tunnel/ssh_output.py
+import codecs
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .events import (
+    EVENT_CONNECTING,
+    EVENT_TCP_CONNECTED,
+    EVENT_KEX_DONE,
+    EVENT_AUTH_METHOD,
+    EVENT_AUTHENTICATED,
+    EVENT_AUTH_FAILED,
+    EVENT_HOST_KEY_FAILED,
+    EVENT_CONNECT_FAILED,
+    EVENT_FORWARD_BOUND,
+    EVENT_FORWARD_FAILED,
+    EVENT_BIND_FAILED,
+    EVENT_CHANNEL_OPEN,
+    EVENT_DISCONNECT,
+)
+
+# Patrón de cada tipo de evento. Los grupos internos llevan como prefijo el
+# nombre del evento porque los nombres de grupo no pueden repetirse.
+_PATTERNS = [
+    (
+        "connecting",
+        r"Connecting to (?P<connecting_host>\S+) \[(?P<connecting_address>[^\]]+)\]"
+        r" port (?P<connecting_port>\d+)",
+    ),
+    (
+        "tcp_connected",
+        r"Connection established",
+    ),
+    (
+        "kex_done",
+        r"SSH2_MSG_NEWKEYS received",
+    ),
+    (
+        "auth_method",
+        r"Next authentication method: (?P<auth_method_method>\S+)",
+    ),
+    (
+        "authenticated",
+        r"Authenticated to (?P<authenticated_host>\S+)(?: \(\S+\))?"
+        r'(?: using "(?P<authenticated_method>[^"]+)")?',
+    ),
+    (
+        "auth_failed",
+        r"Permission denied \((?P<auth_failed_methods>[^)]*)\)"
+        r"|Too many authentication failures",
+    ),
+    (
+        "host_key_failed",
+        r"Host key verification failed",
+    ),
+    (
+        "connect_failed",
+        r"connect to host (?P<connect_failed_host>\S+) port (?P<connect_failed_port>\d+):"
+        r" (?P<connect_failed_reason>.+)"
+        r"|Could not resolve hostname (?P<connect_failed_name>[^:\s]+)",
+    ),
+    (
+        "forward_bound",
+        r"Local connections to (?P<forward_bound_listen>\S+) forwarded to remote"
+        r" address (?P<forward_bound_target>\S+)"
+        r"|Local forwarding listening on (?P<forward_bound_address>\S+)"
+        r" port (?P<forward_bound_port>\d+)",
+    ),
+    (
+        "forward_failed",
+        r"channel (?P<forward_failed_channel>\d+): open failed: (?P<forward_failed_reason>.+)"
+        r"|Could not request local forwarding",
+    ),
+    (
+        "bind_failed",
+        r"bind \[?(?P<bind_failed_address>[^\]\s]*)\]?:(?P<bind_failed_port>\d+):"
+        r" (?P<bind_failed_reason>.+)"
+        r"|cannot listen to port: (?P<bind_failed_listen_port>\d+)"
+        r"|bind: (?P<bind_failed_error>.+)",
+    ),
+    (
+        "channel_open",
+        r"Connection to port (?P<channel_open_port>\d+) forwarding to"
+        r" (?P<channel_open_host>\S+) port (?P<channel_open_remote_port>\d+) requested"
+        r"|channel (?P<channel_open_channel>\d+): new \S*\s*\[(?P<channel_open_type>[^\]]+)\]",
+    ),
+    (
+        "disconnect",
+        r"Connection (?:to (?P<disconnect_host>\S+) )?closed by remote host"
+        r"|Received disconnect from (?P<disconnect_peer>\S+)"
+        r"|Timeout, server (?P<disconnect_server>\S+) not responding"
+        r"|client_loop: send disconnect: (?P<disconnect_reason>.+)"
+        r"|Connection reset by (?P<disconnect_reset_by>\S+)",
+    ),
+]
+
+# Un único patrón para todos los eventos: cada línea se recorre una sola vez
+_MATCHER = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in _PATTERNS)
+)
+
+
+@dataclass
+class SshEvent:
+    """Evento reconocido en una línea de salida de ssh"""
+
+    kind: str
+    line: str
+    fields: Dict[str, str] = field(default_factory=dict)
+
+
+def classify_line(line: str) -> Optional[SshEvent]:
+    """
+    Clasifica una línea completa de salida de ssh
+
+    Args:
+        line: Línea sin el salto de línea final
+
+    Returns:
+        Evento reconocido o None si la línea no es relevante
+    """
+    match = _MATCHER.search(line)
+    if match is None:
+        return None
+
+    # lastgroup es el grupo externo, es decir, el nombre del evento
+    name = match.lastgroup
+    prefix = name + "_"
+    fields = {
+        group[len(prefix):]: value
+        for group, value in match.groupdict().items()
+        if value is not None and group.startswith(prefix)
+    }
+    return SshEvent(name.replace("_", "-"), line, fields)
+
+
+class LineDecoder:
+    """
+    Decodificador incremental de un flujo de salida en líneas completas.
+
+    Las secuencias UTF-8 y las líneas partidas entre dos lecturas se
+    conservan hasta que llega el resto, de modo que nunca se decodifica
+    ni se clasifica un fragmento incompleto.
+    """
+
+    def __init__(self, encoding: str = "utf-8"):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._buffer = ""
+
+    def feed(self, data: bytes) -> List[str]:
+        """
+        Añade datos leídos del proceso
+
+        Args:
+            data: Bytes leídos
+
+        Returns:
+            Líneas completas disponibles (sin salto de línea)
+        """
+        self._buffer += self._decoder.decode(data)
+        if "\n" not in self._buffer:
+            return []
+
+        *lines, self._buffer = self._buffer.split("\n")
+        return [line.rstrip("\r") for line in lines]
+
+    def flush(self) -> List[str]:
+        """Devuelve la última línea incompleta al terminar el flujo"""
+        rest = (self._buffer + self._decoder.decode(b"", final=True)).rstrip("\r")
+        self._buffer = ""
+        self._decoder.reset()
+        return [rest] if rest else []
@@ -0,0 +1,265 @@
+# ilo_tunnel/traffic.py
+import asyncio
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .local_ports import set_listen_options
+
+# Tamaño de lectura del relé
+RELAY_CHUNK = 65536
+
+
+@dataclass
+class PortCounters:
+    """Contadores de tráfico de un reenvío durante la sesión del túnel"""
+
+    bytes_received: int = 0  # Del ILO hacia el cliente local
+    bytes_sent: int = 0  # Del cliente local hacia el ILO
+    connections: int = 0
+    active: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class PortRate:
+    """Tasa de transferencia de un reenvío entre dos lecturas"""
+
+    received_per_s: float
+    sent_per_s: float
+
+
+def allocate_internal_port(host: str = "127.0.0.1") -> int:
+    """Obtiene un puerto libre de loopback para el extremo de ssh del relé"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+class TrafficRelay:
+    """
+    Relé local que cuenta el tráfico de cada reenvío.
+
+    Con el relé activo ssh escucha en un puerto interno de loopback y el relé
+    ocupa el puerto local del usuario, copiando los datos en ambos sentidos y
+    contando bytes y conexiones. Las copias se hacen en un bucle asyncio en un
+    hilo propio para no cargar el hilo de la interfaz.
+    """
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, int], PortCounters] = {}
+        self._servers: Dict[str, List[asyncio.AbstractServer]] = {}
+        self._writers: Dict[str, set] = {}
+        self._last_sample: Dict[Tuple[str, int], Tuple[float, int, int]] = {}
+        self._generation: Dict[str, int] = {}  # Se incrementa al detener un túnel
+        self._loop = None
+        self._thread = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Arranca el bucle del relé la primera vez que se necesita"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="traffic-relay", daemon=True
+            )
+            self._thread.start()
+        return self._loop
+
+    def bind(self, host: str, port: int) -> Optional[socket.socket]:
+        """
+        Reserva el puerto local del usuario para el relé
+
+        Args:
+            host: Dirección local
+            port: Puerto local
+
+        Returns:
+            Socket a la escucha, o None si no se puede ocupar (puerto
+            privilegiado o en uso), en cuyo caso ssh debe escuchar directamente
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            set_listen_options(sock)
+            sock.bind((host, port))
+            sock.listen(64)
+        except OSError:
+            sock.close()
+            return None
+        sock.setblocking(False)
+        return sock
+
+    def start(
+        self, tunnel_id: str, sock: socket.socket, local_port: int, target_port: int
+    ) -> None:
+        """
+        Empieza a reenviar las conexiones de un socket reservado con bind()
+
+        Args:
+            tunnel_id: Túnel al que pertenece el reenvío
+            sock: Socket devuelto por bind()
+            local_port: Puerto local del usuario (clave de los contadores)
+            target_port: Puerto interno de loopback en el que escucha ssh
+        """
+        counters = self.counters_for(tunnel_id, local_port)
+        generation = self._generation.get(tunnel_id, 0)
+        loop = self._ensure_loop()
+        asyncio.run_coroutine_threadsafe(
+            self._serve(tunnel_id, generation, sock, counters, target_port), loop
+        )
+
+    async def _serve(
+        self,
+        tunnel_id: str,
+        generation: int,
+        sock: socket.socket,
+        counters: PortCounters,
+        target_port: int,
+    ) -> None:
+        """Abre el servidor del relé (en el hilo del relé)"""
+
+        async def handle(reader, writer):
+            await self._relay(tunnel_id, reader, writer, counters, target_port)
+
+        server = await asyncio.start_server(handle, sock=sock)
+        if self._generation.get(tunnel_id, 0) != generation:
+            # El túnel se detuvo mientras se abría el servidor
+            server.close()
+            return
+        self._servers.setdefault(tunnel_id, []).append(server)
+
+    async def _relay(self, tunnel_id, client_reader, client_writer, counters, target_port):
+        """Copia una conexión en ambos sentidos contando los bytes"""
+        try:
+            remote_reader, remote_writer = await asyncio.open_connection(
+                "127.0.0.1", target_port
+            )
+        except OSError:
+            client_writer.close()
+            return
+
+        writers = self._writers.setdefault(tunnel_id, set())
+        writers.update((client_writer, remote_writer))
+        counters.connections += 1
+        counters.active += 1
+
+        async def pump(reader, writer, attribute):
+            try:
+                while True:
+                    data = await reader.read(RELAY_CHUNK)
+                    if not data:
+                        break
+                    writer.write(data)
+                    setattr(counters, attribute, getattr(counters, attribute) + len(data))
+                    await writer.drain()
+            except (OSError, asyncio.CancelledError):
+                pass
+            finally:
+                # Propagar el cierre al otro extremo
+                if writer.can_write_eof():
+                    try:
+                        writer.write_eof()
+                    except OSError:
+                        pass
+
+        try:
+            await asyncio.gather(
+                pump(client_reader, remote_writer, "bytes_sent"),
+                pump(remote_reader, client_writer, "bytes_received"),
+            )
+        finally:
+            counters.active -= 1
+            for writer in (client_writer, remote_writer):
+                writers.discard(writer)
+                writer.close()
+
+    def stop(self, tunnel_id: str) -> None:
+        """
+        Cierra los relés y las conexiones de un túnel (conserva los contadores).
+
+        Espera brevemente a que los puertos queden libres para que un
+        arranque inmediato del túnel pueda volver a ocuparlos.
+        """
+        self._generation[tunnel_id] = self._generation.get(tunnel_id, 0) + 1
+        if self._loop is None:
+            return
+
+        async def close():
+            for server in self._servers.pop(tunnel_id, []):
+                server.close()
+            for writer in self._writers.pop(tunnel_id, set()):
+                writer.close()
+
+        future = asyncio.run_coroutine_threadsafe(close(), self._loop)
+        try:
+            future.result(timeout=1)
+        except Exception:
+            pass
+
+    def counters_for(self, tunnel_id: str, local_port: int) -> PortCounters:
+        """Contadores de un reenvío, creándolos si no existen"""
+        return self.counters.setdefault((tunnel_id, local_port), PortCounters())
+
+    def reset(self, tunnel_id: str) -> None:
+        """
+        Pone a cero los contadores de una sesión nueva del túnel
+
+        Los objetos PortCounters se conservan y se ponen a cero en el sitio:
+        los relés que siguen escuchando entre sesiones (ssh murió sin
+        stop()) cuentan sobre ellos. Las conexiones activas siguen contando
+        en `active` hasta que se cierran.
+        """
+        for key, counters in self.counters.items():
+            if key[0] == tunnel_id:
+                counters.bytes_received = 0
+                counters.bytes_sent = 0
+                counters.connections = 0
+                counters.started_at = time.monotonic()
+                self._last_sample.pop(key, None)
+
+    def get_counters(self, tunnel_id: str) -> Dict[int, PortCounters]:
+        """Contadores del túnel indexados por puerto local"""
+        return {
+            port: counters
+            for (key_tunnel, port), counters in self.counters.items()
+            if key_tunnel == tunnel_id
+        }
+
+    def sample_rates(self, tunnel_id: str) -> Dict[int, PortRate]:
+        """
+        Calcula la tasa de cada puerto desde la lectura anterior
+
+        Returns:
+            Diccionario puerto local -> bytes/s recibidos y enviados
+        """
+        now = time.monotonic()
+        rates = {}
+        for port, counters in self.get_counters(tunnel_id).items():
+            key = (tunnel_id, port)
+            last_time, last_received, last_sent = self._last_sample.get(
+                key, (counters.started_at, 0, 0)
+            )
+            elapsed = max(now - last_time, 1e-3)
+            rates[port] = PortRate(
+                (counters.bytes_received - last_received) / elapsed,
+                (counters.bytes_sent - last_sent) / elapsed,
+            )
+            self._last_sample[key] = (now, counters.bytes_received, counters.bytes_sent)
+        return rates
+
+    def shutdown(self) -> None:
+        """Detiene el bucle del relé"""
+        if self._loop is not None:
+            for tunnel_id in list(self._servers):
+                self.stop(tunnel_id)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+
+def format_bytes(count: float) -> str:
+    """Formatea una cantidad de bytes en unidades legibles"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(count) < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
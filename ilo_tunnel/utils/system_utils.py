@@ -0,0 +1,165 @@
+# ilo_tunnel/utils/system_utils.py
+import platform
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Tiempo de validez de la lista de IPs locales (segundos)
+LOCAL_ADDRESSES_TTL = 30.0
+
+_FIB_TRIE = "/proc/net/fib_trie"
+
+# ioctl para obtener la dirección IPv4 de una interfaz
+_SIOCGIFADDR = {"Linux": 0x8915, "Darwin": 0xC0206921, "FreeBSD": 0xC0206921}
+
+
+def _fib_trie_addresses(path: str = _FIB_TRIE) -> List[str]:
+    """
+    Lee las direcciones locales de la tabla de rutas del kernel (Linux)
+
+    Cada dirección asignada a una interfaz aparece como una hoja seguida
+    de la línea "/32 host LOCAL".
+    """
+    addresses = []
+    with open(path) as f:
+        last = None
+        for line in f:
+            line = line.strip()
+            if line.startswith("|--"):
+                last = line[3:].strip()
+            elif line.startswith("/32 host LOCAL") and last:
+                addresses.append(last)
+    return addresses
+
+
+def _ioctl_addresses() -> List[str]:
+    """Pregunta la dirección IPv4 de cada interfaz con ioctl (Unix)"""
+    import fcntl
+
+    request = _SIOCGIFADDR.get(platform.system())
+    if request is None:
+        return []
+
+    addresses = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        for _, name in socket.if_nameindex():
+            ifreq = struct.pack("256s", name.encode()[:15])
+            try:
+                result = fcntl.ioctl(s.fileno(), request, ifreq)
+            except OSError:
+                continue  # Interfaz sin IPv4
+            addresses.append(socket.inet_ntoa(result[20:24]))
+    return addresses
+
+
+def _default_route_address() -> Optional[str]:
+    """IP de la interfaz de la ruta por defecto (UDP connect, sin enviar nada)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        try:
+            s.connect(("10.255.255.255", 1))
+            return s.getsockname()[0]
+        except OSError:
+            return None
+
+
+def list_local_addresses() -> List[str]:
+    """
+    Enumera las direcciones IPv4 de las interfaces del sistema
+
+    Se leen directamente del kernel (/proc/net/fib_trie en Linux, ioctl en
+    otros Unix) sin resolver ningún nombre, de modo que un DNS inverso roto
+    no puede bloquear la llamada. En Windows, o si lo anterior falla, se
+    usa la IP de la ruta por defecto.
+
+    Returns:
+        Lista ordenada de IPs, siempre con 127.0.0.1 y sin el resto de
+        direcciones de loopback
+    """
+    addresses = []
+    for method in (_fib_trie_addresses, _ioctl_addresses):
+        try:
+            addresses = method()
+        except (OSError, ImportError, AttributeError):
+            continue
+        if addresses:
+            break
+
+    default = _default_route_address()
+    if default:
+        addresses.append(default)
+
+    addresses = {ip for ip in addresses if not ip.startswith("127.")}
+    return sorted(addresses | {"127.0.0.1"})
+
+
+class LocalAddressCache(QObject):
+    """
+    Lista de IPs locales con caducidad.
+
+    get() responde siempre al momento con la última lista conocida; si ha
+    caducado se vuelve a enumerar en un hilo de trabajo y, solo si el
+    conjunto de IPs ha cambiado, se avisa con addresses_changed. Mientras
+    haya alguien usando la caché se refresca periódicamente.
+    """
+
+    addresses_changed = pyqtSignal(list)
+    _refreshed = pyqtSignal(list)
+
+    def __init__(self, ttl: float = LOCAL_ADDRESSES_TTL, parent=None):
+        super().__init__(parent)
+        self.ttl = ttl
+        self._addresses: Optional[List[str]] = None
+        self._updated_at = 0.0
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="local-addresses"
+        )
+        self._pending = None
+        self._refreshed.connect(self._handle_refreshed)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(ttl * 1000))
+        self.timer.timeout.connect(self.refresh)
+
+    def get(self) -> List[str]:
+        """Devuelve las IPs locales (la primera vez se enumeran al momento)"""
+        if self._addresses is None:
+            self._addresses = list_local_addresses()
+            self._updated_at = time.monotonic()
+        elif time.monotonic() - self._updated_at >= self.ttl:
+            self.refresh()
+
+        if not self.timer.isActive():
+            self.timer.start()
+        return list(self._addresses)
+
+    def refresh(self) -> None:
+        """Vuelve a enumerar las IPs en segundo plano"""
+        if self._pending is not None and not self._pending.done():
+            return
+        self._pending = self._executor.submit(list_local_addresses)
+        self._pending.add_done_callback(self._handle_done)
+
+    def _handle_done(self, future) -> None:
+        """Entrega el resultado al hilo de la interfaz (desde el hilo de trabajo)"""
+        try:
+            addresses = future.result()
+        except Exception as e:
+            print(f"Advertencia al detectar IPs: {e}")
+            return
+        self._refreshed.emit(addresses)
+
+    def _handle_refreshed(self, addresses: List[str]) -> None:
+        """Guarda la nueva lista y avisa si ha cambiado"""
+        self._updated_at = time.monotonic()
+        if addresses != self._addresses:
+            self._addresses = addresses
+            self.addresses_changed.emit(list(addresses))
+
+    def shutdown(self) -> None:
+        """Detiene el refresco periódico y el hilo de trabajo"""
+        self.timer.stop()
+        self._executor.shutdown(wait=False)
@@ -8,6 +8,10 @@ setup(
     install_requires=[
         "PyQt6>=6.0.0",
     ],
+    extras_require={
+        # Motor de túneles en proceso (opcional)
+        "asyncssh": ["asyncssh>=2.13"],
+    },
     entry_points={
         "console_scripts": [
             "ilo-tunnel=ilo_tunnel.main:main",
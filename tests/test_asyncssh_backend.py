@@ -0,0 +1,86 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+import types
+from unittest import mock
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importar después de modificar el path
+from ilo_tunnel.asyncssh_backend import AsyncSSHEngine
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class FakeConnection:
+    """Conexión de asyncssh de prueba"""
+
+    def __init__(self):
+        self.closed = threading.Event()
+        self._closed = asyncio.Event()
+
+    def close(self):
+        self.closed.set()
+        self._closed.set()
+
+    async def wait_closed(self):
+        await self._closed.wait()
+
+
+class TestAsyncSSHEngine(unittest.TestCase):
+    def setUp(self):
+        self.connecting = threading.Event()
+        self.connections = []
+
+        async def connect(host, **options):
+            # Conexión lenta: el túnel se cierra mientras espera
+            self.connecting.set()
+            await asyncio.sleep(0.2)
+            connection = FakeConnection()
+            self.connections.append(connection)
+            return connection
+
+        fake_asyncssh = types.SimpleNamespace(
+            connect=connect,
+            Error=type('Error', (Exception,), {}),
+            PermissionDenied=type('PermissionDenied', (Exception,), {}),
+        )
+        patcher = mock.patch.dict(sys.modules, {'asyncssh': fake_asyncssh})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.engine = AsyncSSHEngine()
+        self.addCleanup(self.engine.shutdown)
+        self.config = {
+            'user': 'admin',
+            'gateway': '192.0.2.1',
+            'ssh_port': 22,
+            'key_path': '~/.ssh/id_rsa',
+            'timeout': 5,
+            'identity_only': False,
+            'compress': False,
+        }
+
+    def test_connection_closed_if_tunnel_closed_while_connecting(self):
+        self.engine.open_tunnel('DEFAULT/rack1', self.config, [])
+        self.assertTrue(self.connecting.wait(2))
+
+        self.engine.close_tunnel('DEFAULT/rack1')
+        self.assertFalse(self.engine.is_running('DEFAULT/rack1'))
+
+        self.assertTrue(wait_for(lambda: self.connections))
+        self.assertTrue(self.connections[0].closed.wait(2))
+        self.assertEqual(self.engine._gateways, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import errno
+import os
+import socket
+import sys
+from unittest import mock
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importar después de modificar el path
+from ilo_tunnel.local_ports import (
+    PortAllocator,
+    is_port_free,
+    needs_root,
+    set_listen_options,
+)
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class TestPortAllocator(unittest.TestCase):
+    def setUp(self):
+        self.allocator = PortAllocator()
+
+    def test_only_privileged_ports_are_remapped(self):
+        port = free_port()
+        mappings = [
+            '127.0.0.1:443:10.0.0.5:443',
+            f'127.0.0.1:{port}:10.0.0.5:17990',
+        ]
+        result, remapped = self.allocator.allocate('DEFAULT/rack1', mappings, True, limit=1024)
+
+        self.assertEqual(list(remapped), [443])
+        ip, assigned = remapped[443]
+        self.assertGreaterEqual(assigned, 1024)
+        self.assertEqual(result[0], f'{ip}:{assigned}:10.0.0.5:443')
+        self.assertFalse(needs_root(result, limit=1024))
+        self.assertTrue(needs_root(mappings, limit=1024))
+
+    def test_privileged_ports_kept_without_remap(self):
+        mappings = ['127.0.0.1:443:10.0.0.5:443', '127.0.0.1:22:10.0.0.5:22']
+        denied = OSError(errno.EACCES, 'Permission denied')
+        with mock.patch('socket.socket.bind', side_effect=denied):
+            self.assertTrue(is_port_free('127.0.0.1', 443))
+            result, remapped = self.allocator.allocate(
+                'DEFAULT/rack1', mappings, False, limit=1024
+            )
+
+        self.assertEqual(result, mappings)
+        self.assertEqual(remapped, {})
+        self.assertTrue(needs_root(result, limit=1024))
+
+        in_use = OSError(errno.EADDRINUSE, 'Address already in use')
+        with mock.patch('socket.socket.bind', side_effect=in_use):
+            self.assertFalse(is_port_free('127.0.0.1', 443))
+
+    def test_missing_local_address_keeps_mapping(self):
+        # 192.0.2.0/24 (TEST-NET-1) no está configurada en ninguna interfaz
+        mappings = ['192.0.2.99:8080:10.0.0.5:80']
+        result, remapped = self.allocator.allocate('DEFAULT/rack1', mappings, True)
+
+        self.assertEqual(result, mappings)
+        self.assertEqual(remapped, {})
+
+    def test_windows_uses_exclusive_bind(self):
+        sock = mock.Mock()
+        with mock.patch('platform.system', return_value='Windows'), \
+                mock.patch.object(socket, 'SO_EXCLUSIVEADDRUSE', -5, create=True):
+            set_listen_options(sock)
+        sock.setsockopt.assert_called_once_with(socket.SOL_SOCKET, -5, 1)
+
+        sock = mock.Mock()
+        with mock.patch('platform.system', return_value='Linux'):
+            set_listen_options(sock)
+        sock.setsockopt.assert_called_once_with(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    def test_no_limit_keeps_mappings(self):
+        port = free_port()
+        mappings = [f'127.0.0.1:{port}:10.0.0.5:22']
+        self.assertEqual(
+            self.allocator.allocate('DEFAULT/rack1', mappings, True, limit=0), (mappings, {})
+        )
+
+    def test_second_tunnel_gets_another_address_or_port(self):
+        port = free_port()
+        mappings = [f'127.0.0.1:{port}:10.0.0.5:443']
+        first, _ = self.allocator.allocate('DEFAULT/rack1', mappings)
+        second, remapped = self.allocator.allocate('DEFAULT/rack2', mappings)
+
+        self.assertEqual(first, mappings)
+        self.assertIn(port, remapped)
+        self.assertNotEqual(second, first)
+        self.assertEqual(self.allocator.reserved_by('127.0.0.1', port), 'DEFAULT/rack1')
+
+        # Al liberar el primero, el puerto vuelve a estar disponible
+        self.allocator.release('DEFAULT/rack1')
+        self.allocator.release('DEFAULT/rack2')
+        self.assertEqual(self.allocator.allocate('DEFAULT/rack2', mappings), (mappings, {}))
+
+    def test_busy_port_falls_back_to_alternative_port(self):
+        allocator = PortAllocator(aliases=[])
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as busy:
+            busy.bind(('127.0.0.1', 0))
+            busy.listen(1)
+            port = busy.getsockname()[1]
+
+            result, remapped = allocator.allocate('DEFAULT/rack1', [f'127.0.0.1:{port}:10.0.0.5:80'])
+            ip, assigned = remapped[port]
+            self.assertEqual(ip, '127.0.0.1')
+            self.assertNotEqual(assigned, port)
+            self.assertEqual(result, [f'127.0.0.1:{assigned}:10.0.0.5:80'])
+
+
+if __name__ == '__main__':
+    unittest.main()
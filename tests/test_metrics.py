@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importar después de modificar el path
+from ilo_tunnel.events import TunnelEvent
+from ilo_tunnel.metrics import (
+    StartupTracker,
+    ConnectionMetrics,
+    SCOPE_GATEWAY,
+    SCOPE_PROFILE,
+)
+
+
+def event(kind, timestamp):
+    return TunnelEvent('DEFAULT/rack1', kind, timestamp)
+
+
+class TestStartupTracker(unittest.TestCase):
+    def test_full_breakdown(self):
+        tracker = StartupTracker()
+        timeline = [
+            ('spawned', 10.0),
+            ('process-started', 10.01),
+            ('connecting', 10.05),
+            ('tcp-connected', 10.15),
+            ('kex-done', 10.35),
+            ('authenticated', 10.85),
+        ]
+        for kind, timestamp in timeline:
+            self.assertIsNone(tracker.feed(event(kind, timestamp)))
+
+        phases = tracker.feed(event('forward-bound', 11.0))
+        self.assertAlmostEqual(phases['tcp'], 100, places=3)
+        self.assertAlmostEqual(phases['auth'], 500, places=3)
+        self.assertAlmostEqual(phases['forward'], 150, places=3)
+        self.assertAlmostEqual(phases['total'], 1000, places=3)
+
+        # Un segundo reenvío no genera otra medida
+        self.assertIsNone(tracker.feed(event('forward-bound', 11.5)))
+
+    def test_missing_marks_are_absorbed_by_next_phase(self):
+        tracker = StartupTracker()
+        tracker.feed(event('spawned', 0.0))
+        tracker.feed(event('authenticated', 2.0))
+        phases = tracker.feed(event('forward-bound', 2.5))
+
+        self.assertAlmostEqual(phases['auth'], 2000)
+        self.assertNotIn('tcp', phases)
+
+    def test_exit_discards_attempt(self):
+        tracker = StartupTracker()
+        tracker.feed(event('spawned', 0.0))
+        tracker.feed(event('exited', 1.0))
+        self.assertIsNone(tracker.feed(event('forward-bound', 2.0)))
+
+
+class TestConnectionMetrics(unittest.TestCase):
+    def test_rolling_histogram_per_profile_and_gateway(self):
+        metrics = ConnectionMetrics(max_samples=3)
+        for total in (80, 300, 700, 4000):
+            metrics.record('DEFAULT/rack1', '192.0.2.1', {'total': total})
+        metrics.record('DEFAULT/rack2', '192.0.2.1', {'total': 90})
+
+        stats = metrics.stats(SCOPE_PROFILE, 'DEFAULT/rack1')['total']
+        self.assertEqual((stats.count, stats.minimum, stats.maximum), (3, 300, 4000))
+        self.assertEqual(metrics.keys(SCOPE_GATEWAY), ['192.0.2.1'])
+        self.assertEqual(sum(metrics.histogram(SCOPE_GATEWAY, '192.0.2.1', 'total')), 3)
+        self.assertEqual(len(metrics.all_samples()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
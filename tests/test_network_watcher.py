@@ -0,0 +1,90 @@
+import unittest
+import os
+import socket
+import sys
+from unittest import mock
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+
+# Importar después de modificar el path
+from ilo_tunnel import network_watcher
+from ilo_tunnel.network_watcher import NetworkWatcher, route_source
+
+
+class TestNetworkWatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.watcher = NetworkWatcher()
+        self.watcher.gateways = {'gw1', 'gw2'}
+        self.changes = []
+        self.watcher.route_changed.connect(
+            lambda *args: self.changes.append(args)
+        )
+
+    def tearDown(self):
+        self.watcher.shutdown()
+
+    def test_route_source_of_loopback(self):
+        self.assertEqual(route_source('127.0.0.1'), '127.0.0.1')
+
+    def test_first_reading_is_only_a_reference(self):
+        self.watcher._handle_poll({'gw1': '192.168.1.10', 'gw2': None})
+        self.assertEqual(self.changes, [])
+
+    def test_source_change_is_reported(self):
+        self.watcher._handle_poll({'gw1': '192.168.1.10', 'gw2': '192.168.1.10'})
+        self.watcher._handle_poll({'gw1': '10.8.0.2', 'gw2': '192.168.1.10'})
+        self.assertEqual(self.changes, [('gw1', '192.168.1.10', '10.8.0.2')])
+
+    def test_failed_lookups_are_ignored(self):
+        self.watcher._handle_poll({'gw1': None})
+        self.watcher._handle_poll({'gw1': '192.168.1.10'})
+        self.watcher._handle_poll({'gw1': None})
+        self.watcher._handle_poll({'gw1': '192.168.1.10'})
+        self.assertEqual(self.changes, [])
+
+        self.watcher._handle_poll({'gw1': None})
+        self.watcher._handle_poll({'gw1': '10.8.0.2'})
+        self.assertEqual(self.changes, [('gw1', '192.168.1.10', '10.8.0.2')])
+
+    def test_gateway_address_is_cached(self):
+        resolved = (socket.AF_INET, ('127.0.0.1', 22))
+        with mock.patch.object(
+            network_watcher, 'resolve_gateway', return_value=resolved
+        ) as resolve:
+            self.watcher._lookup(['gw1'])
+            self.assertEqual(self.watcher._lookup(['gw1']), {'gw1': '127.0.0.1'})
+            self.assertEqual(resolve.call_count, 1)
+
+            # Un fallo de la ruta obliga a resolver de nuevo el nombre
+            with mock.patch.object(network_watcher, 'route_source', return_value=None):
+                self.assertEqual(self.watcher._lookup(['gw1']), {'gw1': None})
+            self.watcher._lookup(['gw1'])
+            self.assertEqual(resolve.call_count, 2)
+
+        with mock.patch.object(network_watcher, 'resolve_gateway', return_value=None):
+            self.assertEqual(self.watcher._lookup(['gw2']), {'gw2': None})
+        self.assertEqual(list(self.watcher._resolved), [])
+
+    def test_timer_runs_only_with_gateways(self):
+        self.watcher.set_gateways(['gw1', ''])
+        self.assertEqual(self.watcher.gateways, {'gw1'})
+        self.assertTrue(self.watcher.timer.isActive())
+
+        self.watcher.set_enabled(False)
+        self.assertFalse(self.watcher.timer.isActive())
+
+        self.watcher.set_enabled(True)
+        self.watcher.set_gateways([])
+        self.assertFalse(self.watcher.timer.isActive())
+
+
+if __name__ == '__main__':
+    unittest.main()
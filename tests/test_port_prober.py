@@ -0,0 +1,98 @@
+import unittest
+import os
+import socket
+import sys
+import time
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+# Importar después de modificar el path
+from ilo_tunnel.port_prober import probe_ports, probe_service, PortProber
+import threading
+
+
+def free_port():
+    """Obtiene un puerto local libre"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+class TestPortProber(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(8)
+        self.open_port = self.server.getsockname()[1]
+        self.closed_port = free_port()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_probe_ports(self):
+        results = probe_ports(
+            [('127.0.0.1', self.open_port), ('127.0.0.1', self.closed_port)], timeout=1.0
+        )
+        self.assertTrue(results[('127.0.0.1', self.open_port)])
+        self.assertFalse(results[('127.0.0.1', self.closed_port)])
+
+    def test_prober_runs_in_background(self):
+        prober = PortProber(timeout=1.0)
+        received = []
+        loop = QEventLoop()
+        prober.sweep_finished.connect(lambda context, results: (received.append((context, results)), loop.quit()))
+        QTimer.singleShot(3000, loop.quit)
+
+        start = time.monotonic()
+        self.assertTrue(prober.probe([('127.0.0.1', self.open_port, 443)], 'ctx'))
+        self.assertLess(time.monotonic() - start, 0.5)
+        loop.exec()
+        prober.shutdown()
+
+        self.assertEqual(received[0][0], 'ctx')
+        self.assertTrue(received[0][1][('127.0.0.1', self.open_port)].is_open)
+
+    def _serve_once(self, reply):
+        """Atiende una conexión en segundo plano respondiendo con `reply`"""
+        def serve():
+            conn, _ = self.server.accept()
+            if reply:
+                conn.recv(1024)
+                conn.sendall(reply)
+            conn.close()
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        return thread
+
+    def test_service_probe_http(self):
+        thread = self._serve_once(b'HTTP/1.0 200 OK\r\n\r\n')
+        result = probe_service('127.0.0.1', self.open_port, 80, timeout=2.0)
+        thread.join()
+
+        self.assertTrue(result.is_open)
+        self.assertEqual(result.detail, 'HTTP/1.0 200 OK')
+        self.assertIsNotNone(result.latency_ms)
+
+    def test_service_probe_detects_dead_forward(self):
+        # ssh acepta la conexión local y la cierra si el ILO no es alcanzable
+        thread = self._serve_once(None)
+        result = probe_service('127.0.0.1', self.open_port, 22, timeout=2.0)
+        thread.join()
+
+        self.assertFalse(result.is_open)
+        self.assertIsNone(result.latency_ms)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import io
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QSettings
+from PyQt6.QtWidgets import QApplication
+
+# Importar después de modificar el path
+from ilo_tunnel.models import profile_export
+from ilo_tunnel.models.profile import ConnectionProfile
+from ilo_tunnel.models.profile_export import (
+    ProfileExporter,
+    detect_export_format,
+    ssh_config_entry,
+    write_profiles,
+)
+from ilo_tunnel.models.profile_import import read_profiles
+from ilo_tunnel.models.profile_manager import ProfileManager
+
+
+def make_profile(name, ilo_ip, gateway_ip='192.0.2.1', **kwargs):
+    return ConnectionProfile.from_dict(
+        dict(name=name, ilo_ip=ilo_ip, gateway_ip=gateway_ip, ssh_user='admin', **kwargs)
+    )
+
+
+def export(profiles_data, file_format, **filters):
+    stream = io.StringIO()
+    count = write_profiles(stream, profiles_data, file_format, **filters)
+    return count, stream.getvalue()
+
+
+class TestProfileExport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        QSettings.setPath(
+            QSettings.Format.NativeFormat, QSettings.Scope.UserScope, self.tmp.name
+        )
+        self.manager = ProfileManager()
+        self.addCleanup(self.manager.storage.close)
+        self.manager.add_profile(make_profile('rack1', '10.0.0.1'), 'DEFAULT')
+        self.manager.add_profile(
+            make_profile('rack2', '10.0.0.2', '192.0.2.9', server_type='Dell'), 'DEFAULT'
+        )
+        self.manager.add_folder('DC2')
+        self.manager.add_profile(
+            make_profile(
+                'rack 3', '10.0.0.3', custom_ports=True, ports={'443': True, '22': False, '80': True}
+            ),
+            'DC2',
+        )
+        self.manager.add_folder('Vacía')
+        self.data = self.manager.get_profiles()
+
+    def test_json_matches_full_dump(self):
+        count, text = export(self.data, 'json')
+        self.assertEqual(count, 3)
+        self.assertEqual(text, json.dumps(self.data, indent=2))
+        self.assertEqual(self.manager.export_profiles(), text)
+        self.assertEqual(export({}, 'json')[1], json.dumps({}, indent=2))
+
+    def test_ndjson_and_csv_round_trip(self):
+        for file_format in ('ndjson', 'csv'):
+            count, text = export(self.data, file_format)
+            self.assertEqual(count, 3)
+            errors = []
+            items = list(read_profiles(io.StringIO(text), errors, file_format))
+            self.assertEqual(errors, [])
+            self.assertEqual(
+                [(folder, p['name']) for folder, p in items],
+                [('DEFAULT', 'rack1'), ('DEFAULT', 'rack2'), ('DC2', 'rack 3')],
+            )
+            # Los puertos desactivados no se exportan en CSV
+            self.assertEqual(items[2][1]['ports'].get('443'), True)
+            self.assertTrue(items[2][1]['custom_ports'])
+
+    def test_filters(self):
+        count, text = export(self.data, 'ndjson', server_type='Dell')
+        self.assertEqual(count, 1)
+        self.assertIn('"rack2"', text)
+
+        count, _ = export(self.data, 'ndjson', gateway='192.0.2.1')
+        self.assertEqual(count, 2)
+
+        count, text = export(self.data, 'json', folder='DC2')
+        self.assertEqual(count, 1)
+        self.assertEqual(list(json.loads(text)), ['DC2'])
+
+    def test_ssh_config(self):
+        entry = ssh_config_entry('DC2', self.data['DC2'][0])
+        self.assertIn('Host DC2-rack-3\n', entry)
+        self.assertIn('    HostName 192.0.2.1\n', entry)
+        self.assertIn('    LocalForward 127.0.0.1:80 10.0.0.3:80\n', entry)
+        self.assertIn('    LocalForward 127.0.0.1:443 10.0.0.3:443\n', entry)
+        self.assertNotIn(':22 ', entry)
+
+        socks = make_profile('socks', '10.0.0.4', forward_mode='socks', socks_port=1081)
+        entry = ssh_config_entry('DEFAULT', socks.to_dict())
+        self.assertIn('    DynamicForward 127.0.0.1:1081\n', entry)
+        self.assertNotIn('LocalForward', entry)
+
+        count, text = export(self.data, 'ssh')
+        self.assertEqual(count, 3)
+        self.assertEqual(text.count('\nHost '), 3)
+        self.assertEqual(detect_export_format('/tmp/config'), 'ssh')
+        self.assertEqual(detect_export_format('/tmp/perfiles.jsonl'), 'ndjson')
+
+    def test_exporter_writes_in_background(self):
+        path = os.path.join(self.tmp.name, 'perfiles.csv')
+        exporter = ProfileExporter(self.manager)
+        self.addCleanup(exporter.shutdown)
+        results, progress = [], []
+        exporter.finished.connect(lambda written, error: results.append((written, error)))
+        exporter.progress.connect(lambda written, percent: progress.append(written))
+
+        with mock.patch.object(profile_export, 'EXPORT_PROGRESS_STEP', 1):
+            self.assertTrue(exporter.start(path, folder='DEFAULT'))
+            # Los cambios posteriores no afectan a la exportación en curso
+            self.manager.add_profile(make_profile('rack4', '10.0.0.4'), 'DEFAULT')
+            while not results:
+                self.app.processEvents()
+
+        self.assertEqual(results, [(2, '')])
+        self.assertEqual(progress, [1, 2])
+        self.assertFalse(os.path.exists(path + '.part'))
+        with open(path, encoding='utf-8') as f:
+            errors = []
+            names = [p['name'] for _, p in read_profiles(f, errors, 'csv')]
+        self.assertEqual(names, ['rack1', 'rack2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
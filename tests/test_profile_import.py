@@ -0,0 +1,182 @@
+import unittest
+import io
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEventLoop, QSettings, QTimer
+from PyQt6.QtWidgets import QApplication
+
+# Importar después de modificar el path
+from ilo_tunnel.models import profile_import
+from ilo_tunnel.models.profile_import import (
+    MERGE_NEWEST,
+    MERGE_OVERWRITE,
+    MERGE_RENAME,
+    MERGE_SKIP,
+    ImportStats,
+    ProfileImporter,
+    read_profiles,
+)
+from ilo_tunnel.models.profile_manager import ProfileManager
+
+
+def profile_dict(name, **extra):
+    data = {'name': name, 'ilo_ip': '10.0.0.5', 'gateway_ip': '192.0.2.1', 'ssh_user': 'admin'}
+    data.update(extra)
+    return data
+
+
+class TestProfileReaders(unittest.TestCase):
+    def test_json_is_read_in_small_chunks(self):
+        exported = {
+            'DEFAULT': [profile_dict('rack1', ssh_port=2222), profile_dict('rack2')],
+            'ROTA': 'no es una lista',
+            'DC2': [{'name': 'incompleto'}, 42, profile_dict('rack3')],
+        }
+        errors = []
+        with mock.patch.object(profile_import, 'CHUNK_SIZE', 7):
+            profiles = list(read_profiles(io.StringIO(json.dumps(exported, indent=2)), errors))
+
+        self.assertEqual(
+            [(folder, p['name'], p['ssh_port']) for folder, p in profiles],
+            [('DEFAULT', 'rack1', 2222), ('DEFAULT', 'rack2', 22), ('DC2', 'rack3', 22)],
+        )
+        self.assertEqual(len(errors), 3)
+
+        with self.assertRaises(ValueError):
+            list(read_profiles(io.StringIO('{"DEFAULT": [{"name": '), []))
+
+    def test_ndjson_and_csv(self):
+        ndjson = '\n'.join([
+            json.dumps(profile_dict('rack1', folder='DC2')),
+            '{roto',
+            json.dumps(profile_dict('rack2')),
+        ])
+        errors = []
+        profiles = list(read_profiles(io.StringIO(ndjson), errors, 'ndjson', 'IMPORT'))
+        self.assertEqual([(f, p['name']) for f, p in profiles], [('DC2', 'rack1'), ('IMPORT', 'rack2')])
+        self.assertEqual(errors, ['Línea 2: JSON no válido'])
+
+        csv_data = (
+            'name,ilo_ip,gateway_ip,ssh_user,ssh_port,ports,folder\n'
+            'rack1,10.0.0.5,192.0.2.1,admin,2222,"443, 17990",DC2\n'
+            'rack2,10.0.0.6,192.0.2.1,admin,,,\n'
+            'rack3,10.0.0.7,192.0.2.1,admin,abc,,\n'
+        )
+        errors = []
+        profiles = list(read_profiles(io.StringIO(csv_data), errors, 'csv'))
+        self.assertEqual(profiles[0][0], 'DC2')
+        self.assertEqual(profiles[0][1]['ssh_port'], 2222)
+        self.assertEqual(profiles[0][1]['ports'], {'443': True, '17990': True})
+        self.assertEqual((profiles[1][0], profiles[1][1]['ssh_port']), ('DEFAULT', 22))
+        self.assertEqual(errors, ['Línea 4: valor numérico no válido'])
+
+
+class TestProfileImporter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        QSettings.setPath(
+            QSettings.Format.NativeFormat, QSettings.Scope.UserScope, self.tmp.name
+        )
+        self.manager = ProfileManager()
+        self.addCleanup(self.manager.storage.close)
+
+    def test_imports_in_batches_off_the_gui_thread(self):
+        path = os.path.join(self.tmp.name, 'inventario.ndjson')
+        with open(path, 'w') as f:
+            for i in range(25):
+                f.write(json.dumps(
+                    profile_dict(f'srv{i:02d}', ilo_ip=f'10.1.0.{i}', folder=f'DC{i % 2}')
+                ) + '\n')
+
+        importer = ProfileImporter(self.manager, batch_size=10)
+        self.addCleanup(importer.shutdown)
+        progress, result = [], []
+        added = []
+        importer.progress.connect(lambda count, percent: progress.append(count))
+        importer.finished.connect(lambda stats, errors: result.append((stats.added, errors)))
+        self.manager.profiles_added.connect(lambda folder, first, last: added.append(last - first + 1))
+
+        loop = QEventLoop()
+        importer.finished.connect(loop.quit)
+        QTimer.singleShot(5000, loop.quit)
+        self.assertTrue(importer.start(path))
+        loop.exec()
+
+        self.assertEqual(result, [(25, [])])
+        self.assertEqual(progress, [10, 20, 25])
+        self.assertEqual(sum(added), 25)
+        self.assertEqual(len(self.manager.get_profiles('DC0')), 13)
+        self.assertEqual(self.manager.get_profile_by_name('srv24')[1], 'DC0')
+
+        # Repetir la importación no duplica nada
+        loop = QEventLoop()
+        importer.finished.connect(loop.quit)
+        QTimer.singleShot(5000, loop.quit)
+        self.assertTrue(importer.start(path))
+        loop.exec()
+        self.assertEqual((importer.stats.added, importer.stats.skipped), (0, 25))
+        self.assertEqual(len(self.manager.get_profiles('DC0')), 13)
+
+    def test_merge_strategies(self):
+        existing = [profile_dict('rack1', updated_at=100.0), profile_dict('rack2', ilo_ip='10.0.0.6')]
+        self.manager.import_profiles(json.dumps(existing))
+
+        incoming = [
+            profile_dict('rack1', ssh_port=2222, updated_at=50.0),  # mismo servidor, más antiguo
+            profile_dict('rack2', ilo_ip='10.0.0.99'),  # mismo nombre, otro servidor
+            profile_dict('rack3', ilo_ip='10.0.0.6'),  # otro nombre, mismo servidor que rack2
+        ]
+        batch = list(read_profiles(io.StringIO(json.dumps(incoming)), []))
+
+        stats = ImportStats()
+        self.manager.add_profiles_batch(batch, MERGE_SKIP, stats)
+        self.assertEqual((stats.added, stats.skipped), (0, 3))
+
+        stats = ImportStats()
+        self.manager.add_profiles_batch(batch, MERGE_NEWEST, stats)
+        self.assertEqual((stats.updated, stats.skipped), (0, 3))
+
+        stats = ImportStats()
+        self.manager.add_profiles_batch(batch, MERGE_RENAME, stats)
+        self.assertEqual((stats.added, stats.renamed, stats.skipped), (1, 1, 2))
+        self.assertEqual(
+            self.manager.get_profile_names('DEFAULT'), ['rack1', 'rack2', 'rack2 (2)']
+        )
+        # Renombrar es idempotente: el servidor ya está como "rack2 (2)"
+        stats = ImportStats()
+        self.manager.add_profiles_batch(batch, MERGE_RENAME, stats)
+        self.assertEqual((stats.added, stats.skipped), (0, 3))
+
+        stats = ImportStats()
+        self.manager.add_profiles_batch(batch, MERGE_OVERWRITE, stats)
+        self.assertEqual(stats.updated, 2)
+        rack1 = self.manager.get_profile_by_name('rack1', 'DEFAULT')[0]
+        self.assertEqual(rack1.ssh_port, 2222)
+        stats = ImportStats()
+        self.manager.add_profiles_batch(batch, MERGE_OVERWRITE, stats)
+        self.assertEqual((stats.updated, stats.skipped), (0, 3))
+
+    def test_import_profiles_keeps_its_result_format(self):
+        self.assertEqual(self.manager.import_profiles('no es json'), (False, 0, ['JSON no válido']))
+        ok, count, errors = self.manager.import_profiles(
+            json.dumps([profile_dict('rack1'), {'name': ''}])
+        )
+        self.assertEqual((ok, count), (True, 1))
+        self.assertEqual(errors, ["Perfil '' no válido"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QSettings
+
+# Importar después de modificar el path
+from ilo_tunnel.models.profile import ConnectionProfile
+from ilo_tunnel.models.profile_manager import ProfileManager
+
+
+def make_profile(name, ilo_ip='10.0.0.5'):
+    return ConnectionProfile.from_dict(
+        {'name': name, 'ilo_ip': ilo_ip, 'gateway_ip': '192.0.2.1', 'ssh_user': 'admin'}
+    )
+
+
+class TestProfileManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        QSettings.setPath(
+            QSettings.Format.NativeFormat, QSettings.Scope.UserScope, self.tmp.name
+        )
+        self.manager = ProfileManager()
+        self.addCleanup(self.manager.storage.close)
+        self.manager.settings.clear()
+        self.manager.add_profile(make_profile('rack1'), 'DEFAULT')
+        self.manager.add_folder('DC2')
+        self.manager.add_profile(make_profile('rack2'), 'DC2')
+
+    def test_reads_do_not_reparse(self):
+        with mock.patch('ilo_tunnel.models.profile_manager.json.loads') as loads:
+            self.manager.get_folders()
+            self.manager.get_profiles('DC2')
+            profile, folder, index = self.manager.get_profile_by_name('rack2')
+        loads.assert_not_called()
+        self.assertEqual((profile.name, folder, index), ('rack2', 'DC2', 0))
+
+    def test_index_follows_writes(self):
+        version = self.manager.version
+        self.assertTrue(self.manager.move_profile('DC2', 0, 'DEFAULT'))
+        self.assertGreater(self.manager.version, version)
+        self.assertEqual(self.manager.get_profile_by_name('rack2')[1:], ('DEFAULT', 1))
+        self.assertEqual(self.manager.get_profile_by_name('rack2', 'DC2')[2], -1)
+        self.assertFalse(self.manager.add_profile(make_profile('rack1'), 'DEFAULT'))
+
+    def test_returned_lists_do_not_alias_cache(self):
+        self.manager.get_profiles('DEFAULT').clear()
+        self.manager.get_profiles()['DC2'] = []
+        self.assertEqual(self.manager.get_profile_names('DEFAULT'), ['rack1'])
+        self.assertEqual(self.manager.get_profile_names('DC2'), ['rack2'])
+
+    def test_secondary_indexes(self):
+        self.manager.add_profile(make_profile('rack3', '10.0.0.9'), 'DC2')
+
+        by_ilo = self.manager.get_profiles_by_ilo_ip('10.0.0.5')
+        self.assertEqual([(p.name, f, i) for p, f, i in by_ilo],
+                         [('rack1', 'DEFAULT', 0), ('rack2', 'DC2', 0)])
+        self.assertEqual(len(self.manager.get_profiles_by_gateway('192.0.2.1')), 3)
+        self.assertEqual(len(self.manager.get_profiles_by_server_type('HP/Huawei')), 3)
+        self.assertEqual(self.manager.get_profiles_by_ilo_ip('10.9.9.9'), [])
+
+    def test_incremental_index_matches_rebuild(self):
+        self.manager.add_profile(make_profile('rack3', '10.0.0.9'), 'DC2')
+        self.manager.add_profile(make_profile('rack4', '10.0.0.9'), 'DC2')
+        self.manager.delete_profile('DC2', 0)
+        self.manager.update_profile('DC2', 1, make_profile('rack4', '10.0.0.7'))
+        self.manager.rename_folder('DC2', 'DC3')
+        self.manager.move_profile('DC3', 0, 'DEFAULT')
+
+        expected = {
+            ip: [(p.name, f, i) for p, f, i in self.manager.get_profiles_by_ilo_ip(ip)]
+            for ip in ('10.0.0.5', '10.0.0.7', '10.0.0.9')
+        }
+        self.assertEqual(expected['10.0.0.9'], [('rack3', 'DEFAULT', 1)])
+        self.assertEqual(expected['10.0.0.7'], [('rack4', 'DC3', 0)])
+
+        self.manager.invalidate()
+        rebuilt = {
+            ip: [(p.name, f, i) for p, f, i in self.manager.get_profiles_by_ilo_ip(ip)]
+            for ip in expected
+        }
+        self.assertEqual(rebuilt, expected)
+
+    def test_external_modification_is_reloaded(self):
+        # Otra instancia de la aplicación con la misma base de datos
+        other = ProfileManager()
+        self.addCleanup(other.storage.close)
+        other.add_folder('DC3')
+        other.add_profile(make_profile('rack3'), 'DC3')
+
+        self.assertIn('DC3', self.manager.get_folders())
+        self.assertEqual(self.manager.get_profile_by_name('rack3')[1], 'DC3')
+
+
+    def test_batch_uses_stable_ids_and_one_transaction(self):
+        for i in range(3, 8):
+            self.manager.add_profile(make_profile(f'rack{i}', f'10.0.0.{i}'), 'DEFAULT')
+        ids = [self.manager.profile_id('DEFAULT', i) for i in range(6)]
+        removed = []
+        self.manager.profile_removed.connect(lambda folder, index: removed.append((folder, index)))
+
+        statements = []
+        self.manager.storage._conn.set_trace_callback(statements.append)
+        with self.manager.batch() as batch:
+            batch.delete(ids[1])
+            batch.move(ids[2], 'DC2')
+            batch.delete(ids[4])
+            batch.update(ids[5], make_profile('rack7b', '10.0.0.7'))
+            batch.delete(ids[1])  # Ya borrado en el lote: se ignora
+        self.manager.storage._conn.set_trace_callback(None)
+        self.assertTrue(batch.result)
+        self.assertEqual(statements.count('COMMIT'), 1)
+        self.assertEqual(removed, [('DEFAULT', 1), ('DEFAULT', 1), ('DEFAULT', 2)])
+
+        expected = (['rack1', 'rack5', 'rack7b'], ['rack2', 'rack4'])
+        for manager in (self.manager, ProfileManager()):
+            self.assertEqual(manager.get_profile_names('DEFAULT'), expected[0])
+            self.assertEqual(manager.get_profile_names('DC2'), expected[1])
+            if manager is not self.manager:
+                manager.storage.close()
+
+    def test_batch_is_all_or_nothing(self):
+        profile_id = self.manager.profile_id('DEFAULT', 0)
+        self.assertIsNone(self.manager.profile_id('DEFAULT', 5))
+
+        # Una excepción dentro del bloque descarta el lote
+        with self.assertRaises(RuntimeError):
+            with self.manager.batch() as batch:
+                batch.delete(profile_id)
+                raise RuntimeError
+        self.assertEqual(self.manager.get_profile_names('DEFAULT'), ['rack1'])
+
+        # Un error al guardar deshace también los cambios en memoria
+        with mock.patch.object(self.manager.storage, 'move_profile', side_effect=OSError):
+            with self.manager.batch() as batch:
+                batch.delete(self.manager.profile_id('DC2', 0))
+                batch.move(profile_id, 'DC2')
+        self.assertFalse(batch.result)
+        self.assertEqual(self.manager.get_profile_names('DEFAULT'), ['rack1'])
+        self.assertEqual(self.manager.get_profile_names('DC2'), ['rack2'])
+
+        # Tras recargar los perfiles los identificadores anteriores no valen
+        with self.manager.batch() as batch:
+            batch.delete(profile_id)
+        self.assertFalse(batch.result)
+        self.assertEqual(self.manager.get_profile_names('DEFAULT'), ['rack1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QSettings
+from PyQt6.QtWidgets import QApplication
+
+# Importar después de modificar el path
+from ilo_tunnel.gui.profile_model import (
+    FOLDER_ROLE,
+    ProfileFilterProxyModel,
+    ProfileListModel,
+)
+from ilo_tunnel.models.profile import ConnectionProfile
+from ilo_tunnel.models.profile_manager import ProfileManager
+
+
+def make_profile(name, ilo_ip='10.0.0.5'):
+    return ConnectionProfile.from_dict(
+        {'name': name, 'ilo_ip': ilo_ip, 'gateway_ip': '192.0.2.1', 'ssh_user': 'admin'}
+    )
+
+
+def names(model):
+    return [model.index(row, 0).data() for row in range(model.rowCount())]
+
+
+class TestProfileModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        QSettings.setPath(
+            QSettings.Format.NativeFormat, QSettings.Scope.UserScope, self.tmp.name
+        )
+        self.manager = ProfileManager()
+        self.manager.settings.clear()
+        self.manager.add_profile(make_profile('rack1'), 'DEFAULT')
+        self.manager.add_profile(make_profile('web-rack2', '10.0.0.6'), 'DEFAULT')
+        self.manager.add_folder('DC2')
+        self.manager.add_profile(make_profile('rack3'), 'DC2')
+
+        self.model = ProfileListModel(self.manager)
+        self.proxy = ProfileFilterProxyModel(self.manager)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.set_filter('DEFAULT')
+
+        self.events = []
+        self.model.rowsInserted.connect(lambda p, a, b: self.events.append(('insert', a)))
+        self.model.rowsRemoved.connect(lambda p, a, b: self.events.append(('remove', a)))
+        self.model.dataChanged.connect(lambda a, b: self.events.append(('change', a.row())))
+        self.model.modelReset.connect(lambda: self.events.append(('reset',)))
+
+    def test_writes_emit_row_changes(self):
+        self.manager.add_profile(make_profile('rack4'), 'DEFAULT')
+        self.manager.update_profile('DEFAULT', 0, make_profile('rack1b'))
+        self.manager.delete_profile('DEFAULT', 1)
+        self.manager.move_profile('DC2', 0, 'DEFAULT')
+
+        self.assertEqual(
+            self.events,
+            [('insert', 2), ('change', 0), ('remove', 1), ('remove', 2), ('insert', 2)],
+        )
+        self.assertEqual(names(self.model), ['rack1b', 'rack4', 'rack3'])
+        self.assertEqual(self.model.index(2, 0).data(FOLDER_ROLE), 'DEFAULT')
+
+    def test_folder_operations_keep_order(self):
+        self.manager.add_folder('DC1')
+        self.manager.add_profile(make_profile('rack5'), 'DC1')
+        self.manager.add_profile(make_profile('rack6'), 'DC2')
+        self.assertEqual(
+            names(self.model), ['rack1', 'web-rack2', 'rack3', 'rack6', 'rack5']
+        )
+
+        self.manager.rename_folder('DC2', 'DC3')
+        self.assertIn(('reset',), self.events)
+        self.assertEqual(names(self.model), ['rack1', 'web-rack2', 'rack5', 'rack3', 'rack6'])
+
+    def test_proxy_filters_folder_and_ranks_search(self):
+        self.assertEqual(names(self.proxy), ['rack1', 'web-rack2'])
+
+        self.manager.add_profile(make_profile('rack4'), 'DEFAULT')
+        self.assertEqual(names(self.proxy), ['rack1', 'web-rack2', 'rack4'])
+
+        self.assertTrue(self.proxy.set_filter('DEFAULT', 'rack'))
+        self.assertEqual(names(self.proxy), ['rack1', 'rack4', 'web-rack2'])
+        self.assertFalse(self.proxy.set_filter('DEFAULT', 'rack'))
+
+        # Un cambio en los datos obliga a repetir la búsqueda
+        self.manager.add_profile(make_profile('rack0'), 'DEFAULT')
+        self.assertTrue(self.proxy.set_filter('DEFAULT', 'rack'))
+        self.assertIn('rack0', names(self.proxy))
+
+        self.proxy.set_filter('DC2', '10.0.0.6')
+        self.assertEqual(names(self.proxy), [])
+        self.proxy.set_filter('DC2')
+        self.assertEqual(names(self.proxy), ['rack3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importar después de modificar el path
+from ilo_tunnel.models.profile_index import ProfileIndex
+
+
+def profile(name, ilo_ip, gateway_ip='192.0.2.1', ssh_user='admin'):
+    return {
+        'name': name,
+        'ilo_ip': ilo_ip,
+        'gateway_ip': gateway_ip,
+        'ssh_user': ssh_user,
+        'server_type': 'HP/Huawei',
+    }
+
+
+class TestProfileSearch(unittest.TestCase):
+    def setUp(self):
+        self.index = ProfileIndex()
+        self.index.rebuild({
+            'DEFAULT': [
+                profile('madrid-rack10', '10.1.0.10'),
+                profile('rack1', '10.1.0.1'),
+                profile('old-rack', '10.9.0.1', ssh_user='rackadmin'),
+            ],
+            'DC2': [profile('rack12', '10.2.0.12', gateway_ip='198.51.100.7')],
+        })
+
+    def names(self, query, folder=None, limit=None):
+        return [
+            self.index.search_index._texts[self.index._rows[f][i]][0]
+            for f, i in self.index.search(query, folder, limit)
+        ]
+
+    def test_ranking_prefers_exact_and_prefix_matches(self):
+        self.assertEqual(
+            self.names('rack1'), ['rack1', 'rack12', 'madrid-rack10']
+        )
+        self.assertEqual(self.names('rack'), ['rack1', 'rack12', 'madrid-rack10', 'old-rack'])
+
+    def test_searches_ips_gateway_and_user(self):
+        self.assertEqual(self.names('10.2.0'), ['rack12'])
+        self.assertEqual(self.names('198.51'), ['rack12'])
+        self.assertEqual(self.names('rackadmin'), ['old-rack'])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.names('rack 10.1'), ['rack1', 'madrid-rack10'])
+        self.assertEqual(self.names('madrid 10.2'), [])
+
+    def test_narrowing_and_updates(self):
+        self.assertEqual(len(self.names('ra')), 4)
+        self.assertEqual(self.names('rack12'), ['rack12'])
+
+        # Un cambio en los datos invalida los resultados anteriores
+        self.index.replace('DEFAULT', 1, profile('rack123', '10.1.0.1'))
+        self.assertEqual(self.names('rack12'), ['rack12', 'rack123'])
+        self.index.remove('DC2', 0)
+        self.assertEqual(self.names('rack12'), ['rack123'])
+
+    def test_folder_filter_and_limit(self):
+        self.assertEqual(self.names('rack', folder='DC2'), ['rack12'])
+        self.assertEqual(self.names('rack', limit=2), ['rack1', 'rack12'])
+
+
+if __name__ == '__main__':
+    unittest.main()
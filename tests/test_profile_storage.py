@@ -0,0 +1,133 @@
+import unittest
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QSettings
+
+# Importar después de modificar el path
+from ilo_tunnel.models.profile import ConnectionProfile
+from ilo_tunnel.models.profile_manager import ProfileManager
+from ilo_tunnel.models.profile_storage import (
+    SETTINGS_KEY,
+    SettingsProfileStorage,
+    SQLiteProfileStorage,
+)
+
+
+def make_profile(name, ilo_ip='10.0.0.5'):
+    return ConnectionProfile.from_dict(
+        {'name': name, 'ilo_ip': ilo_ip, 'gateway_ip': '192.0.2.1', 'ssh_user': 'admin'}
+    )
+
+
+class TestProfileStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.settings = QSettings(os.path.join(self.tmp.name, 'app.conf'), QSettings.Format.IniFormat)
+        self.path = os.path.join(self.tmp.name, 'profiles.db')
+
+    def open_manager(self, storage):
+        self.addCleanup(storage.close)
+        return ProfileManager(storage=storage)
+
+    def rows(self):
+        with sqlite3.connect(self.path) as conn:
+            return conn.execute(
+                'SELECT folders.name, profiles.position, profiles.name, profiles.ilo_ip'
+                ' FROM profiles JOIN folders ON folders.id = profiles.folder_id'
+                ' ORDER BY folders.position, profiles.position'
+            ).fetchall()
+
+    def test_migrates_settings_blob_once(self):
+        legacy = [make_profile('rack1').to_dict(), make_profile('rack2').to_dict()]
+        self.settings.setValue(SETTINGS_KEY, json.dumps(legacy))
+
+        manager = self.open_manager(SQLiteProfileStorage(self.path, self.settings))
+        self.assertEqual(manager.get_profile_names('DEFAULT'), ['rack1', 'rack2'])
+        # El JSON original se conserva como copia de seguridad
+        self.assertEqual(json.loads(self.settings.value(SETTINGS_KEY)), legacy)
+
+        # Un JSON escrito después (versión antigua) no se vuelve a migrar
+        self.settings.setValue(SETTINGS_KEY, json.dumps({'OTHER': legacy}))
+        again = self.open_manager(SQLiteProfileStorage(self.path, self.settings))
+        self.assertEqual(again.get_folders(), ['DEFAULT'])
+
+    def test_writes_only_touch_affected_rows(self):
+        manager = self.open_manager(SQLiteProfileStorage(self.path))
+        manager.add_folder('DEFAULT')
+        for i in range(3):
+            manager.add_profile(make_profile(f'rack{i}'), 'DEFAULT')
+        manager.add_folder('DC2')
+
+        manager.update_profile('DEFAULT', 1, make_profile('rack1', '10.0.0.9'))
+        manager.move_profile('DEFAULT', 0, 'DC2')
+        manager.delete_profile('DEFAULT', 1)
+        manager.rename_folder('DC2', 'DC3')
+
+        self.assertEqual(
+            self.rows(),
+            [('DEFAULT', 1, 'rack1', '10.0.0.9'), ('DC3', 0, 'rack0', '10.0.0.5')],
+        )
+        # Lo guardado coincide con la copia en memoria
+        expected = manager.get_profiles()
+        manager.invalidate()
+        self.assertEqual(manager.get_profiles(), expected)
+
+    def test_batch_delete_writes_one_row_per_profile(self):
+        storage = SQLiteProfileStorage(self.path)
+        manager = self.open_manager(storage)
+        manager.add_folder('DC2')
+        for i in range(10):
+            manager.add_profile(make_profile(f'rack{i}', f'10.0.0.{i}'), 'DEFAULT')
+        ids = [manager.profile_id('DEFAULT', i) for i in range(10)]
+
+        # Las filas se localizan por id: no se renumeran las siguientes
+        changes = storage._conn.total_changes
+        with manager.batch() as batch:
+            for profile_id in ids[:3]:
+                batch.delete(profile_id)
+            batch.move(ids[3], 'DC2')
+        self.assertTrue(batch.result)
+        self.assertEqual(storage._conn.total_changes - changes, 4)
+
+        manager.add_profile(make_profile('rack10', '10.0.0.10'), 'DEFAULT')
+        names = ['rack4', 'rack5', 'rack6', 'rack7', 'rack8', 'rack9', 'rack10']
+        self.assertEqual(manager.get_profile_names('DEFAULT'), names)
+        other = self.open_manager(SQLiteProfileStorage(self.path))
+        self.assertEqual(other.get_profile_names('DEFAULT'), names)
+        self.assertEqual(other.get_profile_names('DC2'), ['rack3'])
+
+    def test_failed_transaction_rolls_back(self):
+        storage = SQLiteProfileStorage(self.path)
+        manager = self.open_manager(storage)
+        manager.add_profile(make_profile('rack1'), 'DEFAULT')
+
+        data = manager.get_profiles()
+        with self.assertRaises(RuntimeError):
+            with storage.transaction():
+                data['DEFAULT'].append(make_profile('rack2').to_dict())
+                storage.add_profile(data, 'DEFAULT', 1)
+                raise RuntimeError('fallo a mitad')
+
+        self.assertEqual(self.rows(), [('DEFAULT', 0, 'rack1', '10.0.0.5')])
+
+    def test_settings_storage_still_supported(self):
+        manager = self.open_manager(SettingsProfileStorage(self.settings))
+        manager.add_profile(make_profile('rack1'), 'DEFAULT')
+        manager.add_folder('DC2')
+        manager.move_profile('DEFAULT', 0, 'DC2')
+
+        stored = json.loads(self.settings.value(SETTINGS_KEY))
+        self.assertEqual([p['name'] for p in stored['DC2']], ['rack1'])
+        self.assertEqual(stored['DEFAULT'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import random
+import sys
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importar después de modificar el path
+from ilo_tunnel.reconnect import (
+    ReconnectPolicy,
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    CIRCUIT_HALF_OPEN,
+)
+
+
+class TestReconnectPolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = ReconnectPolicy(
+            base_delay=2.0, max_delay=60.0, max_attempts=3, rng=random.Random(1)
+        )
+
+    def test_delays_stay_within_bounds(self):
+        self.policy.max_attempts = 100
+        previous = self.policy.base_delay
+        for _ in range(30):
+            delay = self.policy.record_failure(255)
+            self.assertGreaterEqual(delay, self.policy.base_delay)
+            self.assertLessEqual(delay, min(self.policy.max_delay, previous * 3))
+            previous = delay
+
+    def test_circuit_opens_after_max_attempts(self):
+        self.policy.record_failure(255)
+        self.policy.record_failure(255)
+        self.assertEqual(self.policy.state, CIRCUIT_CLOSED)
+
+        delay = self.policy.record_failure(255)
+        self.assertEqual(self.policy.state, CIRCUIT_OPEN)
+        self.assertGreaterEqual(delay, self.policy.max_delay / 2)
+        self.assertLessEqual(delay, self.policy.max_delay)
+
+    def test_open_circuit_delays_are_jittered(self):
+        for _ in range(3):
+            self.policy.record_failure(255)
+
+        delays = []
+        for _ in range(20):
+            self.policy.record_attempt()
+            delays.append(self.policy.record_failure(255))
+            self.assertEqual(self.policy.state, CIRCUIT_OPEN)
+
+        self.assertGreater(len(set(delays)), 1)
+        for delay in delays:
+            self.assertGreaterEqual(delay, self.policy.max_delay / 2)
+            self.assertLessEqual(delay, self.policy.max_delay)
+
+    def test_failed_probe_reopens_circuit(self):
+        for _ in range(3):
+            self.policy.record_failure(255)
+        self.policy.record_attempt()
+        self.assertEqual(self.policy.state, CIRCUIT_HALF_OPEN)
+
+        delay = self.policy.record_failure(255)
+        self.assertEqual(self.policy.state, CIRCUIT_OPEN)
+        self.assertLessEqual(delay, self.policy.max_delay)
+
+    def test_stable_connection_resets_counters(self):
+        for _ in range(3):
+            self.policy.record_failure(255)
+        self.policy.record_attempt()
+        self.policy.record_connected()
+        self.policy.record_stable()
+
+        self.assertEqual(self.policy.state, CIRCUIT_CLOSED)
+        self.assertEqual(self.policy.failures, 0)
+        self.assertLess(self.policy.record_failure(255), self.policy.max_delay)
+
+    def test_history_detects_flapping(self):
+        self.assertFalse(self.policy.is_flapping())
+        for _ in range(3):
+            self.policy.record_connected()
+            self.policy.record_failure(255, "Connection reset")
+
+        self.assertEqual(len(self.policy.recent_failures()), 3)
+        self.assertTrue(self.policy.is_flapping())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+import os
+import sys
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importar después de modificar el path
+from ilo_tunnel.socks_proxy import build_pac, pac_path
+
+
+class TestPac(unittest.TestCase):
+    def test_only_ilo_goes_through_proxy(self):
+        pac = build_pac('127.0.0.1', 1080, ['10.0.0.5'])
+
+        self.assertIn('host == "10.0.0.5"', pac)
+        self.assertIn('"SOCKS5 127.0.0.1:1080; SOCKS 127.0.0.1:1080"', pac)
+        self.assertIn('return "DIRECT";', pac)
+
+    def test_pac_path_is_safe_file_name(self):
+        self.assertEqual(os.path.basename(pac_path('DEFAULT/rack 1')), 'DEFAULT_rack_1.pac')
+
+
+if __name__ == '__main__':
+    unittest.main()
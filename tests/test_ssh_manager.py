@@ -0,0 +1,230 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+
+# Importar después de modificar el path
+from ilo_tunnel import socks_proxy
+from ilo_tunnel.ssh_manager import SSHManager, Tunnel, ControlMasterPool, SocksProxy
+from ilo_tunnel.events import TunnelEvent, FORWARD_BOUND, FORWARD_FAILED, FORWARD_PENDING
+
+
+class TestSSHManager(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.manager = SSHManager()
+
+    def test_registry_is_keyed_by_tunnel(self):
+        self.manager.set_auto_reconnect(True, 5)
+        first = self.manager._register_tunnel('DEFAULT/rack1')
+        second = self.manager._register_tunnel('DEFAULT/rack2')
+
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.reconnect_timer, second.reconnect_timer)
+        self.assertEqual(self.manager.get_tunnel_ids(), ['DEFAULT/rack1', 'DEFAULT/rack2'])
+        self.assertTrue(second.auto_reconnect)
+        self.assertEqual(second.max_reconnect_attempts, 5)
+        self.assertFalse(self.manager.is_connected())
+        self.assertEqual(self.manager.get_active_tunnel_ids(), [])
+
+    def test_stop_unknown_tunnel(self):
+        self.assertFalse(self.manager.stop_tunnel('no-existe'))
+
+    def test_stop_removes_tunnel(self):
+        removed = []
+        self.manager.tunnel_removed.connect(removed.append)
+        self.manager._register_tunnel('DEFAULT/rack1')
+
+        self.assertFalse(self.manager.stop_tunnel('DEFAULT/rack1'))
+        self.assertEqual(removed, ['DEFAULT/rack1'])
+        self.assertIsNone(self.manager.get_tunnel('DEFAULT/rack1'))
+
+    def test_shutdown_stops_background_workers(self):
+        removed = []
+        self.manager.tunnel_removed.connect(removed.append)
+        self.manager._register_tunnel('DEFAULT/rack1')
+        self.manager.network_watcher.set_gateways(['127.0.0.1'])
+        self.manager.get_local_ip_addresses()
+        self.manager.traffic_relay._ensure_loop()
+
+        self.manager.shutdown()
+
+        self.assertEqual(removed, ['DEFAULT/rack1'])
+        self.assertFalse(self.manager.network_watcher.timer.isActive())
+        self.assertFalse(self.manager.local_addresses.timer.isActive())
+        self.assertIsNone(self.manager.traffic_relay._loop)
+        with self.assertRaises(RuntimeError):
+            self.manager.port_prober._executor.submit(int)
+
+    def test_build_command(self):
+        tunnel = Tunnel('DEFAULT/rack1')
+        tunnel.config.update(
+            key_path='~/.ssh/id_rsa',
+            ssh_port=2222,
+            port_mappings=['127.0.0.1:443:10.0.0.5:443'],
+            user='admin',
+            gateway='192.0.2.1',
+        )
+        cmd = tunnel._build_command()
+
+        self.assertEqual(cmd[-1], 'admin@192.0.2.1')
+        self.assertIn('2222', cmd)
+        self.assertEqual(cmd[cmd.index('-L') + 1], '127.0.0.1:443:10.0.0.5:443')
+
+    def test_build_command_with_socks_proxy(self):
+        tunnel = Tunnel('DEFAULT/rack1')
+        tunnel.config.update(
+            key_path='~/.ssh/id_rsa',
+            ssh_port=22,
+            port_mappings=[],
+            dynamic_forward='127.0.0.1:1080',
+            user='admin',
+            gateway='192.0.2.1',
+        )
+        tunnel._reset_forwards()
+        cmd = tunnel._build_command()
+
+        self.assertNotIn('-L', cmd)
+        self.assertEqual(cmd[cmd.index('-D') + 1], '127.0.0.1:1080')
+        self.assertEqual(tunnel.find_forward(1080).target, 'SOCKS5')
+
+    def test_socks_proxy_is_shared_per_gateway(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for patcher in (
+            mock.patch.object(socks_proxy, 'PAC_DIR', tmp.name),
+            mock.patch.object(SocksProxy, 'start', return_value=True),
+            mock.patch('ilo_tunnel.local_ports.is_port_free', return_value=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        def connect(tunnel_id, ilo_ip, listen):
+            self.assertTrue(self.manager.create_tunnel(
+                tunnel_id, '~/.ssh/id_rsa', 22, [], 'admin', '192.0.2.1',
+                dynamic_forward=listen, socks_hosts=[ilo_ip],
+            ))
+            return self.manager.get_tunnel(tunnel_id)
+
+        first = connect('DEFAULT/rack1', '10.0.0.5', '127.0.0.1:1080')
+        second = connect('DEFAULT/rack2', '10.0.0.6', '127.0.0.1:1081')
+        proxy = first.socks_proxy
+
+        # Una sola escucha para el gateway, con los dos ILO en el archivo PAC
+        self.assertIs(second.socks_proxy, proxy)
+        self.assertEqual(second.config['dynamic_forward'], '127.0.0.1:1080')
+        self.assertEqual(proxy.users, {'DEFAULT/rack1', 'DEFAULT/rack2'})
+        with open(proxy.pac_file) as f:
+            pac = f.read()
+        self.assertIn('host == "10.0.0.5"', pac)
+        self.assertIn('host == "10.0.0.6"', pac)
+        self.assertEqual(self.manager.port_allocator.reserved_by('127.0.0.1', 1080), proxy.name)
+
+        # El proxy sobrevive al túnel que lo abrió
+        self.manager.stop_tunnel('DEFAULT/rack1')
+        self.assertEqual(proxy.users, {'DEFAULT/rack2'})
+        with open(proxy.pac_file) as f:
+            self.assertNotIn('10.0.0.5', f.read())
+        self.assertEqual(self.manager.port_allocator.reserved_by('127.0.0.1', 1080), proxy.name)
+
+        self.manager.stop_tunnel('DEFAULT/rack2')
+        self.assertEqual(proxy.users, set())
+        self.assertIsNone(self.manager.port_allocator.reserved_by('127.0.0.1', 1080))
+
+    def test_master_identity_is_shared_per_gateway(self):
+        base = dict(user='admin', gateway='192.0.2.1', ssh_port=22, key_path='~/.ssh/id_rsa')
+        other_ilo = dict(base, port_mappings=['127.0.0.1:17990:10.0.0.6:17990'])
+        other_port = dict(base, ssh_port=2222)
+
+        self.assertEqual(ControlMasterPool.identity(base), ControlMasterPool.identity(other_ilo))
+        self.assertNotEqual(ControlMasterPool.identity(base), ControlMasterPool.identity(other_port))
+
+    def test_build_command_without_privileged_ports_skips_sudo(self):
+        tunnel = Tunnel('DEFAULT/rack1')
+        tunnel.config.update(
+            key_path='~/.ssh/id_rsa',
+            ssh_port=22,
+            port_mappings=['127.0.0.1:10443:10.0.0.5:443'],
+            user='admin',
+            gateway='192.0.2.1',
+        )
+        self.assertEqual(tunnel._build_command()[0], 'ssh')
+
+    def test_events_track_forward_state(self):
+        tunnel = Tunnel('DEFAULT/rack1')
+        tunnel.config['port_mappings'] = [
+            '127.0.0.1:443:10.0.0.5:443',
+            '127.0.0.1:17990:10.0.0.5:17990',
+            '127.0.0.1:22:10.0.0.5:22',
+        ]
+        tunnel._reset_forwards()
+        events = []
+        tunnel.tunnel_event.connect(events.append)
+
+        tunnel._process_lines([
+            'debug1: Connecting to 192.0.2.1 [192.0.2.1] port 22.',
+            'debug1: Connection established.',
+            'Authenticated to 192.0.2.1 ([192.0.2.1]:22) using "publickey".',
+            'debug1: Local connections to 127.0.0.1:443 forwarded to remote address 10.0.0.5:443',
+            'bind [127.0.0.1]:22: Address already in use',
+            'debug1: Connection to port 443 forwarding to 10.0.0.5 port 443 requested.',
+            'debug1: channel 3: new [direct-tcpip]',
+            'channel 3: open failed: connect failed: No route to host',
+        ], tunnel.error_ready)
+
+        kinds = [event.kind for event in events]
+        self.assertEqual(kinds[:3], ['connecting', 'tcp-connected', 'authenticated'])
+        self.assertTrue(all(a.timestamp <= b.timestamp for a, b in zip(events, events[1:])))
+        self.assertTrue(tunnel.connected)
+
+        https = tunnel.find_forward(443)
+        self.assertEqual(https.state, FORWARD_BOUND)
+        self.assertEqual((https.channels, https.channel_failures), (1, 1))
+        self.assertEqual(tunnel.find_forward(22).state, FORWARD_FAILED)
+        self.assertEqual(tunnel.find_forward(17990).state, FORWARD_PENDING)
+
+    def test_engine_events_track_forward_state(self):
+        tunnel = Tunnel('DEFAULT/rack1')
+        tunnel.config['port_mappings'] = [
+            '127.0.0.1:8443:10.0.0.5:443',
+            '127.0.0.1:22:10.0.0.5:22',
+        ]
+        tunnel._reset_forwards()
+        tunnel.async_active = True
+        finished = []
+        tunnel.process_finished.connect(lambda *args: finished.append(args))
+
+        for kind, fields in [
+            ('authenticated', {'host': '192.0.2.1'}),
+            ('forward-bound', {'listen': '127.0.0.1:8443', 'target': '10.0.0.5:443'}),
+            ('bind-failed', {'port': '22', 'reason': 'Permission denied'}),
+            ('channel-open', {'port': '8443'}),
+        ]:
+            tunnel.handle_engine_event(TunnelEvent('DEFAULT/rack1', kind, fields=fields))
+
+        self.assertTrue(tunnel.connected)
+        self.assertTrue(tunnel.is_running())
+        self.assertEqual(tunnel.find_forward(8443).state, FORWARD_BOUND)
+        self.assertEqual(tunnel.find_forward(8443).channels, 1)
+        self.assertEqual(tunnel.find_forward(22).state, FORWARD_FAILED)
+
+        tunnel.handle_engine_event(
+            TunnelEvent('DEFAULT/rack1', 'exited', fields={'code': '255', 'reason': 'Conexión cerrada'})
+        )
+        self.assertFalse(tunnel.is_running())
+        self.assertEqual(finished, [('DEFAULT/rack1', 255, 'Conexión cerrada')])
+        self.assertEqual(tunnel.find_forward(8443).state, FORWARD_PENDING)
+
+
+if __name__ == '__main__':
+    unittest.main()
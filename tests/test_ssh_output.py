@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importar después de modificar el path
+from ilo_tunnel.ssh_output import (
+    LineDecoder,
+    classify_line,
+    EVENT_AUTHENTICATED,
+    EVENT_BIND_FAILED,
+    EVENT_CONNECT_FAILED,
+    EVENT_DISCONNECT,
+    EVENT_FORWARD_FAILED,
+)
+
+
+class TestLineDecoder(unittest.TestCase):
+    def test_multibyte_sequence_split_across_reads(self):
+        decoder = LineDecoder()
+        data = 'Conexión establecida\n'.encode()
+        split = data.index('ó'.encode()) + 1
+
+        self.assertEqual(decoder.feed(data[:split]), [])
+        self.assertEqual(decoder.feed(data[split:]), ['Conexión establecida'])
+
+    def test_line_split_across_reads(self):
+        decoder = LineDecoder()
+
+        self.assertEqual(decoder.feed(b'debug1: uno\r\nAuthentic'), ['debug1: uno'])
+        self.assertEqual(decoder.feed(b'ated to 192.0.2.1 ([192.0.2.1]:22).\n'),
+                         ['Authenticated to 192.0.2.1 ([192.0.2.1]:22).'])
+
+    def test_flush_returns_incomplete_line(self):
+        decoder = LineDecoder()
+        decoder.feed(b'Connection closed by remote host')
+
+        self.assertEqual(decoder.flush(), ['Connection closed by remote host'])
+        self.assertEqual(decoder.flush(), [])
+
+
+class TestClassifyLine(unittest.TestCase):
+    def test_authenticated(self):
+        event = classify_line('Authenticated to 192.0.2.1 ([192.0.2.1]:22) using "publickey".')
+        self.assertEqual(event.kind, EVENT_AUTHENTICATED)
+        self.assertEqual(event.fields['host'], '192.0.2.1')
+
+    def test_forward_failure_is_not_a_connect_failure(self):
+        event = classify_line('channel 3: open failed: connect failed: Connection refused')
+        self.assertEqual(event.kind, EVENT_FORWARD_FAILED)
+        self.assertEqual(event.fields['channel'], '3')
+
+    def test_connect_failed(self):
+        event = classify_line('ssh: connect to host 192.0.2.1 port 22: Connection timed out')
+        self.assertEqual(event.kind, EVENT_CONNECT_FAILED)
+        self.assertEqual(event.fields['reason'], 'Connection timed out')
+
+    def test_bind_failed(self):
+        event = classify_line('bind [127.0.0.1]:443: Permission denied')
+        self.assertEqual(event.kind, EVENT_BIND_FAILED)
+        self.assertEqual(event.fields['port'], '443')
+
+    def test_disconnect(self):
+        event = classify_line('Connection to 192.0.2.1 closed by remote host.')
+        self.assertEqual(event.kind, EVENT_DISCONNECT)
+
+    def test_irrelevant_line(self):
+        self.assertIsNone(classify_line('debug1: Reading configuration data /etc/ssh/ssh_config'))
+
+
+if __name__ == '__main__':
+    unittest.main()
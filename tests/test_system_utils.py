@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+
+# Importar después de modificar el path
+from ilo_tunnel.utils.system_utils import (
+    LocalAddressCache,
+    _fib_trie_addresses,
+    list_local_addresses,
+)
+
+FIB_TRIE = """Main:
+  +-- 0.0.0.0/0 3 0 5
+     |-- 0.0.0.0
+        /0 universe UNICAST
+     +-- 127.0.0.0/8 2 0 2
+        +-- 127.0.0.0/31 1 0 0
+           |-- 127.0.0.0
+              /8 host LOCAL
+           |-- 127.0.0.1
+              /32 host LOCAL
+     +-- 192.168.1.0/24 2 0 2
+           |-- 192.168.1.0
+              /24 link UNICAST
+           |-- 192.168.1.20
+              /32 host LOCAL
+        |-- 192.168.1.255
+           /32 link BROADCAST
+"""
+
+
+class TestLocalAddresses(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_fib_trie_only_returns_local_hosts(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.trie', delete=False) as f:
+            f.write(FIB_TRIE)
+        self.addCleanup(os.remove, f.name)
+
+        self.assertEqual(_fib_trie_addresses(f.name), ['127.0.0.1', '192.168.1.20'])
+
+    def test_list_always_has_single_loopback(self):
+        addresses = list_local_addresses()
+        self.assertIn('127.0.0.1', addresses)
+        self.assertEqual([ip for ip in addresses if ip.startswith('127.')], ['127.0.0.1'])
+        self.assertEqual(addresses, sorted(addresses))
+
+    def test_cache_notifies_only_changes(self):
+        cache = LocalAddressCache(ttl=60)
+        self.addCleanup(cache.shutdown)
+        changes = []
+        cache.addresses_changed.connect(changes.append)
+
+        first = cache.get()
+        self.assertTrue(cache.timer.isActive())
+        cache._handle_refreshed(list(first))
+        self.assertEqual(changes, [])
+
+        cache._handle_refreshed(first + ['10.8.0.2'])
+        self.assertEqual(changes, [first + ['10.8.0.2']])
+        self.assertEqual(cache.get(), first + ['10.8.0.2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
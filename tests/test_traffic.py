@@ -0,0 +1,114 @@
+import unittest
+import os
+import socket
+import sys
+import threading
+import time
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importar después de modificar el path
+from ilo_tunnel.traffic import TrafficRelay, allocate_internal_port, format_bytes
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestTrafficRelay(unittest.TestCase):
+    def setUp(self):
+        # Servidor de eco que hace de extremo de ssh
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.target_port = self.server.getsockname()[1]
+        threading.Thread(target=self._echo, daemon=True).start()
+
+        self.relay = TrafficRelay()
+
+    def tearDown(self):
+        self.relay.shutdown()
+        self.server.close()
+
+    def _echo(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            with conn:
+                while True:
+                    data = conn.recv(4096)
+                    if not data:
+                        break
+                    conn.sendall(data * 2)
+
+    def test_counts_bytes_and_connections(self):
+        local_port = allocate_internal_port()
+        sock = self.relay.bind('127.0.0.1', local_port)
+        self.assertIsNotNone(sock)
+        self.relay.start('DEFAULT/rack1', sock, local_port, self.target_port)
+
+        self.assertTrue(wait_for(lambda: self._can_connect(local_port)))
+        with socket.create_connection(('127.0.0.1', local_port), timeout=2) as client:
+            client.sendall(b'x' * 1000)
+            received = b''
+            while len(received) < 2000:
+                received += client.recv(4096)
+
+        counters = self.relay.get_counters('DEFAULT/rack1')[local_port]
+        self.assertTrue(wait_for(lambda: counters.active == 0))
+        self.assertEqual(counters.bytes_sent, 1000)
+        self.assertEqual(counters.bytes_received, 2000)
+        self.assertGreaterEqual(counters.connections, 1)
+
+        rates = self.relay.sample_rates('DEFAULT/rack1')
+        self.assertGreater(rates[local_port].received_per_s, 0)
+
+    def test_reset_keeps_counting_on_surviving_relay(self):
+        local_port = allocate_internal_port()
+        sock = self.relay.bind('127.0.0.1', local_port)
+        self.relay.start('DEFAULT/rack1', sock, local_port, self.target_port)
+        self.assertTrue(wait_for(lambda: self._can_connect(local_port)))
+
+        # Sesión nueva del túnel con el relé aún escuchando
+        self.relay.reset('DEFAULT/rack1')
+        counters = self.relay.get_counters('DEFAULT/rack1')[local_port]
+        self.assertEqual((counters.bytes_sent, counters.connections), (0, 0))
+
+        with socket.create_connection(('127.0.0.1', local_port), timeout=2) as client:
+            client.sendall(b'x' * 100)
+            received = b''
+            while len(received) < 200:
+                received += client.recv(4096)
+
+        self.assertTrue(wait_for(lambda: counters.active == 0))
+        self.assertIs(self.relay.get_counters('DEFAULT/rack1')[local_port], counters)
+        self.assertEqual(counters.bytes_sent, 100)
+        self.assertGreaterEqual(counters.connections, 1)
+
+    def test_bind_fails_on_busy_port(self):
+        self.assertIsNone(self.relay.bind('127.0.0.1', self.target_port))
+
+    def _can_connect(self, port):
+        # La conexión de prueba también cuenta; se abre y se cierra sin datos
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return True
+        except OSError:
+            return False
+
+
+class TestFormatBytes(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(format_bytes(512), '512 B')
+        self.assertEqual(format_bytes(1536), '1.5 KB')
+        self.assertEqual(format_bytes(5 * 1024 ** 3), '5.0 GB')
+
+
+if __name__ == '__main__':
+    unittest.main()
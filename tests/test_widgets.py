@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+
+# Añadir directorio principal al path para importar módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+
+# Importar después de modificar el path
+from ilo_tunnel.gui.widgets import LogTextEdit
+
+
+class TestLogTextEdit(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.log = LogTextEdit(max_lines=100)
+
+    def test_appends_are_batched(self):
+        self.log.append('debug1: uno', 'debug')
+        self.log.append('dos\ntres')
+
+        self.assertTrue(self.log.document().isEmpty())
+        self.log.flush()
+        self.assertEqual(self.log.document().blockCount(), 3)
+        self.assertEqual(self.log.toPlainText(), 'debug1: uno\ndos\ntres')
+
+    def test_ring_buffer_keeps_last_lines(self):
+        for i in range(250):
+            self.log.append(f'linea {i}')
+        self.log.flush()
+        for i in range(250, 300):
+            self.log.append(f'linea {i}')
+
+        lines = self.log.toPlainText().splitlines()
+        self.assertEqual(len(lines), 100)
+        self.assertEqual(lines[0], 'linea 200')
+        self.assertEqual(lines[-1], 'linea 299')
+
+    def test_filter_hides_lower_levels(self):
+        self.log.append('debug1: ruido', 'debug')
+        self.log.append('Túnel establecido')
+        self.log.setMinimumLevel('info')
+        self.log.append('debug1: más ruido', 'debug')
+        self.log.append('Connection refused', 'error')
+        self.log.flush()
+
+        document = self.log.document()
+        visible = [
+            document.findBlockByNumber(i).text()
+            for i in range(document.blockCount())
+            if document.findBlockByNumber(i).isVisible()
+        ]
+        self.assertEqual(visible, ['Túnel establecido', 'Connection refused'])
+
+        self.log.setMinimumLevel('debug')
+        self.assertTrue(all(
+            document.findBlockByNumber(i).isVisible()
+            for i in range(document.blockCount())
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()